@@ -7,13 +7,22 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 from semantic_kernel import Kernel
-from semantic_kernel.functions import KernelFunctionFromPrompt
+
+from common.utils.analysis_dag import AnalysisDAG
+from common.utils.prompt_registry import prompt_registry
+from common.utils.json_stream import StreamingJSONMixin
+from common.utils.token_budget import SUMMARIZE, FittedPrompt, PromptBudget, PromptSection
+from common.utils.token_usage import token_usage
+from common.utils.tokens import count_tokens
 
 logger = logging.getLogger(__name__)
 
-class AgileCoachingAgent:
+# Specialist insights consumed by the coaching synthesis
+SPECIALISTS = ("backlog", "meeting", "flow", "wellness")
+
+class AgileCoachingAgent(StreamingJSONMixin):
     """
     Agile Coaching Agent that provides strategic guidance by synthesizing insights
     """
@@ -22,7 +31,15 @@ class AgileCoachingAgent:
         self.kernel = kernel
         self.deployment_name = deployment_name
         self.agent_name = "SM-Asst-AgileCoachingAgent"
+        # Deadlines (seconds) for each specialist and for the synthesis steps
+        # when running the full coaching analysis
+        self.specialist_timeout = 60.0
+        self.synthesis_timeout = 90.0
+        # Prompt token budget, and the cap on each specialist's insights within it
+        self.prompt_token_budget = 12000
+        self.insight_section_tokens = 3000
         self._init_prompts()
+        self._init_functions()
         
     def _init_prompts(self):
         """Initialize prompt templates for agile coaching capabilities"""
@@ -148,32 +165,119 @@ class AgileCoachingAgent:
             ]
         }
         """
+        
+        self.sprint_summary_prompt = """
+        Generate a comprehensive sprint coaching summary based on all available data.
+        
+        Sprint Data: {{$sprint_data}}
+        
+        Provide coaching summary in JSON format:
+        {
+            "sprint_overview": {
+                "sprint_health": "Overall assessment of sprint health",
+                "key_achievements": ["Major accomplishments this sprint"],
+                "challenges_encountered": ["Key challenges faced"],
+                "lessons_learned": ["Important lessons from this sprint"]
+            },
+            "performance_analysis": {
+                "velocity_assessment": "Analysis of team velocity",
+                "quality_indicators": "Assessment of work quality",
+                "collaboration_effectiveness": "How well team collaborated",
+                "goal_achievement": "Assessment of sprint goal achievement"
+            },
+            "coaching_recommendations": {
+                "immediate_actions": ["Actions for next sprint"],
+                "process_adjustments": ["Process improvements to try"],
+                "team_development": ["Team development opportunities"],
+                "celebration_items": ["Things to celebrate and recognize"]
+            },
+            "next_sprint_focus": [
+                "Key focus areas for the upcoming sprint"
+            ]
+        }
+        """
+        
+        self.escalation_prompt = """
+        Analyze all agent data to identify issues requiring human Scrum Master escalation.
+        
+        Agent Data: {{$agent_data}}
+        
+        Identify escalation needs in JSON format:
+        {
+            "escalation_analysis": {
+                "critical_issues": [
+                    {
+                        "issue": "Description of critical issue",
+                        "severity": "Critical/High/Medium",
+                        "impact": "Potential impact if not addressed",
+                        "recommended_action": "Suggested escalation action",
+                        "urgency": "Immediate/Today/This Week",
+                        "stakeholders": ["Who should be involved"]
+                    }
+                ],
+                "patterns_requiring_attention": [
+                    "Patterns that suggest need for human intervention"
+                ],
+                "coaching_limitations": [
+                    "Areas where AI coaching has limitations"
+                ]
+            },
+            "escalation_plan": {
+                "immediate_escalations": ["Issues needing immediate attention"],
+                "planned_discussions": ["Items for next coaching conversation"],
+                "monitoring_items": ["Items to monitor before escalating"]
+            }
+        }
+        """
+
+    def _init_functions(self):
+        """Compile each prompt function once; the compiled functions are shared across requests"""
+        self.functions = prompt_registry.compile_all({
+            "synthesize_insights": self.coaching_synthesis_prompt,
+            "optimize_processes": self.process_optimization_prompt,
+            "develop_coaching_plan": self.team_development_prompt,
+            "generate_sprint_summary": self.sprint_summary_prompt,
+            "identify_escalations": self.escalation_prompt
+        })
+
+    def _fit_prompt(self, function, template: str, sections: List[PromptSection]) -> FittedPrompt:
+        """Fit prompt sections into the token budget left after the template"""
+        fitted = PromptBudget(self.prompt_token_budget, count_tokens(template)).fit(sections)
+        if fitted.trimmed:
+            token_usage.record_trimmed(self.agent_name, function.name, len(fitted.trimmed))
+            logger.info(f"Trimmed {len(fitted.trimmed)} sections of {function.name} to fit {fitted.budget} tokens")
+        return fitted
 
     async def synthesize_coaching_insights(self, agent_insights: Dict[str, Any], team_context: str = "") -> Dict[str, Any]:
         """
         Synthesize insights from all agents to provide holistic coaching guidance
+        
+        Each specialist's insights are summarized down to insight_section_tokens, and
+        further if the whole prompt exceeds prompt_token_budget.
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="synthesize_insights",
-                prompt=self.coaching_synthesis_prompt
-            )
+            function = self.functions["synthesize_insights"]
             
-            result = await self.kernel.invoke(
-                function,
-                backlog_insights=json.dumps(agent_insights.get('backlog', {})),
-                meeting_insights=json.dumps(agent_insights.get('meeting', {})),
-                flow_insights=json.dumps(agent_insights.get('flow', {})),
-                wellness_insights=json.dumps(agent_insights.get('wellness', {})),
-                team_context=team_context
-            )
+            sections = [
+                PromptSection(
+                    f"{name}_insights",
+                    agent_insights.get(name, {}),
+                    priority=1,
+                    max_tokens=self.insight_section_tokens,
+                    strategy=SUMMARIZE
+                )
+                for name in SPECIALISTS
+            ]
+            sections.append(PromptSection("team_context", team_context, priority=2))
+            fitted = self._fit_prompt(function, self.coaching_synthesis_prompt, sections)
             
-            coaching_guidance = json.loads(str(result))
+            coaching_guidance = await self._invoke_json(function, **fitted.sections)
             
             return {
                 "success": True,
                 "agent": self.agent_name,
                 "coaching_guidance": coaching_guidance,
+                "prompt_budget": fitted.report(),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -190,20 +294,15 @@ class AgileCoachingAgent:
         Provide process optimization recommendations
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="optimize_processes",
-                prompt=self.process_optimization_prompt
-            )
+            function = self.functions["optimize_processes"]
             
-            result = await self.kernel.invoke(
+            optimization = await self._invoke_json(
                 function,
                 process_data=process_data,
                 metrics=metrics,
                 feedback=feedback
             )
             
-            optimization = json.loads(str(result))
-            
             return {
                 "success": True,
                 "agent": self.agent_name,
@@ -224,19 +323,14 @@ class AgileCoachingAgent:
         Create comprehensive team development coaching plan
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="develop_coaching_plan",
-                prompt=self.team_development_prompt
-            )
+            function = self.functions["develop_coaching_plan"]
             
-            result = await self.kernel.invoke(
+            development_plan = await self._invoke_json(
                 function,
                 team_assessment=team_assessment,
                 development_goals=development_goals
             )
             
-            development_plan = json.loads(str(result))
-            
             return {
                 "success": True,
                 "agent": self.agent_name,
@@ -257,44 +351,9 @@ class AgileCoachingAgent:
         Generate comprehensive sprint coaching summary
         """
         try:
-            summary_prompt = """
-            Generate a comprehensive sprint coaching summary based on all available data.
-            
-            Sprint Data: {{$sprint_data}}
+            function = self.functions["generate_sprint_summary"]
             
-            Provide coaching summary in JSON format:
-            {
-                "sprint_overview": {
-                    "sprint_health": "Overall assessment of sprint health",
-                    "key_achievements": ["Major accomplishments this sprint"],
-                    "challenges_encountered": ["Key challenges faced"],
-                    "lessons_learned": ["Important lessons from this sprint"]
-                },
-                "performance_analysis": {
-                    "velocity_assessment": "Analysis of team velocity",
-                    "quality_indicators": "Assessment of work quality",
-                    "collaboration_effectiveness": "How well team collaborated",
-                    "goal_achievement": "Assessment of sprint goal achievement"
-                },
-                "coaching_recommendations": {
-                    "immediate_actions": ["Actions for next sprint"],
-                    "process_adjustments": ["Process improvements to try"],
-                    "team_development": ["Team development opportunities"],
-                    "celebration_items": ["Things to celebrate and recognize"]
-                },
-                "next_sprint_focus": [
-                    "Key focus areas for the upcoming sprint"
-                ]
-            }
-            """
-            
-            function = KernelFunctionFromPrompt(
-                function_name="generate_sprint_summary",
-                prompt=summary_prompt
-            )
-            
-            result = await self.kernel.invoke(function, sprint_data=json.dumps(sprint_data))
-            summary = json.loads(str(result))
+            summary = await self._invoke_json(function, sprint_data=json.dumps(sprint_data))
             
             return {
                 "success": True,
@@ -316,46 +375,15 @@ class AgileCoachingAgent:
         Identify issues that require human Scrum Master intervention
         """
         try:
-            escalation_prompt = """
-            Analyze all agent data to identify issues requiring human Scrum Master escalation.
+            function = self.functions["identify_escalations"]
             
-            Agent Data: {{$agent_data}}
-            
-            Identify escalation needs in JSON format:
-            {
-                "escalation_analysis": {
-                    "critical_issues": [
-                        {
-                            "issue": "Description of critical issue",
-                            "severity": "Critical/High/Medium",
-                            "impact": "Potential impact if not addressed",
-                            "recommended_action": "Suggested escalation action",
-                            "urgency": "Immediate/Today/This Week",
-                            "stakeholders": ["Who should be involved"]
-                        }
-                    ],
-                    "patterns_requiring_attention": [
-                        "Patterns that suggest need for human intervention"
-                    ],
-                    "coaching_limitations": [
-                        "Areas where AI coaching has limitations"
-                    ]
-                },
-                "escalation_plan": {
-                    "immediate_escalations": ["Issues needing immediate attention"],
-                    "planned_discussions": ["Items for next coaching conversation"],
-                    "monitoring_items": ["Items to monitor before escalating"]
-                }
-            }
-            """
-            
-            function = KernelFunctionFromPrompt(
-                function_name="identify_escalations",
-                prompt=escalation_prompt
+            fitted = self._fit_prompt(
+                function,
+                self.escalation_prompt,
+                [PromptSection("agent_data", all_agent_data, strategy=SUMMARIZE)]
             )
             
-            result = await self.kernel.invoke(function, agent_data=json.dumps(all_agent_data))
-            escalation_analysis = json.loads(str(result))
+            escalation_analysis = await self._invoke_json(function, **fitted.sections)
             
             return {
                 "success": True,
@@ -370,4 +398,71 @@ class AgileCoachingAgent:
                 "success": False,
                 "error": str(e),
                 "agent": self.agent_name
-            }
\ No newline at end of file
+            }
+
+    async def run_coaching_analysis(self,
+                                    specialist_tasks: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]],
+                                    team_context: str = "") -> Dict[str, Any]:
+        """
+        Run the specialist agents concurrently and feed their results into the
+        coaching synthesis and escalation analysis, which also run side by side
+        
+        specialist_tasks maps "backlog", "meeting", "flow" and "wellness" to
+        zero-argument coroutines, e.g. ``lambda: flow_agent.analyze_flow_metrics(data)``.
+        A specialist that fails or misses its deadline is reported as unavailable
+        and the synthesis proceeds with the remaining insights.
+        """
+        try:
+            unknown = set(specialist_tasks) - set(SPECIALISTS)
+            if unknown:
+                raise ValueError(f"Unknown specialists: {', '.join(sorted(unknown))}")
+            
+            dag = AnalysisDAG()
+            for name, task in specialist_tasks.items():
+                dag.add_node(
+                    name,
+                    lambda _, task=task: task(),
+                    timeout=self.specialist_timeout,
+                    fallback={"success": False, "error": f"{name} insights unavailable"}
+                )
+            
+            specialists = tuple(specialist_tasks)
+            
+            async def synthesize(insights: Dict[str, Any]) -> Dict[str, Any]:
+                return await self.synthesize_coaching_insights(insights, team_context)
+            
+            async def escalate(insights: Dict[str, Any]) -> Dict[str, Any]:
+                return await self.identify_escalation_needs(insights)
+            
+            dag.add_node(
+                "synthesis", synthesize, depends_on=specialists, timeout=self.synthesis_timeout,
+                fallback={"success": False, "error": "Coaching synthesis unavailable"}
+            )
+            dag.add_node(
+                "escalations", escalate, depends_on=specialists, timeout=self.synthesis_timeout,
+                fallback={"success": False, "error": "Escalation analysis unavailable"}
+            )
+            
+            execution = await dag.run()
+            results = execution["results"]
+            
+            return {
+                "success": results["synthesis"].get("success", False),
+                "agent": self.agent_name,
+                "coaching_guidance": results["synthesis"].get("coaching_guidance"),
+                "escalation_analysis": results["escalations"].get("escalation_analysis"),
+                "specialist_insights": {name: results[name] for name in specialists},
+                "partial": any(
+                    not results[name].get("success", False) for name in specialists
+                ),
+                "execution": {"nodes": execution["nodes"], "total_ms": execution["total_ms"]},
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error running coaching analysis: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "agent": self.agent_name
+            }
@@ -3,29 +3,74 @@ Backlog Intelligence Agent for Scrum Master Assistant
 Specializes in user story creation, acceptance criteria, and backlog analysis.
 """
 
+import asyncio
 import json
 import logging
-import re
-from typing import Dict, List, Optional, Any
+import time
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
 from semantic_kernel import Kernel
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-from semantic_kernel.prompt_template import InputVariable, PromptTemplateConfig
-from semantic_kernel.functions import KernelFunctionFromPrompt
+
+from common.analytics.estimation import StoryPointEstimator
+from common.utils.prompt_registry import prompt_registry
+from common.utils.json_stream import JSONExtractionError, StreamingJSONMixin
+from common.utils.tokens import count_json_tokens, count_tokens, pack_by_budget
 
 logger = logging.getLogger(__name__)
 
-class BacklogIntelligenceAgent:
+# Terms that push the heuristic estimate up
+COMPLEXITY_KEYWORDS = (
+    "integration", "api", "database", "migration", "security",
+    "performance", "complex", "multiple", "external", "new technology"
+)
+
+BACKLOG_SUMMARY_KEYS = (
+    "total_stories", "ready_stories", "needs_refinement",
+    "blocked_stories", "estimated_capacity_needed"
+)
+
+
+def _number(value: Any) -> float:
+    """Numeric value of an LLM-reported figure such as 5, "5" or "8 points"; 0 if none"""
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        number = float(str(value).split()[0].rstrip("%"))
+    except (ValueError, IndexError):
+        return 0
+    return int(number) if number.is_integer() else number
+
+
+def _unique(values: List[Any]) -> List[Any]:
+    """Values in first-seen order without duplicates"""
+    seen = set()
+    result = []
+    for value in values:
+        key = json.dumps(value, sort_keys=True, default=str)
+        if key not in seen:
+            seen.add(key)
+            result.append(value)
+    return result
+
+class BacklogIntelligenceAgent(StreamingJSONMixin):
     """Agent specialized in backlog management and user story creation"""
     
     def __init__(self, kernel: Kernel, deployment_name: str):
         self.kernel = kernel
         self.deployment_name = deployment_name
         self.agent_name = "BacklogIntelligenceAgent"
+        # Backlog analysis sends at most this many tokens of stories per call,
+        # with up to max_concurrent_analyses calls in flight
+        self.backlog_chunk_tokens = 6000
+        self.max_concurrent_analyses = 4
+        # Completed stories with known points, used for similarity estimates
+        self.point_estimator = StoryPointEstimator()
         
         # Initialize prompts for different capabilities
         self._init_prompts()
+        self._init_functions()
     
     def _init_prompts(self):
         """Initialize prompt templates for various backlog operations"""
@@ -266,44 +311,38 @@ Format as JSON:
 ```
 """
 
+    def _init_functions(self):
+        """Compile each prompt function once; the compiled functions are shared across requests"""
+        self.functions = prompt_registry.compile_all({
+            "create_user_stories": self.story_creation_prompt,
+            "analyze_backlog": self.backlog_analysis_prompt,
+            "generate_acceptance_criteria": self.acceptance_criteria_prompt,
+            "break_down_epic": self.epic_breakdown_prompt
+        })
+
     async def create_user_stories(self, requirements: str, context: str = "") -> Dict[str, Any]:
         """Create user stories from raw requirements"""
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="create_user_stories",
-                prompt=self.story_creation_prompt,
-                prompt_template_config=PromptTemplateConfig(
-                    input_variables=[
-                        InputVariable(name="requirements"),
-                        InputVariable(name="context")
-                    ]
-                )
-            )
+            function = self.functions["create_user_stories"]
             
-            result = await self.kernel.invoke(
-                function,
-                requirements=requirements,
-                context=context or "No additional context provided"
-            )
-            
-            # Parse the JSON response
-            response_text = str(result)
-            
-            # Clean up the response to extract JSON
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-            if json_match:
-                stories_json = json.loads(json_match.group())
-                return {
-                    "success": True,
-                    "stories": stories_json,
-                    "count": len(stories_json)
-                }
-            else:
+            try:
+                stories_json = await self._invoke_json(
+                    function,
+                    requirements=requirements,
+                    context=context or "No additional context provided"
+                )
+            except JSONExtractionError as e:
                 return {
                     "success": False,
                     "error": "Could not parse user stories from response",
-                    "raw_response": response_text
+                    "raw_response": e.text
                 }
+            
+            return {
+                "success": True,
+                "stories": stories_json,
+                "count": len(stories_json)
+            }
                 
         except Exception as e:
             logger.error(f"Error creating user stories: {e}")
@@ -315,47 +354,76 @@ Format as JSON:
     async def analyze_backlog(self, backlog_items: List[Dict], 
                             sprint_capacity: int = 21, 
                             team_velocity: int = 18) -> Dict[str, Any]:
-        """Analyze backlog readiness for sprint planning"""
+        """Analyze backlog readiness for sprint planning
+        
+        Stories are packed into token-budgeted chunks that are analyzed
+        concurrently and then merged into one sprint-readiness report.
+        """
         try:
-            # Format backlog items for analysis
-            backlog_text = json.dumps(backlog_items, indent=2)
+            started = time.perf_counter()
+            function = self.functions["analyze_backlog"]
+            template_tokens = count_tokens(self.backlog_analysis_prompt)
             
-            function = KernelFunctionFromPrompt(
-                function_name="analyze_backlog",
-                prompt=self.backlog_analysis_prompt,
-                prompt_template_config=PromptTemplateConfig(
-                    input_variables=[
-                        InputVariable(name="backlog_items"),
-                        InputVariable(name="sprint_capacity"),
-                        InputVariable(name="team_velocity")
-                    ]
-                )
-            )
+            chunks = pack_by_budget(backlog_items, self.backlog_chunk_tokens, count_json_tokens) or [[]]
+            chunked = time.perf_counter()
             
-            result = await self.kernel.invoke(
-                function,
-                backlog_items=backlog_text,
-                sprint_capacity=str(sprint_capacity),
-                team_velocity=str(team_velocity)
-            )
+            semaphore = asyncio.Semaphore(self.max_concurrent_analyses)
             
-            response_text = str(result)
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-                return {
-                    "success": True,
-                    "analysis": analysis,
-                    "analyzed_at": datetime.now().isoformat()
+            async def analyze_chunk(chunk: List[Dict]):
+                backlog_text = json.dumps(chunk)
+                async with semaphore:
+                    chunk_started = time.perf_counter()
+                    analysis = await self._invoke_json(
+                        function,
+                        backlog_items=backlog_text,
+                        sprint_capacity=str(sprint_capacity),
+                        team_velocity=str(team_velocity)
+                    )
+                return analysis, {
+                    "stories": len(chunk),
+                    "prompt_tokens": template_tokens + count_tokens(backlog_text),
+                    "completion_tokens": count_json_tokens(analysis),
+                    "duration_ms": round((time.perf_counter() - chunk_started) * 1000, 1)
                 }
-            else:
+            
+            try:
+                results = await asyncio.gather(*(analyze_chunk(chunk) for chunk in chunks))
+            except JSONExtractionError as e:
                 return {
                     "success": False,
                     "error": "Could not parse backlog analysis",
-                    "raw_response": response_text
+                    "raw_response": e.text
                 }
+            mapped = time.perf_counter()
+            
+            analyses = [analysis for analysis, _ in results]
+            if len(analyses) == 1:
+                analysis = analyses[0]
+            else:
+                analysis = self._merge_backlog_analyses(analyses, sprint_capacity)
+            reduced = time.perf_counter()
+            
+            chunk_stats = [stats for _, stats in results]
+            return {
+                "success": True,
+                "analysis": analysis,
+                "analyzed_at": datetime.now().isoformat(),
+                "pipeline": {
+                    "chunks": len(chunks),
+                    "max_concurrency": self.max_concurrent_analyses,
+                    "timings_ms": {
+                        "chunking": round((chunked - started) * 1000, 1),
+                        "analysis": round((mapped - chunked) * 1000, 1),
+                        "reduce": round((reduced - mapped) * 1000, 1),
+                        "total": round((reduced - started) * 1000, 1)
+                    },
+                    "tokens": {
+                        "prompt": sum(stats["prompt_tokens"] for stats in chunk_stats),
+                        "completion": sum(stats["completion_tokens"] for stats in chunk_stats),
+                        "per_chunk": chunk_stats
+                    }
+                }
+            }
                 
         except Exception as e:
             logger.error(f"Error analyzing backlog: {e}")
@@ -364,47 +432,71 @@ Format as JSON:
                 "error": str(e)
             }
     
+    def _merge_backlog_analyses(self, analyses: List[Dict], sprint_capacity: int) -> Dict[str, Any]:
+        """Combine per-chunk readiness analyses into one report, re-planning
+        the sprint across all ready stories"""
+        summaries = [analysis.get("summary") or {} for analysis in analyses]
+        summary = {
+            key: sum(_number(s.get(key)) for s in summaries)
+            for key in BACKLOG_SUMMARY_KEYS
+        }
+        
+        ready = [story for a in analyses for story in a.get("ready_for_sprint") or []]
+        ready.sort(key=lambda story: _number(story.get("readiness_score")), reverse=True)
+        
+        # Fill the sprint with the most ready stories that fit the capacity
+        suggested = []
+        total_points = 0
+        for story in ready:
+            points = _number(story.get("story_points"))
+            if total_points + points <= sprint_capacity:
+                suggested.append(story.get("story_key") or story.get("title"))
+                total_points += points
+        
+        sprint_recommendations = [a.get("sprint_recommendations") or {} for a in analyses]
+        return {
+            "summary": summary,
+            "ready_for_sprint": ready,
+            "needs_refinement": [story for a in analyses for story in a.get("needs_refinement") or []],
+            "sprint_recommendations": {
+                "suggested_stories": suggested,
+                "total_points": total_points,
+                "capacity_utilization": f"{round(100 * total_points / sprint_capacity)}%" if sprint_capacity else "N/A",
+                "risk_factors": _unique([
+                    risk for r in sprint_recommendations for risk in r.get("risk_factors") or []
+                ])
+            },
+            "overall_recommendations": _unique([
+                item for a in analyses for item in a.get("overall_recommendations") or []
+            ])
+        }
+    
     async def generate_acceptance_criteria(self, user_story: str, 
                                          context: str = "",
                                          additional_requirements: str = "") -> Dict[str, Any]:
         """Generate comprehensive acceptance criteria for a user story"""
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="generate_acceptance_criteria",
-                prompt=self.acceptance_criteria_prompt,
-                prompt_template_config=PromptTemplateConfig(
-                    input_variables=[
-                        InputVariable(name="user_story"),
-                        InputVariable(name="context"),
-                        InputVariable(name="additional_requirements")
-                    ]
-                )
-            )
-            
-            result = await self.kernel.invoke(
-                function,
-                user_story=user_story,
-                context=context or "No additional context",
-                additional_requirements=additional_requirements or "No additional requirements"
-            )
-            
-            response_text = str(result)
+            function = self.functions["generate_acceptance_criteria"]
             
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                criteria = json.loads(json_match.group())
-                return {
-                    "success": True,
-                    "acceptance_criteria": criteria,
-                    "generated_at": datetime.now().isoformat()
-                }
-            else:
+            try:
+                criteria = await self._invoke_json(
+                    function,
+                    user_story=user_story,
+                    context=context or "No additional context",
+                    additional_requirements=additional_requirements or "No additional requirements"
+                )
+            except JSONExtractionError as e:
                 return {
                     "success": False,
                     "error": "Could not parse acceptance criteria",
-                    "raw_response": response_text
+                    "raw_response": e.text
                 }
+            
+            return {
+                "success": True,
+                "acceptance_criteria": criteria,
+                "generated_at": datetime.now().isoformat()
+            }
                 
         except Exception as e:
             logger.error(f"Error generating acceptance criteria: {e}")
@@ -419,44 +511,28 @@ Format as JSON:
                             technical_constraints: str = "") -> Dict[str, Any]:
         """Break down an epic into user stories"""
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="break_down_epic",
-                prompt=self.epic_breakdown_prompt,
-                prompt_template_config=PromptTemplateConfig(
-                    input_variables=[
-                        InputVariable(name="epic_description"),
-                        InputVariable(name="target_users"),
-                        InputVariable(name="business_goals"),
-                        InputVariable(name="technical_constraints")
-                    ]
-                )
-            )
-            
-            result = await self.kernel.invoke(
-                function,
-                epic_description=epic_description,
-                target_users=target_users or "General users",
-                business_goals=business_goals or "No specific goals provided",
-                technical_constraints=technical_constraints or "No constraints specified"
-            )
-            
-            response_text = str(result)
+            function = self.functions["break_down_epic"]
             
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                breakdown = json.loads(json_match.group())
-                return {
-                    "success": True,
-                    "breakdown": breakdown,
-                    "generated_at": datetime.now().isoformat()
-                }
-            else:
+            try:
+                breakdown = await self._invoke_json(
+                    function,
+                    epic_description=epic_description,
+                    target_users=target_users or "General users",
+                    business_goals=business_goals or "No specific goals provided",
+                    technical_constraints=technical_constraints or "No constraints specified"
+                )
+            except JSONExtractionError as e:
                 return {
                     "success": False,
                     "error": "Could not parse epic breakdown",
-                    "raw_response": response_text
+                    "raw_response": e.text
                 }
+            
+            return {
+                "success": True,
+                "breakdown": breakdown,
+                "generated_at": datetime.now().isoformat()
+            }
                 
         except Exception as e:
             logger.error(f"Error breaking down epic: {e}")
@@ -465,71 +541,59 @@ Format as JSON:
                 "error": str(e)
             }
     
+    async def index_completed_stories(self, stories: List[Dict]) -> Dict[str, Any]:
+        """Add completed stories with known points to the estimation history"""
+        try:
+            added = self.point_estimator.add_stories(stories)
+            
+            return {
+                "success": True,
+                "stories_indexed": added,
+                "history_size": len(self.point_estimator)
+            }
+            
+        except Exception as e:
+            logger.error(f"Error indexing completed stories: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
     async def estimate_story_points(self, stories: List[Dict]) -> Dict[str, Any]:
         """Estimate story points for a list of stories"""
         try:
+            # Stories similar to completed ones are estimated from their points;
+            # the complexity heuristic covers the rest (and a cold start)
+            similar = self.point_estimator.estimate(stories)
             estimates = []
             
-            for story in stories:
-                # Simple heuristic-based estimation
-                # In production, this would use ML models trained on historical data
-                
-                title = story.get("title", "")
-                description = story.get("description", "")
-                acceptance_criteria = story.get("acceptance_criteria", [])
-                
-                # Calculate complexity factors
-                complexity_score = 0
-                
-                # Text length factor
-                text_length = len(title) + len(description) + sum(len(ac) for ac in acceptance_criteria)
-                if text_length > 500:
-                    complexity_score += 3
-                elif text_length > 200:
-                    complexity_score += 2
-                else:
-                    complexity_score += 1
-                
-                # Number of acceptance criteria
-                ac_count = len(acceptance_criteria)
-                if ac_count > 8:
-                    complexity_score += 3
-                elif ac_count > 4:
-                    complexity_score += 2
-                else:
-                    complexity_score += 1
-                
-                # Complexity keywords
-                complexity_keywords = [
-                    "integration", "api", "database", "migration", "security",
-                    "performance", "complex", "multiple", "external", "new technology"
-                ]
+            for story, match in zip(stories, similar):
+                complexity_score, heuristic_points = self._heuristic_estimate(story)
                 
-                full_text = (title + " " + description).lower()
-                keyword_matches = sum(1 for keyword in complexity_keywords if keyword in full_text)
-                complexity_score += keyword_matches
-                
-                # Map to Fibonacci sequence
-                if complexity_score <= 3:
-                    points = 1
-                elif complexity_score <= 5:
-                    points = 2
-                elif complexity_score <= 8:
-                    points = 3
-                elif complexity_score <= 12:
-                    points = 5
-                elif complexity_score <= 16:
-                    points = 8
-                elif complexity_score <= 20:
-                    points = 13
+                if match:
+                    points = match["estimated_points"]
+                    neighbours = ", ".join(
+                        f"'{n['story']}' ({n['points']:g} pts)" for n in match["neighbours"]
+                    )
+                    estimate = {
+                        "method": "historical_similarity",
+                        "confidence": match["confidence"],
+                        "similar_stories": match["neighbours"],
+                        "reasoning": f"Most similar completed stories: {neighbours}"
+                    }
                 else:
-                    points = 21  # Consider splitting
+                    points = heuristic_points
+                    estimate = {
+                        "method": "heuristic",
+                        "confidence": None,
+                        "reasoning": self._get_estimation_reasoning(complexity_score, points)
+                    }
                 
                 estimates.append({
                     "story": story.get("title", "Unknown"),
                     "estimated_points": points,
                     "complexity_score": complexity_score,
-                    "reasoning": self._get_estimation_reasoning(complexity_score, points),
+                    **estimate,
                     "recommendation": "Consider splitting" if points >= 13 else "Appropriate size"
                 })
             
@@ -547,6 +611,55 @@ Format as JSON:
                 "error": str(e)
             }
     
+    def _heuristic_estimate(self, story: Dict) -> Tuple[int, int]:
+        """Complexity score and Fibonacci points from text length, criteria and keywords"""
+        title = story.get("title", "")
+        description = story.get("description", "")
+        acceptance_criteria = story.get("acceptance_criteria", [])
+        
+        # Calculate complexity factors
+        complexity_score = 0
+        
+        # Text length factor
+        text_length = len(title) + len(description) + sum(len(ac) for ac in acceptance_criteria)
+        if text_length > 500:
+            complexity_score += 3
+        elif text_length > 200:
+            complexity_score += 2
+        else:
+            complexity_score += 1
+        
+        # Number of acceptance criteria
+        ac_count = len(acceptance_criteria)
+        if ac_count > 8:
+            complexity_score += 3
+        elif ac_count > 4:
+            complexity_score += 2
+        else:
+            complexity_score += 1
+        
+        # Complexity keywords
+        full_text = (title + " " + description).lower()
+        complexity_score += sum(1 for keyword in COMPLEXITY_KEYWORDS if keyword in full_text)
+        
+        # Map to Fibonacci sequence
+        if complexity_score <= 3:
+            points = 1
+        elif complexity_score <= 5:
+            points = 2
+        elif complexity_score <= 8:
+            points = 3
+        elif complexity_score <= 12:
+            points = 5
+        elif complexity_score <= 16:
+            points = 8
+        elif complexity_score <= 20:
+            points = 13
+        else:
+            points = 21  # Consider splitting
+        
+        return complexity_score, points
+    
     def _get_estimation_reasoning(self, complexity_score: int, points: int) -> str:
         """Provide reasoning for story point estimation"""
         if points == 1:
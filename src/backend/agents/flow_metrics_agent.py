@@ -9,11 +9,16 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from semantic_kernel import Kernel
-from semantic_kernel.functions import KernelFunctionFromPrompt
+
+from common.analytics.flow_aggregator import FlowAggregator
+from common.analytics.flow_metrics import DONE_STATUSES, FlowMetricsEngine
+from common.analytics.forecasting import MonteCarloForecaster
+from common.utils.prompt_registry import prompt_registry
+from common.utils.json_stream import StreamingJSONMixin
 
 logger = logging.getLogger(__name__)
 
-class FlowMetricsAgent:
+class FlowMetricsAgent(StreamingJSONMixin):
     """
     Flow Metrics Agent specialized in analyzing team delivery performance
     """
@@ -22,7 +27,9 @@ class FlowMetricsAgent:
         self.kernel = kernel
         self.deployment_name = deployment_name
         self.agent_name = "SM-Asst-FlowMetricsAgent"
+        self.flow_aggregator = FlowAggregator()
         self._init_prompts()
+        self._init_functions()
         
     def _init_prompts(self):
         """Initialize prompt templates for flow metrics analysis"""
@@ -32,9 +39,13 @@ class FlowMetricsAgent:
         
         Analyze the following work item data and calculate flow metrics:
         
+        Computed Metrics: {{$computed_metrics}}
         Work Items Data: {{$work_items_data}}
         Sprint Information: {{$sprint_info}}
         
+        When Computed Metrics are provided they were calculated from the full
+        work item data set. Use those numbers as given and focus on interpreting them.
+        
         Calculate and provide analysis in JSON format:
         {
             "flow_metrics": {
@@ -114,6 +125,11 @@ class FlowMetricsAgent:
         
         Historical Data: {{$historical_data}}
         Upcoming Work: {{$upcoming_work}}
+        Monte Carlo Simulation: {{$simulation}}
+        
+        When a Monte Carlo Simulation is provided, ground the forecast in it: take
+        sprint capacity from the throughput percentiles, use the p50 completion date
+        as most likely and the p95 date as worst case, and quote confidence levels.
         
         Provide forecasting analysis in JSON format:
         {
@@ -140,24 +156,37 @@ class FlowMetricsAgent:
         }
         """
 
+    def _init_functions(self):
+        """Compile each prompt function once; the compiled functions are shared across requests"""
+        self.functions = prompt_registry.compile_all({
+            "analyze_flow": self.flow_analysis_prompt,
+            "identify_bottlenecks": self.bottleneck_analysis_prompt,
+            "generate_forecast": self.forecasting_prompt
+        })
+
     async def analyze_flow_metrics(self, work_items_data: str, sprint_info: str = "") -> Dict[str, Any]:
         """
         Analyze flow metrics from work item data
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="analyze_flow",
-                prompt=self.flow_analysis_prompt
-            )
+            computed_metrics = "Not available"
+            work_items = self._extract_work_items(work_items_data)
+            if work_items:
+                # Only the computed summary is sent to the LLM, not the raw items
+                computed_metrics = json.dumps(FlowMetricsEngine(work_items).summary())
+                work_items_data = f"{len(work_items)} work items, summarized in Computed Metrics"
+            elif self.flow_aggregator.events:
+                computed_metrics = json.dumps(self.flow_aggregator.metrics())
+            
+            function = self.functions["analyze_flow"]
             
-            result = await self.kernel.invoke(
+            analysis = await self._invoke_json(
                 function,
+                computed_metrics=computed_metrics,
                 work_items_data=work_items_data,
                 sprint_info=sprint_info
             )
             
-            analysis = json.loads(str(result))
-            
             return {
                 "success": True,
                 "agent": self.agent_name,
@@ -178,13 +207,9 @@ class FlowMetricsAgent:
         Identify and analyze delivery bottlenecks
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="identify_bottlenecks",
-                prompt=self.bottleneck_analysis_prompt
-            )
+            function = self.functions["identify_bottlenecks"]
             
-            result = await self.kernel.invoke(function, flow_data=flow_data)
-            analysis = json.loads(str(result))
+            analysis = await self._invoke_json(function, flow_data=flow_data)
             
             return {
                 "success": True,
@@ -201,24 +226,25 @@ class FlowMetricsAgent:
                 "agent": self.agent_name
             }
 
-    async def generate_forecast(self, historical_data: str, upcoming_work: str = "") -> Dict[str, Any]:
+    async def generate_forecast(self, historical_data: str, upcoming_work: str = "", forecast_days: int = 14) -> Dict[str, Any]:
         """
         Generate delivery forecasts based on historical performance
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="generate_forecast",
-                prompt=self.forecasting_prompt
-            )
+            simulation = None
+            work_items = self._extract_work_items(historical_data)
+            if work_items:
+                simulation = self._simulate_forecast(work_items, upcoming_work, forecast_days)
             
-            result = await self.kernel.invoke(
+            function = self.functions["generate_forecast"]
+            
+            forecast = await self._invoke_json(
                 function,
                 historical_data=historical_data,
-                upcoming_work=upcoming_work
+                upcoming_work=upcoming_work,
+                simulation=json.dumps(simulation) if simulation else "Not available"
             )
             
-            forecast = json.loads(str(result))
-            
             return {
                 "success": True,
                 "agent": self.agent_name,
@@ -234,12 +260,78 @@ class FlowMetricsAgent:
                 "agent": self.agent_name
             }
 
+    @staticmethod
+    def _extract_work_items(work_items_data: str) -> Optional[List[Dict]]:
+        """
+        Return the work items in a JSON payload, or None if it is not one
+        """
+        try:
+            data = json.loads(work_items_data)
+        except (TypeError, ValueError):
+            return None
+        if isinstance(data, dict):
+            data = next(
+                (data[key] for key in ("work_items", "stories", "items", "issues") if isinstance(data.get(key), list)),
+                None
+            )
+        if isinstance(data, list) and data and all(isinstance(item, dict) for item in data):
+            return data
+        return None
+
+    def _simulate_forecast(self, work_items: List[Dict], upcoming_work: str, forecast_days: int) -> Optional[Dict[str, Any]]:
+        """
+        Run the Monte Carlo forecast over historical work items
+        """
+        try:
+            forecaster = MonteCarloForecaster.from_work_items(work_items)
+        except ValueError:
+            # Nothing has been completed yet, so there is no throughput to resample
+            return None
+        
+        upcoming_items = self._extract_work_items(upcoming_work)
+        if upcoming_items is not None:
+            remaining = sum(1 for item in upcoming_items if str(item.get('status') or '').lower() not in DONE_STATUSES)
+        elif upcoming_work.strip().isdigit():
+            remaining = int(upcoming_work)
+        else:
+            remaining = sum(1 for item in work_items if str(item.get('status') or '').lower() not in DONE_STATUSES)
+        
+        simulation = {
+            "history": forecaster.history_summary(),
+            "throughput": forecaster.forecast_throughput(forecast_days)
+        }
+        if remaining:
+            simulation["completion"] = forecaster.forecast_completion(remaining)
+        return simulation
+
+    async def ingest_transitions(self, events: List[Dict]) -> Dict[str, Any]:
+        """
+        Update live flow metrics from status-transition events
+        """
+        try:
+            applied = self.flow_aggregator.consume(events)
+            
+            return {
+                "success": True,
+                "agent": self.agent_name,
+                "events_applied": applied,
+                "metrics": self.flow_aggregator.metrics(),
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error ingesting transitions: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "agent": self.agent_name
+            }
+
     async def calculate_key_metrics(self, work_items: List[Dict]) -> Dict[str, Any]:
         """
         Calculate key flow metrics from work item data
         """
         try:
-            # Simplified calculation for demonstration
             if not work_items:
                 return {
                     "success": False,
@@ -247,36 +339,22 @@ class FlowMetricsAgent:
                     "agent": self.agent_name
                 }
             
-            # Calculate basic metrics
-            cycle_times = []
-            lead_times = []
-            throughput_count = len([item for item in work_items if item.get('status') == 'Done'])
-            
-            for item in work_items:
-                if item.get('start_date') and item.get('end_date'):
-                    start = datetime.fromisoformat(item['start_date'].replace('Z', '+00:00'))
-                    end = datetime.fromisoformat(item['end_date'].replace('Z', '+00:00'))
-                    cycle_time = (end - start).days
-                    cycle_times.append(cycle_time)
-                
-                if item.get('created_date') and item.get('end_date'):
-                    created = datetime.fromisoformat(item['created_date'].replace('Z', '+00:00'))
-                    end = datetime.fromisoformat(item['end_date'].replace('Z', '+00:00'))
-                    lead_time = (end - created).days
-                    lead_times.append(lead_time)
-            
-            avg_cycle_time = sum(cycle_times) / len(cycle_times) if cycle_times else 0
-            avg_lead_time = sum(lead_times) / len(lead_times) if lead_times else 0
+            summary = FlowMetricsEngine(work_items).summary()
             
             return {
                 "success": True,
                 "agent": self.agent_name,
                 "metrics": {
-                    "average_cycle_time_days": round(avg_cycle_time, 2),
-                    "average_lead_time_days": round(avg_lead_time, 2),
-                    "throughput_items": throughput_count,
-                    "total_items_analyzed": len(work_items),
-                    "completion_rate": round(throughput_count / len(work_items) * 100, 2)
+                    "average_cycle_time_days": summary["cycle_time"]["average_days"],
+                    "average_lead_time_days": summary["lead_time"]["average_days"],
+                    "throughput_items": summary["completed_items"],
+                    "total_items_analyzed": summary["total_items"],
+                    "completion_rate": summary["completion_rate"],
+                    "cycle_time": summary["cycle_time"],
+                    "lead_time": summary["lead_time"],
+                    "throughput": summary["throughput"],
+                    "work_in_progress": summary["work_in_progress"],
+                    "aging": summary["aging"]
                 },
                 "timestamp": datetime.now().isoformat()
             }
@@ -287,4 +365,4 @@ class FlowMetricsAgent:
                 "success": False,
                 "error": str(e),
                 "agent": self.agent_name
-            }
\ No newline at end of file
+            }
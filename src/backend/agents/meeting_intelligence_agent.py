@@ -4,17 +4,25 @@ Specialized in meeting facilitation, transcript analysis, and action item extrac
 """
 
 import os
+import asyncio
 import json
 import logging
+import time
+from collections import Counter
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from semantic_kernel import Kernel
-from semantic_kernel.functions import KernelFunctionFromPrompt
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 
+from common.analytics.participation import analyze_participation, analyze_participation_batch
+from common.analytics.transcripts import merge_items, parse_transcript, unique
+from common.utils.prompt_registry import prompt_registry
+from common.utils.json_stream import StreamingJSONMixin
+from common.utils.response_cache import response_cache
+
 logger = logging.getLogger(__name__)
 
-class MeetingIntelligenceAgent:
+class MeetingIntelligenceAgent(StreamingJSONMixin):
     """
     Meeting Intelligence Agent specialized in Scrum ceremony facilitation and analysis
     """
@@ -23,7 +31,12 @@ class MeetingIntelligenceAgent:
         self.kernel = kernel
         self.deployment_name = deployment_name
         self.agent_name = "SM-Asst-MeetingIntelligenceAgent"
+        # Long transcripts are split on speaker turns into chunks of at most
+        # this many tokens, with up to max_concurrent_analyses calls in flight
+        self.transcript_chunk_tokens = 3000
+        self.max_concurrent_analyses = 4
         self._init_prompts()
+        self._init_functions()
         
     def _init_prompts(self):
         """Initialize prompt templates for meeting analysis capabilities"""
@@ -151,30 +164,178 @@ class MeetingIntelligenceAgent:
             ]
         }
         """
+        
+        self.participation_prompt = """
+        Suggest how to improve team participation in this meeting, based on these
+        participation statistics computed from the transcript:
+        
+        {{$participation_stats}}
+        
+        Speaking share is the fraction of words spoken; dominant speakers and quiet
+        participants are already identified. Return suggestions in JSON format:
+        {
+            "observations": "Qualitative reading of the participation pattern",
+            "recommendations": [
+                "Suggestions for improving participation"
+            ]
+        }
+        """
 
-    async def analyze_meeting_transcript(self, transcript: str, meeting_type: str = "Daily Standup") -> Dict[str, Any]:
+    def _init_functions(self):
+        """Compile each prompt function once; the compiled functions are shared across requests"""
+        self.functions = prompt_registry.compile_all({
+            "analyze_meeting": self.meeting_analysis_prompt,
+            "extract_action_items": self.action_item_extraction_prompt,
+            "detect_impediments": self.impediment_detection_prompt,
+            "facilitate_ceremony": self.ceremony_facilitation_prompt,
+            "analyze_participation": self.participation_prompt
+        })
+        # Ceremony guides depend only on the ceremony and context, so keep them longer
+        response_cache.set_ttl("facilitate_ceremony", 24 * 3600)
+
+    async def _analyze_chunks(self, function_name: str, transcript: str,
+                              semaphore: Optional[asyncio.Semaphore] = None,
+                              **arguments) -> List[Any]:
         """
-        Analyze a complete meeting transcript for comprehensive insights
+        Run one prompt over each token-budgeted chunk of a transcript concurrently
+        """
+        chunks = parse_transcript(transcript).chunks(self.transcript_chunk_tokens)
+        if len(chunks) == 1:
+            # Short enough for one call: send the transcript as written
+            chunks = [transcript]
+        function = self.functions[function_name]
+        text_argument = "transcript" if function_name == "analyze_meeting" else "text"
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent_analyses)
+        
+        async def analyze(chunk: str):
+            async with semaphore:
+                return await self._invoke_json(function, **{text_argument: chunk}, **arguments)
+        
+        return list(await asyncio.gather(*(analyze(chunk) for chunk in chunks)))
+
+    @staticmethod
+    def _merge_action_items(results: List[Dict]) -> Dict[str, Any]:
+        if len(results) == 1:
+            return results[0]
+        return {"action_items": merge_items(
+            item for result in results for item in result.get("action_items") or []
+        )}
+
+    @staticmethod
+    def _merge_impediments(results: List[Dict]) -> Dict[str, Any]:
+        if len(results) == 1:
+            return results[0]
+        return {"impediments": merge_items(
+            (item for result in results for item in result.get("impediments") or []),
+            owner_field="affected_person"
+        )}
+
+    @staticmethod
+    def _merge_meeting_analyses(analyses: List[Dict]) -> Dict[str, Any]:
+        """
+        Combine per-chunk meeting analyses into one report
+        """
+        if len(analyses) == 1:
+            return analyses[0]
+        
+        def collect(key: str) -> List[Any]:
+            return [item for analysis in analyses for item in analysis.get(key) or []]
+        
+        def most_common(values: List[Any]) -> Any:
+            values = [value for value in values if value]
+            return Counter(values).most_common(1)[0][0] if values else None
+        
+        sentiments = [analysis.get("team_sentiment") or {} for analysis in analyses]
+        effectiveness = [analysis.get("ceremony_effectiveness") or {} for analysis in analyses]
+        scores = []
+        for item in effectiveness:
+            try:
+                scores.append(float(item.get("score")))
+            except (TypeError, ValueError):
+                pass
+        
+        return {
+            "meeting_summary": " ".join(
+                str(analysis["meeting_summary"]) for analysis in analyses if analysis.get("meeting_summary")
+            ),
+            "action_items": merge_items(collect("action_items")),
+            "impediments": merge_items(collect("impediments"), owner_field="affected_person"),
+            "decisions": merge_items(collect("decisions"), text_field="decision", owner_field=None),
+            "team_sentiment": {
+                "overall_mood": most_common([s.get("overall_mood") for s in sentiments]),
+                "engagement_level": most_common([s.get("engagement_level") for s in sentiments]),
+                "observations": " ".join(str(s["observations"]) for s in sentiments if s.get("observations"))
+            },
+            "follow_up_actions": unique(collect("follow_up_actions")),
+            "ceremony_effectiveness": {
+                "score": round(sum(scores) / len(scores), 1) if scores else None,
+                "strengths": unique([s for item in effectiveness for s in item.get("strengths") or []]),
+                "improvements": unique([s for item in effectiveness for s in item.get("improvements") or []])
+            }
+        }
+
+    async def process_transcript(self, transcript: str, meeting_type: str = "Daily Standup") -> Dict[str, Any]:
+        """
+        Run the meeting analysis, action item extraction and impediment detection
+        together over one parse of the transcript, all chunks concurrently
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="analyze_meeting",
-                prompt=self.meeting_analysis_prompt
-            )
+            started = time.perf_counter()
+            parsed = parse_transcript(transcript)
+            chunk_count = len(parsed.chunks(self.transcript_chunk_tokens))
+            parsed_at = time.perf_counter()
             
-            result = await self.kernel.invoke(
-                function,
-                meeting_type=meeting_type,
-                transcript=transcript
+            semaphore = asyncio.Semaphore(self.max_concurrent_analyses)
+            analyses, action_items, impediments = await asyncio.gather(
+                self._analyze_chunks("analyze_meeting", transcript, semaphore, meeting_type=meeting_type),
+                self._analyze_chunks("extract_action_items", transcript, semaphore),
+                self._analyze_chunks("detect_impediments", transcript, semaphore)
             )
+            analyzed_at = time.perf_counter()
+            
+            result = {
+                "success": True,
+                "agent": self.agent_name,
+                "meeting_type": meeting_type,
+                "analysis": self._merge_meeting_analyses(analyses),
+                "action_items": self._merge_action_items(action_items),
+                "impediments": self._merge_impediments(impediments)
+            }
+            merged_at = time.perf_counter()
+            
+            result["pipeline"] = {
+                "speakers": parsed.speakers,
+                "turns": len(parsed.turns),
+                "chunks": chunk_count,
+                "timings_ms": {
+                    "parse": round((parsed_at - started) * 1000, 1),
+                    "analysis": round((analyzed_at - parsed_at) * 1000, 1),
+                    "merge": round((merged_at - analyzed_at) * 1000, 1)
+                }
+            }
+            result["timestamp"] = datetime.now().isoformat()
+            return result
             
-            analysis = json.loads(str(result))
+        except Exception as e:
+            logger.error(f"Error processing transcript: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "agent": self.agent_name
+            }
+
+    async def analyze_meeting_transcript(self, transcript: str, meeting_type: str = "Daily Standup") -> Dict[str, Any]:
+        """
+        Analyze a complete meeting transcript for comprehensive insights
+        """
+        try:
+            analyses = await self._analyze_chunks("analyze_meeting", transcript, meeting_type=meeting_type)
             
             return {
                 "success": True,
                 "agent": self.agent_name,
                 "meeting_type": meeting_type,
-                "analysis": analysis,
+                "analysis": self._merge_meeting_analyses(analyses),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -191,18 +352,12 @@ class MeetingIntelligenceAgent:
         Extract structured action items from meeting text
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="extract_action_items",
-                prompt=self.action_item_extraction_prompt
-            )
-            
-            result = await self.kernel.invoke(function, text=text)
-            action_items = json.loads(str(result))
+            results = await self._analyze_chunks("extract_action_items", text)
             
             return {
                 "success": True,
                 "agent": self.agent_name,
-                "action_items": action_items,
+                "action_items": self._merge_action_items(results),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -219,18 +374,12 @@ class MeetingIntelligenceAgent:
         Detect and categorize impediments from meeting discussions
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="detect_impediments",
-                prompt=self.impediment_detection_prompt
-            )
-            
-            result = await self.kernel.invoke(function, text=text)
-            impediments = json.loads(str(result))
+            results = await self._analyze_chunks("detect_impediments", text)
             
             return {
                 "success": True,
                 "agent": self.agent_name,
-                "impediments": impediments,
+                "impediments": self._merge_impediments(results),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -247,19 +396,14 @@ class MeetingIntelligenceAgent:
         Provide facilitation guidance for agile ceremonies
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="facilitate_ceremony",
-                prompt=self.ceremony_facilitation_prompt
-            )
+            function = self.functions["facilitate_ceremony"]
             
-            result = await self.kernel.invoke(
+            guidance = await self._invoke_json(
                 function,
                 ceremony_type=ceremony_type,
                 context=context
             )
             
-            guidance = json.loads(str(result))
-            
             return {
                 "success": True,
                 "agent": self.agent_name,
@@ -276,43 +420,24 @@ class MeetingIntelligenceAgent:
                 "agent": self.agent_name
             }
 
-    async def analyze_team_participation(self, transcript: str) -> Dict[str, Any]:
+    async def analyze_team_participation(self, transcript: str, include_suggestions: bool = True) -> Dict[str, Any]:
         """
         Analyze team participation patterns in meetings
+        
+        Speaking share, turns, questions and interruptions are computed locally;
+        the LLM is only asked for qualitative suggestions on top of them.
         """
         try:
-            participation_prompt = """
-            Analyze team participation in this meeting transcript:
-            
-            {{$transcript}}
+            analysis = analyze_participation(transcript)
             
-            Return analysis in JSON format:
-            {
-                "participation_summary": {
-                    "total_speakers": "number of people who spoke",
-                    "dominant_speakers": ["people who spoke most"],
-                    "quiet_participants": ["people who spoke little or not at all"],
-                    "balanced_discussion": true/false
-                },
-                "engagement_indicators": {
-                    "question_count": "number of clarifying questions asked",
-                    "interruptions": "instances of people talking over each other",
-                    "positive_interactions": "supportive comments or agreements",
-                    "tension_indicators": "signs of disagreement or frustration"
-                },
-                "recommendations": [
-                    "Suggestions for improving participation"
-                ]
-            }
-            """
-            
-            function = KernelFunctionFromPrompt(
-                function_name="analyze_participation",
-                prompt=participation_prompt
-            )
-            
-            result = await self.kernel.invoke(function, transcript=transcript)
-            analysis = json.loads(str(result))
+            if include_suggestions:
+                function = self.functions["analyze_participation"]
+                suggestions = await self._invoke_json(
+                    function,
+                    participation_stats=json.dumps(analysis)
+                )
+                analysis["observations"] = suggestions.get("observations", "")
+                analysis["recommendations"] = suggestions.get("recommendations", [])
             
             return {
                 "success": True,
@@ -323,6 +448,26 @@ class MeetingIntelligenceAgent:
             
         except Exception as e:
             logger.error(f"Error analyzing participation: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "agent": self.agent_name
+            }
+
+    async def analyze_participation_trends(self, transcripts: List[str]) -> Dict[str, Any]:
+        """
+        Compute participation statistics across many meetings without LLM calls
+        """
+        try:
+            return {
+                "success": True,
+                "agent": self.agent_name,
+                "participation": analyze_participation_batch(transcripts),
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error analyzing participation trends: {e}")
             return {
                 "success": False,
                 "error": str(e),
@@ -7,13 +7,16 @@ import os
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from semantic_kernel import Kernel
-from semantic_kernel.functions import KernelFunctionFromPrompt
+
+from common.analytics.sentiment import analyze_messages, parse_communications
+from common.utils.prompt_registry import prompt_registry
+from common.utils.json_stream import StreamingJSONMixin
 
 logger = logging.getLogger(__name__)
 
-class TeamWellnessAgent:
+class TeamWellnessAgent(StreamingJSONMixin):
     """
     Team Wellness Agent specialized in monitoring and supporting team health
     """
@@ -22,7 +25,10 @@ class TeamWellnessAgent:
         self.kernel = kernel
         self.deployment_name = deployment_name
         self.agent_name = "SM-Asst-TeamWellnessAgent"
+        # Most negative or stressed messages quoted to the LLM alongside the aggregates
+        self.max_outlier_messages = 15
         self._init_prompts()
+        self._init_functions()
         
     def _init_prompts(self):
         """Initialize prompt templates for team wellness analysis"""
@@ -30,9 +36,12 @@ class TeamWellnessAgent:
         self.sentiment_analysis_prompt = """
         You are a Team Wellness Agent specialized in analyzing team communications for sentiment and wellness indicators.
         
-        Analyze the following team communications for sentiment and wellness signals:
+        Analyze the following team communications for sentiment and wellness signals.
+        The messages have already been scored with a sentiment and stress lexicon; you
+        receive the overall, per-member and per-day aggregates (scores from -1 to +1)
+        and the most negative or stressed messages verbatim:
         
-        Communications Data: {{$communications_data}}
+        Communication Statistics: {{$sentiment_summary}}
         Time Period: {{$time_period}}
         
         Provide comprehensive analysis in JSON format:
@@ -145,29 +154,96 @@ class TeamWellnessAgent:
             ]
         }
         """
+        
+        self.wellness_report_prompt = """
+        Generate a comprehensive team wellness report for the current {{$period}}.
+        
+        Provide a detailed wellness report in JSON format:
+        {
+            "wellness_summary": {
+                "overall_health_score": "1-10 scale",
+                "key_findings": ["Main wellness insights"],
+                "trend_analysis": "Improvement/Stable/Declining trends"
+            },
+            "recommendations": {
+                "immediate_actions": ["Actions needed right away"],
+                "short_term_goals": ["Goals for next 1-2 weeks"],
+                "long_term_initiatives": ["Longer-term wellness initiatives"]
+            },
+            "monitoring_plan": {
+                "key_metrics": ["Metrics to continue tracking"],
+                "check_in_frequency": "Recommended check-in schedule",
+                "early_warning_signs": ["Signs to watch for"]
+            }
+        }
+        """
+        
+        self.intervention_prompt = """
+        Based on the following team wellness data, recommend specific interventions:
+        
+        Wellness Data: {{$wellness_data}}
+        
+        Provide intervention recommendations in JSON format:
+        {
+            "intervention_plan": {
+                "immediate_interventions": [
+                    {
+                        "intervention": "Specific intervention",
+                        "target": "Individual/Team/Process",
+                        "priority": "Critical/High/Medium",
+                        "implementation": "How to implement",
+                        "success_metrics": "How to measure success"
+                    }
+                ],
+                "preventive_measures": [
+                    "Measures to prevent wellness issues"
+                ],
+                "team_building_activities": [
+                    "Suggested team building approaches"
+                ],
+                "process_improvements": [
+                    "Process changes to support wellness"
+                ]
+            }
+        }
+        """
 
-    async def analyze_team_sentiment(self, communications_data: str, time_period: str = "Last 2 weeks") -> Dict[str, Any]:
+    def _init_functions(self):
+        """Compile each prompt function once; the compiled functions are shared across requests"""
+        self.functions = prompt_registry.compile_all({
+            "analyze_sentiment": self.sentiment_analysis_prompt,
+            "detect_burnout": self.burnout_detection_prompt,
+            "analyze_dynamics": self.team_dynamics_prompt,
+            "generate_wellness_report": self.wellness_report_prompt,
+            "recommend_interventions": self.intervention_prompt
+        })
+
+    async def analyze_team_sentiment(self,
+                                     communications_data: Union[str, List[Dict[str, Any]]],
+                                     time_period: str = "Last 2 weeks") -> Dict[str, Any]:
         """
         Analyze team sentiment from communications data
+        
+        Messages (a list of user/text/ts dicts, its JSON, or a plain-text log) are
+        scored locally first, so the LLM only sees the aggregates and outliers.
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="analyze_sentiment",
-                prompt=self.sentiment_analysis_prompt
-            )
+            messages = parse_communications(communications_data)
+            lexicon_analysis = analyze_messages(messages, max_outliers=self.max_outlier_messages)
             
-            result = await self.kernel.invoke(
+            function = self.functions["analyze_sentiment"]
+            
+            analysis = await self._invoke_json(
                 function,
-                communications_data=communications_data,
+                sentiment_summary=json.dumps(lexicon_analysis),
                 time_period=time_period
             )
             
-            analysis = json.loads(str(result))
-            
             return {
                 "success": True,
                 "agent": self.agent_name,
                 "sentiment_analysis": analysis,
+                "lexicon_analysis": lexicon_analysis,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -184,19 +260,14 @@ class TeamWellnessAgent:
         Detect early warning signs of team burnout
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="detect_burnout",
-                prompt=self.burnout_detection_prompt
-            )
+            function = self.functions["detect_burnout"]
             
-            result = await self.kernel.invoke(
+            assessment = await self._invoke_json(
                 function,
                 team_data=team_data,
                 recent_activity=recent_activity
             )
             
-            assessment = json.loads(str(result))
-            
             return {
                 "success": True,
                 "agent": self.agent_name,
@@ -217,13 +288,9 @@ class TeamWellnessAgent:
         Analyze team collaboration patterns and dynamics
         """
         try:
-            function = KernelFunctionFromPrompt(
-                function_name="analyze_dynamics",
-                prompt=self.team_dynamics_prompt
-            )
+            function = self.functions["analyze_dynamics"]
             
-            result = await self.kernel.invoke(function, interaction_data=interaction_data)
-            analysis = json.loads(str(result))
+            analysis = await self._invoke_json(function, interaction_data=interaction_data)
             
             return {
                 "success": True,
@@ -247,37 +314,9 @@ class TeamWellnessAgent:
         try:
             # This would typically gather data from multiple sources
             # For demonstration, providing a structured response
+            function = self.functions["generate_wellness_report"]
             
-            report_prompt = """
-            Generate a comprehensive team wellness report for the current {{$period}}.
-            
-            Provide a detailed wellness report in JSON format:
-            {
-                "wellness_summary": {
-                    "overall_health_score": "1-10 scale",
-                    "key_findings": ["Main wellness insights"],
-                    "trend_analysis": "Improvement/Stable/Declining trends"
-                },
-                "recommendations": {
-                    "immediate_actions": ["Actions needed right away"],
-                    "short_term_goals": ["Goals for next 1-2 weeks"],
-                    "long_term_initiatives": ["Longer-term wellness initiatives"]
-                },
-                "monitoring_plan": {
-                    "key_metrics": ["Metrics to continue tracking"],
-                    "check_in_frequency": "Recommended check-in schedule",
-                    "early_warning_signs": ["Signs to watch for"]
-                }
-            }
-            """
-            
-            function = KernelFunctionFromPrompt(
-                function_name="generate_wellness_report",
-                prompt=report_prompt
-            )
-            
-            result = await self.kernel.invoke(function, period=period)
-            report = json.loads(str(result))
+            report = await self._invoke_json(function, period=period)
             
             return {
                 "success": True,
@@ -301,43 +340,9 @@ class TeamWellnessAgent:
         Recommend specific interventions based on wellness analysis
         """
         try:
-            intervention_prompt = """
-            Based on the following team wellness data, recommend specific interventions:
-            
-            Wellness Data: {{$wellness_data}}
-            
-            Provide intervention recommendations in JSON format:
-            {
-                "intervention_plan": {
-                    "immediate_interventions": [
-                        {
-                            "intervention": "Specific intervention",
-                            "target": "Individual/Team/Process",
-                            "priority": "Critical/High/Medium",
-                            "implementation": "How to implement",
-                            "success_metrics": "How to measure success"
-                        }
-                    ],
-                    "preventive_measures": [
-                        "Measures to prevent wellness issues"
-                    ],
-                    "team_building_activities": [
-                        "Suggested team building approaches"
-                    ],
-                    "process_improvements": [
-                        "Process changes to support wellness"
-                    ]
-                }
-            }
-            """
-            
-            function = KernelFunctionFromPrompt(
-                function_name="recommend_interventions", 
-                prompt=intervention_prompt
-            )
+            function = self.functions["recommend_interventions"]
             
-            result = await self.kernel.invoke(function, wellness_data=wellness_data)
-            recommendations = json.loads(str(result))
+            recommendations = await self._invoke_json(function, wellness_data=wellness_data)
             
             return {
                 "success": True,
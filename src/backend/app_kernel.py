@@ -6,7 +6,11 @@ from contextlib import asynccontextmanager
 
 from azure.monitor.opentelemetry import configure_azure_monitor
 from common.config.app_config import config
+from common.database.cosmos_metrics import cosmos_metrics
+from common.database.database_factory import DatabaseFactory
 from common.models.messages_kernel import UserLanguage
+from common.utils.response_cache import response_cache
+from common.utils.token_usage import token_usage
 
 # FastAPI imports
 from fastapi import FastAPI, Request
@@ -15,6 +19,7 @@ from fastapi.middleware.cors import CORSMiddleware
 # Local imports
 from middleware.health_check import HealthCheckMiddleware
 from v3.api.router import app_v3
+from v3.common.services.change_feed_service import ChangeFeedService
 
 # Azure monitoring
 
@@ -22,6 +27,30 @@ from v3.api.router import app_v3
 from v3.config.agent_registry import agent_registry
 
 
+async def start_change_feed(logger: logging.Logger):
+    """Start the Cosmos change-feed listener when enabled."""
+    if not config.CHANGE_FEED_ENABLED or config.DATABASE_BACKEND != "cosmos":
+        return None
+    try:
+        database = await DatabaseFactory.get_database()
+        lease_container = None
+        if config.COSMOSDB_LEASE_CONTAINER:
+            lease_container = database.database.get_container_client(
+                config.COSMOSDB_LEASE_CONTAINER
+            )
+        change_feed = ChangeFeedService(
+            database.container,
+            lease_container=lease_container,
+            lease_slots=config.CHANGE_FEED_LEASE_SLOTS,
+            poll_interval=config.CHANGE_FEED_POLL_INTERVAL,
+        )
+        change_feed.start()
+        return change_feed
+    except Exception as e:
+        logger.error(f"❌ Could not start change-feed listener: {e}")
+        return None
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage FastAPI application lifecycle - startup and shutdown."""
@@ -29,10 +58,13 @@ async def lifespan(app: FastAPI):
 
     # Startup
     logger.info("🚀 Starting MACAE application...")
+    change_feed = await start_change_feed(logger)
     yield
 
     # Shutdown
     logger.info("🛑 Shutting down MACAE application...")
+    if change_feed:
+        await change_feed.stop()
     try:
         # Clean up all agents from Azure AI Foundry when container stops
         await agent_registry.cleanup_all_agents()
@@ -127,6 +159,63 @@ async def user_browser_language_endpoint(user_language: UserLanguage, request: R
     return {"status": "Language received successfully"}
 
 
+@app.get("/api/diagnostics/cosmos")
+async def cosmos_diagnostics_endpoint(top: int = 10):
+    """
+    Summarize CosmosDB request-unit consumption for this worker.
+
+    ---
+    tags:
+      - Diagnostics
+    parameters:
+      - name: top
+        in: query
+        type: integer
+        required: false
+        description: Number of top RU-consuming methods to return
+    responses:
+      200:
+        description: Totals and the top RU consumers by client method
+    """
+    return cosmos_metrics.summary(limit=top)
+
+
+@app.get("/api/diagnostics/tokens")
+async def token_diagnostics_endpoint(top: int = 10):
+    """
+    Summarize LLM prompt and completion token usage for this worker.
+
+    ---
+    tags:
+      - Diagnostics
+    parameters:
+      - name: top
+        in: query
+        type: integer
+        required: false
+        description: Number of top token-consuming agent endpoints to return
+    responses:
+      200:
+        description: Totals and the top token consumers by agent and endpoint
+    """
+    return token_usage.summary(limit=top)
+
+
+@app.get("/api/diagnostics/cache")
+async def cache_diagnostics_endpoint():
+    """
+    Summarize the LLM response cache for this worker.
+
+    ---
+    tags:
+      - Diagnostics
+    responses:
+      200:
+        description: Cache size and hit, disk hit, coalesced and miss counts per agent
+    """
+    return response_cache.stats()
+
+
 # Run the app
 if __name__ == "__main__":
     import uvicorn
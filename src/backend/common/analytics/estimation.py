@@ -0,0 +1,227 @@
+"""Story point estimation from similar completed stories.
+
+Completed stories with known points are indexed as TF-IDF weighted
+hashing vectors in a sparse matrix. Terms are hashed with Python's
+``hash``, so an index only lives as long as its process. A batch of new
+stories is vectorized the same way and scored against the whole index
+with one sparse matrix product; each story then takes a
+similarity-weighted vote among its k nearest neighbours.
+Stories with no sufficiently similar history get no estimate, so callers
+can fall back to a heuristic.
+
+Run ``python -m common.analytics.estimation`` from ``src/backend`` to
+print index build and batch estimation times for a synthetic history.
+"""
+
+import re
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+# Field names accepted for a story's known size, in order of preference
+POINT_FIELDS = ("story_points", "points", "estimate")
+
+# Terms are hashed into this many columns (a power of two)
+N_FEATURES = 2 ** 20
+
+_BIGRAM_MULTIPLIER = 1_000_003
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def story_text(story: Dict[str, Any]) -> str:
+    """Title, description and acceptance criteria of a story as one string."""
+    criteria = story.get("acceptance_criteria") or []
+    if isinstance(criteria, str):
+        criteria = [criteria]
+    return " ".join([story.get("title") or "", story.get("description") or "", *map(str, criteria)])
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words."""
+    return _TOKEN.findall(text.lower())
+
+
+def story_points(story: Dict[str, Any]) -> Optional[float]:
+    for field in POINT_FIELDS:
+        value = story.get(field)
+        if value is None or value == "":
+            continue
+        try:
+            points = float(value)
+        except (TypeError, ValueError):
+            continue
+        return points if points > 0 else None
+    return None
+
+
+class StoryPointEstimator:
+    """k-nearest-neighbour story point estimates over a TF-IDF index.
+
+    ``confidence`` is the share of the neighbours' similarity that voted
+    for the winning estimate, scaled by their mean similarity, so it is
+    high only when close matches agree.
+    """
+
+    def __init__(self, k: int = 7, min_similarity: float = 0.2, min_history: int = 20):
+        self.k = k
+        self.min_similarity = min_similarity
+        self.min_history = min_history
+
+        self.titles: List[str] = []
+        self._points: List[float] = []
+        self._batches: List[sparse.csr_matrix] = []
+
+        self._matrix: Optional[sparse.csr_matrix] = None
+        self._idf: Optional[np.ndarray] = None
+        self._point_array = np.zeros(0)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    @staticmethod
+    def _term_counts(stories: Sequence[Dict[str, Any]]) -> sparse.csr_matrix:
+        """Hashed word and word-bigram counts, one row per story."""
+        hashes: List[int] = []
+        lengths: List[int] = []
+        for story in stories:
+            words = tokenize(story_text(story))
+            hashes.extend(map(hash, words))
+            lengths.append(len(words))
+
+        words = np.asarray(hashes, dtype=np.int64)
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        # Bigrams combine the hashes of adjacent words in the same story
+        adjacent = rows[:-1] == rows[1:]
+        bigrams = words[:-1][adjacent] * _BIGRAM_MULTIPLIER ^ words[1:][adjacent]
+
+        columns = np.concatenate([words, bigrams]) & (N_FEATURES - 1)
+        counts = sparse.coo_matrix(
+            (np.ones(columns.size), (np.concatenate([rows, rows[:-1][adjacent]]), columns)),
+            shape=(len(lengths), N_FEATURES),
+        )
+        return counts.tocsr()
+
+    def add_stories(self, stories: Sequence[Dict[str, Any]]) -> int:
+        """Index completed stories that have known points; returns how many were added."""
+        known = [(story, story_points(story)) for story in stories]
+        known = [(story, points) for story, points in known if points is not None]
+        if not known:
+            return 0
+        self._batches.append(self._term_counts([story for story, _ in known]))
+        self._points.extend(points for _, points in known)
+        self.titles.extend(story.get("title") or "Unknown" for story, _ in known)
+        self._matrix = None
+        return len(known)
+
+    def _weight(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Sublinear TF times IDF, with rows scaled to unit length."""
+        weighted = counts.copy()
+        weighted.data = (1.0 + np.log(weighted.data)) * self._idf[weighted.indices]
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ weighted
+
+    def _build(self) -> None:
+        counts = sparse.vstack(self._batches, format="csr")
+        self._batches = [counts]
+        document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+        self._idf = np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1.0
+        self._matrix = self._weight(counts).T.tocsr()
+        self._point_array = np.asarray(self._points)
+
+    def estimate(self, stories: Sequence[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Estimate a batch of stories; ``None`` where history cannot support an estimate."""
+        if len(self) < self.min_history or not stories:
+            return [None] * len(stories)
+        if self._matrix is None:
+            self._build()
+
+        queries = self._weight(self._term_counts(stories))
+        similarities = (queries @ self._matrix).tocsr()
+
+        return [
+            self._vote(
+                similarities.indices[start:end],
+                similarities.data[start:end],
+            )
+            for start, end in zip(similarities.indptr[:-1], similarities.indptr[1:])
+        ]
+
+    def _vote(self, neighbours: np.ndarray, scores: np.ndarray) -> Optional[Dict[str, Any]]:
+        keep = scores >= self.min_similarity
+        neighbours, scores = neighbours[keep], scores[keep]
+        if not neighbours.size:
+            return None
+        if neighbours.size > self.k:
+            top = np.argpartition(scores, -self.k)[-self.k:]
+            neighbours, scores = neighbours[top], scores[top]
+        order = np.argsort(scores)[::-1]
+        neighbours, scores = neighbours[order], scores[order]
+
+        values, inverse = np.unique(self._point_array[neighbours], return_inverse=True)
+        votes = np.bincount(inverse, weights=scores)
+        winner = int(np.argmax(votes))
+        share = votes[winner] / votes.sum()
+        points = float(values[winner])
+
+        return {
+            "estimated_points": int(points) if points.is_integer() else points,
+            "confidence": round(float(share * scores.mean()), 2),
+            "neighbours": [
+                {
+                    "story": self.titles[i],
+                    "points": self._points[i],
+                    "similarity": round(float(s), 3),
+                }
+                for i, s in zip(neighbours[:3], scores[:3])
+            ],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"stories": len(self), "features": N_FEATURES}
+
+
+def benchmark(history_size: int = 100_000, batch_size: int = 100, seed: int = 0) -> Dict[str, Any]:
+    """Index build and batch estimation time for a synthetic story history."""
+    rng = np.random.default_rng(seed)
+    words = [f"term{i}" for i in range(5_000)]
+    fibonacci = [1, 2, 3, 5, 8, 13]
+
+    def synthetic(count: int) -> List[Dict[str, Any]]:
+        terms = rng.integers(0, len(words), size=(count, 36)).tolist()
+        points = rng.choice(fibonacci, size=count).tolist()
+        return [
+            {
+                "title": " ".join(words[i] for i in row[:6]),
+                "description": " ".join(words[i] for i in row[6:]),
+                "story_points": size,
+            }
+            for row, size in zip(terms, points)
+        ]
+
+    history, batch = synthetic(history_size), synthetic(batch_size)
+
+    estimator = StoryPointEstimator()
+    started = time.perf_counter()
+    estimator.add_stories(history)
+    estimator._build()
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    estimator.estimate(batch)
+    estimate_seconds = time.perf_counter() - started
+
+    return {
+        "history": history_size,
+        "batch": batch_size,
+        "index_build_s": round(build_seconds, 2),
+        "batch_estimate_ms": round(estimate_seconds * 1000, 1),
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>18}: {value}")
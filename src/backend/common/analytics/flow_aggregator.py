@@ -0,0 +1,445 @@
+"""Incremental flow metrics built from status-transition events.
+
+``FlowAggregator`` consumes ``(issue, from_status, to_status, timestamp)``
+events one at a time and keeps running totals: per-stage dwell times,
+flow efficiency, cumulative-flow counts and quantile sketches for cycle
+and lead time. Queries read those totals directly, so their cost does not
+grow with the number of events. The same totals are also kept per day, so
+metrics for a trailing window (``metrics_since``) are a merge of at most
+one entry per day in it. The whole state can be saved to and loaded from a
+JSON snapshot so a restart resumes without replaying history.
+"""
+
+import bisect
+import json
+import math
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from common.analytics.flow_metrics import DONE_STATUSES
+
+Timestamp = Union[datetime, str, float, int]
+
+ACTIVE_STATUSES = (
+    "in progress",
+    "in development",
+    "in code review",
+    "code review",
+    "in review",
+    "in testing",
+    "testing",
+)
+BACKLOG_STATUSES = (
+    "backlog",
+    "to do",
+    "todo",
+    "open",
+    "new",
+    "ready",
+    "selected for development",
+)
+
+SNAPSHOT_VERSION = 2
+_SECONDS_PER_DAY = 86_400.0
+
+
+def to_epoch_seconds(timestamp: Timestamp) -> float:
+    """Convert an ISO string, datetime or epoch number to UTC epoch seconds."""
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _iso_day(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).date().isoformat()
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded relative error.
+
+    Values are counted in buckets whose bounds grow geometrically (the
+    DDSketch scheme), so every quantile is within ``relative_accuracy`` of
+    the exact answer and memory depends on the value range, not the count.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+        self._keys: Optional[List[int]] = None
+        self._cumulative: List[int] = []
+
+    def add(self, value: float) -> None:
+        value = max(value, 0.0)
+        self.count += 1
+        self.total += value
+        self.min = value if self.count == 1 else min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= self.min_value:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+        self._keys = None
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Approximate value at quantile ``q`` (0 to 1)."""
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        if self._keys is None:
+            self._keys = sorted(self.buckets)
+            self._cumulative = []
+            running = self.zero_count
+            for key in self._keys:
+                running += self.buckets[key]
+                self._cumulative.append(running)
+        index = bisect.bisect_right(self._cumulative, rank)
+        key = self._keys[min(index, len(self._keys) - 1)]
+        estimate = 2 * self.gamma ** key / (self.gamma + 1)
+        return min(max(estimate, self.min), self.max)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add every value counted by ``other`` (same accuracy) to this sketch."""
+        if not other.count:
+            return
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self._keys = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value": self.min_value,
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["min_value"])
+        sketch.buckets = {int(k): v for k, v in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        return sketch
+
+
+def _sketch_summary(sketch: QuantileSketch) -> Dict[str, Any]:
+    return {
+        "count": sketch.count,
+        "average_days": round(sketch.average, 2),
+        "p50_days": round(sketch.quantile(0.50), 2),
+        "p85_days": round(sketch.quantile(0.85), 2),
+        "p95_days": round(sketch.quantile(0.95), 2),
+    }
+
+
+class DailyFlow:
+    """Flow totals for one day: completions and the stages left that day."""
+
+    def __init__(self):
+        self.cycle_time = QuantileSketch()
+        self.lead_time = QuantileSketch()
+        self.stage_dwell: Dict[str, QuantileSketch] = {}
+        self.active_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "cycle_time": self.cycle_time.to_dict(),
+            "lead_time": self.lead_time.to_dict(),
+            "stage_dwell": {status: sketch.to_dict() for status, sketch in self.stage_dwell.items()},
+            "active_seconds": self.active_seconds,
+            "wait_seconds": self.wait_seconds,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DailyFlow":
+        daily = cls()
+        daily.cycle_time = QuantileSketch.from_dict(data["cycle_time"])
+        daily.lead_time = QuantileSketch.from_dict(data["lead_time"])
+        daily.stage_dwell = {
+            status: QuantileSketch.from_dict(sketch) for status, sketch in data["stage_dwell"].items()
+        }
+        daily.active_seconds = data["active_seconds"]
+        daily.wait_seconds = data["wait_seconds"]
+        return daily
+
+
+class FlowAggregator:
+    """Maintains flow metrics incrementally from status transitions.
+
+    Statuses are classified (case-insensitively) as backlog, active, done or
+    waiting; anything not listed as backlog, active or done counts as a wait
+    state for flow efficiency. Events for an issue that are not newer than
+    the last one already applied are ignored, so overlapping re-syncs are
+    safe. For windowed metrics, dwell time counts towards the day a stage
+    was left and cycle and lead time towards the day an item was completed.
+    """
+
+    def __init__(
+        self,
+        active_statuses: Iterable[str] = ACTIVE_STATUSES,
+        backlog_statuses: Iterable[str] = BACKLOG_STATUSES,
+        done_statuses: Iterable[str] = DONE_STATUSES,
+    ):
+        self.active_statuses = {s.lower() for s in active_statuses}
+        self.backlog_statuses = {s.lower() for s in backlog_statuses}
+        self.done_statuses = {s.lower() for s in done_statuses}
+
+        # issue -> [status, entered_at, created_at, started_at]
+        self.issues: Dict[str, List[Any]] = {}
+        self.stage_dwell: Dict[str, QuantileSketch] = {}
+        self.status_counts: Dict[str, int] = {}
+        self.cumulative_flow: Dict[str, Dict[str, int]] = {}
+        self.completions_per_day: Dict[str, int] = {}
+        self.cycle_time = QuantileSketch()
+        self.lead_time = QuantileSketch()
+        self.active_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.daily: Dict[str, DailyFlow] = {}
+        self.events = 0
+        self.last_event_at: Optional[float] = None
+        # Start of the history the caller has fed in, if it tracks one
+        self.synced_since: Optional[float] = None
+        self._cfd_day: Optional[str] = None
+        self._metrics: Optional[Dict[str, Any]] = None
+        self._window_metrics: Dict[str, Dict[str, Any]] = {}
+
+    def _category(self, status: str) -> str:
+        status = status.lower()
+        if status in self.done_statuses:
+            return "done"
+        if status in self.active_statuses:
+            return "active"
+        if status in self.backlog_statuses:
+            return "backlog"
+        return "wait"
+
+    def _close_cfd_day(self, day: str) -> None:
+        # Counts are recorded as of the end of each day that saw events; late
+        # events for an earlier day are counted towards the current one.
+        if self._cfd_day is None or day > self._cfd_day:
+            if self._cfd_day is not None:
+                self.cumulative_flow[self._cfd_day] = dict(self.status_counts)
+            self._cfd_day = day
+
+    def add_transition(
+        self,
+        issue: str,
+        from_status: Optional[str],
+        to_status: str,
+        timestamp: Timestamp,
+    ) -> bool:
+        """Apply one status change. ``from_status`` is None when the issue is created.
+
+        The first event seen for an issue is treated as its creation. Returns
+        False if the event is older than the issue's current state or repeats it.
+        """
+        at = to_epoch_seconds(timestamp)
+        state = self.issues.get(issue)
+        if state is not None and (at < state[1] or (at == state[1] and to_status == state[0])):
+            return False
+
+        day = _iso_day(at)
+        self._close_cfd_day(day)
+        daily = self.daily.get(day)
+        if daily is None:
+            daily = self.daily[day] = DailyFlow()
+        if state is None:
+            state = self.issues[issue] = [None, at, at, None]
+        else:
+            previous = state[0]
+            dwell = max(at - state[1], 0.0)
+            category = self._category(previous)
+            for totals in (self, daily):
+                sketch = totals.stage_dwell.get(previous)
+                if sketch is None:
+                    sketch = totals.stage_dwell[previous] = QuantileSketch()
+                sketch.add(dwell / _SECONDS_PER_DAY)
+                if category == "active":
+                    totals.active_seconds += dwell
+                elif category == "wait":
+                    totals.wait_seconds += dwell
+            self.status_counts[previous] -= 1
+            if not self.status_counts[previous]:
+                del self.status_counts[previous]
+
+        target = self._category(to_status)
+        if state[3] is None and target in ("active", "wait"):
+            state[3] = at
+        if target == "done" and (state[0] is None or self._category(state[0]) != "done"):
+            started_at = state[3] if state[3] is not None else state[2]
+            for totals in (self, daily):
+                totals.cycle_time.add((at - started_at) / _SECONDS_PER_DAY)
+                totals.lead_time.add((at - state[2]) / _SECONDS_PER_DAY)
+            self.completions_per_day[day] = self.completions_per_day.get(day, 0) + 1
+
+        state[0], state[1] = to_status, at
+        self.status_counts[to_status] = self.status_counts.get(to_status, 0) + 1
+        self.events += 1
+        self.last_event_at = at if self.last_event_at is None else max(self.last_event_at, at)
+        self._metrics = None
+        self._window_metrics.clear()
+        return True
+
+    def consume(self, events: Iterable[Dict[str, Any]]) -> int:
+        """Apply events shaped like ``{issue, from, to, timestamp}``; returns how many applied."""
+        applied = 0
+        for event in events:
+            applied += self.add_transition(
+                event["issue"], event.get("from"), event["to"], event["timestamp"]
+            )
+        return applied
+
+    def _summarize(self, totals: Union["FlowAggregator", DailyFlow]) -> Dict[str, Any]:
+        flow_time = totals.active_seconds + totals.wait_seconds
+        wip = sum(
+            count
+            for status, count in self.status_counts.items()
+            if self._category(status) in ("active", "wait")
+        )
+        return {
+            "events_processed": self.events,
+            "issues_tracked": len(self.issues),
+            "last_event_at": (
+                datetime.fromtimestamp(self.last_event_at, timezone.utc).isoformat()
+                if self.last_event_at is not None
+                else None
+            ),
+            "completed_items": totals.cycle_time.count,
+            "work_in_progress": wip,
+            "cycle_time": _sketch_summary(totals.cycle_time),
+            "lead_time": _sketch_summary(totals.lead_time),
+            "flow_efficiency": round(totals.active_seconds / flow_time * 100, 2) if flow_time else 0.0,
+            "stage_dwell": {
+                status: _sketch_summary(sketch) for status, sketch in totals.stage_dwell.items()
+            },
+            "status_counts": dict(self.status_counts),
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current metrics. Cached until the next event is applied."""
+        if self._metrics is None:
+            self._metrics = self._summarize(self)
+        return self._metrics
+
+    def metrics_since(self, day: str) -> Dict[str, Any]:
+        """Metrics for completions and stage exits on or after ``day`` (an ISO date).
+
+        Work in progress and status counts are always as of now.
+        """
+        if day not in self._window_metrics:
+            window = DailyFlow()
+            for d, daily in self.daily.items():
+                if d < day:
+                    continue
+                window.cycle_time.merge(daily.cycle_time)
+                window.lead_time.merge(daily.lead_time)
+                for status, sketch in daily.stage_dwell.items():
+                    window.stage_dwell.setdefault(status, QuantileSketch()).merge(sketch)
+                window.active_seconds += daily.active_seconds
+                window.wait_seconds += daily.wait_seconds
+            self._window_metrics[day] = self._summarize(window)
+        return self._window_metrics[day]
+
+    def cumulative_flow_diagram(self, since: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """End-of-day status counts for every day with events (from ``since``), including today."""
+        diagram = dict(self.cumulative_flow)
+        if self._cfd_day is not None:
+            diagram[self._cfd_day] = dict(self.status_counts)
+        if since is not None:
+            diagram = {day: counts for day, counts in diagram.items() if day >= since}
+        return diagram
+
+    def throughput_since(self, day: str) -> int:
+        """Items completed on or after ``day`` (an ISO date)."""
+        return sum(count for d, count in self.completions_per_day.items() if d >= day)
+
+    # Snapshots
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "active_statuses": sorted(self.active_statuses),
+            "backlog_statuses": sorted(self.backlog_statuses),
+            "done_statuses": sorted(self.done_statuses),
+            "issues": self.issues,
+            "stage_dwell": {status: sketch.to_dict() for status, sketch in self.stage_dwell.items()},
+            "status_counts": self.status_counts,
+            "cumulative_flow": self.cumulative_flow,
+            "completions_per_day": self.completions_per_day,
+            "cycle_time": self.cycle_time.to_dict(),
+            "lead_time": self.lead_time.to_dict(),
+            "active_seconds": self.active_seconds,
+            "wait_seconds": self.wait_seconds,
+            "daily": {day: daily.to_dict() for day, daily in self.daily.items()},
+            "events": self.events,
+            "last_event_at": self.last_event_at,
+            "synced_since": self.synced_since,
+            "cfd_day": self._cfd_day,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FlowAggregator":
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported flow snapshot version: {data.get('version')}")
+        aggregator = cls(data["active_statuses"], data["backlog_statuses"], data["done_statuses"])
+        aggregator.issues = data["issues"]
+        aggregator.stage_dwell = {
+            status: QuantileSketch.from_dict(sketch) for status, sketch in data["stage_dwell"].items()
+        }
+        aggregator.status_counts = data["status_counts"]
+        aggregator.cumulative_flow = data["cumulative_flow"]
+        aggregator.completions_per_day = data["completions_per_day"]
+        aggregator.cycle_time = QuantileSketch.from_dict(data["cycle_time"])
+        aggregator.lead_time = QuantileSketch.from_dict(data["lead_time"])
+        aggregator.active_seconds = data["active_seconds"]
+        aggregator.wait_seconds = data["wait_seconds"]
+        aggregator.daily = {day: DailyFlow.from_dict(daily) for day, daily in data["daily"].items()}
+        aggregator.events = data["events"]
+        aggregator.last_event_at = data["last_event_at"]
+        aggregator.synced_since = data["synced_since"]
+        aggregator._cfd_day = data["cfd_day"]
+        return aggregator
+
+    def save(self, path: str) -> None:
+        """Write a snapshot atomically so a crash never leaves a partial file."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "FlowAggregator":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,167 @@
+"""Monte Carlo delivery forecasting from historical daily throughput.
+
+Each trial replays the future by resampling days from the team's own
+throughput history. All trials are simulated together as NumPy arrays, so
+even 100k trials take a fraction of a second. Results answer "when will N
+items be done" and "how many items will be done by date D" at the
+requested confidence levels.
+
+Run ``python -m common.analytics.forecasting`` from ``src/backend`` to
+print the trial-count versus latency benchmark.
+"""
+
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from common.analytics.flow_metrics import FlowMetricsEngine
+
+DEFAULT_PERCENTILES = (50, 70, 85, 95)
+
+
+class MonteCarloForecaster:
+    """Forecasts delivery by resampling historical daily throughput.
+
+    Percentiles are confidence levels: ``p85`` of a completion forecast is
+    the number of days within which 85% of trials finished, and ``p85`` of
+    a throughput forecast is the item count reached by 85% of trials.
+    """
+
+    def __init__(
+        self,
+        daily_throughput: Sequence[int],
+        trials: int = 10_000,
+        seed: Optional[int] = None,
+        percentiles: Sequence[int] = DEFAULT_PERCENTILES,
+        max_cells: int = 2_000_000,
+    ):
+        history = np.asarray(daily_throughput, dtype=np.int64)
+        if history.size == 0 or history.sum() <= 0:
+            raise ValueError("Forecasting needs at least one day with completed items")
+        self.history = history
+        self.trials = trials
+        self.percentiles = tuple(percentiles)
+        # Upper bound on trials x days sampled at once, to cap memory use
+        self.max_cells = max_cells
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_work_items(
+        cls,
+        work_items: Sequence[Dict[str, Any]],
+        history_days: Optional[int] = None,
+        **kwargs: Any,
+    ) -> "MonteCarloForecaster":
+        """Build a forecaster from the completion dates of work items."""
+        engine = FlowMetricsEngine(work_items)
+        return cls(engine.daily_throughput(history_days), **kwargs)
+
+    def _sample(self, trials: int, days: int) -> np.ndarray:
+        return self.history[self.rng.integers(0, self.history.size, size=(trials, days))]
+
+    def simulate_items(self, days: int, trials: Optional[int] = None) -> np.ndarray:
+        """Items completed over the next ``days`` days, one value per trial."""
+        trials = trials or self.trials
+        totals = np.zeros(trials, dtype=np.int64)
+        if days <= 0:
+            return totals
+        chunk = max(1, self.max_cells // days)
+        for start in range(0, trials, chunk):
+            size = min(chunk, trials - start)
+            totals[start:start + size] = self._sample(size, days).sum(axis=1)
+        return totals
+
+    def simulate_days(self, items: int, trials: Optional[int] = None) -> np.ndarray:
+        """Days needed to complete ``items`` items, one value per trial."""
+        trials = trials or self.trials
+        days = np.zeros(trials, dtype=np.int64)
+        if items <= 0:
+            return days
+        remaining = np.full(trials, items, dtype=np.int64)
+        active = np.arange(trials)
+        horizon = int(np.ceil(items / self.history.mean() * 1.5))
+        # Simulate a block of days for every unfinished trial, then carry the
+        # trials that have not finished yet into the next block.
+        while active.size:
+            step = max(1, min(horizon, self.max_cells // active.size))
+            cumulative = np.cumsum(self._sample(active.size, step), axis=1)
+            target = remaining[active]
+            finished = cumulative[:, -1] >= target
+            days[active[finished]] += (
+                np.argmax(cumulative[finished] >= target[finished, None], axis=1) + 1
+            )
+            days[active[~finished]] += step
+            remaining[active[~finished]] -= cumulative[~finished, -1]
+            active = active[~finished]
+        return days
+
+    def forecast_completion(self, items: int, start: Optional[date] = None) -> Dict[str, Any]:
+        """When will ``items`` items be done, at each confidence level."""
+        start = start or date.today()
+        days = self.simulate_days(items)
+        values = np.percentile(days, self.percentiles, method="higher")
+        return {
+            "items": items,
+            "trials": int(days.size),
+            "start_date": start.isoformat(),
+            "percentiles": {
+                f"p{p}": {
+                    "days": int(value),
+                    "date": (start + timedelta(days=int(value))).isoformat(),
+                }
+                for p, value in zip(self.percentiles, values)
+            },
+        }
+
+    def forecast_throughput(self, days: int, start: Optional[date] = None) -> Dict[str, Any]:
+        """How many items will be done within ``days`` days, at each confidence level."""
+        start = start or date.today()
+        totals = self.simulate_items(days)
+        values = np.percentile(totals, [100 - p for p in self.percentiles], method="lower")
+        return {
+            "days": days,
+            "trials": int(totals.size),
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=days)).isoformat(),
+            "percentiles": {f"p{p}": int(value) for p, value in zip(self.percentiles, values)},
+        }
+
+    def forecast_by_date(self, target: date, start: Optional[date] = None) -> Dict[str, Any]:
+        """How many items will be done by ``target``, at each confidence level."""
+        start = start or date.today()
+        return self.forecast_throughput(max((target - start).days, 0), start)
+
+    def history_summary(self) -> Dict[str, Any]:
+        """Describe the throughput sample the simulation draws from."""
+        return {
+            "days": int(self.history.size),
+            "items": int(self.history.sum()),
+            "average_per_day": round(float(self.history.mean()), 2),
+            "zero_days": int((self.history == 0).sum()),
+        }
+
+
+def benchmark(
+    trial_counts: Sequence[int] = (1_000, 10_000, 100_000),
+    items: int = 50,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Measure simulation latency for each trial count on synthetic history."""
+    history = np.random.default_rng(seed).poisson(1.5, size=90)
+    results = []
+    for trials in trial_counts:
+        forecaster = MonteCarloForecaster(history, trials=trials, seed=seed)
+        started = time.perf_counter()
+        forecaster.forecast_completion(items)
+        forecaster.forecast_throughput(14)
+        results.append(
+            {"trials": trials, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+        )
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark():
+        print(f"{row['trials']:>8} trials  {row['latency_ms']:>8.2f} ms")
@@ -0,0 +1,157 @@
+"""Deterministic participation statistics for meeting transcripts.
+
+Speaking share, turn counts, questions and interruptions are counted
+directly from the parsed speaker turns, so the LLM is only needed for
+qualitative suggestions on top of the numbers. A turn that trails off
+(``--``, an em dash or ``...``) and is followed by another speaker counts
+as an interruption by that speaker.
+
+Run ``python -m common.analytics.participation`` from ``src/backend`` to
+print the per-transcript analysis time.
+"""
+
+import re
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from common.analytics.transcripts import NOTES_SPEAKER, ParsedTranscript, parse_transcript
+
+# A speaker is dominant above, and quiet below, these multiples of an equal share
+DOMINANT_SHARE = 1.5
+QUIET_SHARE = 0.5
+
+POSITIVE_MARKERS = (
+    "thanks", "thank you", "great", "good point", "good job",
+    "i agree", "agreed", "perfect", "sounds good", "excellent",
+)
+TENSION_MARKERS = ("disagree", "frustrat", "concern", "not sure", "problem", "annoy", "again?")
+
+_INTERRUPTED = ("--", "—", "...", "…")
+_SENTENCE_END = re.compile(r"[.!?]+(?=\s|$)")
+_ROLE = re.compile(r"\s*\([^)]*\)")
+
+
+def _attendees(transcript: ParsedTranscript) -> List[str]:
+    listed = transcript.metadata.get("Attendees", "")
+    return [_ROLE.sub("", name).strip() for name in listed.split(",") if name.strip()]
+
+
+def _empty_stats() -> Dict[str, int]:
+    return {"turns": 0, "words": 0, "sentences": 0, "questions": 0, "interruptions": 0, "interrupted": 0}
+
+
+def _count_markers(text: str, markers: Sequence[str]) -> int:
+    return sum(text.count(marker) for marker in markers)
+
+
+def analyze_participation(transcript: Any) -> Dict[str, Any]:
+    """Participation statistics for one transcript (text or ``ParsedTranscript``)."""
+    parsed = transcript if isinstance(transcript, ParsedTranscript) else parse_transcript(transcript)
+    turns = [turn for turn in parsed.turns if turn.speaker not in (NOTES_SPEAKER, "Unknown")]
+
+    # Listed attendees who never speak still count, as quiet participants
+    people: Dict[str, Dict[str, int]] = {name: _empty_stats() for name in _attendees(parsed)}
+
+    previous = None
+    for turn in turns:
+        stats = people.get(turn.speaker)
+        if stats is None:
+            stats = people[turn.speaker] = _empty_stats()
+        text = turn.text
+        stats["turns"] += 1
+        stats["words"] += text.count(" ") + 1
+        stats["sentences"] += max(len(_SENTENCE_END.findall(text)), 1)
+        stats["questions"] += text.count("?")
+        if (
+            previous is not None
+            and previous.speaker != turn.speaker
+            and previous.text.rstrip().endswith(_INTERRUPTED)
+        ):
+            stats["interruptions"] += 1
+            people[previous.speaker]["interrupted"] += 1
+        previous = turn
+
+    spoken = " ".join(turn.text for turn in turns).lower()
+
+    total_words = sum(stats["words"] for stats in people.values())
+    equal_share = 1 / len(people) if people else 0.0
+    attendees = {}
+    for name, stats in people.items():
+        share = stats["words"] / total_words if total_words else 0.0
+        attendees[name] = {
+            "turns": stats["turns"],
+            "words": stats["words"],
+            "speaking_share": round(share, 3),
+            "questions": stats["questions"],
+            "question_ratio": round(stats["questions"] / stats["sentences"], 3) if stats["sentences"] else 0.0,
+            "interruptions": stats["interruptions"],
+            "interrupted": stats["interrupted"],
+        }
+
+    dominant = [n for n, a in attendees.items() if a["speaking_share"] > DOMINANT_SHARE * equal_share]
+    quiet = [n for n, a in attendees.items() if a["speaking_share"] < QUIET_SHARE * equal_share]
+    return {
+        "participation_summary": {
+            "total_speakers": sum(1 for a in attendees.values() if a["turns"]),
+            "total_turns": len(turns),
+            "dominant_speakers": dominant,
+            "quiet_participants": quiet,
+            "balanced_discussion": not dominant and not quiet,
+        },
+        "engagement_indicators": {
+            "question_count": sum(a["questions"] for a in attendees.values()),
+            "interruptions": sum(a["interruptions"] for a in attendees.values()),
+            "positive_interactions": _count_markers(spoken, POSITIVE_MARKERS),
+            "tension_indicators": _count_markers(spoken, TENSION_MARKERS),
+        },
+        "attendees": attendees,
+    }
+
+
+def analyze_participation_batch(transcripts: Sequence[Any]) -> Dict[str, Any]:
+    """Per-meeting statistics plus each attendee's totals across all meetings."""
+    meetings = [analyze_participation(transcript) for transcript in transcripts]
+    totals: Dict[str, Dict[str, Any]] = {}
+    for meeting in meetings:
+        for name, stats in meeting["attendees"].items():
+            person = totals.setdefault(
+                name,
+                {"meetings": 0, "turns": 0, "words": 0, "questions": 0, "interruptions": 0, "share_sum": 0.0},
+            )
+            person["meetings"] += 1
+            person["turns"] += stats["turns"]
+            person["words"] += stats["words"]
+            person["questions"] += stats["questions"]
+            person["interruptions"] += stats["interruptions"]
+            person["share_sum"] += stats["speaking_share"]
+    for person in totals.values():
+        person["average_speaking_share"] = round(person.pop("share_sum") / person["meetings"], 3)
+    return {"meetings": meetings, "attendees": totals}
+
+
+def benchmark(transcript: Optional[str] = None, iterations: int = 1_000) -> Dict[str, float]:
+    """Average analysis time per transcript, with and without the cached parse."""
+    if transcript is None:
+        turns = [
+            f"**Person {i % 5}:**\nYesterday I worked on story {i}. Any questions? I can pair--"
+            for i in range(40)
+        ]
+        transcript = "**Attendees:** " + ", ".join(f"Person {i}" for i in range(6)) + "\n\n" + "\n\n".join(turns)
+
+    parsed = parse_transcript(transcript)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        analyze_participation(parsed)
+    analysis = (time.perf_counter() - started) / iterations
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        parse_transcript.__wrapped__(transcript)
+    parse = (time.perf_counter() - started) / iterations
+
+    return {"analysis_us": round(analysis * 1e6, 1), "parse_us": round(parse * 1e6, 1)}
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>12}: {value}")
@@ -0,0 +1,287 @@
+"""Lexicon-based sentiment and stress scoring for team messages.
+
+The lexicon is compiled into two prefix-trie regular expressions (see
+``common.utils.trie_regex``), one for words and phrases and one for emoji
+and Slack shortcodes such as ``:tada:``, so a batch of messages is scanned
+once per expression instead of testing each term against each message.
+Word terms only match on word boundaries ("bug" does not match "debug");
+emoji and shortcodes match anywhere. Two scans measure faster than one
+combined alternation, because the symbol expression can skip straight to
+its first characters.
+
+Scores are cheap enough to compute for every message, so agents can send
+the LLM per-user and per-day aggregates plus the most negative or stressed
+messages rather than the raw communications.
+
+Run ``python -m common.analytics.sentiment`` from ``src/backend`` to print
+scoring throughput in messages per second.
+"""
+
+import json
+import re
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from common.analytics.transcripts import NOTES_SPEAKER, parse_transcript
+from common.utils.trie_regex import trie_pattern
+
+POSITIVE = "positive"
+NEGATIVE = "negative"
+STRESS = "stress"
+
+LEXICON: Dict[str, Sequence[str]] = {
+    POSITIVE: (
+        "good", "great", "excellent", "awesome", "fantastic", "love", "perfect",
+        "amazing", "wonderful", "brilliant", "outstanding", "superb", "thanks",
+        "thank you", "kudos", "well done", "nice work", "shipped",
+        "👍", "🎉", "✅", "💚", "😊", "😃", "🙌",
+        ":+1:", ":thumbsup:", ":tada:", ":white_check_mark:", ":green_heart:",
+        ":blush:", ":smiley:", ":raised_hands:",
+    ),
+    NEGATIVE: (
+        "bad", "terrible", "awful", "hate", "horrible", "frustrated", "frustrating",
+        "annoying", "difficult", "problem", "problems", "issue", "issues", "bug", "bugs",
+        "broken", "stuck", "blocked", "blocker", "blockers", "worried", "concerned",
+        "👎", "😞", "😢", "😤", "🚨", "❌",
+        ":-1:", ":thumbsdown:", ":disappointed:", ":cry:", ":triumph:",
+        ":rotating_light:", ":x:",
+    ),
+    STRESS: (
+        "overwhelmed", "stressed", "burnout", "burned out", "burnt out", "tired",
+        "exhausted", "overwork", "overworked", "too much", "can't handle",
+        "struggling", "pressure", "no time", "late night", "weekend work",
+    ),
+}
+
+# A message is positive or negative when its score passes these bounds
+POSITIVE_THRESHOLD = 0.3
+NEGATIVE_THRESHOLD = -0.3
+
+# Joins a batch for scanning; never part of a term, so matches cannot span messages
+_SEPARATOR = "\x00"
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_WORD_EDGES = re.compile(r"^\w(?:.*\w)?$", re.DOTALL)
+
+
+def _variants(term: str) -> List[str]:
+    """The term plus its typographic- and missing-apostrophe spellings."""
+    if "'" not in term:
+        return [term]
+    return [term, term.replace("'", "’"), term.replace("'", "")]
+
+
+class SentimentLexicon:
+    """A compiled lexicon mapping each matched term to its category."""
+
+    def __init__(self, lexicon: Optional[Dict[str, Sequence[str]]] = None):
+        lexicon = lexicon or LEXICON
+        self.labels = tuple(dict.fromkeys((POSITIVE, NEGATIVE, STRESS, *lexicon)))
+        self.categories: Dict[str, str] = {}
+        for category, terms in lexicon.items():
+            for term in terms:
+                for variant in _variants(term.lower()):
+                    self.categories[variant] = category
+        # Word terms must stand alone ("bug" is not in "debug"); emoji and
+        # shortcodes match anywhere, including straight after a word
+        words = [term for term in self.categories if _WORD_EDGES.match(term)]
+        symbols = [term for term in self.categories if not _WORD_EDGES.match(term)]
+        # Anchoring on the preceding non-word character rather than a
+        # lookbehind lets the engine skip ahead to candidate positions
+        self.regexes = [re.compile(rf"\W({trie_pattern(words)})(?!\w)")] if words else []
+        if symbols:
+            self.regexes.append(re.compile(f"({trie_pattern(symbols)})"))
+
+    def count(self, texts: Sequence[str]) -> List[Dict[str, int]]:
+        """Category counts for each text, found by scanning the whole batch at once."""
+        # Lower-case each text first: lowering can change a string's length
+        texts = [text.lower() for text in texts]
+        counts = [dict.fromkeys(self.labels, 0) for _ in texts]
+        starts = []
+        offset = 1
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        # The leading separator gives a match at the very start its non-word anchor
+        batch = _SEPARATOR + _SEPARATOR.join(texts)
+        categories = self.categories
+        for regex in self.regexes:
+            for match in regex.finditer(batch):
+                counts[bisect_right(starts, match.start(1)) - 1][categories[match.group(1)]] += 1
+        return counts
+
+
+default_lexicon = SentimentLexicon()
+
+
+def _score(counts: Dict[str, int]) -> Dict[str, Any]:
+    positive, negative = counts[POSITIVE], counts[NEGATIVE]
+    score = (positive - negative) / (positive + negative) if positive or negative else 0.0
+    if score > POSITIVE_THRESHOLD:
+        sentiment = "positive"
+    elif score < NEGATIVE_THRESHOLD:
+        sentiment = "negative"
+    else:
+        sentiment = "neutral"
+    return {
+        "sentiment": sentiment,
+        "score": round(score, 3),
+        "positive_signals": positive,
+        "negative_signals": negative,
+        "stress_indicators": counts[STRESS],
+    }
+
+
+def score_messages(texts: Sequence[str], lexicon: Optional[SentimentLexicon] = None) -> List[Dict[str, Any]]:
+    """Sentiment, score (-1 to +1) and signal counts for each text."""
+    return [_score(counts) for counts in (lexicon or default_lexicon).count(list(texts))]
+
+
+def score_message(text: str, lexicon: Optional[SentimentLexicon] = None) -> Dict[str, Any]:
+    return score_messages([text], lexicon)[0]
+
+
+def message_day(value: Any) -> Optional[str]:
+    """ISO date of a Slack ``ts`` (epoch seconds) or ISO timestamp, if recognizable."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    try:
+        return datetime.fromtimestamp(float(value), timezone.utc).date().isoformat()
+    except (TypeError, ValueError, OverflowError, OSError):
+        pass
+    match = _ISO_DATE.match(str(value))
+    return match.group() if match else None
+
+
+def _new_bucket() -> Dict[str, float]:
+    return {"messages": 0, "score_sum": 0.0, "positive": 0, "negative": 0, "stress_indicators": 0}
+
+
+def _add(bucket: Dict[str, float], scored: Dict[str, Any]) -> None:
+    bucket["messages"] += 1
+    bucket["score_sum"] += scored["score"]
+    bucket["positive"] += scored["sentiment"] == "positive"
+    bucket["negative"] += scored["sentiment"] == "negative"
+    bucket["stress_indicators"] += scored["stress_indicators"]
+
+
+def _summary(bucket: Dict[str, float]) -> Dict[str, Any]:
+    messages = bucket["messages"]
+    return {
+        "messages": messages,
+        "average_score": round(bucket["score_sum"] / messages, 3) if messages else 0.0,
+        "positive_ratio": round(bucket["positive"] / messages, 3) if messages else 0.0,
+        "negative_ratio": round(bucket["negative"] / messages, 3) if messages else 0.0,
+        "stress_indicators": bucket["stress_indicators"],
+    }
+
+
+def analyze_messages(
+    messages: Iterable[Dict[str, Any]],
+    text_field: str = "text",
+    user_field: str = "user",
+    time_field: str = "ts",
+    max_outliers: int = 10,
+    lexicon: Optional[SentimentLexicon] = None,
+) -> Dict[str, Any]:
+    """Score a batch of messages and aggregate overall, per user and per day.
+
+    ``outliers`` lists the most negative or stressed messages (worst first),
+    which is usually all the raw text an LLM needs to see.
+    """
+    messages = [m for m in messages if isinstance(m, dict) and str(m.get(text_field) or "").strip()]
+    scores = score_messages([str(m[text_field]) for m in messages], lexicon)
+
+    overall = _new_bucket()
+    users: Dict[str, Dict[str, float]] = defaultdict(_new_bucket)
+    days: Dict[str, Dict[str, float]] = defaultdict(_new_bucket)
+    flagged = []
+    for message, scored in zip(messages, scores):
+        user = str(message.get(user_field) or "unknown")
+        day = message_day(message.get(time_field))
+        _add(overall, scored)
+        _add(users[user], scored)
+        if day:
+            _add(days[day], scored)
+        if scored["sentiment"] == "negative" or scored["stress_indicators"]:
+            flagged.append((message, scored, user, day))
+
+    flagged.sort(key=lambda item: (-item[1]["stress_indicators"], item[1]["score"]))
+    return {
+        "overall": _summary(overall),
+        "users": {user: _summary(bucket) for user, bucket in users.items()},
+        "days": {day: _summary(days[day]) for day in sorted(days)},
+        "outliers": [
+            {
+                "user": user,
+                "day": day,
+                "text": str(message[text_field])[:280],
+                "score": scored["score"],
+                "stress_indicators": scored["stress_indicators"],
+            }
+            for message, scored, user, day in flagged[:max_outliers]
+        ],
+    }
+
+
+def parse_communications(data: Any) -> List[Dict[str, Any]]:
+    """Messages (``user``/``text``/``ts`` dicts) from the forms agents receive.
+
+    Accepts a list of message dicts or strings, the JSON of such a list (or
+    of an object with a ``messages`` list), or free text, which is split
+    into speaker turns like a meeting transcript.
+    """
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            turns = parse_transcript(data).turns
+            return [{"user": turn.speaker, "text": turn.text} for turn in turns if turn.speaker != NOTES_SPEAKER]
+    if isinstance(data, dict):
+        data = data.get("messages", [])
+    if not isinstance(data, list):
+        return [{"text": str(data)}]
+    return [item if isinstance(item, dict) else {"text": str(item)} for item in data]
+
+
+def _substring_score(text: str) -> int:
+    # The per-word substring scan this module replaces, kept for the benchmark
+    lowered = text.lower()
+    return sum(1 for terms in LEXICON.values() for term in terms if term in lowered)
+
+
+def benchmark(count: int = 100_000, seed: int = 0) -> Dict[str, Any]:
+    """Messages per second for batch scoring, against a per-word substring scan."""
+    import random
+
+    rng = random.Random(seed)
+    vocabulary = ["the", "deploy", "story", "review", "today", "api", "test", "sprint", "merge", "we"]
+    terms = [term for category in LEXICON.values() for term in category]
+    texts = [
+        " ".join(rng.choice(vocabulary) for _ in range(12)) + " " + rng.choice(terms)
+        for _ in range(count)
+    ]
+
+    started = time.perf_counter()
+    score_messages(texts)
+    compiled = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for text in texts:
+        _substring_score(text)
+    substring = time.perf_counter() - started
+
+    return {
+        "messages": count,
+        "compiled_msgs_per_s": round(count / compiled),
+        "substring_msgs_per_s": round(count / substring),
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>20}: {value}")
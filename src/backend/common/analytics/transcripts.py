@@ -0,0 +1,193 @@
+"""Local parsing, chunking and result merging for meeting transcripts.
+
+Transcripts in the ``test_data/meeting_transcripts`` format mark each
+speaker turn with a bold ``**Name (Role):**`` line and keep meeting
+metadata in bold ``**Key:** value`` lines; notes written after the closing
+``---`` (action item lists, mood assessments) are kept as a final turn.
+Plain ``Name: text`` lines are understood too, and text without any
+speaker markers is split into paragraphs.
+
+Chunks are packed from whole turns up to a token budget, so every chunk
+can be analyzed concurrently and the per-chunk results merged back with
+near-duplicate action items and impediments removed.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from common.utils.tokens import count_tokens, pack_by_budget
+
+NOTES_SPEAKER = "Meeting notes"
+
+_BOLD_SPEAKER = re.compile(r"^\*\*(?P<name>[^*:]+?)(?:\s*\((?P<role>[^)]*)\))?:\*\*\s*$")
+_BOLD_FIELD = re.compile(r"^\*\*(?P<key>[^*:]+):\*\*\s*(?P<value>.+)$")
+_PLAIN_SPEAKER = re.compile(r"^(?P<name>[A-Z][\w.'-]*(?: [A-Z][\w.'-]*){0,3})(?:\s*\((?P<role>[^)]*)\))?:\s+(?P<text>.+)$")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class SpeakerTurn:
+    speaker: str
+    text: str
+    role: Optional[str] = None
+
+    def render(self) -> str:
+        return f"{self.speaker}: {self.text}"
+
+
+@dataclass
+class ParsedTranscript:
+    metadata: Dict[str, str] = field(default_factory=dict)
+    turns: List[SpeakerTurn] = field(default_factory=list)
+
+    @property
+    def speakers(self) -> List[str]:
+        """Distinct speakers in order of first appearance (notes excluded)."""
+        seen = dict.fromkeys(turn.speaker for turn in self.turns if turn.speaker != NOTES_SPEAKER)
+        return list(seen)
+
+    def header(self) -> str:
+        return "\n".join(f"{key}: {value}" for key, value in self.metadata.items())
+
+    def chunks(self, token_budget: int) -> List[str]:
+        """Render the transcript as chunks of whole turns within ``token_budget`` tokens.
+
+        The metadata header (title, attendees) is repeated in every chunk and
+        counted against the budget.
+        """
+        header = self.header()
+        budget = max(token_budget - count_tokens(header), 1)
+        rendered = [turn.render() for turn in self.turns]
+        groups = pack_by_budget(rendered, budget, count_tokens) or [[]]
+        return ["\n\n".join(([header] if header else []) + group) for group in groups]
+
+
+def _split_paragraphs(text: str) -> List[SpeakerTurn]:
+    return [
+        SpeakerTurn(speaker="Unknown", text=paragraph.strip())
+        for paragraph in re.split(r"\n\s*\n", text)
+        if paragraph.strip()
+    ]
+
+
+@lru_cache(maxsize=32)
+def parse_transcript(text: str) -> ParsedTranscript:
+    """Parse speaker turns and metadata from a transcript.
+
+    Results are cached by text, so several analyses of one transcript share
+    a single parse. Treat the returned object as read-only.
+    """
+    transcript = ParsedTranscript()
+    current: Optional[SpeakerTurn] = None
+    lines: List[str] = []
+    notes: List[str] = []
+    in_notes = False
+
+    def flush():
+        if current is not None and lines:
+            current.text = " ".join(lines)
+            transcript.turns.append(current)
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if in_notes:
+            notes.append(line)
+            continue
+        if line == "---":
+            if transcript.turns or current is not None:
+                flush()
+                current, lines = None, []
+                in_notes = True
+            continue
+
+        speaker = _BOLD_SPEAKER.match(line)
+        if speaker:
+            flush()
+            current, lines = SpeakerTurn(speaker["name"].strip(), "", speaker["role"]), []
+            continue
+        metadata = _BOLD_FIELD.match(line)
+        if metadata:
+            transcript.metadata[metadata["key"].strip()] = metadata["value"].strip()
+            continue
+        if current is None and line.startswith("**") and line.endswith("**"):
+            transcript.metadata.setdefault("Title", line.strip("*").strip())
+            continue
+
+        if current is not None:
+            lines.append(line)
+        else:
+            plain = _PLAIN_SPEAKER.match(line)
+            if plain:
+                transcript.turns.append(SpeakerTurn(plain["name"], plain["text"], plain["role"]))
+            elif transcript.turns and transcript.turns[-1].speaker != "Unknown":
+                transcript.turns[-1].text += " " + line
+            else:
+                notes.append(line)
+    flush()
+
+    if not transcript.turns:
+        # No speaker markers at all: analyze the text paragraph by paragraph
+        transcript.turns = _split_paragraphs(text)
+    elif notes:
+        transcript.turns.append(SpeakerTurn(NOTES_SPEAKER, "\n".join(notes)))
+    return transcript
+
+
+def _words(value: Any) -> frozenset:
+    return frozenset(_WORD.findall(str(value or "").lower()))
+
+
+def _similar(a: frozenset, b: frozenset, threshold: float) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= threshold
+
+
+def merge_items(
+    items: Iterable[Dict[str, Any]],
+    text_field: str = "description",
+    owner_field: Optional[str] = "owner",
+    threshold: float = 0.6,
+) -> List[Dict[str, Any]]:
+    """De-duplicate items reported by several chunks.
+
+    Two items are duplicates when their owners match (or either is missing,
+    or ``owner_field`` is None) and the word overlap of their descriptions
+    reaches ``threshold``. The first item is kept, with empty fields filled
+    in from its duplicates.
+    """
+    merged: List[Dict[str, Any]] = []
+    signatures: List[tuple] = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        words = _words(item.get(text_field))
+        owner = _words(item.get(owner_field)) if owner_field else frozenset()
+        for index, (kept_words, kept_owner) in enumerate(signatures):
+            same_owner = not owner or not kept_owner or owner == kept_owner
+            if same_owner and _similar(words, kept_words, threshold):
+                kept = merged[index]
+                for key, value in item.items():
+                    if value and not kept.get(key):
+                        kept[key] = value
+                break
+        else:
+            merged.append(dict(item))
+            signatures.append((words, owner))
+    return merged
+
+
+def unique(values: Sequence[Any]) -> List[Any]:
+    """Values in first-seen order, dropping repeats of the same text."""
+    seen = set()
+    result = []
+    for value in values:
+        key = str(value).strip().lower()
+        if key not in seen:
+            seen.add(key)
+            result.append(value)
+    return result
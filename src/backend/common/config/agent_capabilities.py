@@ -0,0 +1,84 @@
+"""Capability definitions shared by the agent routers.
+
+Plain data, so routers can be built without importing the FastAPI apps.
+``CHAT_AGENTS`` maps each capability to the agent name used by the
+production chat endpoints.
+"""
+
+from typing import Dict, List
+
+AGENT_CAPABILITY_DEFINITIONS: Dict[str, Dict[str, object]] = {
+    "BacklogIntelligence": {
+        "keywords": ["user story", "backlog", "epic", "acceptance criteria", "story points",
+                     "requirements", "feature", "epic", "prioritization", "story creation"],
+        "description": "Specializes in user story creation, backlog analysis, and requirement gathering",
+        "examples": [
+            "Create user stories for a login feature",
+            "Analyze the current backlog priorities",
+            "Generate acceptance criteria for this requirement"
+        ]
+    },
+    "MeetingIntelligence": {
+        "keywords": ["meeting", "standup", "retrospective", "sprint planning", "review",
+                     "action items", "impediments", "ceremony", "daily scrum", "agenda"],
+        "description": "Analyzes meetings, extracts action items, and facilitates agile ceremonies",
+        "examples": [
+            "Analyze this meeting transcript",
+            "Extract action items from the standup",
+            "Prepare retrospective agenda"
+        ]
+    },
+    "FlowMetrics": {
+        "keywords": ["metrics", "velocity", "cycle time", "lead time", "burndown",
+                     "throughput", "bottleneck", "performance", "delivery", "analytics"],
+        "description": "Analyzes team delivery metrics and identifies performance bottlenecks",
+        "examples": [
+            "Show team velocity trends",
+            "Identify delivery bottlenecks",
+            "Calculate cycle time metrics"
+        ]
+    },
+    "TeamWellness": {
+        "keywords": ["wellness", "burnout", "sentiment", "morale", "stress", "workload",
+                     "satisfaction", "engagement", "team health", "psychological safety"],
+        "description": "Monitors team sentiment and provides wellness recommendations",
+        "examples": [
+            "Analyze team sentiment from Slack",
+            "Check for burnout indicators",
+            "Assess team wellness metrics"
+        ]
+    },
+    "AgileCoaching": {
+        "keywords": ["agile", "scrum", "coaching", "process", "improvement", "best practices",
+                     "facilitation", "transformation", "methodology", "framework"],
+        "description": "Provides agile coaching and process improvement guidance",
+        "examples": [
+            "How can we improve our sprint planning?",
+            "Best practices for retrospectives",
+            "Agile transformation guidance"
+        ]
+    },
+}
+
+# Context patterns that add to a capability's score when they match
+CAPABILITY_PATTERNS: Dict[str, List[str]] = {
+    "BacklogIntelligence": [r'\b(create|write|generate)\b.*\b(story|stories|feature)\b',
+                            r'\bacceptance\s+criteria\b', r'\buser\s+story\b'],
+    "MeetingIntelligence": [r'\b(analyze|summarize)\b.*\b(meeting|transcript)\b',
+                            r'\baction\s+items?\b', r'\bdaily\s+(standup|scrum)\b'],
+    "FlowMetrics": [r'\b(show|display|calculate)\b.*\b(metrics|velocity)\b',
+                    r'\bteam\s+performance\b', r'\bcycle\s+time\b'],
+    "TeamWellness": [r'\bteam\s+(health|wellness|morale)\b',
+                     r'\bburnout\s+(risk|indicator|analysis)\b'],
+    "AgileCoaching": [r'\bhow\s+(can|do|should)\s+we\b.*\b(improve|better)\b',
+                      r'\bbest\s+practices?\b', r'\bagile\s+(process|methodology)\b'],
+}
+
+# Agent names used by /agents/chat and /agents/smart-chat
+CHAT_AGENTS: Dict[str, str] = {
+    "BacklogIntelligence": "backlog",
+    "MeetingIntelligence": "meeting",
+    "FlowMetrics": "metrics",
+    "TeamWellness": "wellness",
+    "AgileCoaching": "coaching",
+}
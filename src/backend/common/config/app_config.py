@@ -28,6 +28,37 @@ class AppConfig:
         self.COSMOSDB_ENDPOINT = self._get_optional("COSMOSDB_ENDPOINT")
         self.COSMOSDB_DATABASE = self._get_optional("COSMOSDB_DATABASE")
         self.COSMOSDB_CONTAINER = self._get_optional("COSMOSDB_CONTAINER")
+        # Maximum pooled connections shared by all requests (0 = SDK default)
+        self.COSMOSDB_CONNECTION_LIMIT = int(
+            self._get_optional("COSMOSDB_CONNECTION_LIMIT", "0") or 0
+        )
+        # Calls slower than this are written to the sampled slow-query log
+        self.COSMOSDB_SLOW_QUERY_MS = float(
+            self._get_optional("COSMOSDB_SLOW_QUERY_MS", "200")
+        )
+        self.COSMOSDB_SLOW_QUERY_SAMPLE_RATE = float(
+            self._get_optional("COSMOSDB_SLOW_QUERY_SAMPLE_RATE", "1.0")
+        )
+
+        # Change-feed listener that pushes persisted plan/step updates to
+        # WebSocket clients on every worker. Leases default to the main container.
+        self.CHANGE_FEED_ENABLED = self._get_bool("CHANGE_FEED_ENABLED")
+        self.CHANGE_FEED_POLL_INTERVAL = float(
+            self._get_optional("CHANGE_FEED_POLL_INTERVAL", "1.0")
+        )
+        self.COSMOSDB_LEASE_CONTAINER = self._get_optional("COSMOSDB_LEASE_CONTAINER")
+        # Lease slots per host; each worker claims one, so this must be at
+        # least the number of workers running on one host
+        self.CHANGE_FEED_LEASE_SLOTS = int(
+            self._get_optional("CHANGE_FEED_LEASE_SLOTS", "16")
+        )
+
+        # Database backend selection: "cosmos" (default) or "sqlite" for the
+        # embedded store used in local development, CI and benchmarks
+        self.DATABASE_BACKEND = self._get_optional("DATABASE_BACKEND", "cosmos")
+        self.SQLITE_DATABASE_PATH = self._get_optional(
+            "SQLITE_DATABASE_PATH", ":memory:"
+        )
 
         self.APPLICATIONINSIGHTS_CONNECTION_STRING = self._get_required(
             "APPLICATIONINSIGHTS_CONNECTION_STRING"
@@ -0,0 +1,186 @@
+"""Request-unit and latency instrumentation for CosmosDB operations."""
+
+import logging
+import random
+import re
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from opentelemetry import metrics
+
+REQUEST_CHARGE_HEADER = "x-ms-request-charge"
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL_RE = re.compile(r"(?<![\w@.])\d+(?:\.\d+)?\b")
+
+
+def redact_query(query: str) -> str:
+    """Replace inline string and numeric literals in a query with ``?``."""
+    query = _STRING_LITERAL_RE.sub("?", query)
+    return _NUMBER_LITERAL_RE.sub("?", query)
+
+
+def redact_parameters(parameters: Optional[List[Dict[str, Any]]]) -> List[str]:
+    """Keep only the parameter names of a query, never their values."""
+    return [parameter.get("name", "") for parameter in parameters or []]
+
+
+class RequestChargeHook:
+    """Cosmos ``response_hook`` that sums the request charge of every page."""
+
+    def __init__(self):
+        self.request_charge = 0.0
+        self.responses = 0
+
+    def __call__(self, headers: Mapping[str, str], result: Any) -> None:
+        self.responses += 1
+        try:
+            self.request_charge += float(headers.get(REQUEST_CHARGE_HEADER, 0) or 0)
+        except (TypeError, ValueError):
+            pass
+
+    def clear(self) -> None:
+        """Reset the totals (the SDK calls this before reusing a hook)."""
+        self.request_charge = 0.0
+        self.responses = 0
+
+
+@dataclass
+class OperationStats:
+    """Aggregated statistics for one client method."""
+
+    method: str
+    operation: str
+    calls: int = 0
+    request_charge: float = 0.0
+    latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+    items: int = 0
+    cross_partition_calls: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["avg_request_charge"] = self.request_charge / self.calls if self.calls else 0.0
+        data["avg_latency_ms"] = self.latency_ms / self.calls if self.calls else 0.0
+        return data
+
+
+class CosmosMetrics:
+    """Collects per-method RU, latency and item counts for Cosmos calls.
+
+    Every recorded call is exported through OpenTelemetry metrics and
+    aggregated in memory for the diagnostics report. Calls slower than
+    ``slow_query_ms`` are written to the slow-query log, sampled at
+    ``sample_rate``, with literals and parameter values redacted.
+    """
+
+    def __init__(self, slow_query_ms: float = 200.0, sample_rate: float = 1.0):
+        self.slow_query_ms = slow_query_ms
+        self.sample_rate = sample_rate
+
+        self.logger = logging.getLogger(__name__)
+        self.slow_query_logger = logging.getLogger(f"{__name__}.slow_query")
+        self._stats: Dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+
+        meter = metrics.get_meter(__name__)
+        self._request_charge = meter.create_counter(
+            "cosmosdb.request_charge",
+            unit="RU",
+            description="Request units consumed by CosmosDB operations",
+        )
+        self._latency = meter.create_histogram(
+            "cosmosdb.latency",
+            unit="ms",
+            description="Latency of CosmosDB operations",
+        )
+        self._items = meter.create_counter(
+            "cosmosdb.items",
+            description="Documents returned or written by CosmosDB operations",
+        )
+
+    def configure(
+        self,
+        slow_query_ms: Optional[float] = None,
+        sample_rate: Optional[float] = None,
+    ) -> None:
+        """Update the slow-query threshold and sampling rate."""
+        if slow_query_ms is not None:
+            self.slow_query_ms = slow_query_ms
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+
+    def record(
+        self,
+        method: str,
+        operation: str,
+        request_charge: float,
+        latency_ms: float,
+        item_count: int = 0,
+        cross_partition: bool = False,
+        query: Optional[str] = None,
+        parameters: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """Record a single CosmosDB call."""
+        attributes = {
+            "method": method,
+            "operation": operation,
+            "cross_partition": cross_partition,
+        }
+        self._request_charge.add(request_charge, attributes)
+        self._latency.record(latency_ms, attributes)
+        self._items.add(item_count, attributes)
+
+        with self._lock:
+            stats = self._stats.get(method)
+            if stats is None:
+                stats = self._stats[method] = OperationStats(method, operation)
+            stats.calls += 1
+            stats.request_charge += request_charge
+            stats.latency_ms += latency_ms
+            stats.max_latency_ms = max(stats.max_latency_ms, latency_ms)
+            stats.items += item_count
+            stats.cross_partition_calls += int(cross_partition)
+
+        if latency_ms >= self.slow_query_ms and random.random() < self.sample_rate:
+            self.slow_query_logger.warning(
+                "Slow CosmosDB %s in %s: %.1f ms, %.2f RU, %d items, "
+                "cross_partition=%s, query=%s, parameters=%s",
+                operation,
+                method,
+                latency_ms,
+                request_charge,
+                item_count,
+                cross_partition,
+                redact_query(query) if query else None,
+                redact_parameters(parameters),
+            )
+
+    def top_consumers(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the methods that consumed the most request units."""
+        with self._lock:
+            ranked = sorted(
+                self._stats.values(), key=lambda s: s.request_charge, reverse=True
+            )
+            return [stats.to_dict() for stats in ranked[:limit]]
+
+    def summary(self, limit: int = 10) -> Dict[str, Any]:
+        """Return overall totals plus the top RU consumers."""
+        with self._lock:
+            total_calls = sum(s.calls for s in self._stats.values())
+            total_charge = sum(s.request_charge for s in self._stats.values())
+        return {
+            "total_calls": total_calls,
+            "total_request_charge": total_charge,
+            "top_consumers": self.top_consumers(limit),
+        }
+
+    def reset(self) -> None:
+        """Clear the in-memory aggregates."""
+        with self._lock:
+            self._stats.clear()
+
+
+# Process-wide collector shared by every CosmosDBClient
+cosmos_metrics = CosmosMetrics()
@@ -2,9 +2,13 @@
 
 import datetime
 import logging
-from typing import Any, Dict, List, Optional, Type
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Type, Union
 
+import aiohttp
 import v3.models.messages as messages
+from azure.core.pipeline.transport import AioHttpTransport
 from azure.cosmos.aio import CosmosClient
 from azure.cosmos.aio._database import DatabaseProxy
 
@@ -18,7 +22,18 @@ from ..models.messages_kernel import (
     TeamConfiguration,
     UserCurrentTeam,
 )
-from .database_base import DatabaseBase
+from .cosmos_metrics import RequestChargeHook, cosmos_metrics
+from .database_base import DatabaseBase, strip_system_fields, validate_documents
+
+
+# Container partition key; queries filtering on it are served by one partition
+PARTITION_KEY_FIELD = "session_id"
+_PARTITION_KEY_FILTER = re.compile(rf"\bc\.{PARTITION_KEY_FIELD}\s*=\s*@\w+")
+
+
+def is_cross_partition(query: str, partition_key: Optional[str] = None) -> bool:
+    """Whether a query may fan out: no partition key given and none in its filter."""
+    return partition_key is None and not _PARTITION_KEY_FILTER.search(query)
 
 
 class CosmosDBClient(DatabaseBase):
@@ -40,6 +55,7 @@ class CosmosDBClient(DatabaseBase):
         container_name: str,
         session_id: str = "",
         user_id: str = "",
+        connection_limit: Optional[int] = None,
     ):
         self.endpoint = endpoint
         self.credential = credential
@@ -47,6 +63,7 @@ class CosmosDBClient(DatabaseBase):
         self.container_name = container_name
         self.session_id = session_id
         self.user_id = user_id
+        self.connection_limit = connection_limit
 
         self.logger = logging.getLogger(__name__)
         self.client = None
@@ -59,7 +76,9 @@ class CosmosDBClient(DatabaseBase):
         try:
             if not self._initialized:
                 self.client = CosmosClient(
-                    url=self.endpoint, credential=self.credential
+                    url=self.endpoint,
+                    credential=self.credential,
+                    **self._transport_kwargs(),
                 )
                 self.database = self.client.get_database_client(self.database_name)
 
@@ -73,6 +92,15 @@ class CosmosDBClient(DatabaseBase):
             raise
 
     # Helper Methods
+    def _transport_kwargs(self) -> Dict[str, Any]:
+        """Build a transport with a bounded connection pool when configured."""
+        if not self.connection_limit:
+            return {}
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.connection_limit)
+        )
+        return {"transport": AioHttpTransport(session=session, session_owner=True)}
+
     async def _ensure_initialized(self) -> None:
         """Ensure the database is initialized."""
         if not self._initialized:
@@ -88,13 +116,19 @@ class CosmosDBClient(DatabaseBase):
 
     async def close(self) -> None:
         """Close the CosmosDB connection."""
-        if self.client:
+        if self.client and self._owns_connection:
             await self.client.close()
             self.logger.info("Closed CosmosDB connection")
 
     # Core CRUD Operations
-    async def add_item(self, item: BaseDataModel) -> None:
-        """Add an item to CosmosDB."""
+    async def add_item(
+        self, item: BaseDataModel, operation_name: Optional[str] = None
+    ) -> None:
+        """Add an item to CosmosDB.
+
+        ``operation_name`` labels the call in the RU and latency metrics.
+        """
+        method = operation_name or "add_item"
         await self._ensure_initialized()
 
         try:
@@ -105,13 +139,18 @@ class CosmosDBClient(DatabaseBase):
                 if isinstance(value, datetime.datetime):
                     document[key] = value.isoformat()
 
-            await self.container.create_item(body=document)
+            await self._point_operation(
+                method, "create", self.container.create_item, body=document
+            )
         except Exception as e:
             self.logger.error("Failed to add item to CosmosDB: %s", str(e))
             raise
 
-    async def update_item(self, item: BaseDataModel) -> None:
+    async def update_item(
+        self, item: BaseDataModel, operation_name: Optional[str] = None
+    ) -> None:
         """Update an item in CosmosDB."""
+        method = operation_name or "update_item"
         await self._ensure_initialized()
 
         try:
@@ -120,58 +159,169 @@ class CosmosDBClient(DatabaseBase):
             for key, value in list(document.items()):
                 if isinstance(value, datetime.datetime):
                     document[key] = value.isoformat()
-            await self.container.upsert_item(body=document)
+            await self._point_operation(
+                method, "upsert", self.container.upsert_item, body=document
+            )
         except Exception as e:
             self.logger.error("Failed to update item in CosmosDB: %s", str(e))
             raise
 
     async def get_item_by_id(
-        self, item_id: str, partition_key: str, model_class: Type[BaseDataModel]
+        self,
+        item_id: str,
+        partition_key: str,
+        model_class: Type[BaseDataModel],
+        operation_name: Optional[str] = None,
     ) -> Optional[BaseDataModel]:
         """Retrieve an item by its ID and partition key."""
+        method = operation_name or "get_item_by_id"
         await self._ensure_initialized()
 
         try:
-            item = await self.container.read_item(
-                item=item_id, partition_key=partition_key
+            item = await self._point_operation(
+                method,
+                "read",
+                self.container.read_item,
+                item=item_id,
+                partition_key=partition_key,
             )
             return model_class.model_validate(item)
         except Exception as e:
             self.logger.error("Failed to retrieve item from CosmosDB: %s", str(e))
             return None
 
+    async def _point_operation(self, method: str, operation: str, call, **kwargs):
+        """Run a single-document Cosmos call and record its RU and latency."""
+        hook = RequestChargeHook()
+        item_count = 0
+        started = time.perf_counter()
+        try:
+            result = await call(response_hook=hook, **kwargs)
+            item_count = 1
+            return result
+        finally:
+            cosmos_metrics.record(
+                method,
+                operation,
+                hook.request_charge,
+                (time.perf_counter() - started) * 1000,
+                item_count=item_count,
+            )
+
+    async def _iter_documents(
+        self,
+        query: str,
+        parameters: List[Dict[str, Any]],
+        method: str,
+        partition_key: Optional[str] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield raw result pages of a query, recording RU and latency."""
+        await self._ensure_initialized()
+
+        hook = RequestChargeHook()
+        item_count = 0
+        started = time.perf_counter()
+        options = {} if partition_key is None else {"partition_key": partition_key}
+        try:
+            items = self.container.query_items(
+                query=query, parameters=parameters, response_hook=hook, **options
+            )
+            async for page in items.by_page():
+                documents = [document async for document in page]
+                item_count += len(documents)
+                yield documents
+        finally:
+            cosmos_metrics.record(
+                method,
+                "query",
+                hook.request_charge,
+                (time.perf_counter() - started) * 1000,
+                item_count=item_count,
+                cross_partition=is_cross_partition(query, partition_key),
+                query=query,
+                parameters=parameters,
+            )
+
+    async def _iter_items(
+        self,
+        query: str,
+        parameters: List[Dict[str, Any]],
+        model_class: Type[BaseDataModel],
+        raw: bool,
+        method: str,
+        partition_key: Optional[str] = None,
+    ) -> AsyncIterator[Union[BaseDataModel, Dict[str, Any]]]:
+        async for documents in self._iter_documents(
+            query, parameters, method, partition_key
+        ):
+            if raw:
+                for document in documents:
+                    yield strip_system_fields(document)
+            else:
+                for model in validate_documents(documents, model_class, self.logger):
+                    yield model
+
+    def iter_items(
+        self,
+        query: str,
+        parameters: List[Dict[str, Any]],
+        model_class: Type[BaseDataModel],
+        raw: bool = False,
+        operation_name: Optional[str] = None,
+        partition_key: Optional[str] = None,
+    ) -> AsyncIterator[Union[BaseDataModel, Dict[str, Any]]]:
+        """Stream query results from CosmosDB one page at a time.
+
+        Each page is validated as a batch as soon as it arrives, so callers
+        can start consuming results before the query has finished. A
+        ``partition_key`` confines the query to that partition.
+        """
+        return self._iter_items(
+            query,
+            parameters,
+            model_class,
+            raw,
+            operation_name or "iter_items",
+            partition_key,
+        )
+
     async def query_items(
         self,
         query: str,
         parameters: List[Dict[str, Any]],
         model_class: Type[BaseDataModel],
-    ) -> List[BaseDataModel]:
+        raw: bool = False,
+        operation_name: Optional[str] = None,
+        partition_key: Optional[str] = None,
+    ) -> Union[List[BaseDataModel], List[Dict[str, Any]]]:
         """Query items from CosmosDB and return a list of model instances."""
-        await self._ensure_initialized()
-
+        method = operation_name or "query_items"
         try:
-            items = self.container.query_items(query=query, parameters=parameters)
-            result_list = []
-            async for item in items:
-                # item["ts"] = item["_ts"]
-                try:
-                    result_list.append(model_class.model_validate(item))
-                except Exception as validation_error:
-                    self.logger.warning(
-                        "Failed to validate item: %s", str(validation_error)
-                    )
-                    continue
-            return result_list
+            return [
+                item
+                async for item in self._iter_items(
+                    query, parameters, model_class, raw, method, partition_key
+                )
+            ]
         except Exception as e:
             self.logger.error("Failed to query items from CosmosDB: %s", str(e))
             return []
 
-    async def delete_item(self, item_id: str, partition_key: str) -> None:
+    async def delete_item(
+        self, item_id: str, partition_key: str, operation_name: Optional[str] = None
+    ) -> None:
         """Delete an item from CosmosDB."""
+        method = operation_name or "delete_item"
         await self._ensure_initialized()
 
         try:
-            await self.container.delete_item(item=item_id, partition_key=partition_key)
+            await self._point_operation(
+                method,
+                "delete",
+                self.container.delete_item,
+                item=item_id,
+                partition_key=partition_key,
+            )
         except Exception as e:
             self.logger.error("Failed to delete item from CosmosDB: %s", str(e))
             raise
@@ -179,11 +329,11 @@ class CosmosDBClient(DatabaseBase):
     # Plan Operations
     async def add_plan(self, plan: Plan) -> None:
         """Add a plan to CosmosDB."""
-        await self.add_item(plan)
+        await self.add_item(plan, operation_name="add_plan")
 
     async def update_plan(self, plan: Plan) -> None:
         """Update a plan in CosmosDB."""
-        await self.update_item(plan)
+        await self.update_item(plan, operation_name="update_plan")
 
     async def get_plan_by_plan_id(self, plan_id: str) -> Optional[Plan]:
         """Retrieve a plan by plan_id."""
@@ -193,7 +343,9 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@data_type", "value": DataType.plan},
             {"name": "@user_id", "value": self.user_id},
         ]
-        results = await self.query_items(query, parameters, Plan)
+        results = await self.query_items(
+            query, parameters, Plan, operation_name="get_plan_by_plan_id"
+        )
         return results[0] if results else None
 
     async def get_plan(self, plan_id: str) -> Optional[Plan]:
@@ -207,7 +359,9 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@user_id", "value": self.user_id},
             {"name": "@data_type", "value": DataType.plan},
         ]
-        return await self.query_items(query, parameters, Plan)
+        return await self.query_items(
+            query, parameters, Plan, operation_name="get_all_plans"
+        )
 
     async def get_all_plans_by_team_id(self, team_id: str) -> List[Plan]:
         """Retrieve all plans for a specific team."""
@@ -217,7 +371,9 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@team_id", "value": team_id},
             {"name": "@data_type", "value": DataType.plan},
         ]
-        return await self.query_items(query, parameters, Plan)
+        return await self.query_items(
+            query, parameters, Plan, operation_name="get_all_plans_by_team_id"
+        )
 
     async def get_all_plans_by_team_id_status(
         self, user_id: str, team_id: str, status: str
@@ -230,16 +386,18 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@data_type", "value": DataType.plan},
             {"name": "@status", "value": status},
         ]
-        return await self.query_items(query, parameters, Plan)
+        return await self.query_items(
+            query, parameters, Plan, operation_name="get_all_plans_by_team_id_status"
+        )
 
     # Step Operations
     async def add_step(self, step: Step) -> None:
         """Add a step to CosmosDB."""
-        await self.add_item(step)
+        await self.add_item(step, operation_name="add_step")
 
     async def update_step(self, step: Step) -> None:
         """Update a step in CosmosDB."""
-        await self.update_item(step)
+        await self.update_item(step, operation_name="update_step")
 
     async def get_steps_by_plan(self, plan_id: str) -> List[Step]:
         """Retrieve all steps for a plan."""
@@ -248,7 +406,9 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@plan_id", "value": plan_id},
             {"name": "@data_type", "value": DataType.step},
         ]
-        return await self.query_items(query, parameters, Step)
+        return await self.query_items(
+            query, parameters, Step, operation_name="get_steps_by_plan"
+        )
 
     async def get_step(self, step_id: str, session_id: str) -> Optional[Step]:
         """Retrieve a step by step_id and session_id."""
@@ -258,7 +418,9 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@session_id", "value": session_id},
             {"name": "@data_type", "value": DataType.step},
         ]
-        results = await self.query_items(query, parameters, Step)
+        results = await self.query_items(
+            query, parameters, Step, operation_name="get_step"
+        )
         return results[0] if results else None
 
     # Removed duplicate update_team method definition
@@ -277,7 +439,9 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@team_id", "value": team_id},
             {"name": "@data_type", "value": DataType.team_config},
         ]
-        teams = await self.query_items(query, parameters, TeamConfiguration)
+        teams = await self.query_items(
+            query, parameters, TeamConfiguration, operation_name="get_team"
+        )
         return teams[0] if teams else None
 
     async def get_team_by_id(self, team_id: str) -> Optional[TeamConfiguration]:
@@ -294,7 +458,9 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@team_id", "value": team_id},
             {"name": "@data_type", "value": DataType.team_config},
         ]
-        teams = await self.query_items(query, parameters, TeamConfiguration)
+        teams = await self.query_items(
+            query, parameters, TeamConfiguration, operation_name="get_team_by_id"
+        )
         return teams[0] if teams else None
 
     async def get_all_teams(self) -> List[TeamConfiguration]:
@@ -310,7 +476,9 @@ class CosmosDBClient(DatabaseBase):
         parameters = [
             {"name": "@data_type", "value": DataType.team_config},
         ]
-        teams = await self.query_items(query, parameters, TeamConfiguration)
+        teams = await self.query_items(
+            query, parameters, TeamConfiguration, operation_name="get_all_teams"
+        )
         return teams
 
     async def delete_team(self, team_id: str) -> bool:
@@ -329,7 +497,11 @@ class CosmosDBClient(DatabaseBase):
             team = await self.get_team(team_id)
             print(team)
             if team:
-                await self.delete_item(item_id=team.id, partition_key=team.session_id)
+                await self.delete_item(
+                    item_id=team.id,
+                    partition_key=team.session_id,
+                    operation_name="delete_team",
+                )
             return True
         except Exception as e:
             logging.exception(f"Failed to delete team from Cosmos DB: {e}")
@@ -346,7 +518,9 @@ class CosmosDBClient(DatabaseBase):
 
         # Get the appropriate model class
         model_class = self.MODEL_CLASS_MAPPING.get(data_type, BaseDataModel)
-        return await self.query_items(query, parameters, model_class)
+        return await self.query_items(
+            query, parameters, model_class, operation_name="get_data_by_type"
+        )
 
     async def get_all_items(self) -> List[Dict[str, Any]]:
         """Retrieve all items as dictionaries."""
@@ -355,11 +529,11 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@user_id", "value": self.user_id},
         ]
 
-        await self._ensure_initialized()
-        items = self.container.query_items(query=query, parameters=parameters)
         results = []
-        async for item in items:
-            results.append(item)
+        async for documents in self._iter_documents(
+            query, parameters, "get_all_items"
+        ):
+            results.extend(documents)
         return results
 
     # Collection Management (for compatibility)
@@ -375,7 +549,7 @@ class CosmosDBClient(DatabaseBase):
         Args:
             team: The TeamConfiguration to add
         """
-        await self.add_item(team)
+        await self.add_item(team, operation_name="add_team")
 
     async def update_team(self, team: TeamConfiguration) -> None:
         """Update an existing team configuration in Cosmos DB.
@@ -383,7 +557,7 @@ class CosmosDBClient(DatabaseBase):
         Args:
             team: The TeamConfiguration to update
         """
-        await self.update_item(team)
+        await self.update_item(team, operation_name="update_team")
 
     async def get_current_team(self, user_id: str) -> Optional[UserCurrentTeam]:
         """Retrieve the current team for a user."""
@@ -398,7 +572,9 @@ class CosmosDBClient(DatabaseBase):
         ]
 
         # Get the appropriate model class
-        teams = await self.query_items(query, parameters, UserCurrentTeam)
+        teams = await self.query_items(
+            query, parameters, UserCurrentTeam, operation_name="get_current_team"
+        )
         return teams[0] if teams else None
 
     async def delete_current_team(self, user_id: str) -> bool:
@@ -409,13 +585,22 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@user_id", "value": user_id},
             {"name": "@data_type", "value": DataType.user_current_team},
         ]
-        items = self.container.query_items(query=query, parameters=params)
-        print("Items to delete:", items)
-        if items:
-            async for doc in items:
+        documents = [
+            doc
+            async for page in self._iter_documents(
+                query, params, "delete_current_team"
+            )
+            for doc in page
+        ]
+        if documents:
+            for doc in documents:
                 try:
-                    await self.container.delete_item(
-                        doc["id"], partition_key=doc["session_id"]
+                    await self._point_operation(
+                        "delete_current_team",
+                        "delete",
+                        self.container.delete_item,
+                        item=doc["id"],
+                        partition_key=doc["session_id"],
                     )
                 except Exception as e:
                     self.logger.warning(
@@ -427,12 +612,12 @@ class CosmosDBClient(DatabaseBase):
     async def set_current_team(self, current_team: UserCurrentTeam) -> None:
         """Set the current team for a user."""
         await self._ensure_initialized()
-        await self.add_item(current_team)
+        await self.add_item(current_team, operation_name="set_current_team")
 
     async def update_current_team(self, current_team: UserCurrentTeam) -> None:
         """Update the current team for a user."""
         await self._ensure_initialized()
-        await self.update_item(current_team)
+        await self.update_item(current_team, operation_name="update_current_team")
 
     async def delete_plan_by_plan_id(self, plan_id: str) -> bool:
         """Delete a plan by its ID."""
@@ -441,13 +626,22 @@ class CosmosDBClient(DatabaseBase):
         params = [
             {"name": "@plan_id", "value": plan_id},
         ]
-        items = self.container.query_items(query=query, parameters=params)
-        print("Items to delete planid:", items)
-        if items:
-            async for doc in items:
+        documents = [
+            doc
+            async for page in self._iter_documents(
+                query, params, "delete_plan_by_plan_id"
+            )
+            for doc in page
+        ]
+        if documents:
+            for doc in documents:
                 try:
-                    await self.container.delete_item(
-                        doc["id"], partition_key=doc["session_id"]
+                    await self._point_operation(
+                        "delete_plan_by_plan_id",
+                        "delete",
+                        self.container.delete_item,
+                        item=doc["id"],
+                        partition_key=doc["session_id"],
                     )
                 except Exception as e:
                     self.logger.warning(
@@ -458,11 +652,11 @@ class CosmosDBClient(DatabaseBase):
 
     async def add_mplan(self, mplan: messages.MPlan) -> None:
         """Add a team configuration to the database."""
-        await self.add_item(mplan)
+        await self.add_item(mplan, operation_name="add_mplan")
 
     async def update_mplan(self, mplan: messages.MPlan) -> None:
         """Update a team configuration in the database."""
-        await self.update_item(mplan)
+        await self.update_item(mplan, operation_name="update_mplan")
 
     async def get_mplan(self, plan_id: str) -> Optional[messages.MPlan]:
         """Retrieve a mplan configuration by mplan_id."""
@@ -471,23 +665,33 @@ class CosmosDBClient(DatabaseBase):
             {"name": "@plan_id", "value": plan_id},
             {"name": "@data_type", "value": DataType.m_plan},
         ]
-        results = await self.query_items(query, parameters, messages.MPlan)
+        results = await self.query_items(
+            query, parameters, messages.MPlan, operation_name="get_mplan"
+        )
         return results[0] if results else None
 
     async def add_agent_message(self, message: AgentMessageData) -> None:
         """Add an agent message to the database."""
-        await self.add_item(message)
+        await self.add_item(message, operation_name="add_agent_message")
 
     async def update_agent_message(self, message: AgentMessageData) -> None:
         """Update an agent message in the database."""
-        await self.update_item(message)
+        await self.update_item(message, operation_name="update_agent_message")
 
-    async def get_agent_messages(self, plan_id: str) -> List[AgentMessageData]:
-        """Retrieve an agent message by message_id."""
+    async def get_agent_messages(
+        self, plan_id: str, raw: bool = False
+    ) -> Union[List[AgentMessageData], List[Dict[str, Any]]]:
+        """Retrieve the agent messages of a plan, optionally as raw dictionaries."""
         query = "SELECT * FROM c WHERE c.plan_id=@plan_id AND c.data_type=@data_type ORDER BY c._ts ASC"
         parameters = [
             {"name": "@plan_id", "value": plan_id},
             {"name": "@data_type", "value": DataType.m_plan_message},
         ]
 
-        return await self.query_items(query, parameters, AgentMessageData)
+        return await self.query_items(
+            query,
+            parameters,
+            AgentMessageData,
+            raw=raw,
+            operation_name="get_agent_messages",
+        )
@@ -1,9 +1,13 @@
 """Database base class for managing database operations."""
 
+import copy
+import functools
+import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, AsyncIterator, Dict, List, Optional, Type, Union
 
 import v3.models.messages as messages
+from pydantic import TypeAdapter, ValidationError
 
 from ..models.messages_kernel import (
     AgentMessageData,
@@ -15,9 +19,62 @@ from ..models.messages_kernel import (
 )
 
 
+@functools.lru_cache(maxsize=None)
+def _list_adapter(model_class: Type[BaseDataModel]) -> TypeAdapter:
+    """Return the cached list TypeAdapter for a model class."""
+    return TypeAdapter(List[model_class])
+
+
+def validate_documents(
+    documents: List[Dict[str, Any]],
+    model_class: Type[BaseDataModel],
+    logger: Optional[logging.Logger] = None,
+) -> List[BaseDataModel]:
+    """Validate a batch of documents into model instances in a single pass.
+
+    Falls back to per-document validation when the batch contains an invalid
+    document so that the valid ones are still returned.
+    """
+    try:
+        return _list_adapter(model_class).validate_python(documents)
+    except ValidationError:
+        pass
+
+    results = []
+    for document in documents:
+        try:
+            results.append(model_class.model_validate(document))
+        except Exception as validation_error:
+            (logger or logging.getLogger(__name__)).warning(
+                "Failed to validate item: %s", str(validation_error)
+            )
+    return results
+
+
+def strip_system_fields(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop store-managed fields (``_rid``, ``_etag``, ``_ts``...) from a document."""
+    return {key: value for key, value in document.items() if not key.startswith("_")}
+
+
 class DatabaseBase(ABC):
     """Abstract base class for database operations."""
 
+    # Scoped views returned by for_user() share the connection of the client
+    # they were created from and must not close it.
+    _owns_connection: bool = True
+    user_id: str = ""
+
+    def for_user(self, user_id: str) -> "DatabaseBase":
+        """Return a lightweight view of this database scoped to user_id.
+
+        The view shares the underlying connection (and its pool) with this
+        instance, so creating one per request costs a shallow copy.
+        """
+        scoped = copy.copy(self)
+        scoped.user_id = user_id
+        scoped._owns_connection = False
+        return scoped
+
     @abstractmethod
     async def initialize(self) -> None:
         """Initialize the database client and create containers if needed."""
@@ -47,8 +104,23 @@ class DatabaseBase(ABC):
         query: str,
         parameters: List[Dict[str, Any]],
         model_class: Type[BaseDataModel],
-    ) -> List[BaseDataModel]:
-        """Query items from the database and return a list of model instances."""
+        raw: bool = False,
+    ) -> Union[List[BaseDataModel], List[Dict[str, Any]]]:
+        """Query items from the database and return a list of model instances.
+
+        With raw=True the documents are returned as plain dictionaries without
+        model validation, for callers that only re-serialize them.
+        """
+
+    @abstractmethod
+    def iter_items(
+        self,
+        query: str,
+        parameters: List[Dict[str, Any]],
+        model_class: Type[BaseDataModel],
+        raw: bool = False,
+    ) -> AsyncIterator[Union[BaseDataModel, Dict[str, Any]]]:
+        """Stream query results, validating them one page at a time."""
 
     @abstractmethod
     async def delete_item(self, item_id: str, partition_key: str) -> None:
@@ -191,5 +263,7 @@ class DatabaseBase(ABC):
         """Update an agent message in the database."""
 
     @abstractmethod
-    async def get_agent_messages(self, plan_id: str) -> Optional[AgentMessageData]:
-        """Retrieve an agent message by message_id."""
+    async def get_agent_messages(
+        self, plan_id: str, raw: bool = False
+    ) -> Union[List[AgentMessageData], List[Dict[str, Any]]]:
+        """Retrieve the agent messages of a plan, optionally as raw dictionaries."""
@@ -1,18 +1,24 @@
 """Database factory for creating database instances."""
 
+import asyncio
 import logging
 from typing import Optional
 
 from common.config.app_config import config
 
+from .cosmos_metrics import cosmos_metrics
 from .cosmosdb import CosmosDBClient
 from .database_base import DatabaseBase
+from .sqlite_db import SQLiteDBClient
 
 
 class DatabaseFactory:
     """Factory class for creating database instances."""
 
+    # Long-lived client that owns the connection pool; callers receive
+    # per-user views of it from get_database().
     _instance: Optional[DatabaseBase] = None
+    _lock: Optional[asyncio.Lock] = None
     _logger = logging.getLogger(__name__)
 
     @staticmethod
@@ -21,40 +27,65 @@ class DatabaseFactory:
         force_new: bool = False,
     ) -> DatabaseBase:
         """
-        Get a database instance.
+        Get a database instance scoped to a user.
+
+        All scoped instances share a single long-lived client (and its
+        connection pool), so per-request calls do not pay connection setup.
 
         Args:
-            endpoint: CosmosDB endpoint URL
-            credential: Azure credential for authentication
-            database_name: Name of the CosmosDB database
-            container_name: Name of the CosmosDB container
-            session_id: Session ID for partitioning
             user_id: User ID for data isolation
-            force_new: Force creation of new instance
+            force_new: Build a dedicated client with its own connection pool
+                instead of a view over the shared one
 
         Returns:
-            DatabaseBase: Database instance
+            DatabaseBase: Database instance scoped to user_id
         """
 
-        # Create new instance if forced or if singleton doesn't exist
-        if force_new or DatabaseFactory._instance is None:
-            cosmos_db_client = CosmosDBClient(
-                endpoint=config.COSMOSDB_ENDPOINT,
-                credential=config.get_azure_credentials(),
-                database_name=config.COSMOSDB_DATABASE,
-                container_name=config.COSMOSDB_CONTAINER,
+        if force_new:
+            database_client = DatabaseFactory._create_client(user_id)
+            await database_client.initialize()
+            return database_client
+
+        if DatabaseFactory._instance is None:
+            if DatabaseFactory._lock is None:
+                DatabaseFactory._lock = asyncio.Lock()
+            async with DatabaseFactory._lock:
+                if DatabaseFactory._instance is None:
+                    database_client = DatabaseFactory._create_client("")
+                    await database_client.initialize()
+                    DatabaseFactory._instance = database_client
+
+        return DatabaseFactory._instance.for_user(user_id)
+
+    @staticmethod
+    def _create_client(user_id: str) -> DatabaseBase:
+        """Build the database client selected by DATABASE_BACKEND."""
+        backend = (config.DATABASE_BACKEND or "cosmos").lower()
+
+        if backend == "sqlite":
+            return SQLiteDBClient(
+                database_path=config.SQLITE_DATABASE_PATH,
                 session_id="",
                 user_id=user_id,
             )
 
-            await cosmos_db_client.initialize()
-
-            if not force_new:
-                DatabaseFactory._instance = cosmos_db_client
+        if backend != "cosmos":
+            raise ValueError(f"Unsupported DATABASE_BACKEND: {backend}")
 
-            return cosmos_db_client
+        cosmos_metrics.configure(
+            slow_query_ms=config.COSMOSDB_SLOW_QUERY_MS,
+            sample_rate=config.COSMOSDB_SLOW_QUERY_SAMPLE_RATE,
+        )
 
-        return DatabaseFactory._instance
+        return CosmosDBClient(
+            endpoint=config.COSMOSDB_ENDPOINT,
+            credential=config.get_azure_credentials(),
+            database_name=config.COSMOSDB_DATABASE,
+            container_name=config.COSMOSDB_CONTAINER,
+            session_id="",
+            user_id=user_id,
+            connection_limit=config.COSMOSDB_CONNECTION_LIMIT,
+        )
 
     @staticmethod
     async def close_all():
@@ -62,3 +93,4 @@ class DatabaseFactory:
         if DatabaseFactory._instance:
             await DatabaseFactory._instance.close()
             DatabaseFactory._instance = None
+            DatabaseFactory._lock = None
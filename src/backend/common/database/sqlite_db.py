@@ -0,0 +1,486 @@
+"""Embedded SQLite implementation of the database interface."""
+
+import asyncio
+import enum
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Type, Union
+
+import v3.models.messages as messages
+
+from ..models.messages_kernel import (
+    AgentMessage,
+    AgentMessageData,
+    BaseDataModel,
+    DataType,
+    Plan,
+    Step,
+    TeamConfiguration,
+    UserCurrentTeam,
+)
+from .database_base import DatabaseBase, validate_documents
+
+# Document fields promoted to real columns so they can be indexed.
+INDEXED_FIELDS = ("data_type", "user_id", "team_id", "plan_id", "session_id")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    data_type TEXT,
+    user_id TEXT,
+    team_id TEXT,
+    plan_id TEXT,
+    _ts REAL NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (session_id, id)
+);
+CREATE INDEX IF NOT EXISTS ix_items_id ON items (id);
+CREATE INDEX IF NOT EXISTS ix_items_data_type_user_id ON items (data_type, user_id);
+CREATE INDEX IF NOT EXISTS ix_items_user_id ON items (user_id);
+CREATE INDEX IF NOT EXISTS ix_items_team_id ON items (team_id, data_type);
+CREATE INDEX IF NOT EXISTS ix_items_plan_id ON items (plan_id, data_type);
+CREATE INDEX IF NOT EXISTS ix_items_session_id ON items (session_id);
+"""
+
+_SELECT_RE = re.compile(r"^\s*SELECT\s+.*?\s+FROM\s+c\b", re.IGNORECASE | re.DOTALL)
+_FIELD_RE = re.compile(r"\bc\.(\w+)")
+_PARAM_RE = re.compile(r"@(\w+)")
+
+
+def translate_query(query: str) -> str:
+    """Translate the Cosmos SQL subset used by the clients into SQLite SQL.
+
+    ``SELECT ... FROM c`` always returns the full document body, indexed
+    fields map onto their columns and any other ``c.<field>`` is read from
+    the JSON body. ``@name`` parameters become ``:name`` placeholders.
+    """
+
+    def _field(match: "re.Match[str]") -> str:
+        name = match.group(1)
+        if name in INDEXED_FIELDS or name in ("id", "_ts"):
+            return name
+        return f"json_extract(body, '$.{name}')"
+
+    sql = _SELECT_RE.sub("SELECT body FROM items", query, count=1)
+    sql = _FIELD_RE.sub(_field, sql)
+    return _PARAM_RE.sub(r":\1", sql)
+
+
+def _bind(value: Any) -> Any:
+    """Convert a query parameter value into something sqlite3 can bind."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+class SQLiteDBClient(DatabaseBase):
+    """Embedded SQLite implementation of the database interface.
+
+    Intended for local development, CI and benchmarks where a live Cosmos
+    account is not available. Documents are stored as JSON with the
+    commonly filtered fields promoted to indexed columns. Statements run in
+    a worker thread so a slow disk or a large scan does not block the event
+    loop.
+    """
+
+    MODEL_CLASS_MAPPING = {
+        DataType.plan: Plan,
+        DataType.step: Step,
+        DataType.agent_message: AgentMessage,
+        DataType.team_config: TeamConfiguration,
+        DataType.user_current_team: UserCurrentTeam,
+    }
+
+    def __init__(
+        self,
+        database_path: str = ":memory:",
+        session_id: str = "",
+        user_id: str = "",
+    ):
+        self.database_path = database_path
+        self.session_id = session_id
+        self.user_id = user_id
+
+        self.logger = logging.getLogger(__name__)
+        self.connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    async def initialize(self) -> None:
+        """Open the SQLite database and create the schema if needed."""
+        try:
+            if not self._initialized:
+                self.connection = sqlite3.connect(
+                    self.database_path, check_same_thread=False
+                )
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.executescript(_SCHEMA)
+                self._initialized = True
+        except Exception as e:
+            self.logger.error("Failed to initialize SQLite database: %s", str(e))
+            raise
+
+    # Helper Methods
+    async def _ensure_initialized(self) -> None:
+        """Ensure the database is initialized."""
+        if not self._initialized:
+            await self.initialize()
+
+    async def _execute(self, sql: str, parameters: Any = ()) -> List[tuple]:
+        return await asyncio.to_thread(self._execute_sync, sql, parameters)
+
+    def _execute_sync(self, sql: str, parameters: Any = ()) -> List[tuple]:
+        with self._lock:
+            cursor = self.connection.execute(sql, parameters)
+            rows = cursor.fetchall()
+            self.connection.commit()
+            return rows
+
+    @staticmethod
+    def _to_row(item: BaseDataModel) -> Dict[str, Any]:
+        document = item.model_dump(mode="json")
+        row = {field: document.get(field) for field in INDEXED_FIELDS}
+        row["id"] = document["id"]
+        row["session_id"] = document.get("session_id") or ""
+        row["_ts"] = time.time()
+        row["body"] = json.dumps(document)
+        return row
+
+    async def _write(self, item: BaseDataModel, verb: str) -> None:
+        row = self._to_row(item)
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{column}" for column in row)
+        await self._execute(f"{verb} INTO items ({columns}) VALUES ({placeholders})", row)
+
+    async def close(self) -> None:
+        """Close the SQLite connection."""
+        if self.connection and self._owns_connection:
+            self.connection.close()
+            self.connection = None
+            self._initialized = False
+            self.logger.info("Closed SQLite connection")
+
+    # Core CRUD Operations
+    async def add_item(self, item: BaseDataModel) -> None:
+        """Add an item to SQLite."""
+        await self._ensure_initialized()
+
+        try:
+            await self._write(item, "INSERT")
+        except Exception as e:
+            self.logger.error("Failed to add item to SQLite: %s", str(e))
+            raise
+
+    async def update_item(self, item: BaseDataModel) -> None:
+        """Update an item in SQLite."""
+        await self._ensure_initialized()
+
+        try:
+            await self._write(item, "INSERT OR REPLACE")
+        except Exception as e:
+            self.logger.error("Failed to update item in SQLite: %s", str(e))
+            raise
+
+    async def get_item_by_id(
+        self, item_id: str, partition_key: str, model_class: Type[BaseDataModel]
+    ) -> Optional[BaseDataModel]:
+        """Retrieve an item by its ID and partition key."""
+        await self._ensure_initialized()
+
+        try:
+            rows = await self._execute(
+                "SELECT body FROM items WHERE session_id=? AND id=?",
+                (partition_key, item_id),
+            )
+            if not rows:
+                return None
+            return model_class.model_validate(json.loads(rows[0][0]))
+        except Exception as e:
+            self.logger.error("Failed to retrieve item from SQLite: %s", str(e))
+            return None
+
+    async def _query_documents(
+        self, query: str, parameters: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        await self._ensure_initialized()
+        bound = {p["name"].lstrip("@"): _bind(p["value"]) for p in parameters}
+        rows = await self._execute(translate_query(query), bound)
+        return [json.loads(row[0]) for row in rows]
+
+    async def iter_items(
+        self,
+        query: str,
+        parameters: List[Dict[str, Any]],
+        model_class: Type[BaseDataModel],
+        raw: bool = False,
+        batch_size: int = 100,
+    ) -> AsyncIterator[Union[BaseDataModel, Dict[str, Any]]]:
+        """Stream query results, validating them in batches of batch_size."""
+        documents = await self._query_documents(query, parameters)
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start : start + batch_size]
+            if raw:
+                for document in batch:
+                    yield document
+            else:
+                for model in validate_documents(batch, model_class, self.logger):
+                    yield model
+
+    async def query_items(
+        self,
+        query: str,
+        parameters: List[Dict[str, Any]],
+        model_class: Type[BaseDataModel],
+        raw: bool = False,
+    ) -> Union[List[BaseDataModel], List[Dict[str, Any]]]:
+        """Query items from SQLite and return a list of model instances."""
+        try:
+            documents = await self._query_documents(query, parameters)
+            if raw:
+                return documents
+            return validate_documents(documents, model_class, self.logger)
+        except Exception as e:
+            self.logger.error("Failed to query items from SQLite: %s", str(e))
+            return []
+
+    async def delete_item(self, item_id: str, partition_key: str) -> None:
+        """Delete an item from SQLite."""
+        await self._ensure_initialized()
+
+        try:
+            await self._execute(
+                "DELETE FROM items WHERE session_id=? AND id=?",
+                (partition_key, item_id),
+            )
+        except Exception as e:
+            self.logger.error("Failed to delete item from SQLite: %s", str(e))
+            raise
+
+    # Plan Operations
+    async def add_plan(self, plan: Plan) -> None:
+        """Add a plan to SQLite."""
+        await self.add_item(plan)
+
+    async def update_plan(self, plan: Plan) -> None:
+        """Update a plan in SQLite."""
+        await self.update_item(plan)
+
+    async def get_plan_by_plan_id(self, plan_id: str) -> Optional[Plan]:
+        """Retrieve a plan by plan_id."""
+        query = "SELECT * FROM c WHERE c.id=@plan_id AND c.data_type=@data_type"
+        parameters = [
+            {"name": "@plan_id", "value": plan_id},
+            {"name": "@data_type", "value": DataType.plan},
+        ]
+        results = await self.query_items(query, parameters, Plan)
+        return results[0] if results else None
+
+    async def get_plan(self, plan_id: str) -> Optional[Plan]:
+        """Retrieve a plan by plan_id."""
+        return await self.get_plan_by_plan_id(plan_id)
+
+    async def get_all_plans(self) -> List[Plan]:
+        """Retrieve all plans for the user."""
+        query = "SELECT * FROM c WHERE c.user_id=@user_id AND c.data_type=@data_type"
+        parameters = [
+            {"name": "@user_id", "value": self.user_id},
+            {"name": "@data_type", "value": DataType.plan},
+        ]
+        return await self.query_items(query, parameters, Plan)
+
+    async def get_all_plans_by_team_id(self, team_id: str) -> List[Plan]:
+        """Retrieve all plans for a specific team."""
+        query = "SELECT * FROM c WHERE c.team_id=@team_id AND c.data_type=@data_type and c.user_id=@user_id"
+        parameters = [
+            {"name": "@user_id", "value": self.user_id},
+            {"name": "@team_id", "value": team_id},
+            {"name": "@data_type", "value": DataType.plan},
+        ]
+        return await self.query_items(query, parameters, Plan)
+
+    async def get_all_plans_by_team_id_status(
+        self, user_id: str, team_id: str, status: str
+    ) -> List[Plan]:
+        """Retrieve all plans for a specific team."""
+        query = "SELECT * FROM c WHERE c.team_id=@team_id AND c.data_type=@data_type and c.user_id=@user_id and c.overall_status=@status ORDER BY c._ts DESC"
+        parameters = [
+            {"name": "@user_id", "value": user_id},
+            {"name": "@team_id", "value": team_id},
+            {"name": "@data_type", "value": DataType.plan},
+            {"name": "@status", "value": status},
+        ]
+        return await self.query_items(query, parameters, Plan)
+
+    # Step Operations
+    async def add_step(self, step: Step) -> None:
+        """Add a step to SQLite."""
+        await self.add_item(step)
+
+    async def update_step(self, step: Step) -> None:
+        """Update a step in SQLite."""
+        await self.update_item(step)
+
+    async def get_steps_by_plan(self, plan_id: str) -> List[Step]:
+        """Retrieve all steps for a plan."""
+        query = "SELECT * FROM c WHERE c.plan_id=@plan_id AND c.data_type=@data_type ORDER BY c.timestamp"
+        parameters = [
+            {"name": "@plan_id", "value": plan_id},
+            {"name": "@data_type", "value": DataType.step},
+        ]
+        return await self.query_items(query, parameters, Step)
+
+    async def get_step(self, step_id: str, session_id: str) -> Optional[Step]:
+        """Retrieve a step by step_id and session_id."""
+        query = "SELECT * FROM c WHERE c.id=@step_id AND c.session_id=@session_id AND c.data_type=@data_type"
+        parameters = [
+            {"name": "@step_id", "value": step_id},
+            {"name": "@session_id", "value": session_id},
+            {"name": "@data_type", "value": DataType.step},
+        ]
+        results = await self.query_items(query, parameters, Step)
+        return results[0] if results else None
+
+    # Team Operations
+    async def add_team(self, team: TeamConfiguration) -> None:
+        """Add a team configuration to SQLite."""
+        await self.add_item(team)
+
+    async def update_team(self, team: TeamConfiguration) -> None:
+        """Update an existing team configuration in SQLite."""
+        await self.update_item(team)
+
+    async def get_team(self, team_id: str) -> Optional[TeamConfiguration]:
+        """Retrieve a specific team configuration by team_id."""
+        query = "SELECT * FROM c WHERE c.team_id=@team_id AND c.data_type=@data_type"
+        parameters = [
+            {"name": "@team_id", "value": team_id},
+            {"name": "@data_type", "value": DataType.team_config},
+        ]
+        teams = await self.query_items(query, parameters, TeamConfiguration)
+        return teams[0] if teams else None
+
+    async def get_team_by_id(self, team_id: str) -> Optional[TeamConfiguration]:
+        """Retrieve a specific team configuration by team_id."""
+        return await self.get_team(team_id)
+
+    async def get_all_teams(self) -> List[TeamConfiguration]:
+        """Retrieve all team configurations."""
+        query = "SELECT * FROM c WHERE c.data_type=@data_type ORDER BY c.created DESC"
+        parameters = [
+            {"name": "@data_type", "value": DataType.team_config},
+        ]
+        return await self.query_items(query, parameters, TeamConfiguration)
+
+    async def delete_team(self, team_id: str) -> bool:
+        """Delete a team configuration by team_id."""
+        await self._ensure_initialized()
+
+        try:
+            team = await self.get_team(team_id)
+            if team:
+                await self.delete_item(item_id=team.id, partition_key=team.session_id)
+            return True
+        except Exception as e:
+            self.logger.exception("Failed to delete team from SQLite: %s", e)
+            return False
+
+    # Data Management Operations
+    async def get_data_by_type(self, data_type: str) -> List[BaseDataModel]:
+        """Retrieve all data of a specific type."""
+        query = "SELECT * FROM c WHERE c.data_type=@data_type AND c.user_id=@user_id"
+        parameters = [
+            {"name": "@data_type", "value": data_type},
+            {"name": "@user_id", "value": self.user_id},
+        ]
+        model_class = self.MODEL_CLASS_MAPPING.get(data_type, BaseDataModel)
+        return await self.query_items(query, parameters, model_class)
+
+    async def get_all_items(self) -> List[Dict[str, Any]]:
+        """Retrieve all items as dictionaries."""
+        query = "SELECT * FROM c WHERE c.user_id=@user_id"
+        parameters = [
+            {"name": "@user_id", "value": self.user_id},
+        ]
+        return await self._query_documents(query, parameters)
+
+    async def get_steps_for_plan(self, plan_id: str) -> List[Step]:
+        """Alias for get_steps_by_plan for compatibility."""
+        return await self.get_steps_by_plan(plan_id)
+
+    # Current Team Operations
+    async def get_current_team(self, user_id: str) -> Optional[UserCurrentTeam]:
+        """Retrieve the current team for a user."""
+        query = "SELECT * FROM c WHERE c.data_type=@data_type AND c.user_id=@user_id"
+        parameters = [
+            {"name": "@data_type", "value": DataType.user_current_team},
+            {"name": "@user_id", "value": user_id},
+        ]
+        teams = await self.query_items(query, parameters, UserCurrentTeam)
+        return teams[0] if teams else None
+
+    async def delete_current_team(self, user_id: str) -> bool:
+        """Delete the current team for a user."""
+        await self._ensure_initialized()
+        await self._execute(
+            "DELETE FROM items WHERE user_id=? AND data_type=?",
+            (user_id, DataType.user_current_team.value),
+        )
+        return True
+
+    async def set_current_team(self, current_team: UserCurrentTeam) -> None:
+        """Set the current team for a user."""
+        await self.add_item(current_team)
+
+    async def update_current_team(self, current_team: UserCurrentTeam) -> None:
+        """Update the current team for a user."""
+        await self.update_item(current_team)
+
+    async def delete_plan_by_plan_id(self, plan_id: str) -> bool:
+        """Delete a plan by its ID."""
+        await self._ensure_initialized()
+        await self._execute("DELETE FROM items WHERE id=?", (plan_id,))
+        return True
+
+    # MPlan Operations
+    async def add_mplan(self, mplan: messages.MPlan) -> None:
+        """Add an mplan to the database."""
+        await self.add_item(mplan)
+
+    async def update_mplan(self, mplan: messages.MPlan) -> None:
+        """Update an mplan in the database."""
+        await self.update_item(mplan)
+
+    async def get_mplan(self, plan_id: str) -> Optional[messages.MPlan]:
+        """Retrieve an mplan by plan_id."""
+        query = "SELECT * FROM c WHERE c.plan_id=@plan_id AND c.data_type=@data_type"
+        parameters = [
+            {"name": "@plan_id", "value": plan_id},
+            {"name": "@data_type", "value": DataType.m_plan},
+        ]
+        results = await self.query_items(query, parameters, messages.MPlan)
+        return results[0] if results else None
+
+    # Agent Message Operations
+    async def add_agent_message(self, message: AgentMessageData) -> None:
+        """Add an agent message to the database."""
+        await self.add_item(message)
+
+    async def update_agent_message(self, message: AgentMessageData) -> None:
+        """Update an agent message in the database."""
+        await self.update_item(message)
+
+    async def get_agent_messages(
+        self, plan_id: str, raw: bool = False
+    ) -> Union[List[AgentMessageData], List[Dict[str, Any]]]:
+        """Retrieve the agent messages of a plan, optionally as raw dictionaries."""
+        query = "SELECT * FROM c WHERE c.plan_id=@plan_id AND c.data_type=@data_type ORDER BY c._ts ASC"
+        parameters = [
+            {"name": "@plan_id", "value": plan_id},
+            {"name": "@data_type", "value": DataType.m_plan_message},
+        ]
+        return await self.query_items(query, parameters, AgentMessageData, raw=raw)
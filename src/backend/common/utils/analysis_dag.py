@@ -0,0 +1,100 @@
+"""Concurrent executor for small DAGs of async analysis steps.
+
+Every node starts as soon as the nodes it depends on have finished, so
+independent specialists run side by side and end-to-end latency tracks the
+slowest path through the graph rather than the sum of all steps. Each node
+can have its own deadline; a node that times out or fails resolves to its
+fallback value, and dependents still run on whatever partial results are
+available.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# A node receives the results of its dependencies, keyed by node name
+NodeFunction = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class AnalysisNode:
+    def __init__(
+        self,
+        name: str,
+        function: NodeFunction,
+        depends_on: Sequence[str] = (),
+        timeout: Optional[float] = None,
+        fallback: Any = None,
+    ):
+        self.name = name
+        self.function = function
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout
+        self.fallback = fallback
+
+
+class AnalysisDAG:
+    """Runs named async nodes concurrently in dependency order."""
+
+    def __init__(self, default_timeout: Optional[float] = None):
+        self.default_timeout = default_timeout
+        self.nodes: Dict[str, AnalysisNode] = {}
+
+    def add_node(
+        self,
+        name: str,
+        function: NodeFunction,
+        depends_on: Sequence[str] = (),
+        timeout: Optional[float] = None,
+        fallback: Any = None,
+    ) -> "AnalysisDAG":
+        """Add a node; ``fallback`` is its result if it fails or misses its deadline."""
+        if name in self.nodes:
+            raise ValueError(f"Duplicate node: {name}")
+        missing = [dependency for dependency in depends_on if dependency not in self.nodes]
+        if missing:
+            # Dependencies must be added first, which also rules out cycles
+            raise ValueError(f"Node {name} depends on unknown nodes: {', '.join(missing)}")
+        self.nodes[name] = AnalysisNode(
+            name, function, depends_on, timeout if timeout is not None else self.default_timeout, fallback
+        )
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        """Execute the graph and return node results plus per-node status and timings."""
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+        status: Dict[str, Dict[str, Any]] = {}
+
+        async def execute(node: AnalysisNode) -> Any:
+            inputs = {}
+            for dependency in node.depends_on:
+                inputs[dependency] = await tasks[dependency]
+            node_started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(node.function(inputs), node.timeout)
+                outcome = {"status": "completed"}
+            except asyncio.TimeoutError:
+                logger.warning(f"Analysis node {node.name} missed its {node.timeout}s deadline")
+                result, outcome = node.fallback, {"status": "timeout"}
+            except Exception as e:
+                logger.error(f"Analysis node {node.name} failed: {e}")
+                result, outcome = node.fallback, {"status": "failed", "error": str(e)}
+            node_finished = time.perf_counter()
+            outcome["started_ms"] = round((node_started - started) * 1000, 1)
+            outcome["duration_ms"] = round((node_finished - node_started) * 1000, 1)
+            status[node.name] = outcome
+            return result
+
+        # Nodes were added in dependency order, so every dependency's task exists
+        for name, node in self.nodes.items():
+            tasks[name] = asyncio.create_task(execute(node))
+        results = await asyncio.gather(*tasks.values())
+
+        return {
+            "results": dict(zip(tasks, results)),
+            "nodes": status,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
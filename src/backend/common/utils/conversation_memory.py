@@ -0,0 +1,395 @@
+"""Bounded in-memory conversation histories with LRU and idle eviction.
+
+Each conversation keeps its recent exchanges in a fixed-length deque, so an
+append is O(1) and the oldest exchange falls off on its own. Conversations
+sit in an LRU; the least recently used ones are evicted when there are too
+many of them or their approximate size passes the global memory cap, and
+conversations idle for longer than the TTL are dropped.
+
+The context string prepended to requests is kept up to date as exchanges
+are appended: each exchange is rendered and capped to its token limit once,
+and the context is reassembled from those cached pieces, so reading it is
+free and nothing is re-tokenized per turn.
+
+With a summarizer (see ``common.utils.conversation_summary``) the context is
+a running summary of earlier exchanges plus the last exchange verbatim, so
+its size no longer grows with the conversation. An exchange is folded into
+the summary in a background task once a newer one arrives, so responses
+never wait for it.
+
+With a store (see ``common.utils.conversation_store``) every change is also
+queued for durable storage, and ``load`` brings a conversation that is not
+in memory back from the store the first time a request asks for it.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from opentelemetry import metrics
+
+from common.utils.conversation_store import APPEND, DELETE, SUMMARY, ConversationStore, WriteBehindQueue
+from common.utils.token_budget import TRUNCATE, PromptSection, shrink
+from common.utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_HEADER = "Previous conversation context:"
+SUMMARY_HEADER = "Summary of earlier exchanges:"
+LAST_EXCHANGE_HEADER = "Last exchange:"
+CONTEXT_FOOTER = "\n\nCurrent request:"
+
+# Why conversations leave memory
+EVICTED_LRU = "lru"
+EVICTED_MEMORY = "memory"
+EVICTED_IDLE = "idle"
+
+
+@dataclass
+class Exchange:
+    user: str
+    assistant: str
+    agent: str
+    timestamp: str
+    # The exchange as it appears in the context, capped to its token limit
+    text: str = ""
+    tokens: int = 0
+
+    @property
+    def size(self) -> int:
+        """Approximate memory held, in characters."""
+        return len(self.user) + len(self.assistant) + len(self.agent) + len(self.timestamp) + len(self.text)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"user": self.user, "assistant": self.assistant, "agent": self.agent, "timestamp": self.timestamp}
+
+
+class Conversation:
+    def __init__(self, conversation_id: str, max_exchanges: int):
+        self.conversation_id = conversation_id
+        self.exchanges: Deque[Exchange] = deque(maxlen=max_exchanges)
+        self.size = 0
+        self.context = ""
+        self.last_access = 0.0
+        # Running summary of every exchange before the last, and its rendering
+        self.summary: Any = None
+        self.summary_text = ""
+        self.summary_tokens = 0
+        self.summary_task: Optional[asyncio.Task] = None
+        # Set once forgotten, so a late summary update is not written back
+        self.cleared = False
+
+
+class ConversationMemory:
+    """Recent exchanges per conversation, bounded in count, memory and idle time."""
+
+    def __init__(
+        self,
+        max_history_length: int = 10,
+        context_exchanges: int = 5,
+        context_token_budget: int = 1500,
+        exchange_token_cap: int = 400,
+        max_conversations: int = 10_000,
+        max_memory_chars: int = 64 * 1024 * 1024,
+        idle_ttl: float = 3600.0,
+        summarizer: Optional[Any] = None,
+        store: Optional[ConversationStore] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_history_length = max_history_length  # Exchanges kept per conversation
+        self.context_exchanges = context_exchanges  # Most recent exchanges offered to the context
+        # Token budget for the context prepended to each request, and the cap per exchange
+        self.context_token_budget = context_token_budget
+        self.exchange_token_cap = exchange_token_cap
+        self.max_conversations = max_conversations
+        self.max_memory_chars = max_memory_chars
+        self.idle_ttl = idle_ttl
+        # Without a summarizer the context is the most recent exchanges verbatim
+        self.summarizer = summarizer
+        # Without a store histories last as long as the process
+        self.writes = WriteBehindQueue(store) if store is not None else None
+        if store is not None:
+            store.set_retention(max_history_length, idle_ttl)
+        self._clock = clock
+
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._memory = 0
+        self._evictions = {EVICTED_LRU: 0, EVICTED_MEMORY: 0, EVICTED_IDLE: 0}
+        self._lock = threading.Lock()
+        self._loading: Dict[str, asyncio.Future] = {}
+
+        meter = metrics.get_meter(__name__)
+        meter.create_observable_gauge(
+            "conversations.active",
+            callbacks=[lambda options: [metrics.Observation(len(self._conversations))]],
+            description="Conversations held in memory",
+        )
+        meter.create_observable_gauge(
+            "conversations.memory",
+            callbacks=[lambda options: [metrics.Observation(self._memory)]],
+            unit="char",
+            description="Approximate size of the conversation histories held in memory",
+        )
+        self._evicted = meter.create_counter(
+            "conversations.evicted",
+            description="Conversations dropped from memory, by reason",
+        )
+
+    def _render(self, exchange: Exchange) -> None:
+        text = f"User: {exchange.user}\n{exchange.agent}: {exchange.assistant}"
+        section = PromptSection("exchange", text, strategy=TRUNCATE)
+        exchange.text = shrink(section, text, self.exchange_token_cap)
+        exchange.tokens = count_tokens(exchange.text)
+
+    def _build_context(self, conversation: Conversation) -> str:
+        if self.summarizer is not None:
+            return self._build_summary_context(conversation)
+        # Newest exchanges first, until the budget is spent; older ones are dropped
+        recent = list(islice(reversed(conversation.exchanges), self.context_exchanges))
+        parts: List[str] = []
+        used = 0
+        for exchange in recent:
+            if used + exchange.tokens > self.context_token_budget:
+                break
+            parts.append(exchange.text)
+            used += exchange.tokens
+        if not parts:
+            if not recent:
+                return ""
+            # A budget smaller than one exchange still gets the start of the newest
+            parts.append(shrink(PromptSection("exchange", recent[0].text), recent[0].text, self.context_token_budget))
+        return "\n".join([CONTEXT_HEADER, *reversed(parts)]) + CONTEXT_FOOTER
+
+    def _build_summary_context(self, conversation: Conversation) -> str:
+        if not conversation.exchanges:
+            return ""
+        last = conversation.exchanges[-1].text
+        parts = [CONTEXT_HEADER]
+        # The summary gets whatever the last exchange leaves of the budget
+        room = self.context_token_budget - conversation.exchanges[-1].tokens
+        if conversation.summary_text and room > 0:
+            summary = conversation.summary_text
+            if conversation.summary_tokens > room:
+                summary = shrink(PromptSection("summary", summary), summary, room)
+            parts += [SUMMARY_HEADER, summary, LAST_EXCHANGE_HEADER]
+        parts.append(last)
+        return "\n".join(parts) + CONTEXT_FOOTER
+
+    def _schedule_summary(self, conversation: Conversation, exchange: Exchange) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts and tests): summarize inline
+            asyncio.run(self._summarize(conversation, exchange, None))
+            return
+        # Chained so each conversation's exchanges are folded in order
+        conversation.summary_task = loop.create_task(
+            self._summarize(conversation, exchange, conversation.summary_task)
+        )
+
+    async def _summarize(self, conversation: Conversation, exchange: Exchange, previous: Optional[asyncio.Task]) -> None:
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            summary = self.summarizer.update(conversation.summary, exchange)
+            if inspect.isawaitable(summary):
+                summary = await summary
+            text = self.summarizer.render(summary)
+        except Exception as e:
+            logger.warning(f"Conversation summary update failed: {e}")
+            return
+        with self._lock:
+            held = self._conversations.get(conversation.conversation_id) is conversation
+            if held:
+                self._memory += len(text) - len(conversation.summary_text)
+            conversation.size += len(text) - len(conversation.summary_text)
+            conversation.summary = summary
+            conversation.summary_text = text
+            conversation.summary_tokens = count_tokens(text)
+            conversation.context = self._build_context(conversation)
+        if self.writes is not None and not conversation.cleared:
+            self.writes.submit(SUMMARY, conversation.conversation_id, text)
+
+    async def wait_for_summaries(self) -> None:
+        """Wait until every scheduled summary update has been applied."""
+        with self._lock:
+            tasks = [c.summary_task for c in self._conversations.values() if c.summary_task is not None]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _evict(self, conversation_id: str, reason: str) -> None:
+        conversation = self._conversations.pop(conversation_id)
+        self._memory -= conversation.size
+        self._evictions[reason] += 1
+        self._evicted.add(1, {"reason": reason})
+
+    def _evict_idle(self, now: float) -> None:
+        # The LRU is in access order, so idle conversations are all at its front
+        while self._conversations:
+            conversation_id, conversation = next(iter(self._conversations.items()))
+            if now - conversation.last_access <= self.idle_ttl:
+                break
+            self._evict(conversation_id, EVICTED_IDLE)
+
+    def _enforce_limits(self) -> None:
+        while len(self._conversations) > self.max_conversations:
+            self._evict(next(iter(self._conversations)), EVICTED_LRU)
+        # Never evict the conversation that was just written
+        while self._memory > self.max_memory_chars and len(self._conversations) > 1:
+            self._evict(next(iter(self._conversations)), EVICTED_MEMORY)
+
+    def _get(self, conversation_id: str, now: float) -> Optional[Conversation]:
+        self._evict_idle(now)
+        conversation = self._conversations.get(conversation_id)
+        if conversation is not None:
+            conversation.last_access = now
+            self._conversations.move_to_end(conversation_id)
+        return conversation
+
+    def add_to_history(
+        self,
+        conversation_id: str,
+        user_message: str,
+        assistant_response: str,
+        agent_name: str = "SM-Assistant",
+        timestamp: Optional[str] = None,
+    ) -> Exchange:
+        """Add exchange to conversation history"""
+        exchange = Exchange(user_message, assistant_response, agent_name, timestamp or datetime.now().isoformat())
+        self._render(exchange)
+        with self._lock:
+            now = self._clock()
+            conversation = self._get(conversation_id, now)
+            if conversation is None:
+                conversation = self._conversations[conversation_id] = Conversation(
+                    conversation_id, self.max_history_length
+                )
+                conversation.last_access = now
+            previous = conversation.exchanges[-1] if conversation.exchanges else None
+            if len(conversation.exchanges) == conversation.exchanges.maxlen:
+                # The deque drops its oldest exchange on append
+                dropped = conversation.exchanges[0].size
+                conversation.size -= dropped
+                self._memory -= dropped
+            conversation.exchanges.append(exchange)
+            conversation.size += exchange.size
+            self._memory += exchange.size
+            conversation.context = self._build_context(conversation)
+            self._enforce_limits()
+        if self.writes is not None:
+            self.writes.submit(APPEND, conversation_id, exchange.to_dict())
+        # The previous exchange leaves the verbatim slot, so it joins the summary
+        if self.summarizer is not None and previous is not None:
+            self._schedule_summary(conversation, previous)
+        return exchange
+
+    async def load(self, conversation_id: str) -> None:
+        """Bring a conversation back from the store if it is not in memory.
+
+        Conversations already in memory return at once; concurrent requests
+        for the same conversation share one read.
+        """
+        if self.writes is None:
+            return
+        with self._lock:
+            if self._get(conversation_id, self._clock()) is not None:
+                return
+            loading = self._loading.get(conversation_id)
+            if loading is None:
+                loading = self._loading[conversation_id] = asyncio.get_running_loop().create_future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            await loading
+            return
+        try:
+            await self._restore(conversation_id)
+        finally:
+            with self._lock:
+                del self._loading[conversation_id]
+            loading.set_result(None)
+
+    async def _restore(self, conversation_id: str) -> None:
+        if self.writes.pending(conversation_id):
+            # Evicted while its writes were queued: read them back, not an older copy
+            await self.writes.flush()
+        try:
+            stored = await self.writes.store.load(conversation_id, self.max_history_length)
+        except Exception as e:
+            logger.warning(f"Loading conversation {conversation_id} from the store failed: {e}")
+            stored = None
+        exchanges = []
+        for item in stored.exchanges if stored else []:
+            exchange = Exchange(item["user"], item["assistant"], item["agent"], item["timestamp"])
+            self._render(exchange)
+            exchanges.append(exchange)
+        summary = None
+        summary_text = stored.summary if stored and self.summarizer is not None else ""
+        if summary_text and hasattr(self.summarizer, "restore"):
+            summary = self.summarizer.restore(summary_text)
+
+        with self._lock:
+            now = self._clock()
+            if self._get(conversation_id, now) is not None:
+                # Written to while the store was being read
+                return
+            # Held even when empty, so the store is read once per conversation
+            conversation = self._conversations[conversation_id] = Conversation(conversation_id, self.max_history_length)
+            conversation.last_access = now
+            conversation.exchanges.extend(exchanges)
+            conversation.summary = summary
+            conversation.summary_text = summary_text
+            conversation.summary_tokens = count_tokens(summary_text)
+            conversation.size = sum(exchange.size for exchange in conversation.exchanges) + len(summary_text)
+            self._memory += conversation.size
+            conversation.context = self._build_context(conversation)
+            self._enforce_limits()
+
+    def get_context_string(self, conversation_id: str) -> str:
+        """Get conversation history as context string"""
+        with self._lock:
+            conversation = self._get(conversation_id, self._clock())
+            return conversation.context if conversation is not None else ""
+
+    def get_history(self, conversation_id: str) -> List[Dict[str, str]]:
+        with self._lock:
+            conversation = self._get(conversation_id, self._clock())
+            return [exchange.to_dict() for exchange in conversation.exchanges] if conversation else []
+
+    def clear(self, conversation_id: str) -> bool:
+        """Forget a conversation; returns whether it was held in memory."""
+        if self.writes is not None:
+            self.writes.submit(DELETE, conversation_id)
+        with self._lock:
+            conversation = self._conversations.pop(conversation_id, None)
+            if conversation is None:
+                return False
+            conversation.cleared = True
+            self._memory -= conversation.size
+            return True
+
+    async def close(self) -> None:
+        """Write out queued changes and close the store."""
+        if self.writes is not None:
+            await self.writes.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active_conversations": len(self._conversations),
+                "max_conversations": self.max_conversations,
+                "memory_chars": self._memory,
+                "max_memory_chars": self.max_memory_chars,
+                "idle_ttl_seconds": self.idle_ttl,
+                "summarized": self.summarizer is not None,
+                "evictions": dict(self._evictions),
+                "store": self.writes.stats() if self.writes is not None else None,
+            }
@@ -0,0 +1,417 @@
+"""Durable storage for conversation histories behind the in-memory cache.
+
+``ConversationMemory`` stays the hot path: requests read their context from
+memory and never wait on the store. Writes (new exchanges, updated
+summaries, deletions) are queued and applied in batches by a background
+task, in the order they were made; a conversation missing from memory is
+read from the store once, the first time a request asks for it, so a
+restarted process or another replica picks up where the last one stopped.
+
+Two stores are provided: ``SQLiteConversationStore`` for a single host and
+``CosmosConversationStore``, which keeps the documents in the application's
+existing Cosmos container, partitioned by conversation like the other
+session data. ``ConversationMemory`` hands its limits to the store: SQLite
+keeps the last ``max_exchanges`` exchanges per conversation and deletes
+rows idle for longer than ``ttl``; Cosmos documents carry ``ttl``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from opentelemetry import metrics
+
+logger = logging.getLogger(__name__)
+
+# Operations applied by the write-behind queue
+APPEND = "append"
+SUMMARY = "summary"
+DELETE = "delete"
+
+# (operation, conversation id, exchange dict or summary text)
+StoreOperation = Tuple[str, str, Any]
+
+EXCHANGE_TYPE = "conversation_exchange"
+SUMMARY_TYPE = "conversation_summary"
+
+
+@dataclass
+class StoredConversation:
+    # Oldest first, as dicts from ``Exchange.to_dict``
+    exchanges: List[Dict[str, str]] = field(default_factory=list)
+    summary: str = ""
+
+
+class ConversationStore(ABC):
+    """Where conversation histories outlive the process."""
+
+    # Exchanges kept per conversation and seconds stored data outlives its
+    # last write; None keeps everything
+    max_exchanges: Optional[int] = None
+    ttl: Optional[float] = None
+
+    def set_retention(self, max_exchanges: Optional[int], ttl: Optional[float]) -> None:
+        """Bound what the store keeps, usually to the in-memory limits."""
+        self.max_exchanges = max_exchanges
+        self.ttl = ttl
+
+    @abstractmethod
+    async def load(self, conversation_id: str, limit: int) -> Optional[StoredConversation]:
+        """The last ``limit`` exchanges and the summary, or None if nothing is stored."""
+
+    @abstractmethod
+    async def write(self, operations: List[StoreOperation]) -> None:
+        """Apply a batch of operations in order."""
+
+    async def close(self) -> None:
+        """Release connections."""
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversation_exchanges (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL,
+    _ts REAL NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_conversation_exchanges
+    ON conversation_exchanges (conversation_id, seq);
+CREATE INDEX IF NOT EXISTS ix_conversation_exchanges_ts
+    ON conversation_exchanges (_ts);
+CREATE TABLE IF NOT EXISTS conversation_summaries (
+    conversation_id TEXT PRIMARY KEY,
+    _ts REAL NOT NULL,
+    summary TEXT NOT NULL
+);
+"""
+
+
+class SQLiteConversationStore(ConversationStore):
+    """Conversations in a local SQLite file.
+
+    Statements run in a worker thread, since a commit to a file waits on the
+    disk; a batch of queued operations is committed as one transaction.
+    Expired rows are removed at most every ``expiry_interval`` seconds.
+    """
+
+    expiry_interval = 600.0
+
+    def __init__(self, database_path: str = ":memory:"):
+        self.database_path = database_path
+        directory = os.path.dirname(database_path)
+        if database_path != ":memory:" and directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._expired_at = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.database_path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(_SCHEMA)
+        return self.connection
+
+    def _load(self, conversation_id: str, limit: int) -> Optional[StoredConversation]:
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute(
+                "SELECT body FROM conversation_exchanges WHERE conversation_id=? ORDER BY seq DESC LIMIT ?",
+                (conversation_id, limit),
+            ).fetchall()
+            summary = connection.execute(
+                "SELECT summary FROM conversation_summaries WHERE conversation_id=?", (conversation_id,)
+            ).fetchone()
+        if not rows and summary is None:
+            return None
+        return StoredConversation([json.loads(body) for (body,) in reversed(rows)], summary[0] if summary else "")
+
+    def _write(self, operations: List[StoreOperation]) -> None:
+        now = time.time()
+        appended = set()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                for operation, conversation_id, value in operations:
+                    if operation == APPEND:
+                        connection.execute(
+                            "INSERT INTO conversation_exchanges (conversation_id, _ts, body) VALUES (?, ?, ?)",
+                            (conversation_id, now, json.dumps(value)),
+                        )
+                        appended.add(conversation_id)
+                    elif operation == SUMMARY:
+                        connection.execute(
+                            "INSERT OR REPLACE INTO conversation_summaries (conversation_id, _ts, summary) VALUES (?, ?, ?)",
+                            (conversation_id, now, value),
+                        )
+                    elif operation == DELETE:
+                        connection.execute("DELETE FROM conversation_exchanges WHERE conversation_id=?", (conversation_id,))
+                        connection.execute("DELETE FROM conversation_summaries WHERE conversation_id=?", (conversation_id,))
+                        appended.discard(conversation_id)
+                if self.max_exchanges:
+                    for conversation_id in appended:
+                        # Drop everything older than the oldest exchange still kept
+                        connection.execute(
+                            "DELETE FROM conversation_exchanges WHERE conversation_id=? AND seq < ("
+                            "SELECT seq FROM conversation_exchanges WHERE conversation_id=? "
+                            "ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+                            (conversation_id, conversation_id, self.max_exchanges - 1),
+                        )
+                if self.ttl and now - self._expired_at >= min(self.ttl, self.expiry_interval):
+                    self._expired_at = now
+                    connection.execute("DELETE FROM conversation_exchanges WHERE _ts < ?", (now - self.ttl,))
+                    connection.execute("DELETE FROM conversation_summaries WHERE _ts < ?", (now - self.ttl,))
+
+    async def load(self, conversation_id: str, limit: int) -> Optional[StoredConversation]:
+        return await asyncio.to_thread(self._load, conversation_id, limit)
+
+    async def write(self, operations: List[StoreOperation]) -> None:
+        await asyncio.to_thread(self._write, operations)
+
+    async def close(self) -> None:
+        with self._lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+class CosmosConversationStore(ConversationStore):
+    """Conversations as documents in the existing Cosmos container.
+
+    Exchanges and the summary share the conversation id as ``session_id``,
+    the container's partition key, so loading a conversation is a single
+    partition query. Documents carry ``ttl``, which Cosmos enforces on
+    containers with time to live enabled.
+    """
+
+    def __init__(self, endpoint: str, credential: Any, database_name: str, container_name: str):
+        self.endpoint = endpoint
+        self.credential = credential
+        self.database_name = database_name
+        self.container_name = container_name
+        self.client = None
+        self.container = None
+
+    async def _container(self):
+        if self.container is None:
+            from azure.cosmos.aio import CosmosClient
+
+            self.client = CosmosClient(url=self.endpoint, credential=self.credential)
+            database = self.client.get_database_client(self.database_name)
+            self.container = database.get_container_client(self.container_name)
+        return self.container
+
+    async def _query(self, query: str, conversation_id: str, parameters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        container = await self._container()
+        items = container.query_items(
+            query=query,
+            parameters=[{"name": "@session_id", "value": conversation_id}, *parameters],
+            partition_key=conversation_id,
+        )
+        return [item async for item in items]
+
+    async def load(self, conversation_id: str, limit: int) -> Optional[StoredConversation]:
+        exchanges = await self._query(
+            "SELECT TOP @limit c.body FROM c WHERE c.session_id=@session_id AND c.data_type=@data_type "
+            "ORDER BY c.sequence DESC",
+            conversation_id,
+            [{"name": "@limit", "value": limit}, {"name": "@data_type", "value": EXCHANGE_TYPE}],
+        )
+        summaries = await self._query(
+            "SELECT c.summary FROM c WHERE c.session_id=@session_id AND c.data_type=@data_type",
+            conversation_id,
+            [{"name": "@data_type", "value": SUMMARY_TYPE}],
+        )
+        if not exchanges and not summaries:
+            return None
+        return StoredConversation(
+            [item["body"] for item in reversed(exchanges)], summaries[0]["summary"] if summaries else ""
+        )
+
+    def _ttl_field(self) -> Dict[str, int]:
+        return {"ttl": int(self.ttl)} if self.ttl else {}
+
+    async def write(self, operations: List[StoreOperation]) -> None:
+        container = await self._container()
+        for operation, conversation_id, value in operations:
+            if operation == APPEND:
+                await container.create_item(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "session_id": conversation_id,
+                        "data_type": EXCHANGE_TYPE,
+                        # Orders exchanges written within the same second
+                        "sequence": time.time_ns(),
+                        "body": value,
+                        **self._ttl_field(),
+                    }
+                )
+            elif operation == SUMMARY:
+                await container.upsert_item(
+                    {
+                        "id": f"summary_{conversation_id}",
+                        "session_id": conversation_id,
+                        "data_type": SUMMARY_TYPE,
+                        "summary": value,
+                        **self._ttl_field(),
+                    }
+                )
+            elif operation == DELETE:
+                documents = await self._query(
+                    "SELECT c.id FROM c WHERE c.session_id=@session_id AND c.data_type IN (@exchange, @summary)",
+                    conversation_id,
+                    [{"name": "@exchange", "value": EXCHANGE_TYPE}, {"name": "@summary", "value": SUMMARY_TYPE}],
+                )
+                for document in documents:
+                    await container.delete_item(item=document["id"], partition_key=conversation_id)
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+            self.container = None
+
+
+class WriteBehindQueue:
+    """Applies store operations in the background, in order, in batches.
+
+    ``submit`` never waits: the operation is queued and a background task
+    writes it. When the queue is full the operation is dropped and counted
+    rather than slowing the request down. Without a running event loop
+    (scripts and tests) operations are written inline.
+    """
+
+    def __init__(self, store: ConversationStore, max_pending: int = 10_000, batch_size: int = 100):
+        self.store = store
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._pending: Counter = Counter()
+        self._written = 0
+        self._failed = 0
+        self._dropped = 0
+        self._batches = 0
+        self._lag_ms = 0.0
+
+        meter = metrics.get_meter(__name__)
+        self._writes = meter.create_counter(
+            "conversation_store.writes",
+            description="Conversation store operations, by outcome",
+        )
+        self._lag = meter.create_histogram(
+            "conversation_store.lag",
+            unit="ms",
+            description="Time from queueing a conversation write to it reaching the store",
+        )
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._worker = asyncio.get_running_loop().create_task(self._drain())
+
+    def submit(self, operation: str, conversation_id: str, value: Any = None) -> None:
+        """Queue an operation for the store; never blocks."""
+        try:
+            self._ensure_worker()
+        except RuntimeError:
+            asyncio.run(self._apply([(time.perf_counter(), (operation, conversation_id, value))]))
+            return
+        try:
+            self._queue.put_nowait((time.perf_counter(), (operation, conversation_id, value)))
+        except asyncio.QueueFull:
+            self._dropped += 1
+            self._writes.add(1, {"outcome": "dropped"})
+            logger.warning(f"Conversation store queue is full; dropped {operation} for {conversation_id}")
+            return
+        self._pending[conversation_id] += 1
+
+    async def _apply(self, batch: List[Tuple[float, StoreOperation]]) -> None:
+        operations = [operation for _, operation in batch]
+        try:
+            await self.store.write(operations)
+        except Exception as e:
+            self._failed += len(batch)
+            self._writes.add(len(batch), {"outcome": "failed"})
+            logger.warning(f"Conversation store write of {len(batch)} operations failed: {e}")
+            return
+        now = time.perf_counter()
+        self._written += len(batch)
+        self._batches += 1
+        self._writes.add(len(batch), {"outcome": "written"})
+        for queued_at, _ in batch:
+            self._lag_ms = (now - queued_at) * 1000
+            self._lag.record(self._lag_ms)
+
+    async def _drain(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._apply(batch)
+            finally:
+                for _, (_, conversation_id, _) in batch:
+                    self._pending[conversation_id] -= 1
+                    if self._pending[conversation_id] <= 0:
+                        del self._pending[conversation_id]
+                    self._queue.task_done()
+
+    def pending(self, conversation_id: str) -> bool:
+        """Whether writes for a conversation have not reached the store yet."""
+        return self._pending.get(conversation_id, 0) > 0
+
+    async def flush(self) -> None:
+        """Wait until every queued operation has been written (or has failed)."""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush, stop the background task and close the store."""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        await self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.store).__name__,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self._written,
+            "failed": self._failed,
+            "dropped": self._dropped,
+            "batches": self._batches,
+            "last_lag_ms": round(self._lag_ms, 2),
+        }
+
+
+def store_from_env() -> Optional[ConversationStore]:
+    """Build the store named by CONVERSATION_STORE ("sqlite", "cosmos" or unset for none)."""
+    backend = (os.getenv("CONVERSATION_STORE") or "").lower()
+    if backend in ("", "none", "memory"):
+        return None
+    if backend == "sqlite":
+        return SQLiteConversationStore(os.getenv("CONVERSATION_STORE_PATH", "./data/conversations.db"))
+    if backend == "cosmos":
+        from azure.identity.aio import DefaultAzureCredential
+
+        return CosmosConversationStore(
+            endpoint=os.getenv("COSMOSDB_ENDPOINT"),
+            credential=DefaultAzureCredential(),
+            database_name=os.getenv("COSMOSDB_DATABASE"),
+            container_name=os.getenv("COSMOSDB_CONTAINER"),
+        )
+    raise ValueError(f"Unknown CONVERSATION_STORE: {backend}")
@@ -0,0 +1,161 @@
+"""Rolling extractive summaries of conversations.
+
+Instead of replaying recent exchanges verbatim, a conversation carries a
+compact running summary: the sentences from earlier exchanges most likely
+to matter later (decisions, numbers, names, commitments, blockers and what
+the user said about their team). Each exchange is folded in once, when it
+stops being the latest turn, and the summary is held to a token budget by
+dropping the weakest and oldest facts, so the context sent with a request
+stays the same size however long the conversation runs.
+
+Any object with ``update(summary, exchange)`` (sync or async) and
+``render(summary)`` can stand in for ``ExtractiveSummarizer``, for example
+one that asks a small model to rewrite the summary. An optional
+``restore(text)`` rebuilds a summary from its rendering when a conversation
+is read back from a store.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from common.utils.tokens import count_tokens
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+_MARKUP = re.compile(r"^[\s>*#\-•\d.)]+|[*_`#]+")
+_WORD = re.compile(r"[a-z0-9']+")
+_NUMBER = re.compile(r"\d")
+_SIGNAL = re.compile(
+    r"\b(decid\w*|agreed?|will|must|need\w*|block\w*|impediment\w*|risk\w*|deadline|due|"
+    r"action|owner|assign\w*|goal|commit\w*|velocity|sprint|story|stories|points?|"
+    r"priorit\w*|release|estimate\w*|burnout|morale)\b",
+    re.IGNORECASE,
+)
+_CAPITALIZED = re.compile(r"(?<=\s)[A-Z][a-zA-Z]+")
+
+# Sentences outside this many words say too little or too much to keep whole
+MIN_WORDS = 4
+MAX_WORDS = 40
+
+
+@dataclass
+class Fact:
+    text: str
+    score: float
+    turn: int
+    tokens: int
+    words: frozenset
+
+
+@dataclass
+class RunningSummary:
+    facts: List[Fact] = field(default_factory=list)
+    turns: int = 0
+
+
+def _sentences(text: str) -> List[str]:
+    sentences = []
+    for raw in _SENTENCE_BREAK.split(text):
+        sentence = _MARKUP.sub("", raw).strip()
+        words = sentence.split()
+        if len(words) < MIN_WORDS:
+            continue
+        if len(words) > MAX_WORDS:
+            sentence = " ".join(words[:MAX_WORDS]) + " …"
+        sentences.append(sentence)
+    return sentences
+
+
+def score_sentence(sentence: str, from_user: bool) -> float:
+    """How likely a sentence is to matter later in the conversation."""
+    score = 1.0 if from_user else 0.0
+    score += 1.0 if _NUMBER.search(sentence) else 0.0
+    score += min(len(_SIGNAL.findall(sentence)), 3)
+    score += 0.5 * min(len(_CAPITALIZED.findall(sentence)), 2)
+    return score
+
+
+class ExtractiveSummarizer:
+    """Keeps the highest-scoring sentences of a conversation within ``max_tokens``."""
+
+    def __init__(
+        self,
+        max_tokens: int = 300,
+        user_sentences: int = 2,
+        assistant_sentences: int = 3,
+        age_penalty: float = 0.25,
+        duplicate_overlap: float = 0.7,
+    ):
+        self.max_tokens = max_tokens
+        # Sentences taken from each side of an exchange
+        self.user_sentences = user_sentences
+        self.assistant_sentences = assistant_sentences
+        # Score lost per turn of age when choosing what to drop
+        self.age_penalty = age_penalty
+        # Word overlap (Jaccard) above which a sentence repeats a kept fact
+        self.duplicate_overlap = duplicate_overlap
+
+    def _candidates(self, text: str, from_user: bool, limit: int, turn: int) -> List[Fact]:
+        facts = []
+        for sentence in _sentences(text):
+            score = score_sentence(sentence, from_user)
+            if score <= 0:
+                continue
+            line = f"User: {sentence}" if from_user else sentence
+            facts.append(Fact(line, score, turn, count_tokens(line) + 1, frozenset(_WORD.findall(sentence.lower()))))
+        facts.sort(key=lambda fact: -fact.score)
+        return facts[:limit]
+
+    def _duplicate(self, fact: Fact, kept: List[Fact]) -> Optional[Fact]:
+        for other in kept:
+            union = len(fact.words | other.words)
+            if union and len(fact.words & other.words) / union >= self.duplicate_overlap:
+                return other
+        return None
+
+    def update(self, summary: Optional[RunningSummary], exchange: Any) -> RunningSummary:
+        """Fold one exchange (with ``user`` and ``assistant`` text) into the summary."""
+        summary = summary or RunningSummary()
+        turn = summary.turns + 1
+        facts = list(summary.facts)
+        candidates = (
+            self._candidates(exchange.user, True, self.user_sentences, turn)
+            + self._candidates(exchange.assistant, False, self.assistant_sentences, turn)
+        )
+        for fact in candidates:
+            duplicate = self._duplicate(fact, facts)
+            if duplicate is None:
+                facts.append(fact)
+            elif fact.score >= duplicate.score:
+                # A restated fact is refreshed rather than repeated
+                facts[facts.index(duplicate)] = fact
+
+        used = sum(fact.tokens for fact in facts)
+        if used > self.max_tokens:
+            ranked = sorted(facts, key=lambda fact: fact.score - self.age_penalty * (turn - fact.turn))
+            dropped = set()
+            for fact in ranked:
+                if used <= self.max_tokens:
+                    break
+                dropped.add(id(fact))
+                used -= fact.tokens
+            facts = [fact for fact in facts if id(fact) not in dropped]
+        return RunningSummary(facts, turn)
+
+    def render(self, summary: Optional[RunningSummary]) -> str:
+        if summary is None or not summary.facts:
+            return ""
+        return "\n".join(f"- {fact.text}" for fact in summary.facts)
+
+    def restore(self, text: str) -> RunningSummary:
+        """Rebuild a summary from ``render`` output, e.g. after a restart."""
+        facts = []
+        for line in text.splitlines():
+            line = line[2:] if line.startswith("- ") else line
+            if not line:
+                continue
+            from_user = line.startswith("User: ")
+            sentence = line[len("User: "):] if from_user else line
+            words = frozenset(_WORD.findall(sentence.lower()))
+            facts.append(Fact(line, score_sentence(sentence, from_user), 0, count_tokens(line) + 1, words))
+        return RunningSummary(facts, 0)
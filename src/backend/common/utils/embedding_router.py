@@ -0,0 +1,218 @@
+"""Capability routing by embedding similarity.
+
+Each capability's description, keyword list and examples are embedded once
+into a small in-memory index, one row per text. A message is routed by a single matrix
+product against the index, taking each capability's best-matching row, so
+paraphrases that share no keyword with a capability can still find it.
+
+The index is saved to disk (``.npz``) together with a fingerprint of the
+embedder and the capability texts. A later start with the same fingerprint
+loads the vectors instead of embedding again, which matters when the
+embedder is a remote service.
+
+Run ``python -m common.utils.embedding_router`` from ``src/backend`` to print
+index build and load times and the per-message routing cost.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+import zipfile
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.utils.tiered_router import confidence
+
+logger = logging.getLogger(__name__)
+
+
+def capability_texts(definitions: Mapping[str, Mapping[str, Any]]) -> Dict[str, List[str]]:
+    """Description, keywords and examples of each capability, the texts of its index rows."""
+    texts = {}
+    for name, definition in definitions.items():
+        rows = [definition["description"]]
+        if definition.get("keywords"):
+            rows.append(", ".join(dict.fromkeys(definition["keywords"])))
+        texts[name] = rows + list(definition.get("examples", []))
+    return texts
+
+
+def index_fingerprint(embedder: Any, texts: Mapping[str, Sequence[str]]) -> str:
+    payload = json.dumps({"embedder": embedder.fingerprint, "texts": texts}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CapabilityIndex:
+    """Normalized text vectors grouped by capability, rows of a capability contiguous."""
+
+    def __init__(self, capabilities: Sequence[str], row_counts: Sequence[int], vectors: np.ndarray, fingerprint: str):
+        self.capabilities = list(capabilities)
+        self.row_counts = [int(count) for count in row_counts]
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.fingerprint = fingerprint
+        # First row of each capability, for the per-capability maximum
+        self._starts = np.cumsum([0, *self.row_counts[:-1]])
+
+    def similarities(self, queries: np.ndarray) -> np.ndarray:
+        """Best cosine similarity of each query (row) to each capability (column)."""
+        return np.maximum.reduceat(queries @ self.vectors.T, self._starts, axis=1)
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename, so a crash never leaves a half-written index behind
+        with open(f"{path}.tmp", "wb") as f:
+            np.savez(
+                f,
+                capabilities=np.array(self.capabilities),
+                row_counts=np.array(self.row_counts),
+                vectors=self.vectors,
+                fingerprint=np.array(self.fingerprint),
+            )
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CapabilityIndex"]:
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(
+                    data["capabilities"].tolist(),
+                    data["row_counts"].tolist(),
+                    data["vectors"],
+                    str(data["fingerprint"]),
+                )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logger.warning(f"Ignoring unreadable capability index {path}: {e}")
+            return None
+
+    @classmethod
+    async def build(
+        cls,
+        embedder: Any,
+        texts: Mapping[str, Sequence[str]],
+        path: Optional[str] = None,
+    ) -> "CapabilityIndex":
+        """Load the index from ``path`` if it matches, otherwise embed ``texts`` (and save it)."""
+        fingerprint = index_fingerprint(embedder, texts)
+        if path:
+            stored = cls.load(path)
+            if stored is not None and stored.fingerprint == fingerprint:
+                return stored
+
+        rows = [text for capability_texts in texts.values() for text in capability_texts]
+        index = cls(list(texts), [len(capability_texts) for capability_texts in texts.values()],
+                    await embedder.embed(rows), fingerprint)
+        if path:
+            try:
+                index.save(path)
+            except OSError as e:
+                logger.warning(f"Failed to save capability index to {path}: {e}")
+        return index
+
+
+class EmbeddingRouter:
+    """Scores messages by embedding similarity to each capability's texts.
+
+    Similarities below ``baseline`` count as no match, and a lead of
+    ``saturation`` above it as a full-strength one. Both default to the
+    embedder's ``similarity_baseline`` and ``similarity_saturation``, since
+    dense remote embeddings score unrelated texts far higher than sparse
+    local ones.
+    """
+
+    def __init__(
+        self,
+        embedder: Any,
+        index: CapabilityIndex,
+        baseline: Optional[float] = None,
+        saturation: Optional[float] = None,
+    ):
+        self.embedder = embedder
+        self.index = index
+        self.baseline = baseline if baseline is not None else getattr(embedder, "similarity_baseline", 0.0)
+        self.saturation = saturation if saturation is not None else getattr(embedder, "similarity_saturation", 0.4)
+
+    @classmethod
+    async def create(
+        cls,
+        embedder: Any,
+        texts: Mapping[str, Sequence[str]],
+        path: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "EmbeddingRouter":
+        return cls(embedder, await CapabilityIndex.build(embedder, texts, path), **kwargs)
+
+    async def score_batch(self, messages: Sequence[str]) -> List[Dict[str, float]]:
+        """Similarity of each message to every capability."""
+        if not messages:
+            return []
+        similarities = self.index.similarities(await self.embedder.embed(list(messages)))
+        return [dict(zip(self.index.capabilities, row.tolist())) for row in similarities]
+
+    async def score(self, message: str) -> Dict[str, float]:
+        return (await self.score_batch([message]))[0]
+
+    async def classify(self, message: str) -> Tuple[Optional[str], float]:
+        """Most similar capability (None when nothing is similar) and the confidence in it."""
+        scores = {
+            capability: max(similarity - self.baseline, 0.0)
+            for capability, similarity in (await self.score(message)).items()
+        }
+        best = max(scores, key=scores.get, default=None)
+        if best is None or scores[best] <= 0:
+            return None, 0.0
+        return best, round(confidence(scores, self.saturation), 3)
+
+
+def benchmark(messages: int = 2_000) -> Dict[str, Any]:
+    """Index build against load time, and per-message cost singly and in one batch."""
+    import asyncio
+    import tempfile
+
+    from common.config.agent_capabilities import AGENT_CAPABILITY_DEFINITIONS
+    from common.utils.embeddings import TfidfEmbedder
+
+    texts = capability_texts(AGENT_CAPABILITY_DEFINITIONS)
+    embedder = TfidfEmbedder([text for rows in texts.values() for text in rows])
+    queries = [f"{example} for sprint {n}" for n in range(messages // 15 + 1)
+               for rows in texts.values() for example in rows[2:]][:messages]
+
+    async def run() -> Dict[str, Any]:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "capabilities.npz")
+            started = time.perf_counter()
+            index = await CapabilityIndex.build(embedder, texts, path)
+            built = time.perf_counter() - started
+            started = time.perf_counter()
+            await CapabilityIndex.build(embedder, texts, path)
+            loaded = time.perf_counter() - started
+
+        router = EmbeddingRouter(embedder, index)
+        started = time.perf_counter()
+        for query in queries:
+            await router.score(query)
+        single = time.perf_counter() - started
+        started = time.perf_counter()
+        await router.score_batch(queries)
+        batch = time.perf_counter() - started
+
+        return {
+            "index_rows": len(index.vectors),
+            "build_ms": round(built * 1000, 2),
+            "load_ms": round(loaded * 1000, 2),
+            "route_us": round(single / len(queries) * 1e6, 2),
+            "route_batch_us": round(batch / len(queries) * 1e6, 2),
+        }
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>16}: {value}")
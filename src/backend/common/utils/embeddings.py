@@ -0,0 +1,196 @@
+"""Text embedding providers for similarity routing.
+
+Every provider has an async ``embed(texts)`` that returns one L2-normalized
+row per text, so cosine similarity is a plain dot product, and a
+``fingerprint`` that changes whenever its vectors would.
+
+* ``HashingEmbedder`` hashes words, word pairs and character trigrams into
+  a fixed number of dimensions. It needs no vocabulary, so words it has
+  never seen still land near their variants ("story" and "stories").
+* ``TfidfEmbedder`` weights the same features by inverse document
+  frequency over a corpus, so words shared by every capability count less.
+* ``AzureOpenAIEmbedder`` calls an Azure OpenAI embeddings deployment.
+
+``embedder_from_env`` picks Azure when ``AZURE_OPENAI_EMBEDDING_DEPLOYMENT``
+is configured and falls back to TF-IDF otherwise.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import zlib
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+try:
+    from openai import AsyncAzureOpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+    AsyncAzureOpenAI = None
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Too common in requests to say anything about what is being asked
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or our "
+    "should the this that these to we what with you your".split()
+)
+# Character n-grams count for less than whole words
+_NGRAM_WEIGHT = 0.5
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class HashingEmbedder:
+    """Feature-hashing embedder; deterministic across processes."""
+
+    name = "hashing"
+    # Typical similarity of unrelated texts, and the lead over it that marks a clear match
+    similarity_baseline = 0.0
+    similarity_saturation = 0.4
+
+    def __init__(self, dimensions: int = 2048, ngram: int = 3):
+        self.dimensions = dimensions
+        self.ngram = ngram
+
+    @property
+    def fingerprint(self) -> str:
+        return f"{self.name}:{self.dimensions}:{self.ngram}"
+
+    def features(self, text: str) -> Dict[str, int]:
+        """Counts of the words, word pairs and character n-grams of ``text``."""
+        words = [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+        features: Dict[str, int] = {}
+        for word in words:
+            features[f"w:{word}"] = features.get(f"w:{word}", 0) + 1
+            padded = f"<{word}>"
+            for start in range(len(padded) - self.ngram + 1):
+                gram = f"c:{padded[start:start + self.ngram]}"
+                features[gram] = features.get(gram, 0) + 1
+        for first, second in zip(words, words[1:]):
+            features[f"b:{first} {second}"] = features.get(f"b:{first} {second}", 0) + 1
+        return features
+
+    def _bucket(self, feature: str) -> int:
+        # crc32 rather than hash(): string hashes are salted per process
+        return zlib.crc32(feature.encode("utf-8")) % self.dimensions
+
+    def _weight(self, bucket: int) -> float:
+        return 1.0
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts`` synchronously."""
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self.features(text).items():
+                bucket = self._bucket(feature)
+                weight = _NGRAM_WEIGHT if feature.startswith("c:") else 1.0
+                # Sublinear term frequency: repeating a word adds little
+                vectors[row, bucket] += (1.0 + math.log(count)) * weight * self._weight(bucket)
+        return normalize_rows(vectors)
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self.transform(texts)
+
+
+class TfidfEmbedder(HashingEmbedder):
+    """Hashing embedder with inverse document frequency weights fitted on a corpus."""
+
+    name = "tfidf"
+
+    def __init__(self, corpus: Sequence[str] = (), dimensions: int = 2048, ngram: int = 3):
+        super().__init__(dimensions, ngram)
+        self._corpus_digest = ""
+        self.idf = np.ones(dimensions, dtype=np.float32)
+        if corpus:
+            self.fit(corpus)
+
+    @property
+    def fingerprint(self) -> str:
+        return f"{super().fingerprint}:{self._corpus_digest}"
+
+    def fit(self, corpus: Sequence[str]) -> "TfidfEmbedder":
+        """Learn bucket weights: rarer across the corpus means heavier."""
+        document_frequency = np.zeros(self.dimensions, dtype=np.float32)
+        for text in corpus:
+            buckets = {self._bucket(feature) for feature in self.features(text)}
+            document_frequency[list(buckets)] += 1
+        # Smoothed idf; buckets never seen in the corpus get the highest weight
+        self.idf = (np.log((1 + len(corpus)) / (1 + document_frequency)) + 1).astype(np.float32)
+        self._corpus_digest = hashlib.sha256("\x00".join(corpus).encode("utf-8")).hexdigest()[:16]
+        return self
+
+    def _weight(self, bucket: int) -> float:
+        return float(self.idf[bucket])
+
+
+class AzureOpenAIEmbedder:
+    """Embeddings from an Azure OpenAI deployment, requested in batches."""
+
+    name = "azure-openai"
+    similarity_baseline = 0.2
+    similarity_saturation = 0.3
+
+    def __init__(
+        self,
+        deployment: str,
+        endpoint: str,
+        api_key: str,
+        api_version: str = "2024-08-01-preview",
+        batch_size: int = 64,
+        timeout: float = 10.0,
+        max_retries: int = 1,
+    ):
+        if not OPENAI_AVAILABLE:
+            raise ImportError("The openai package is required for Azure OpenAI embeddings")
+        self.deployment = deployment
+        self.batch_size = batch_size
+        # The client's defaults (600 s, two retries) are far too long for routing
+        self._client = AsyncAzureOpenAI(
+            azure_endpoint=endpoint,
+            api_key=api_key,
+            api_version=api_version,
+            timeout=timeout,
+            max_retries=max_retries,
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        return f"{self.name}:{self.deployment}"
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            response = await self._client.embeddings.create(
+                model=self.deployment,
+                input=list(texts[start:start + self.batch_size]),
+            )
+            rows.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return normalize_rows(np.asarray(rows, dtype=np.float32))
+
+
+def embedder_from_env(corpus: Sequence[str] = ()) -> Union[HashingEmbedder, AzureOpenAIEmbedder]:
+    """Azure OpenAI embeddings when a deployment is configured, else TF-IDF over ``corpus``."""
+    deployment = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+    api_key = os.getenv("AZURE_OPENAI_API_KEY")
+    if deployment and endpoint and api_key:
+        try:
+            return AzureOpenAIEmbedder(
+                deployment,
+                endpoint,
+                api_key,
+                api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-08-01-preview"),
+                timeout=float(os.getenv("AZURE_OPENAI_EMBEDDING_TIMEOUT_SECONDS", "10")),
+            )
+        except ImportError as e:
+            logger.warning(f"Azure OpenAI embeddings unavailable, using local TF-IDF: {e}")
+    return TfidfEmbedder(corpus)
@@ -0,0 +1,192 @@
+"""Incremental extraction of JSON from streamed LLM responses.
+
+Models wrap their JSON in prose or code fences, sometimes follow it with a
+second example object, and stream it a few tokens at a time. The extractor
+scans chunks as they arrive, skips leading prose, stops at the end of the
+first complete top-level object or array and ignores anything after it.
+While the value is still streaming, each top-level field (or array
+element) is reported as soon as it is complete, so callers can show
+partial results before the completion finishes. ``invoke_json`` and
+``StreamingJSONMixin`` wire this into the agents' cached prompt calls.
+"""
+
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from semantic_kernel import Kernel
+from semantic_kernel.functions import KernelFunction
+
+from common.utils.response_cache import response_cache
+
+_CLOSING = {"{": "}", "[": "]"}
+
+FieldKey = Union[str, int]
+
+# Receives (agent name, function name, field key, field value) as fields complete
+PartialHandler = Callable[[str, str, FieldKey, Any], Awaitable[None]]
+
+
+class JSONExtractionError(ValueError):
+    """Raised when a response does not contain a complete JSON object or array."""
+
+    def __init__(self, message: str, text: str):
+        super().__init__(message)
+        self.text = text
+
+
+class JSONStreamExtractor:
+    """Finds the first complete top-level JSON object or array in streamed text.
+
+    ``feed`` returns the ``(key, value)`` pairs completed by each chunk:
+    member names for an object, element indexes for an array.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.value: Any = None
+        self.done = False
+        self._pos = 0
+        self._reset_candidate()
+
+    def _reset_candidate(self) -> None:
+        self._start = -1
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+        self._index = 0
+
+    def feed(self, chunk: str) -> List[Tuple[FieldKey, Any]]:
+        """Add a chunk of the response and return the fields it completed."""
+        self.text += chunk
+        if self.done:
+            return []
+        return self._scan()
+
+    def _scan(self) -> List[Tuple[FieldKey, Any]]:
+        text = self.text
+        fields: List[Tuple[FieldKey, Any]] = []
+        pos = self._pos
+        while pos < len(text):
+            char = text[pos]
+            if self._start < 0:
+                if char in _CLOSING:
+                    self._start = pos
+                    self._stack.append(_CLOSING[char])
+                    self._member_start = pos + 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in _CLOSING:
+                self._stack.append(_CLOSING[char])
+            elif char in "}]":
+                if char != self._stack.pop():
+                    # Mismatched brackets: this was not JSON, look further on
+                    pos = self._start + 1
+                    self._reset_candidate()
+                    continue
+                if not self._stack:
+                    fields.extend(self._member(pos))
+                    try:
+                        self.value = json.loads(text[self._start:pos + 1])
+                    except ValueError:
+                        pos = self._start + 1
+                        self._reset_candidate()
+                        continue
+                    self.done = True
+                    self._pos = pos + 1
+                    return fields
+            elif char == "," and len(self._stack) == 1:
+                fields.extend(self._member(pos))
+                self._member_start = pos + 1
+            pos += 1
+        self._pos = pos
+        return fields
+
+    def _member(self, end: int) -> List[Tuple[FieldKey, Any]]:
+        """Parse the top-level member that ends just before ``end``."""
+        member = self.text[self._member_start:end].strip()
+        if not member:
+            return []
+        if self.text[self._start] == "{":
+            try:
+                return list(json.loads("{" + member + "}").items())
+            except ValueError:
+                return []
+        index = self._index
+        self._index += 1
+        try:
+            return [(index, json.loads(member))]
+        except ValueError:
+            return []
+
+    def result(self) -> Any:
+        """The extracted value; raises JSONExtractionError if none was found."""
+        if not self.done:
+            raise JSONExtractionError("No complete JSON object or array in response", self.text)
+        return self.value
+
+
+def extract_json(text: str) -> Any:
+    """Return the first complete top-level JSON object or array in ``text``."""
+    extractor = JSONStreamExtractor()
+    extractor.feed(text)
+    return extractor.result()
+
+
+async def invoke_json(
+    kernel: Kernel,
+    function: KernelFunction,
+    arguments: Dict[str, Any],
+    *,
+    agent: str,
+    model: str,
+    partial_handler: Optional[PartialHandler] = None,
+) -> Any:
+    """Invoke a prompt function through the shared response cache and parse its JSON.
+
+    With a ``partial_handler`` the completion is streamed and each top-level
+    field is passed to it as soon as it is complete.
+    """
+    extractor = JSONStreamExtractor()
+
+    async def on_chunk(chunk: str):
+        for key, value in extractor.feed(chunk):
+            if partial_handler:
+                await partial_handler(agent, function.name, key, value)
+
+    await response_cache.invoke(
+        kernel,
+        function,
+        arguments,
+        agent=agent,
+        model=model,
+        on_chunk=on_chunk,
+        stream=partial_handler is not None,
+        # Output that is not JSON is not cached, so the next identical call retries
+        validate=extract_json,
+    )
+    return extractor.result()
+
+
+class StreamingJSONMixin:
+    """JSON prompt invocation for agents with ``kernel``, ``agent_name`` and ``deployment_name``."""
+
+    # Async callback receiving (agent, function, field, value) as JSON fields stream in
+    partial_handler: Optional[PartialHandler] = None
+
+    async def _invoke_json(self, function: KernelFunction, **arguments) -> Any:
+        return await invoke_json(
+            self.kernel,
+            function,
+            arguments,
+            agent=self.agent_name,
+            model=self.deployment_name,
+            partial_handler=self.partial_handler,
+        )
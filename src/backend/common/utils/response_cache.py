@@ -0,0 +1,385 @@
+"""Content-addressed cache for LLM responses from Semantic Kernel functions.
+
+Responses are keyed by a hash of the prompt function (name and template),
+the input arguments, the model and the execution settings, so identical
+analyses are served without another completion. Entries live in a
+size-bounded in-memory LRU with a per-function TTL and can optionally be
+written through to a directory on disk. Concurrent identical calls share
+a single in-flight request, which keeps running as long as any of them is
+still waiting for it. Callers that want partial output can ask for
+the completion to be streamed; cached responses are replayed as a single
+chunk. A caller can validate a completion before it is stored, so a
+response it cannot use is not served again for the whole TTL. Prompt and
+completion tokens of every completion are recorded in ``token_usage``;
+cached responses count as calls without tokens. Lookups are exported
+through OpenTelemetry metrics per agent and outcome.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from opentelemetry import metrics
+
+from common.utils.prompt_registry import template_hash
+from common.utils.token_usage import token_usage
+from common.utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+ChunkHandler = Callable[[str], Awaitable[None]]
+Validator = Callable[[str], Any]
+
+# Outcomes of a cache lookup
+HIT = "hit"
+DISK_HIT = "disk_hit"
+COALESCED = "coalesced"
+MISS = "miss"
+
+
+def _function_template(function: Any) -> str:
+    prompt_template = getattr(function, "prompt_template", None)
+    if prompt_template is None:
+        return ""
+    return prompt_template.prompt_template_config.template or ""
+
+
+def _function_fingerprint(function: Any) -> Tuple[str, str]:
+    """Name and template hash of a prompt function."""
+    return function.name, template_hash(_function_template(function))
+
+
+def prompt_tokens(function: Any, arguments: Dict[str, Any]) -> int:
+    """Tokens in a prompt function's template plus its argument values."""
+    return count_tokens(_function_template(function)) + sum(
+        count_tokens(str(value)) for value in arguments.values()
+    )
+
+
+def _chunk_text(item: Any) -> str:
+    """Text of one item yielded by ``Kernel.invoke_stream``."""
+    if isinstance(item, list):
+        return "".join(str(content) for content in item)
+    return str(item)
+
+
+def _settings_fingerprint(function: Any) -> Dict[str, Any]:
+    settings = getattr(function, "prompt_execution_settings", None) or {}
+    return {
+        service_id: value.model_dump(exclude_none=True) if hasattr(value, "model_dump") else str(value)
+        for service_id, value in settings.items()
+    }
+
+
+class CacheStats:
+    """Hit and miss counters for one agent."""
+
+    def __init__(self):
+        self.hits = 0
+        self.disk_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        requests = self.hits + self.disk_hits + self.coalesced + self.misses
+        served = requests - self.misses
+        return {
+            "requests": requests,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round(served / requests, 4) if requests else 0.0,
+        }
+
+
+class InFlight:
+    """A completion shared by every concurrent caller with the same key."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        # Retrieve the outcome even if every caller was cancelled first
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+
+class ResponseCache:
+    """LRU + TTL response cache with an optional disk tier and single-flight calls."""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        default_ttl: float = 3600.0,
+        ttls: Optional[Dict[str, float]] = None,
+        disk_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls: Dict[str, float] = dict(ttls or {})
+        self.disk_path = disk_path
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, InFlight] = {}
+        self._stats: Dict[str, CacheStats] = {}
+
+        meter = metrics.get_meter(__name__)
+        self._lookups = meter.create_counter(
+            "llm_cache.lookups",
+            description="LLM response cache lookups, by agent and outcome",
+        )
+        self._rejected = meter.create_counter(
+            "llm_cache.rejected",
+            description="Completions not cached because the caller could not use them",
+        )
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build a cache from LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS and LLM_CACHE_DIR."""
+        return cls(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512")),
+            default_ttl=float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")),
+            disk_path=os.getenv("LLM_CACHE_DIR") or None,
+        )
+
+    def set_ttl(self, function_name: str, seconds: float) -> None:
+        """Override the TTL for one prompt function; 0 disables caching for it."""
+        self.ttls[function_name] = seconds
+
+    def make_key(
+        self,
+        function: Any,
+        arguments: Dict[str, Any],
+        model: str = "",
+    ) -> str:
+        name, template = _function_fingerprint(function)
+        payload = json.dumps(
+            {
+                "function": name,
+                "template": template,
+                "arguments": arguments,
+                "model": model,
+                "settings": _settings_fingerprint(function),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # Storage tiers
+    def _get_memory(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_memory(self, key: str, value: str, ttl: float) -> None:
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_file(self, key: str) -> str:
+        return os.path.join(self.disk_path, f"{key}.json")
+
+    def _get_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        if not self.disk_path:
+            return None
+        path = self._disk_file(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry["expires_at"] < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry["expires_at"], entry["value"]
+
+    def _put_disk(self, key: str, value: str, ttl: float) -> None:
+        if not self.disk_path:
+            return
+        path = self._disk_file(key)
+        try:
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump({"expires_at": time.time() + ttl, "value": value}, f)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning("Failed to write LLM cache entry to disk: %s", e)
+
+    # Invocation
+    async def _complete(
+        self,
+        kernel: Any,
+        function: Any,
+        arguments: Dict[str, Any],
+        agent: str,
+        on_chunk: Optional[ChunkHandler],
+        stream: bool,
+    ) -> str:
+        if not stream:
+            value = str(await kernel.invoke(function, **arguments))
+            if on_chunk:
+                await on_chunk(value)
+        else:
+            parts = []
+            async for item in kernel.invoke_stream(function, **arguments):
+                text = _chunk_text(item)
+                if text:
+                    parts.append(text)
+                    if on_chunk:
+                        await on_chunk(text)
+            value = "".join(parts)
+
+        token_usage.record(agent, function.name, prompt_tokens(function, arguments), count_tokens(value))
+        return value
+
+    async def invoke(
+        self,
+        kernel: Any,
+        function: Any,
+        arguments: Dict[str, Any],
+        agent: str = "default",
+        model: str = "",
+        on_chunk: Optional[ChunkHandler] = None,
+        stream: bool = False,
+        validate: Optional[Validator] = None,
+    ) -> str:
+        """Invoke a prompt function through the cache and return the response text.
+
+        ``on_chunk`` receives the response as it arrives: chunk by chunk when
+        ``stream`` is set and the response is not cached, otherwise whole.
+        ``validate`` is called with a new completion before it is stored; if
+        it raises, the completion is not cached and the error propagates.
+        """
+        ttl = self.ttls.get(function.name, self.default_ttl)
+        if ttl <= 0:
+            self._count(agent, MISS)
+            value = await self._complete(kernel, function, arguments, agent, on_chunk, stream)
+            if validate:
+                validate(value)
+            return value
+
+        key = self.make_key(function, arguments, model)
+        value = self._get_memory(key)
+        if value is not None:
+            self._count(agent, HIT)
+            token_usage.record_cached(agent, function.name)
+            return await self._replay(value, on_chunk)
+
+        disk_entry = self._get_disk(key)
+        if disk_entry is not None:
+            expires_at, value = disk_entry
+            self._put_memory(key, value, expires_at - time.time())
+            self._count(agent, DISK_HIT)
+            token_usage.record_cached(agent, function.name)
+            return await self._replay(value, on_chunk)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._count(agent, COALESCED)
+            token_usage.record_cached(agent, function.name)
+            return await self._replay(await self._join(key, pending), on_chunk)
+
+        self._count(agent, MISS)
+        # The completion runs in its own task so that cancelling the caller that
+        # started it does not fail the callers sharing it
+        pending = InFlight(
+            asyncio.get_running_loop().create_task(
+                self._fill(key, ttl, kernel, function, arguments, agent, on_chunk, stream, validate)
+            )
+        )
+        self._inflight[key] = pending
+        return await self._join(key, pending)
+
+    async def _fill(
+        self,
+        key: str,
+        ttl: float,
+        kernel: Any,
+        function: Any,
+        arguments: Dict[str, Any],
+        agent: str,
+        on_chunk: Optional[ChunkHandler],
+        stream: bool,
+        validate: Optional[Validator],
+    ) -> str:
+        try:
+            value = await self._complete(kernel, function, arguments, agent, on_chunk, stream)
+            if validate:
+                try:
+                    validate(value)
+                except Exception:
+                    self._rejected.add(1, {"agent": agent, "function": function.name})
+                    raise
+        finally:
+            self._forget(key, asyncio.current_task())
+        self._put_memory(key, value, ttl)
+        self._put_disk(key, value, ttl)
+        return value
+
+    def _count(self, agent: str, outcome: str) -> None:
+        stats = self._stats.setdefault(agent, CacheStats())
+        if outcome == HIT:
+            stats.hits += 1
+        elif outcome == DISK_HIT:
+            stats.disk_hits += 1
+        elif outcome == COALESCED:
+            stats.coalesced += 1
+        else:
+            stats.misses += 1
+        self._lookups.add(1, {"agent": agent, "outcome": outcome})
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        pending = self._inflight.get(key)
+        if pending is not None and pending.task is task:
+            del self._inflight[key]
+
+    async def _join(self, key: str, pending: InFlight) -> str:
+        """Wait for a shared completion; it is cancelled only when every caller has left."""
+        pending.waiters += 1
+        try:
+            return await asyncio.shield(pending.task)
+        finally:
+            pending.waiters -= 1
+            if pending.waiters == 0 and not pending.task.done():
+                # Later callers start a new completion rather than join a cancelled one
+                self._forget(key, pending.task)
+                pending.task.cancel()
+
+    @staticmethod
+    async def _replay(value: str, on_chunk: Optional[ChunkHandler]) -> str:
+        if on_chunk:
+            await on_chunk(value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-agent hit rates and current cache size."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "agents": {agent: stats.to_dict() for agent, stats in self._stats.items()},
+        }
+
+    def clear(self) -> None:
+        """Drop all in-memory entries and statistics (the disk tier is kept)."""
+        self._entries.clear()
+        self._stats.clear()
+
+
+# Process-wide cache shared by every agent
+response_cache = ResponseCache.from_env()
@@ -0,0 +1,171 @@
+"""Speculative agent calls started while an LLM router is still deciding.
+
+When routing has to wait for the LLM, the best local candidate's agent call
+can start at the same time. If the router picks that candidate, its result
+is used and the router's latency is saved; if not, the call is cancelled
+and its tokens are wasted. Both sides are counted so the confidence at
+which speculation starts can be tuned from real traffic.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from opentelemetry import metrics
+
+HIT = "hit"
+MISS = "miss"
+
+
+@dataclass
+class SpeculationStats:
+    """Aggregated outcomes of speculative agent calls."""
+
+    started: int = 0
+    hits: int = 0
+    misses: int = 0
+    saved_ms: float = 0.0
+    wasted_tokens: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        resolved = self.hits + self.misses
+        data["saved_ms"] = round(self.saved_ms, 1)
+        data["hit_rate"] = round(self.hits / resolved, 3) if resolved else 0.0
+        data["avg_saved_ms_per_hit"] = round(self.saved_ms / self.hits, 1) if self.hits else 0.0
+        data["avg_wasted_tokens_per_miss"] = round(self.wasted_tokens / self.misses, 1) if self.misses else 0.0
+        return data
+
+
+class SpeculationMetrics:
+    """Counts speculative calls, the latency hits saved and the tokens misses wasted."""
+
+    def __init__(self):
+        self._stats = SpeculationStats()
+        self._by_agent: Dict[str, SpeculationStats] = {}
+        self._lock = threading.Lock()
+
+        meter = metrics.get_meter(__name__)
+        self._outcomes = meter.create_counter(
+            "speculation.outcomes",
+            description="Speculative agent calls by outcome",
+        )
+        self._saved = meter.create_histogram(
+            "speculation.saved_latency",
+            unit="ms",
+            description="Routing latency saved by a speculative call that was kept",
+        )
+        self._wasted = meter.create_counter(
+            "speculation.wasted_tokens",
+            unit="token",
+            description="Tokens spent on speculative calls that were cancelled",
+        )
+
+    def record_started(self, agent: str) -> None:
+        with self._lock:
+            self._stats.started += 1
+            self._by_agent.setdefault(agent, SpeculationStats()).started += 1
+
+    def record_hit(self, agent: str, saved_ms: float) -> None:
+        self._outcomes.add(1, {"agent": agent, "outcome": HIT})
+        self._saved.record(saved_ms, {"agent": agent})
+        with self._lock:
+            for stats in (self._stats, self._by_agent.setdefault(agent, SpeculationStats())):
+                stats.hits += 1
+                stats.saved_ms += saved_ms
+
+    def record_miss(self, agent: str, wasted_tokens: int) -> None:
+        self._outcomes.add(1, {"agent": agent, "outcome": MISS})
+        self._wasted.add(wasted_tokens, {"agent": agent})
+        with self._lock:
+            for stats in (self._stats, self._by_agent.setdefault(agent, SpeculationStats())):
+                stats.misses += 1
+                stats.wasted_tokens += wasted_tokens
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            summary = self._stats.to_dict()
+            summary["agents"] = {agent: stats.to_dict() for agent, stats in self._by_agent.items()}
+        return summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = SpeculationStats()
+            self._by_agent.clear()
+
+
+class Speculation:
+    """One speculative agent call, kept or cancelled once routing has decided.
+
+    ``prompt_tokens`` is what the call sends up front; a cancelled call is
+    charged that, plus ``completion_tokens(result)`` if it had already
+    finished.
+    """
+
+    def __init__(
+        self,
+        speculation_metrics: SpeculationMetrics,
+        completion_tokens: Optional[Callable[[Any], int]] = None,
+    ):
+        self.metrics = speculation_metrics
+        self.completion_tokens = completion_tokens
+        self.agent: Optional[str] = None
+        self.outcome: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._prompt_tokens = 0
+        self._started = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._task is not None
+
+    def start(self, agent: str, call: Awaitable[Any], prompt_tokens: int = 0) -> None:
+        """Run ``call`` in the background as the guess that ``agent`` will be chosen."""
+        if self._task is not None:
+            if asyncio.iscoroutine(call):
+                call.close()
+            raise RuntimeError("A speculative call is already running")
+        self.agent = agent
+        self._prompt_tokens = prompt_tokens
+        self._started = time.perf_counter()
+        self._task = asyncio.ensure_future(call)
+        self.metrics.record_started(agent)
+
+    async def resolve(self, chosen_agent: str) -> Optional[Any]:
+        """The speculative result if ``chosen_agent`` was the guess; otherwise cancel it and return None."""
+        if self._task is None:
+            return None
+        task, self._task = self._task, None
+        decided = time.perf_counter()
+        if chosen_agent == self.agent:
+            result = await task
+            # Without speculation the call would only have started once routing decided
+            call_ms = (time.perf_counter() - self._started) * 1000
+            self.metrics.record_hit(self.agent, min((decided - self._started) * 1000, call_ms))
+            self.outcome = HIT
+            return result
+        self.metrics.record_miss(self.agent, self._cancel(task))
+        self.outcome = MISS
+        return None
+
+    def cancel(self) -> None:
+        """Abandon the speculative call, for example when routing itself failed."""
+        if self._task is not None:
+            task, self._task = self._task, None
+            self.metrics.record_miss(self.agent, self._cancel(task))
+            self.outcome = MISS
+
+    def _cancel(self, task: asyncio.Task) -> int:
+        wasted = self._prompt_tokens
+        if task.done():
+            if not task.cancelled() and task.exception() is None and self.completion_tokens:
+                wasted += self.completion_tokens(task.result())
+        else:
+            task.cancel()
+        return wasted
+
+
+# Process-wide speculation accounting
+speculation_metrics = SpeculationMetrics()
@@ -0,0 +1,338 @@
+"""Local-first agent routing with an LLM fallback for ambiguous messages.
+
+Messages are routed in tiers, cheapest first:
+
+* ``cache``: a decision already made for the same normalized message,
+* ``local``: a keyword, pattern and example-word classifier (microseconds),
+* ``embedding``: an optional embedding-similarity classifier, which also
+  catches paraphrases that share no keyword with a capability,
+* ``llm``: the caller's LLM router, only when neither classifier is
+  confident enough,
+* ``default``: the default agent, when nothing matched and no LLM router
+  is available or it failed.
+
+Local confidence combines how strongly the best capability matched with
+how far ahead of the runner-up it is, so a message that matches two
+capabilities equally goes to the LLM even if both scores are high.
+
+Run ``python -m common.utils.tiered_router`` from ``src/backend`` to print
+the local tier's share and latency over the capability examples.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+from opentelemetry import metrics
+
+from common.utils.intent_router import IntentRouter
+
+logger = logging.getLogger(__name__)
+
+CACHE = "cache"
+LOCAL = "local"
+EMBEDDING = "embedding"
+LLM = "llm"
+DEFAULT = "default"
+TIERS = (CACHE, LOCAL, EMBEDDING, LLM, DEFAULT)
+
+_WORD = re.compile(r"[a-z]+")
+_WHITESPACE = re.compile(r"\s+")
+# Example words too common to say anything about a capability
+_STOPWORDS = frozenset(
+    "this that these those from with for the and our your their what when how can should "
+    "could would into about team".split()
+)
+
+# An LLM router receives the message (with any conversation context) and returns an agent
+Fallback = Callable[[str], Awaitable[Optional[str]]]
+
+
+def normalize_message(message: str) -> str:
+    """Cache key for a message: lower-cased, whitespace collapsed, edge punctuation removed."""
+    return _WHITESPACE.sub(" ", message.lower()).strip(" \t\n.,!?;:")
+
+
+def example_terms(examples: Mapping[str, Sequence[str]], exclude: Sequence[str] = ()) -> Dict[str, list]:
+    """Words from each capability's examples that appear in no other capability's examples."""
+    words = {
+        capability: {
+            word for example in capability_examples for word in _WORD.findall(example.lower())
+            if len(word) > 3 and word not in _STOPWORDS
+        }
+        for capability, capability_examples in examples.items()
+    }
+    owners = Counter(word for capability_words in words.values() for word in capability_words)
+    excluded = set(exclude)
+    return {
+        capability: sorted(word for word in capability_words if owners[word] == 1 and word not in excluded)
+        for capability, capability_words in words.items()
+    }
+
+
+def confidence(scores: Mapping[str, float], saturation: float) -> float:
+    """0 to 1: the best score's strength (capped at ``saturation``) times its lead over the runner-up."""
+    ranked = sorted(scores.values(), reverse=True)
+    if not ranked or ranked[0] <= 0:
+        return 0.0
+    runner_up = ranked[1] if len(ranked) > 1 else 0.0
+    return (ranked[0] - runner_up) / ranked[0] * min(ranked[0] / saturation, 1.0)
+
+
+class CapabilityClassifier:
+    """Scores messages by capability keywords, patterns and distinctive example words."""
+
+    def __init__(
+        self,
+        keywords: Mapping[str, Sequence[str]],
+        patterns: Optional[Mapping[str, Sequence[str]]] = None,
+        examples: Optional[Mapping[str, Sequence[str]]] = None,
+        example_weight: float = 1.0,
+        saturation: float = 8.0,
+    ):
+        self.keywords = IntentRouter(keywords, patterns)
+        listed = [keyword for capability_keywords in keywords.values() for keyword in capability_keywords]
+        terms = example_terms(examples or {}, exclude=listed)
+        self.examples = IntentRouter(terms, exact_weight=example_weight, keyword_weight=example_weight)
+        # Score of a keyword plus a pattern match: enough on its own for full confidence
+        self.saturation = saturation
+
+    def score(self, message: str) -> Dict[str, float]:
+        scores = self.keywords.score(message)
+        for capability, score in self.examples.score(message).items():
+            scores[capability] = scores.get(capability, 0.0) + score
+        return scores
+
+    def classify(self, message: str) -> Tuple[Optional[str], float]:
+        """Best capability (None when nothing matched) and the confidence in it."""
+        scores = self.score(message)
+        best = max(scores, key=scores.get, default=None)
+        if best is None or scores[best] <= 0:
+            return None, 0.0
+        return best, round(confidence(scores, self.saturation), 3)
+
+
+@dataclass
+class RoutingDecision:
+    agent: str
+    tier: str
+    confidence: float
+    latency_ms: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class TierStats:
+    decisions: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+class TieredRouter:
+    """Routes messages to agents through the cache, local, embedding and LLM tiers.
+
+    ``agents`` maps classifier capabilities to the returned agent names.
+    ``embeddings`` is anything with an async ``classify(message)`` returning
+    a capability and confidence, such as ``EmbeddingRouter``. Decisions are
+    cached per normalized message, except LLM decisions made with
+    conversation context, which may not hold for the message alone.
+    """
+
+    def __init__(
+        self,
+        classifier: CapabilityClassifier,
+        agents: Optional[Mapping[str, str]] = None,
+        fallback: Optional[Fallback] = None,
+        default_agent: str = "coaching",
+        confidence_threshold: float = 0.35,
+        cache_size: int = 1024,
+        embeddings: Optional[Any] = None,
+        embedding_threshold: float = 0.35,
+        embedding_timeout: float = 1.0,
+    ):
+        self.classifier = classifier
+        self.agents = dict(agents or {})
+        self.fallback = fallback
+        self.default_agent = default_agent
+        self.confidence_threshold = confidence_threshold
+        self.embeddings = embeddings
+        self.embedding_threshold = embedding_threshold
+        # Remote embeddings must not hold up routing; a slow call is skipped
+        self.embedding_timeout = embedding_timeout
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._stats = {tier: TierStats() for tier in TIERS}
+        self._lock = threading.Lock()
+        self._latency = metrics.get_meter(__name__).create_histogram(
+            "router.latency",
+            unit="ms",
+            description="Time to choose an agent for a message",
+        )
+
+    def _agent(self, capability: str) -> str:
+        return self.agents.get(capability, capability)
+
+    def route_locally(self, message: str) -> Tuple[Optional[str], float]:
+        """Agent the local classifier picks (None when nothing matched) and its confidence."""
+        capability, score = self.classifier.classify(message)
+        return (self._agent(capability) if capability else None), score
+
+    async def route(
+        self,
+        message: str,
+        context: str = "",
+        on_fallback: Optional[Callable[[Optional[str], float], None]] = None,
+    ) -> RoutingDecision:
+        """Choose an agent for ``message``; ``context`` is only sent to the LLM tier.
+
+        ``on_fallback`` is called with the best local candidate (or None) and
+        its confidence right before the LLM router is awaited, so callers can
+        start work on the likely answer in the meantime.
+        """
+        started = time.perf_counter()
+        key = normalize_message(message)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            return self._record(CACHE, cached[0], cached[1], started)
+
+        agent, score = self.route_locally(message)
+        if agent is not None and score >= self.confidence_threshold:
+            self._remember(key, agent, score)
+            return self._record(LOCAL, agent, score, started)
+
+        # Best guess so far, used if no tier is confident
+        candidate, candidate_score, candidate_tier = agent, score, LOCAL
+        if self.embeddings is not None:
+            try:
+                capability, similarity = await asyncio.wait_for(
+                    self.embeddings.classify(message), self.embedding_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Embedding routing took over {self.embedding_timeout}s, skipping it")
+                capability = None
+            except Exception as e:
+                logger.warning(f"Embedding routing failed: {e}")
+                capability = None
+            if capability is not None and similarity >= self.embedding_threshold:
+                self._remember(key, self._agent(capability), similarity)
+                return self._record(EMBEDDING, self._agent(capability), similarity, started)
+            if capability is not None and similarity > score:
+                candidate, candidate_score, candidate_tier = self._agent(capability), similarity, EMBEDDING
+
+        if self.fallback is not None:
+            if on_fallback is not None:
+                on_fallback(candidate, candidate_score)
+            try:
+                choice = await self.fallback(f"{context}\n{message}" if context else message)
+            except Exception:
+                choice = None
+            if choice:
+                if not context:
+                    self._remember(key, choice, 1.0)
+                return self._record(LLM, choice, 1.0, started)
+
+        # A weak match still beats the default
+        if candidate is not None:
+            return self._record(candidate_tier, candidate, candidate_score, started)
+        return self._record(DEFAULT, self.default_agent, 0.0, started)
+
+    def _remember(self, key: str, agent: str, score: float) -> None:
+        with self._lock:
+            self._cache[key] = (agent, score)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _record(self, tier: str, agent: str, score: float, started: float) -> RoutingDecision:
+        elapsed = (time.perf_counter() - started) * 1000
+        self._latency.record(elapsed, {"tier": tier})
+        with self._lock:
+            stats = self._stats[tier]
+            stats.decisions += 1
+            stats.total_ms += elapsed
+            stats.max_ms = max(stats.max_ms, elapsed)
+        return RoutingDecision(agent, tier, score, round(elapsed, 3))
+
+    def stats(self) -> Dict[str, Any]:
+        """Share of decisions and latency per tier."""
+        with self._lock:
+            total = sum(stats.decisions for stats in self._stats.values())
+            tiers = {
+                tier: {
+                    "decisions": stats.decisions,
+                    "share": round(stats.decisions / total, 3) if total else 0.0,
+                    "avg_latency_ms": round(stats.total_ms / stats.decisions, 3) if stats.decisions else 0.0,
+                    "max_latency_ms": round(stats.max_ms, 3),
+                }
+                for tier, stats in self._stats.items()
+            }
+            cached = len(self._cache)
+        return {
+            "decisions": total,
+            "confidence_threshold": self.confidence_threshold,
+            "embedding_threshold": self.embedding_threshold if self.embeddings is not None else None,
+            "cached_messages": cached,
+            "tiers": tiers,
+        }
+
+    def reset(self) -> None:
+        """Clear cached decisions and statistics."""
+        with self._lock:
+            self._cache.clear()
+            self._stats = {tier: TierStats() for tier in TIERS}
+
+
+def benchmark(repeats: int = 2_000) -> Dict[str, Any]:
+    """Local tier share and per-message cost over the capability examples."""
+    import asyncio
+
+    from common.config.agent_capabilities import (
+        AGENT_CAPABILITY_DEFINITIONS,
+        CAPABILITY_PATTERNS,
+        CHAT_AGENTS,
+    )
+
+    examples = {name: definition["examples"] for name, definition in AGENT_CAPABILITY_DEFINITIONS.items()}
+    classifier = CapabilityClassifier(
+        {name: definition["keywords"] for name, definition in AGENT_CAPABILITY_DEFINITIONS.items()},
+        CAPABILITY_PATTERNS,
+        examples,
+    )
+    messages = [(example, name) for name, capability_examples in examples.items() for example in capability_examples]
+
+    async def unused_fallback(message: str) -> str:
+        return "coaching"
+
+    router = TieredRouter(classifier, CHAT_AGENTS, fallback=unused_fallback, cache_size=0)
+    correct = 0
+    for message, name in messages:
+        decision = asyncio.run(router.route(message))
+        correct += decision.tier == LOCAL and decision.agent == CHAT_AGENTS[name]
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for message, _ in messages:
+            classifier.classify(message)
+    local = time.perf_counter() - started
+
+    return {
+        "examples": len(messages),
+        "routed_locally": correct,
+        "local_us": round(local / (repeats * len(messages)) * 1e6, 2),
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>16}: {value}")
@@ -0,0 +1,180 @@
+"""Token budgets for prompts assembled from several context sections.
+
+Each section has a priority, an optional token cap of its own and a
+strategy for shrinking it when the whole prompt is over budget:
+
+* ``truncate`` keeps the start of the section,
+* ``summarize`` compacts it locally: JSON is trimmed to fewer list items
+  and shorter strings, text keeps its first and last lines,
+* ``drop`` removes it entirely.
+
+Sections over their own cap are truncated (or summarized) first; then,
+while the prompt is still over budget, sections are shrunk or dropped from
+the lowest priority up.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from common.utils.tokens import count_tokens, truncate_to_tokens
+
+TRUNCATE = "truncate"
+SUMMARIZE = "summarize"
+DROP = "drop"
+
+TRUNCATION_MARKER = " …[truncated]"
+
+# (max list items, max string characters) tried in turn when summarizing JSON
+_COMPACTION_STEPS = ((10, 400), (5, 200), (3, 120), (1, 60))
+
+
+@dataclass
+class PromptSection:
+    name: str
+    content: Any
+    priority: int = 0
+    max_tokens: Optional[int] = None
+    strategy: str = TRUNCATE
+    min_tokens: int = 0
+
+    def render(self) -> str:
+        if isinstance(self.content, str):
+            return self.content
+        return json.dumps(self.content, default=str)
+
+
+@dataclass
+class FittedPrompt:
+    sections: Dict[str, str]
+    tokens: Dict[str, int]
+    budget: int
+    trimmed: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.tokens.values())
+
+    def report(self) -> Dict[str, Any]:
+        return {"budget": self.budget, "total_tokens": self.total_tokens, "trimmed": self.trimmed}
+
+
+def compact_json(value: Any, max_items: int, max_chars: int) -> Any:
+    """``value`` with lists cut to ``max_items``, strings to ``max_chars`` and empty fields removed."""
+    if isinstance(value, dict):
+        compacted = {key: compact_json(item, max_items, max_chars) for key, item in value.items()}
+        return {key: item for key, item in compacted.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        items = [compact_json(item, max_items, max_chars) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"... {len(value) - max_items} more")
+        return items
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + "…"
+    return value
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    marker_tokens = count_tokens(TRUNCATION_MARKER)
+    if max_tokens <= marker_tokens:
+        return truncate_to_tokens(text, max_tokens)
+    return truncate_to_tokens(text, max_tokens - marker_tokens) + TRUNCATION_MARKER
+
+
+def _summarize_text(text: str, max_tokens: int) -> str:
+    lines = text.splitlines()
+    omitted = "…"
+    budget = max_tokens - count_tokens(omitted)
+    head: List[str] = []
+    tail: List[str] = []
+    used = 0
+    # Two thirds of the budget for the opening lines, the rest for the most recent ones
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > budget * 2 // 3:
+            break
+        head.append(line)
+        used += cost
+    for line in reversed(lines[len(head):]):
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        tail.insert(0, line)
+        used += cost
+    if len(head) + len(tail) == len(lines):
+        return text
+    if not head and not tail:
+        return _truncate(text, max_tokens)
+    return "\n".join(head + [omitted] + tail)
+
+
+def shrink(section: PromptSection, text: str, max_tokens: int, strategy: Optional[str] = None) -> str:
+    """Shrink a rendered section to ``max_tokens`` with the given (or its own) strategy."""
+    strategy = strategy or section.strategy
+    if max_tokens <= 0 or strategy == DROP:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if strategy == SUMMARIZE:
+        if not isinstance(section.content, str):
+            for max_items, max_chars in _COMPACTION_STEPS:
+                compacted = json.dumps(compact_json(section.content, max_items, max_chars), default=str)
+                if count_tokens(compacted) <= max_tokens:
+                    return compacted
+        else:
+            return _summarize_text(text, max_tokens)
+    return _truncate(text, max_tokens)
+
+
+class PromptBudget:
+    """Fits prompt sections into ``max_tokens``, less ``reserved_tokens`` for the template."""
+
+    def __init__(self, max_tokens: int, reserved_tokens: int = 0):
+        self.max_tokens = max_tokens
+        self.reserved_tokens = reserved_tokens
+
+    @property
+    def available(self) -> int:
+        return max(self.max_tokens - self.reserved_tokens, 0)
+
+    def fit(self, sections: Sequence[PromptSection]) -> FittedPrompt:
+        texts: Dict[str, str] = {}
+        tokens: Dict[str, int] = {}
+        trimmed: List[Dict[str, Any]] = []
+
+        def update(section: PromptSection, text: str, action: str) -> None:
+            trimmed.append({
+                "section": section.name,
+                "action": action,
+                "from_tokens": tokens[section.name],
+                "to_tokens": count_tokens(text),
+            })
+            texts[section.name] = text
+            tokens[section.name] = trimmed[-1]["to_tokens"]
+
+        for section in sections:
+            texts[section.name] = section.render()
+            tokens[section.name] = count_tokens(texts[section.name])
+            if section.max_tokens is not None and tokens[section.name] > section.max_tokens:
+                strategy = SUMMARIZE if section.strategy == SUMMARIZE else TRUNCATE
+                update(section, shrink(section, texts[section.name], section.max_tokens, strategy), _action(strategy))
+
+        # Stable sort: among equal priorities, earlier sections are trimmed first
+        for section in sorted(sections, key=lambda s: s.priority):
+            overflow = sum(tokens.values()) - self.available
+            if overflow <= 0:
+                break
+            target = tokens[section.name] - overflow
+            if section.strategy == DROP or (target < 1 and not section.min_tokens):
+                update(section, "", "dropped")
+                continue
+            # A section never shrinks below min_tokens, even if the prompt stays over budget
+            target = max(target, section.min_tokens)
+            if target < tokens[section.name]:
+                update(section, shrink(section, texts[section.name], target), _action(section.strategy))
+
+        return FittedPrompt(texts, tokens, self.available, trimmed)
+
+
+def _action(strategy: str) -> str:
+    return {TRUNCATE: "truncated", SUMMARIZE: "summarized", DROP: "dropped"}[strategy]
@@ -0,0 +1,128 @@
+"""Prompt and completion token accounting for LLM calls."""
+
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Tuple
+
+from opentelemetry import metrics
+
+
+@dataclass
+class UsageStats:
+    """Aggregated token usage for one agent endpoint."""
+
+    agent: str
+    endpoint: str
+    calls: int = 0
+    cached_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    max_prompt_tokens: int = 0
+    trimmed_sections: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["total_tokens"] = self.prompt_tokens + self.completion_tokens
+        data["avg_prompt_tokens"] = self.prompt_tokens / self.calls if self.calls else 0.0
+        return data
+
+
+class TokenUsageMetrics:
+    """Collects prompt and completion tokens per agent and endpoint.
+
+    The endpoint is the prompt function or API route that made the call.
+    Completions served from the response cache are counted as cached calls
+    without tokens. Every call is exported through OpenTelemetry metrics and
+    aggregated in memory for the diagnostics report.
+    """
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], UsageStats] = {}
+        self._lock = threading.Lock()
+
+        meter = metrics.get_meter(__name__)
+        self._prompt_tokens = meter.create_counter(
+            "llm.prompt_tokens",
+            unit="token",
+            description="Tokens sent to the LLM",
+        )
+        self._completion_tokens = meter.create_counter(
+            "llm.completion_tokens",
+            unit="token",
+            description="Tokens generated by the LLM",
+        )
+        self._prompt_size = meter.create_histogram(
+            "llm.prompt_size",
+            unit="token",
+            description="Tokens per prompt",
+        )
+
+    def _get(self, agent: str, endpoint: str) -> UsageStats:
+        stats = self._stats.get((agent, endpoint))
+        if stats is None:
+            stats = self._stats[(agent, endpoint)] = UsageStats(agent, endpoint)
+        return stats
+
+    def record(
+        self,
+        agent: str,
+        endpoint: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+    ) -> None:
+        """Record one completion."""
+        attributes = {"agent": agent, "endpoint": endpoint}
+        self._prompt_tokens.add(prompt_tokens, attributes)
+        self._completion_tokens.add(completion_tokens, attributes)
+        self._prompt_size.record(prompt_tokens, attributes)
+
+        with self._lock:
+            stats = self._get(agent, endpoint)
+            stats.calls += 1
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.max_prompt_tokens = max(stats.max_prompt_tokens, prompt_tokens)
+
+    def record_cached(self, agent: str, endpoint: str) -> None:
+        """Record a call answered without a completion."""
+        with self._lock:
+            self._get(agent, endpoint).cached_calls += 1
+
+    def record_trimmed(self, agent: str, endpoint: str, sections: int) -> None:
+        """Record prompt sections shortened or dropped to fit a token budget."""
+        with self._lock:
+            self._get(agent, endpoint).trimmed_sections += sections
+
+    def top_consumers(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the agent endpoints that used the most tokens."""
+        with self._lock:
+            ranked = sorted(
+                self._stats.values(),
+                key=lambda s: s.prompt_tokens + s.completion_tokens,
+                reverse=True,
+            )
+            return [stats.to_dict() for stats in ranked[:limit]]
+
+    def summary(self, limit: int = 10) -> Dict[str, Any]:
+        """Return overall totals plus the top token consumers."""
+        with self._lock:
+            prompt = sum(s.prompt_tokens for s in self._stats.values())
+            completion = sum(s.completion_tokens for s in self._stats.values())
+            calls = sum(s.calls for s in self._stats.values())
+            cached = sum(s.cached_calls for s in self._stats.values())
+        return {
+            "total_calls": calls,
+            "cached_calls": cached,
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "top_consumers": self.top_consumers(limit),
+        }
+
+    def reset(self) -> None:
+        """Clear the in-memory aggregates."""
+        with self._lock:
+            self._stats.clear()
+
+
+# Process-wide collector shared by every agent
+token_usage = TokenUsageMetrics()
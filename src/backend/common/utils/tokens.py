@@ -0,0 +1,104 @@
+"""Token counting and token-budgeted chunking for prompt inputs.
+
+Counts use ``tiktoken``. If it is missing, or its encoding cannot be
+downloaded (offline), they fall back to an estimate of one token per word
+or punctuation mark, plus one for every eight characters of a word, which
+tracks GPT tokenizers closely enough for budgeting.
+"""
+
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence, Set, TypeVar
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_ENCODING = "o200k_base"
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+# Encodings that failed to load; they are not retried on every call
+_failed_encodings: Set[str] = set()
+
+
+@lru_cache(maxsize=4)
+def _load_encoding(name: str):
+    return tiktoken.get_encoding(name)
+
+
+def _encoding(name: str) -> Optional[Any]:
+    """The tiktoken encoding ``name``, or None to estimate instead."""
+    if not TIKTOKEN_AVAILABLE or name in _failed_encodings:
+        return None
+    try:
+        return _load_encoding(name)
+    except Exception as e:
+        # Encodings are downloaded on first use and fail offline
+        logger.warning("Could not load tiktoken encoding %s, estimating tokens: %s", name, e)
+        _failed_encodings.add(name)
+        return None
+
+
+def count_tokens(text: str, encoding: str = DEFAULT_ENCODING) -> int:
+    """Number of tokens in ``text``."""
+    if not text:
+        return 0
+    tokenizer = _encoding(encoding)
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, disallowed_special=()))
+    return sum(1 + len(piece) // 8 for piece in _PIECE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding: str = DEFAULT_ENCODING) -> str:
+    """The longest prefix of ``text`` that fits in ``max_tokens`` tokens."""
+    if max_tokens <= 0 or not text:
+        return ""
+    tokenizer = _encoding(encoding)
+    if tokenizer is not None:
+        tokens = tokenizer.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else tokenizer.decode(tokens[:max_tokens])
+    used = 0
+    for piece in _PIECE.finditer(text):
+        used += 1 + len(piece.group()) // 8
+        if used > max_tokens:
+            return text[:piece.start()].rstrip()
+    return text
+
+
+def pack_by_budget(
+    items: Sequence[T],
+    budget: int,
+    cost: Callable[[T], int],
+) -> List[List[T]]:
+    """Group consecutive items into chunks whose total cost stays within ``budget``.
+
+    An item that alone exceeds the budget gets a chunk of its own.
+    """
+    chunks: List[List[T]] = []
+    current: List[T] = []
+    used = 0
+    for item in items:
+        size = cost(item)
+        if current and used + size > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def count_json_tokens(value: Any) -> int:
+    """Tokens in the JSON form of ``value``."""
+    return count_tokens(json.dumps(value, default=str))
@@ -0,0 +1,31 @@
+"""Regular expressions for large sets of literal terms.
+
+A plain alternation makes the regex engine try every term at every
+position. Factoring the terms into a prefix trie first means each position
+tests one branch per character, so the cost of a scan barely grows with
+the number of terms.
+"""
+
+import re
+from typing import Any, Dict, Iterable
+
+
+def trie_pattern(terms: Iterable[str]) -> str:
+    """A non-capturing regex matching any of ``terms``, longest match first."""
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(node[char]) for char in sorted(node, reverse=True) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return build(trie)
@@ -4,9 +4,10 @@ This is a basic implementation that can be expanded based on your backend framew
 """
 
 import asyncio
+import copy
 import json
 import logging
-from typing import Dict, Set
+from typing import Any, Dict, Set
 
 from fastapi import WebSocket, WebSocketDisconnect
 
@@ -166,6 +167,38 @@ async def send_agent_message(
     await ws_manager.broadcast_to_plan(message, plan_id)
 
 
+async def send_partial_result(
+    plan_id: str, agent_name: str, function_name: str, field: Any, value: Any
+):
+    """
+    Send one completed field of an agent's JSON result while it is still streaming
+    """
+    message = {
+        "type": "agent_partial",
+        "data": {
+            "plan_id": plan_id,
+            "agent_name": agent_name,
+            "function_name": function_name,
+            "field": field,
+            "value": value,
+            "timestamp": asyncio.get_event_loop().time(),
+        },
+    }
+
+    await ws_manager.broadcast_to_plan(message, plan_id)
+
+
+def partial_result_forwarder(plan_id: str):
+    """
+    Build an agent ``partial_handler`` that streams partial results to a plan's subscribers
+    """
+
+    async def forward(agent_name: str, function_name: str, field: Any, value: Any):
+        await send_partial_result(plan_id, agent_name, function_name, field, value)
+
+    return forward
+
+
 # Example function to send step updates
 async def send_step_update(
     plan_id: str, step_id: str, status: str, content: str = None
@@ -187,6 +220,28 @@ async def send_step_update(
     await ws_manager.broadcast_to_plan(message, plan_id)
 
 
+async def run_streamed_step(
+    plan_id: str, step_id: str, agent: Any, method: str, **arguments
+) -> Any:
+    """
+    Run one agent method as a plan step, streaming its JSON fields to the plan's
+    subscribers as they complete and reporting the step's progress
+
+    The method runs on a shallow copy of the agent, so it shares the agent's
+    kernel and state while concurrent steps each get their own partial handler.
+    """
+    agent = copy.copy(agent)
+    agent.partial_handler = partial_result_forwarder(plan_id)
+    await send_step_update(plan_id, step_id, "in_progress", f"{agent.agent_name} is running {method}")
+    try:
+        result = await getattr(agent, method)(**arguments)
+    except Exception as e:
+        await send_step_update(plan_id, step_id, "failed", str(e))
+        raise
+    await send_step_update(plan_id, step_id, "completed")
+    return result
+
+
 # Example integration with FastAPI
 """
 from fastapi import FastAPI
@@ -208,7 +263,7 @@ async def execute_plan_step(plan_id: str, step_id: str):
     await asyncio.sleep(1)
     # Send agent action message
     await send_agent_message(plan_id, "Data Analyst", "Processing data and generating insights...", "action")
-    await asyncio.sleep(3)
-    # Send completion update
-    await send_step_update(plan_id, step_id, "completed", "Step completed successfully!")
+    # Stream an agent's JSON fields to the UI as they complete
+    # (reports the step as in progress, then completed or failed)
+    await run_streamed_step(plan_id, step_id, agent, "analyze_flow_metrics", work_items_data=work_items_data)
 """
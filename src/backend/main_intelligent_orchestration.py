@@ -8,7 +8,6 @@ import asyncio
 import json
 import logging
 import os
-import re
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
@@ -21,6 +20,9 @@ from azure.ai.projects.aio import AIProjectClient
 from azure.identity.aio import DefaultAzureCredential
 import dotenv
 
+from common.config.agent_capabilities import AGENT_CAPABILITY_DEFINITIONS, CAPABILITY_PATTERNS
+from common.utils.intent_router import IntentRouter
+
 # Load environment variables
 dotenv.load_dotenv()
 
@@ -66,61 +68,8 @@ class OrchestrationResult(BaseModel):
 
 # Define agent capabilities for intelligent routing
 AGENT_CAPABILITIES = {
-    "BacklogIntelligence": AgentCapability(
-        name="BacklogIntelligence",
-        keywords=["user story", "backlog", "epic", "acceptance criteria", "story points", 
-                 "requirements", "feature", "epic", "prioritization", "story creation"],
-        description="Specializes in user story creation, backlog analysis, and requirement gathering",
-        examples=[
-            "Create user stories for a login feature",
-            "Analyze the current backlog priorities",
-            "Generate acceptance criteria for this requirement"
-        ]
-    ),
-    "MeetingIntelligence": AgentCapability(
-        name="MeetingIntelligence", 
-        keywords=["meeting", "standup", "retrospective", "sprint planning", "review",
-                 "action items", "impediments", "ceremony", "daily scrum", "agenda"],
-        description="Analyzes meetings, extracts action items, and facilitates agile ceremonies",
-        examples=[
-            "Analyze this meeting transcript",
-            "Extract action items from the standup",
-            "Prepare retrospective agenda"
-        ]
-    ),
-    "FlowMetrics": AgentCapability(
-        name="FlowMetrics",
-        keywords=["metrics", "velocity", "cycle time", "lead time", "burndown", 
-                 "throughput", "bottleneck", "performance", "delivery", "analytics"],
-        description="Analyzes team delivery metrics and identifies performance bottlenecks",
-        examples=[
-            "Show team velocity trends",
-            "Identify delivery bottlenecks", 
-            "Calculate cycle time metrics"
-        ]
-    ),
-    "TeamWellness": AgentCapability(
-        name="TeamWellness",
-        keywords=["wellness", "burnout", "sentiment", "morale", "stress", "workload",
-                 "satisfaction", "engagement", "team health", "psychological safety"],
-        description="Monitors team sentiment and provides wellness recommendations", 
-        examples=[
-            "Analyze team sentiment from Slack",
-            "Check for burnout indicators",
-            "Assess team wellness metrics"
-        ]
-    ),
-    "AgileCoaching": AgentCapability(
-        name="AgileCoaching",
-        keywords=["agile", "scrum", "coaching", "process", "improvement", "best practices",
-                 "facilitation", "transformation", "methodology", "framework"],
-        description="Provides agile coaching and process improvement guidance",
-        examples=[
-            "How can we improve our sprint planning?",
-            "Best practices for retrospectives",
-            "Agile transformation guidance"
-        ]
-    )
+    name: AgentCapability(name=name, **definition)
+    for name, definition in AGENT_CAPABILITY_DEFINITIONS.items()
 }
 
 
@@ -148,66 +97,27 @@ async def get_ai_client() -> AIProjectClient:
     return ai_client
 
 
+# Keyword and pattern index built once at startup; exact keyword matches score 10,
+# keyword matches 3 and pattern matches 5
+intent_router = IntentRouter(
+    {name: capability.keywords for name, capability in AGENT_CAPABILITIES.items()},
+    CAPABILITY_PATTERNS
+)
+
+
 def analyze_user_intent(message: str) -> Dict[str, float]:
     """
     Analyze user message and score it against agent capabilities
     Returns capability scores for intelligent agent selection
     """
-    message_lower = message.lower()
-    scores = {}
-    
-    for capability_name, capability in AGENT_CAPABILITIES.items():
-        score = 0.0
-        
-        # Keyword matching with different weights
-        for keyword in capability.keywords:
-            if keyword in message_lower:
-                # Exact match gets higher score
-                if keyword == message_lower.strip():
-                    score += 10.0
-                # Phrase match gets medium score
-                elif keyword in message_lower:
-                    score += 3.0
-        
-        # Context analysis - look for related patterns
-        if capability_name == "BacklogIntelligence":
-            patterns = [r'\b(create|write|generate)\b.*\b(story|stories|feature)\b',
-                       r'\bacceptance\s+criteria\b', r'\buser\s+story\b']
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    score += 5.0
-                    
-        elif capability_name == "MeetingIntelligence":
-            patterns = [r'\b(analyze|summarize)\b.*\b(meeting|transcript)\b',
-                       r'\baction\s+items?\b', r'\bdaily\s+(standup|scrum)\b']
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    score += 5.0
-                    
-        elif capability_name == "FlowMetrics":
-            patterns = [r'\b(show|display|calculate)\b.*\b(metrics|velocity)\b',
-                       r'\bteam\s+performance\b', r'\bcycle\s+time\b']
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    score += 5.0
-                    
-        elif capability_name == "TeamWellness":
-            patterns = [r'\bteam\s+(health|wellness|morale)\b',
-                       r'\bburnout\s+(risk|indicator|analysis)\b']
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    score += 5.0
-                    
-        elif capability_name == "AgileCoaching":
-            patterns = [r'\bhow\s+(can|do|should)\s+we\b.*\b(improve|better)\b',
-                       r'\bbest\s+practices?\b', r'\bagile\s+(process|methodology)\b']
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    score += 5.0
-        
-        scores[capability_name] = score
-    
-    return scores
+    return intent_router.score(message)
+
+
+def analyze_user_intents(messages: List[str]) -> List[Dict[str, float]]:
+    """
+    Score many messages against agent capabilities
+    """
+    return intent_router.score_batch(messages)
 
 
 def select_best_agent(capability_scores: Dict[str, float]) -> tuple[str, float, str]:
@@ -11,7 +11,7 @@ import os
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import HTMLResponse
@@ -19,6 +19,19 @@ from fastapi.security import HTTPBearer
 from pydantic import BaseModel
 import uvicorn
 
+from common.config.agent_capabilities import AGENT_CAPABILITY_DEFINITIONS, CAPABILITY_PATTERNS, CHAT_AGENTS
+from common.utils.conversation_memory import ConversationMemory
+from common.utils.conversation_store import store_from_env
+from common.utils.conversation_summary import ExtractiveSummarizer
+from common.utils.embedding_router import EmbeddingRouter, capability_texts
+from common.utils.embeddings import embedder_from_env
+from common.utils.response_cache import response_cache
+from common.utils.speculation import Speculation, speculation_metrics
+from common.utils.tiered_router import CapabilityClassifier, TieredRouter
+from common.utils.token_usage import token_usage
+from common.utils.tokens import count_tokens
+from common.utils.websocket_streaming import run_streamed_step, websocket_streaming_endpoint
+
 # Azure AI components with graceful fallback
 try:
     from azure.ai.projects.aio import AIProjectClient
@@ -33,8 +46,7 @@ except ImportError:
 try:
     from semantic_kernel import Kernel
     from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-    from semantic_kernel.functions import KernelFunctionFromPrompt
-    from semantic_kernel.prompt_template import InputVariable, PromptTemplateConfig
+    from common.utils.prompt_registry import prompt_registry
     SEMANTIC_KERNEL_AVAILABLE = True
     logger_sk = logging.getLogger("semantic_kernel")
     logger_sk.setLevel(logging.WARNING)  # Reduce SK logging
@@ -43,6 +55,23 @@ except ImportError:
     Kernel = None
     AzureChatCompletion = None
 
+# Structured-analysis agents (Semantic Kernel based) and the methods exposed per agent
+try:
+    from agents.agile_coaching_agent import AgileCoachingAgent
+    from agents.backlog_intelligence_agent import BacklogIntelligenceAgent
+    from agents.flow_metrics_agent import FlowMetricsAgent
+    from agents.meeting_intelligence_agent import MeetingIntelligenceAgent
+    from agents.team_wellness_agent import TeamWellnessAgent
+    STRUCTURED_ANALYSES = {
+        "backlog": (BacklogIntelligenceAgent, {"create_user_stories", "generate_acceptance_criteria", "break_down_epic"}),
+        "meeting": (MeetingIntelligenceAgent, {"analyze_meeting_transcript", "extract_action_items", "detect_impediments", "facilitate_ceremony"}),
+        "metrics": (FlowMetricsAgent, {"analyze_flow_metrics", "identify_bottlenecks", "generate_forecast"}),
+        "wellness": (TeamWellnessAgent, {"analyze_team_sentiment", "detect_burnout_risk", "analyze_team_dynamics", "recommend_interventions"}),
+        "coaching": (AgileCoachingAgent, {"synthesize_coaching_insights", "optimize_processes", "develop_team_coaching_plan"}),
+    }
+except ImportError:
+    STRUCTURED_ANALYSES = {}
+
 # Load environment
 import dotenv
 dotenv.load_dotenv()
@@ -87,13 +116,10 @@ ai_client = None
 semantic_kernel = None
 sm_agents = {}
 sk_enhanced = False
+structured_agents = {}
 
-# Global conversation history storage (in production, use database/redis)
-conversation_histories = {}
-
-class ConversationManager:
-    def __init__(self):
-        self.max_history_length = 10  # Keep last 10 exchanges
+class ConversationManager(ConversationMemory):
+    """Bounded conversation histories (see common.utils.conversation_memory) keyed per client"""
     
     def get_conversation_id(self, request: Request) -> str:
         """Generate or get conversation ID from session/request"""
@@ -101,41 +127,17 @@ class ConversationManager:
         # For demo, use a simple approach based on IP
         client_ip = getattr(request.client, 'host', 'default')
         return f"conversation_{client_ip}"
-    
-    def add_to_history(self, conversation_id: str, user_message: str, assistant_response: str, agent_name: str = "SM-Assistant"):
-        """Add exchange to conversation history"""
-        if conversation_id not in conversation_histories:
-            conversation_histories[conversation_id] = []
-        
-        conversation_histories[conversation_id].append({
-            "user": user_message,
-            "assistant": assistant_response,
-            "agent": agent_name,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        # Keep only recent history
-        if len(conversation_histories[conversation_id]) > self.max_history_length:
-            conversation_histories[conversation_id] = conversation_histories[conversation_id][-self.max_history_length:]
-    
-    def get_context_string(self, conversation_id: str) -> str:
-        """Get conversation history as context string"""
-        if conversation_id not in conversation_histories:
-            return ""
-        
-        history = conversation_histories[conversation_id]
-        if not history:
-            return ""
-        
-        context_parts = ["Previous conversation context:"]
-        for exchange in history[-5:]:  # Use last 5 exchanges for context
-            context_parts.append(f"User: {exchange['user']}")
-            context_parts.append(f"{exchange['agent']}: {exchange['assistant'][:500]}...")  # Truncate long responses
-        
-        return "\n".join(context_parts) + "\n\nCurrent request:"
 
 # Initialize conversation manager
-conversation_manager = ConversationManager()
+conversation_manager = ConversationManager(
+    max_conversations=int(os.getenv("CONVERSATION_MAX_COUNT", "10000")),
+    max_memory_chars=int(os.getenv("CONVERSATION_MAX_MEMORY_CHARS", str(64 * 1024 * 1024))),
+    idle_ttl=float(os.getenv("CONVERSATION_IDLE_TTL_SECONDS", "3600")),
+    # Context is a running summary plus the last exchange instead of the last five exchanges
+    summarizer=ExtractiveSummarizer(max_tokens=int(os.getenv("CONVERSATION_SUMMARY_TOKENS", "300"))),
+    # Optional durable store (CONVERSATION_STORE=sqlite|cosmos) so sessions survive restarts and replicas
+    store=store_from_env()
+)
 
 class ChatRequest(BaseModel):
     message: str
@@ -143,6 +145,11 @@ class ChatRequest(BaseModel):
     team_id: Optional[str] = "scrum_master_team"
     user_id: Optional[str] = "default_user"
 
+class AnalysisRequest(BaseModel):
+    plan_id: str
+    step_id: Optional[str] = None
+    arguments: Dict[str, Any] = {}
+
 async def initialize_azure_ai():
     """Initialize Azure AI Foundry connection (from working version)"""
     global ai_client
@@ -216,6 +223,13 @@ async def initialize_semantic_kernel():
             )
             semantic_kernel.add_service(chat_completion)
             sk_enhanced = True
+            
+            # Compile the router and agent prompts once, before the first request
+            _router_function()
+            for agent_name in AGENT_PROMPTS:
+                _agent_function(agent_name)
+            for agent_name, (agent_class, _) in STRUCTURED_ANALYSES.items():
+                structured_agents[agent_name] = agent_class(semantic_kernel, deployment_name)
             logger.info(f"✅ Semantic Kernel enhancement active: {deployment_name}")
             return True
         else:
@@ -254,14 +268,7 @@ async def load_sm_agents():
     except Exception as e:
         logger.error(f"❌ Failed to load SM agents: {e}")
 
-async def intelligent_agent_router(message: str) -> str:
-    """Use Semantic Kernel to intelligently route messages to the appropriate agent"""
-    
-    if not sk_enhanced or not semantic_kernel:
-        return "coaching"  # Default fallback
-    
-    try:
-        router_prompt = f"""You are an intelligent agent router for a Scrum Master Assistant system. 
+ROUTER_PROMPT = """You are an intelligent agent router for a Scrum Master Assistant system. 
 Analyze the user's message and determine which specialized agent should handle it.
 
 Available agents:
@@ -271,115 +278,172 @@ Available agents:
 - metrics: Velocity, cycle time, flow metrics, performance analysis, bottleneck identification
 - wellness: Team sentiment, burnout detection, team health, engagement monitoring
 
-User message: "{message}"
+User message: "{{$message}}"
 
 Respond with ONLY the agent name (coaching, backlog, meeting, metrics, or wellness) that best matches this request."""
 
-        # Create simple routing function
-        prompt_config = PromptTemplateConfig(
-            template=router_prompt,
-            name="agent_router",
-            description="Routes messages to appropriate SM-Assistant agent"
-        )
-        
-        router_function = KernelFunctionFromPrompt(
-            function_name="agent_router",
-            prompt_template_config=prompt_config
-        )
-        
-        # Execute with short timeout
-        result = await asyncio.wait_for(
-            semantic_kernel.invoke(router_function),
-            timeout=5.0
-        )
-        
-        # Extract agent name from result
-        agent_choice = str(result).strip().lower()
-        valid_agents = ["coaching", "backlog", "meeting", "metrics", "wellness"]
-        
-        if agent_choice in valid_agents:
-            return agent_choice
-        else:
-            return "coaching"  # Default fallback
-            
-    except Exception as e:
-        logger.warning(f"Agent routing failed: {e}, defaulting to coaching")
-        return "coaching"
-
-async def enhanced_chat_with_sk(message: str, agent_name: str) -> Dict[str, Any]:
-    """Enhanced chat using Semantic Kernel with conversation context"""
-    
-    if not sk_enhanced or not semantic_kernel:
-        return None  # Fall back to Azure AI Foundry
-    
-    try:
-        # Enhanced agent prompts with context awareness for SK
-        agent_prompts = {
-            "backlog": f"""You are a Backlog Intelligence Agent specialized in user stories, acceptance criteria, and backlog management.
+# Enhanced agent prompts with context awareness for SK
+AGENT_PROMPTS = {
+    "backlog": """You are a Backlog Intelligence Agent specialized in user stories, acceptance criteria, and backlog management.
 
 IMPORTANT: If the user has previously mentioned specific stories, backlogs, or requirements in our conversation, reference them directly in your response. Don't ask for information that was already provided in our chat history.
 
-User request: {message}
+User request: {{$message}}
 
 Provide specific, actionable guidance for backlog management, user story creation, and agile planning.""",
 
-            "meeting": f"""You are a Meeting Intelligence Agent specialized in analyzing meetings, extracting action items, and identifying impediments.
+    "meeting": """You are a Meeting Intelligence Agent specialized in analyzing meetings, extracting action items, and identifying impediments.
 
 IMPORTANT: If the user has previously shared meeting content, standups, or team discussions in our conversation, reference them directly in your response. Don't ask for information that was already provided.
 
-User request: {message}
+User request: {{$message}}
 
 Analyze meeting content and provide insights about team dynamics, action items, and potential blockers.""",
 
-            "metrics": f"""You are a Flow Metrics Agent specialized in velocity, cycle time, and performance analysis.
+    "metrics": """You are a Flow Metrics Agent specialized in velocity, cycle time, and performance analysis.
 
 IMPORTANT: If the user has previously shared velocity data, sprint metrics, or team performance information in our conversation, reference them directly in your response. Don't ask for information that was already provided.
 
-User request: {message}
+User request: {{$message}}
 
 Provide data-driven insights about team performance and actionable recommendations for improvement.""",
 
-            "wellness": f"""You are a Team Wellness Agent specialized in assessing team health, sentiment, and burnout prevention.
+    "wellness": """You are a Team Wellness Agent specialized in assessing team health, sentiment, and burnout prevention.
 
 IMPORTANT: If the user has previously shared team sentiment, wellness concerns, or stress indicators in our conversation, reference them directly in your response. Don't ask for information that was already provided.
 
-User request: {message}
+User request: {{$message}}
 
 Assess team wellness and provide recommendations for maintaining healthy team dynamics.""",
 
-            "coaching": f"""You are an Agile Coaching Agent providing strategic guidance for Scrum Masters and agile teams.
+    "coaching": """You are an Agile Coaching Agent providing strategic guidance for Scrum Masters and agile teams.
 
 IMPORTANT: If the user has previously shared team challenges, process issues, or agile practices in our conversation, reference them directly in your response. Don't ask for information that was already provided.
 
-User request: {message}
+User request: {{$message}}
 
 Provide strategic coaching guidance and actionable recommendations for agile team success."""
-        }
+}
+
+def _router_function():
+    """Compiled router function, shared across requests"""
+    return prompt_registry.get(
+        "agent_router",
+        ROUTER_PROMPT,
+        description="Routes messages to appropriate SM-Assistant agent"
+    )
+
+def _agent_function(agent_name: str):
+    """Compiled chat function for an agent, shared across requests"""
+    if agent_name not in AGENT_PROMPTS:
+        agent_name = "coaching"
+    return prompt_registry.get(
+        f"sm_agent_{agent_name}",
+        AGENT_PROMPTS[agent_name],
+        description=f"SM-Assistant {agent_name} agent with context awareness"
+    )
+
+async def intelligent_agent_router(message: str) -> Optional[str]:
+    """Use Semantic Kernel to route messages the local classifier is unsure about"""
+    
+    if not sk_enhanced or not semantic_kernel:
+        return None  # Let the tiered router fall back
+    
+    try:
+        router_function = _router_function()
         
-        prompt = agent_prompts.get(agent_name, agent_prompts["coaching"])
+        # Execute with short timeout
+        result = await asyncio.wait_for(
+            semantic_kernel.invoke(router_function, message=message),
+            timeout=5.0
+        )
         
-        # Create and execute function
-        prompt_config = PromptTemplateConfig(
-            template=prompt,
-            name=f"sm_agent_{agent_name}",
-            description=f"SM-Assistant {agent_name} agent with context awareness"
+        # Extract agent name from result
+        agent_choice = str(result).strip().lower()
+        token_usage.record(
+            "SM-Assistant-Router",
+            router_function.name,
+            count_tokens(ROUTER_PROMPT) + count_tokens(message),
+            count_tokens(agent_choice)
         )
+        valid_agents = ["coaching", "backlog", "meeting", "metrics", "wellness"]
         
-        function = KernelFunctionFromPrompt(
-            function_name=f"sm_agent_{agent_name}",
-            prompt_template_config=prompt_config
+        if agent_choice in valid_agents:
+            return agent_choice
+        else:
+            return None
+            
+    except Exception as e:
+        logger.warning(f"Agent routing failed: {e}, using local routing")
+        return None
+
+# Keyword, pattern and example-word classifier tried before the LLM router;
+# only messages it is unsure about cost an LLM call
+agent_router = TieredRouter(
+    CapabilityClassifier(
+        {name: definition["keywords"] for name, definition in AGENT_CAPABILITY_DEFINITIONS.items()},
+        CAPABILITY_PATTERNS,
+        {name: definition["examples"] for name, definition in AGENT_CAPABILITY_DEFINITIONS.items()}
+    ),
+    CHAT_AGENTS,
+    fallback=intelligent_agent_router,
+    default_agent="coaching",
+    confidence_threshold=0.35,
+    embedding_timeout=float(os.getenv("ROUTER_EMBEDDING_TIMEOUT_SECONDS", "1.0"))
+)
+
+# Start the likeliest agent while the LLM router decides; a wrong guess is cancelled
+# and its prompt tokens are wasted (see /api/diagnostics/routing)
+SPECULATIVE_ROUTING = os.getenv("SPECULATIVE_ROUTING", "false").lower() in ["true", "1"]
+SPECULATION_MIN_CONFIDENCE = float(os.getenv("SPECULATION_MIN_CONFIDENCE", "0.1"))
+
+def _response_tokens(result: Any) -> int:
+    """Completion tokens of a chat result, for speculative calls that finished but were discarded"""
+    return count_tokens(result.get("response", "")) if isinstance(result, dict) else 0
+
+async def initialize_embedding_router():
+    """Add embedding similarity routing; capability vectors are cached on disk"""
+    try:
+        texts = capability_texts(AGENT_CAPABILITY_DEFINITIONS)
+        embedder = embedder_from_env([text for rows in texts.values() for text in rows])
+        agent_router.embeddings = await EmbeddingRouter.create(
+            embedder,
+            texts,
+            os.getenv("ROUTER_VECTORS_PATH") or None
         )
+        logger.info(f"✅ Embedding routing active: {embedder.name}")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Embedding routing unavailable: {e}")
+        return False
+
+async def enhanced_chat_with_sk(message: str, agent_name: str) -> Dict[str, Any]:
+    """Enhanced chat using Semantic Kernel with conversation context"""
+    
+    if not sk_enhanced or not semantic_kernel:
+        return None  # Fall back to Azure AI Foundry
+    
+    try:
+        function = _agent_function(agent_name)
         
         # Execute with longer timeout for complex analysis
         result = await asyncio.wait_for(
-            semantic_kernel.invoke(function),
+            semantic_kernel.invoke(function, message=message),
             timeout=60.0  # Increased from 15s to 60s for metrics analysis
         )
         
+        response = str(result)
+        token_usage.record(
+            f"SM-Assistant-{agent_name.title()}",
+            function.name,
+            count_tokens(AGENT_PROMPTS.get(agent_name, AGENT_PROMPTS["coaching"])) + count_tokens(message),
+            count_tokens(response)
+        )
+        
         return {
             "success": True,
             "agent_name": f"SM-Assistant-{agent_name.title()}",
-            "response": str(result),
+            "response": response,
             "semantic_kernel_enhanced": True,
             "timestamp": datetime.now().isoformat()
         }
@@ -517,12 +581,40 @@ async def health_check():
             "timestamp": datetime.now().isoformat()
         }
 
+@app.get("/api/diagnostics/tokens")
+async def token_diagnostics(top: int = 10):
+    """Prompt and completion token usage per agent and endpoint"""
+    return token_usage.summary(limit=top)
+
+@app.get("/api/diagnostics/cache")
+async def cache_diagnostics():
+    """LLM response cache size and hit rates per agent"""
+    return response_cache.stats()
+
+@app.get("/api/diagnostics/routing")
+async def routing_diagnostics():
+    """Share and latency of each smart-chat routing tier, plus speculative call outcomes"""
+    return {
+        **agent_router.stats(),
+        "speculation": {
+            "enabled": SPECULATIVE_ROUTING,
+            "min_confidence": SPECULATION_MIN_CONFIDENCE,
+            **speculation_metrics.summary()
+        }
+    }
+
+@app.get("/api/diagnostics/conversations")
+async def conversation_diagnostics():
+    """Conversations held in memory, their approximate size, evictions and store writes"""
+    return conversation_manager.stats()
+
 @app.post("/agents/chat")
 async def chat_with_agent_endpoint(chat_request: ChatRequest, request: Request):
     """Manual chat endpoint with conversation context"""
     try:
         # Get conversation context
         conversation_id = conversation_manager.get_conversation_id(request)
+        await conversation_manager.load(conversation_id)
         conversation_context = conversation_manager.get_context_string(conversation_id)
         
         # Include context in the message
@@ -588,33 +680,57 @@ async def smart_chat_with_routing(chat_request: ChatRequest, request: Request):
     try:
         # Get conversation context
         conversation_id = conversation_manager.get_conversation_id(request)
+        await conversation_manager.load(conversation_id)
         conversation_context = conversation_manager.get_context_string(conversation_id)
         
-        # Include context in the message for routing and processing
+        # Include context in the message for processing
         message_with_context = f"{conversation_context}\n{chat_request.message}" if conversation_context else chat_request.message
         
-        # Use intelligent routing to determine the best agent
-        if sk_enhanced:
-            routed_agent = await intelligent_agent_router(message_with_context)
-            logger.info(f"Smart routing selected: {routed_agent} for message: {chat_request.message[:50]}...")
-        else:
-            routed_agent = "coaching"  # Default fallback
+        speculation = Speculation(speculation_metrics, _response_tokens) if SPECULATIVE_ROUTING else None
         
-        # Create new request with routed agent and context
-        routed_request = ChatRequest(
-            message=message_with_context,
-            agent=routed_agent,
-            team_id=chat_request.team_id,
-            user_id=chat_request.user_id
-        )
+        def speculate(candidate: Optional[str], confidence: float):
+            # Called only when the LLM router is about to run
+            if speculation is None or candidate is None or confidence < SPECULATION_MIN_CONFIDENCE:
+                return
+            speculation.start(
+                candidate,
+                chat_with_agent(ChatRequest(
+                    message=message_with_context,
+                    agent=candidate,
+                    team_id=chat_request.team_id,
+                    user_id=chat_request.user_id
+                )),
+                prompt_tokens=count_tokens(AGENT_PROMPTS.get(candidate, AGENT_PROMPTS["coaching"])) + count_tokens(message_with_context)
+            )
         
-        # Process with the selected agent
-        result = await chat_with_agent(routed_request)
+        # Route locally when confident; the LLM router also sees the conversation context
+        try:
+            routing = await agent_router.route(chat_request.message, conversation_context, on_fallback=speculate)
+            routed_agent = routing.agent
+            logger.info(f"Smart routing selected: {routed_agent} ({routing.tier}, confidence {routing.confidence}) for message: {chat_request.message[:50]}...")
+            
+            # Create new request with routed agent and context
+            routed_request = ChatRequest(
+                message=message_with_context,
+                agent=routed_agent,
+                team_id=chat_request.team_id,
+                user_id=chat_request.user_id
+            )
+            
+            # Keep the speculative call if it guessed right, otherwise process with the selected agent
+            result = await speculation.resolve(routed_agent) if speculation is not None else None
+        finally:
+            # No-op once resolved; otherwise routing failed or the request was cancelled
+            if speculation is not None:
+                speculation.cancel()
+        if result is None:
+            result = await chat_with_agent(routed_request)
         
         # Add routing information to the response
         if isinstance(result, dict):
             result["routed_to"] = routed_agent
             result["smart_routing"] = True
+            result["routing"] = {**routing.to_dict(), "speculation": speculation.outcome if speculation else None}
             
             # Store conversation history
             agent_response = result.get("response", "")
@@ -633,13 +749,42 @@ async def smart_chat_with_routing(chat_request: ChatRequest, request: Request):
             "timestamp": datetime.now().isoformat()
         }
 
+@app.post("/agents/{agent}/analyze/{method}")
+async def structured_analysis(agent: str, method: str, analysis_request: AnalysisRequest):
+    """Run a structured agent analysis as a plan step; its JSON fields stream to the
+    plan's /ws/streaming subscribers as they complete"""
+    if not sk_enhanced or agent not in structured_agents:
+        raise HTTPException(status_code=503, detail=f"Structured analysis unavailable for {agent}")
+    if method not in STRUCTURED_ANALYSES[agent][1]:
+        raise HTTPException(status_code=404, detail=f"Unknown {agent} analysis: {method}")
+    
+    step_id = analysis_request.step_id or f"{agent}-{method}"
+    try:
+        result = await run_streamed_step(
+            analysis_request.plan_id, step_id, structured_agents[agent], method, **analysis_request.arguments
+        )
+    except TypeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid arguments for {method}: {e}")
+    
+    return {
+        "success": True,
+        "plan_id": analysis_request.plan_id,
+        "step_id": step_id,
+        "result": result,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.websocket("/ws/streaming")
+async def streaming_websocket(websocket: WebSocket):
+    """Subscribe to a plan's step updates and partial agent results"""
+    await websocket_streaming_endpoint(websocket)
+
 @app.post("/agents/clear-conversation")
 async def clear_conversation(request: Request):
     """Clear conversation history for the current session"""
     try:
         conversation_id = conversation_manager.get_conversation_id(request)
-        if conversation_id in conversation_histories:
-            del conversation_histories[conversation_id]
+        conversation_manager.clear(conversation_id)
         
         return {
             "success": True,
@@ -1422,6 +1567,9 @@ async def startup_tasks():
     # Load agents
     await load_sm_agents()
     
+    # Embedding tier for smart-chat routing
+    await initialize_embedding_router()
+    
     if sk_success:
         logger.info("🎉 SM-Assistant Production + Semantic Kernel ready!")
         logger.info(f"   • Semantic Kernel: ✅ Enhanced mode active")
@@ -1431,6 +1579,11 @@ async def startup_tasks():
         logger.info(f"   • Semantic Kernel: ⚠️ Not available (fallback mode)")
         logger.info(f"   • Azure AI Foundry: {'✅' if azure_success else '❌'} {len(sm_agents)} agents")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Write out conversation changes still queued for the store
+    await conversation_manager.close()
+
 @app.on_event("startup")
 async def startup_event():
     await startup_tasks()
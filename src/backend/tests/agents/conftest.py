@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import pytest
+
+from common.utils.response_cache import response_cache
+
+
+class FakeKernel:
+    """Kernel stand-in answering every prompt function with a canned response.
+
+    ``response`` is either the answer itself or a callable taking
+    ``(function_name, arguments)``; answers that are not strings are JSON
+    encoded. Calls are recorded in ``calls`` as ``(function_name, arguments)``
+    and ``peak`` is the most invocations that were in flight at once.
+    """
+
+    def __init__(self, response=None, delay=0.0, chunk_size=7):
+        self.response = {} if response is None else response
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    @property
+    def arguments(self):
+        return [arguments for _, arguments in self.calls]
+
+    async def invoke(self, function, **kwargs):
+        self.calls.append((function.name, kwargs))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        response = self.response(function.name, kwargs) if callable(self.response) else self.response
+        return response if isinstance(response, str) else json.dumps(response)
+
+    async def invoke_stream(self, function, **kwargs):
+        text = await self.invoke(function, **kwargs)
+        for start in range(0, len(text), self.chunk_size):
+            yield [text[start:start + self.chunk_size]]
+
+
+@pytest.fixture
+def fake_kernel():
+    """Factory for ``FakeKernel`` instances, taking the same arguments."""
+    return FakeKernel
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
@@ -0,0 +1,64 @@
+import pytest
+
+from src.backend.agents.backlog_intelligence_agent import BacklogIntelligenceAgent
+from src.backend.agents.team_wellness_agent import TeamWellnessAgent
+
+
+@pytest.mark.asyncio
+async def test_agent_forwards_streamed_fields_to_partial_handler(fake_kernel):
+    response = 'Analysis:\n{"sentiment_analysis": {"overall_sentiment": "Positive"}, "recommendations": ["Celebrate"]}'
+    agent = TeamWellnessAgent(fake_kernel(response))
+    partials = []
+
+    async def handler(agent_name, function_name, field, value):
+        partials.append((function_name, field, value))
+
+    agent.partial_handler = handler
+    result = await agent.analyze_team_sentiment("standup notes")
+
+    assert result["success"] is True
+    assert result["sentiment_analysis"]["recommendations"] == ["Celebrate"]
+    assert partials == [
+        ("analyze_sentiment", "sentiment_analysis", {"overall_sentiment": "Positive"}),
+        ("analyze_sentiment", "recommendations", ["Celebrate"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_backlog_agent_keeps_raw_response_when_no_json(fake_kernel):
+    agent = BacklogIntelligenceAgent(fake_kernel("I need more detail first."), "gpt-4o")
+
+    result = await agent.create_user_stories("Login page")
+
+    assert result["success"] is False
+    assert result["raw_response"] == "I need more detail first."
+
+
+@pytest.mark.asyncio
+async def test_streamed_step_broadcasts_partials_to_plan_subscribers(monkeypatch, fake_kernel):
+    from common.utils import websocket_streaming
+
+    broadcasts = []
+
+    async def broadcast_to_plan(message, plan_id):
+        broadcasts.append((plan_id, message["type"], message["data"]))
+
+    monkeypatch.setattr(websocket_streaming.ws_manager, "broadcast_to_plan", broadcast_to_plan)
+    response = '{"sentiment_analysis": {"overall_sentiment": "Positive"}, "recommendations": ["Celebrate"]}'
+    agent = TeamWellnessAgent(fake_kernel(response))
+
+    result = await websocket_streaming.run_streamed_step(
+        "plan-1", "step-1", agent, "analyze_team_sentiment", communications_data="standup notes"
+    )
+
+    assert result["success"] is True
+    assert agent.partial_handler is None
+    assert [(plan, kind) for plan, kind, _ in broadcasts] == [
+        ("plan-1", "step_update"),
+        ("plan-1", "agent_partial"),
+        ("plan-1", "agent_partial"),
+        ("plan-1", "step_update"),
+    ]
+    partials = [(data["field"], data["value"]) for _, kind, data in broadcasts if kind == "agent_partial"]
+    assert partials == [("sentiment_analysis", {"overall_sentiment": "Positive"}), ("recommendations", ["Celebrate"])]
+    assert broadcasts[-1][2]["status"] == "completed"
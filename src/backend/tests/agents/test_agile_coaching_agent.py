@@ -0,0 +1,92 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.backend.agents.agile_coaching_agent import AgileCoachingAgent
+
+
+def coaching_response(function_name, arguments):
+    if function_name == "synthesize_insights":
+        return {"coaching_guidance": {"priorities": ["Unblock Redis"]}}
+    return {"escalation_analysis": {"critical_issues": []}}
+
+
+def specialist(delay, key, value):
+    async def run():
+        await asyncio.sleep(delay)
+        return {"success": True, key: value}
+    return run
+
+
+@pytest.mark.asyncio
+async def test_specialists_synthesis_and_escalations_run_concurrently(fake_kernel):
+    kernel = fake_kernel(coaching_response, delay=0.05)
+    agent = AgileCoachingAgent(kernel)
+
+    started = time.perf_counter()
+    result = await agent.run_coaching_analysis({
+        "backlog": specialist(0.1, "analysis", {"ready": 3}),
+        "meeting": specialist(0.2, "analysis", {"impediments": 1}),
+        "flow": specialist(0.1, "analysis", {"wip": 4}),
+        "wellness": specialist(0.15, "sentiment_analysis", {"mood": "Positive"}),
+    })
+    elapsed = time.perf_counter() - started
+
+    # Slowest specialist (0.2s) plus one concurrent synthesis round (0.05s)
+    assert elapsed < 0.4
+    assert result["success"] is True
+    assert result["partial"] is False
+    assert result["coaching_guidance"]["coaching_guidance"]["priorities"] == ["Unblock Redis"]
+    assert {name for name, _ in kernel.calls} == {"synthesize_insights", "identify_escalations"}
+    nodes = result["execution"]["nodes"]
+    assert abs(nodes["synthesis"]["started_ms"] - nodes["escalations"]["started_ms"]) < 20
+    sent = dict(kernel.calls)["synthesize_insights"]
+    assert json.loads(sent["meeting_insights"])["analysis"] == {"impediments": 1}
+
+
+@pytest.mark.asyncio
+async def test_slow_specialist_is_dropped_after_its_deadline(fake_kernel):
+    kernel = fake_kernel(coaching_response)
+    agent = AgileCoachingAgent(kernel)
+    agent.specialist_timeout = 0.05
+
+    result = await agent.run_coaching_analysis({
+        "flow": specialist(0, "analysis", {"wip": 4}),
+        "wellness": specialist(1, "sentiment_analysis", {}),
+    })
+
+    assert result["success"] is True
+    assert result["partial"] is True
+    assert result["execution"]["nodes"]["wellness"]["status"] == "timeout"
+    assert result["specialist_insights"]["wellness"]["success"] is False
+    sent = dict(kernel.calls)["synthesize_insights"]
+    assert json.loads(sent["backlog_insights"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_unknown_specialist_is_rejected(fake_kernel):
+    agent = AgileCoachingAgent(fake_kernel(coaching_response))
+
+    result = await agent.run_coaching_analysis({"jira": specialist(0, "x", 1)})
+
+    assert result["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_synthesis_prompt_is_fitted_to_the_token_budget(fake_kernel):
+    from common.utils.tokens import count_tokens
+
+    kernel = fake_kernel(coaching_response)
+    agent = AgileCoachingAgent(kernel)
+    agent.prompt_token_budget = 4000
+    huge = {"items": [{"title": f"Story {i}", "notes": "detail " * 50} for i in range(200)]}
+
+    result = await agent.synthesize_coaching_insights({"backlog": huge, "flow": {"wip": 4}}, "Team Atlas")
+
+    sent = kernel.calls[0][1]
+    assert sum(count_tokens(value) for value in sent.values()) <= 4000
+    assert json.loads(sent["flow_insights"]) == {"wip": 4}
+    assert sent["team_context"] == "Team Atlas"
+    assert [t["section"] for t in result["prompt_budget"]["trimmed"]] == ["backlog_insights"]
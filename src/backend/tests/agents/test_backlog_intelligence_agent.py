@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from src.backend.agents.backlog_intelligence_agent import BacklogIntelligenceAgent
+
+STORIES = [
+    {"title": f"Payment gateway {feature}", "description": "Integrate external payment gateway API", "story_points": 8}
+    for feature in ("checkout", "refunds", "webhooks", "retries", "receipts")
+] + [
+    {"title": f"Login form {feature}", "description": "Update the login form", "story_points": 2}
+    for feature in ("validation", "errors", "layout", "copy", "labels")
+]
+
+
+@pytest.mark.asyncio
+async def test_estimate_story_points_falls_back_to_heuristic_on_cold_start():
+    agent = BacklogIntelligenceAgent(kernel=None, deployment_name="gpt-4o")
+
+    result = await agent.estimate_story_points([{"title": "Simple copy change", "description": "Fix typo"}])
+
+    estimate = result["estimates"][0]
+    assert estimate["method"] == "heuristic"
+    assert estimate["estimated_points"] == 1
+    assert estimate["confidence"] is None
+
+
+@pytest.mark.asyncio
+async def test_estimate_story_points_uses_similar_completed_stories():
+    agent = BacklogIntelligenceAgent(kernel=None, deployment_name="gpt-4o")
+    agent.point_estimator.min_history = 5
+
+    indexed = await agent.index_completed_stories(STORIES)
+    result = await agent.estimate_story_points([
+        {"title": "Payment gateway disputes", "description": "Handle disputes from the external payment gateway API"},
+        {"title": "Kubernetes autoscaling"},
+    ])
+
+    assert indexed["stories_indexed"] == 10
+    similar, fallback = result["estimates"]
+    assert similar["method"] == "historical_similarity"
+    assert similar["estimated_points"] == 8
+    assert similar["similar_stories"][0]["points"] == 8
+    assert fallback["method"] == "heuristic"
+    assert result["total_points"] == 8 + fallback["estimated_points"]
+
+
+def ready_chunk(function_name, arguments):
+    """Answers each backlog chunk with every story ready."""
+    stories = json.loads(arguments["backlog_items"])
+    return "Analysis:\n" + json.dumps({
+        "summary": {"total_stories": len(stories), "ready_stories": str(len(stories))},
+        "ready_for_sprint": [
+            {"story_key": s["key"], "story_points": s["points"], "readiness_score": s["score"]}
+            for s in stories
+        ],
+        "needs_refinement": [],
+        "sprint_recommendations": {"risk_factors": ["Shared API dependency"]},
+        "overall_recommendations": ["Refine the top of the backlog"],
+    })
+
+
+@pytest.mark.asyncio
+async def test_analyze_backlog_maps_chunks_concurrently_and_reduces(fake_kernel):
+    kernel = fake_kernel(ready_chunk, delay=0.01)
+    agent = BacklogIntelligenceAgent(kernel, "gpt-4o")
+    agent.backlog_chunk_tokens = 60
+    agent.max_concurrent_analyses = 2
+    backlog = [
+        {"key": f"PROJ-{i}", "title": f"Story {i}", "points": 5, "score": i}
+        for i in range(12)
+    ]
+
+    result = await agent.analyze_backlog(backlog, sprint_capacity=20)
+
+    pipeline = result["pipeline"]
+    assert result["success"] is True
+    assert pipeline["chunks"] == len(kernel.calls) > 1
+    assert kernel.peak == 2
+    assert set(pipeline["timings_ms"]) == {"chunking", "analysis", "reduce", "total"}
+    assert pipeline["tokens"]["prompt"] == sum(c["prompt_tokens"] for c in pipeline["tokens"]["per_chunk"])
+
+    analysis = result["analysis"]
+    assert analysis["summary"]["total_stories"] == 12
+    assert analysis["summary"]["ready_stories"] == 12
+    assert analysis["sprint_recommendations"]["suggested_stories"] == ["PROJ-11", "PROJ-10", "PROJ-9", "PROJ-8"]
+    assert analysis["sprint_recommendations"]["capacity_utilization"] == "100%"
+    assert analysis["sprint_recommendations"]["risk_factors"] == ["Shared API dependency"]
+    assert analysis["overall_recommendations"] == ["Refine the top of the backlog"]
+
+
+@pytest.mark.asyncio
+async def test_analyze_backlog_small_backlog_is_a_single_call(fake_kernel):
+    kernel = fake_kernel(ready_chunk, delay=0.01)
+    agent = BacklogIntelligenceAgent(kernel, "gpt-4o")
+
+    result = await agent.analyze_backlog([{"key": "PROJ-1", "points": 3, "score": 8}])
+
+    assert len(kernel.calls) == 1
+    assert result["analysis"]["summary"]["ready_stories"] == "1"
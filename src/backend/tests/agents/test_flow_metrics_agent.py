@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from src.backend.agents.flow_metrics_agent import FlowMetricsAgent
+
+
+WORK_ITEMS = [
+    {
+        "id": "US-1",
+        "status": "Done",
+        "created_date": "2024-01-01T00:00:00Z",
+        "start_date": "2024-01-02T00:00:00Z",
+        "end_date": "2024-01-05T00:00:00Z",
+    },
+    {
+        "id": "US-2",
+        "status": "In Progress",
+        "created_date": "2024-01-03T00:00:00Z",
+        "start_date": "2024-01-04T00:00:00Z",
+    },
+]
+
+
+@pytest.mark.asyncio
+async def test_calculate_key_metrics_keeps_existing_keys(fake_kernel):
+    agent = FlowMetricsAgent(fake_kernel({}))
+
+    result = await agent.calculate_key_metrics(WORK_ITEMS)
+
+    assert result["success"] is True
+    metrics = result["metrics"]
+    assert metrics["average_cycle_time_days"] == 3.0
+    assert metrics["average_lead_time_days"] == 4.0
+    assert metrics["throughput_items"] == 1
+    assert metrics["total_items_analyzed"] == 2
+    assert metrics["completion_rate"] == 50.0
+    assert metrics["work_in_progress"]["current_wip"] == 1
+
+
+@pytest.mark.asyncio
+async def test_analyze_flow_metrics_sends_only_the_summary(fake_kernel):
+    kernel = fake_kernel({"flow_metrics": {}})
+    agent = FlowMetricsAgent(kernel)
+
+    result = await agent.analyze_flow_metrics(json.dumps({"stories": WORK_ITEMS}))
+
+    assert result["success"] is True
+    sent = kernel.arguments[0]
+    assert "US-2" not in sent["work_items_data"]
+    assert json.loads(sent["computed_metrics"])["total_items"] == 2
+
+
+@pytest.mark.asyncio
+async def test_analyze_flow_metrics_passes_free_text_through(fake_kernel):
+    kernel = fake_kernel({"flow_metrics": {}})
+    agent = FlowMetricsAgent(kernel)
+
+    await agent.analyze_flow_metrics("Cycle time has been creeping up this sprint")
+
+    sent = kernel.arguments[0]
+    assert sent["computed_metrics"] == "Not available"
+    assert sent["work_items_data"] == "Cycle time has been creeping up this sprint"
+
+
+@pytest.mark.asyncio
+async def test_generate_forecast_grounds_prompt_in_simulation(fake_kernel):
+    kernel = fake_kernel({"delivery_forecast": {}})
+    agent = FlowMetricsAgent(kernel)
+
+    result = await agent.generate_forecast(json.dumps(WORK_ITEMS), upcoming_work="12")
+
+    assert result["success"] is True
+    simulation = json.loads(kernel.arguments[0]["simulation"])
+    assert simulation["completion"]["items"] == 12
+    assert simulation["throughput"]["days"] == 14
+    assert simulation["history"]["items"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ingest_transitions_feeds_live_metrics_into_analysis(fake_kernel):
+    kernel = fake_kernel({"flow_metrics": {}})
+    agent = FlowMetricsAgent(kernel)
+
+    result = await agent.ingest_transitions([
+        {"issue": "US-1", "from": None, "to": "To Do", "timestamp": "2024-01-01T00:00:00Z"},
+        {"issue": "US-1", "from": "To Do", "to": "In Progress", "timestamp": "2024-01-02T00:00:00Z"},
+        {"issue": "US-1", "from": "In Progress", "to": "Done", "timestamp": "2024-01-04T00:00:00Z"},
+    ])
+    await agent.analyze_flow_metrics("How is our flow this sprint?")
+
+    assert result["events_applied"] == 3
+    assert result["metrics"]["cycle_time"]["average_days"] == 2.0
+    assert json.loads(kernel.arguments[0]["computed_metrics"])["completed_items"] == 1
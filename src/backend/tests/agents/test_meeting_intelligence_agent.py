@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from common.analytics.transcripts import parse_transcript
+from src.backend.agents.meeting_intelligence_agent import MeetingIntelligenceAgent
+
+STANDUP = Path(__file__).parents[4] / "test_data" / "meeting_transcripts" / "daily_standup_2024-01-18.md"
+
+
+def chunk_response(function_name, arguments):
+    """Reports the same Redis impediment and action item for every chunk."""
+    action = {"description": "Follow up on the Redis cluster timeline", "owner": "Jane"}
+    impediment = {"description": "Waiting for the Redis cluster", "affected_person": "Mike"}
+    return {
+        "analyze_meeting": {
+            "meeting_summary": "Chunk summary.",
+            "action_items": [action],
+            "impediments": [impediment],
+            "team_sentiment": {"overall_mood": "Positive"},
+            "ceremony_effectiveness": {"score": "8", "strengths": ["Focused"]},
+        },
+        "extract_action_items": {"action_items": [action]},
+        "detect_impediments": {"impediments": [impediment]},
+    }[function_name]
+
+
+@pytest.fixture(autouse=True)
+def clear_transcript_cache():
+    parse_transcript.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_process_transcript_shares_one_parse_and_merges_chunks(fake_kernel):
+    kernel = fake_kernel(chunk_response, delay=0.01)
+    agent = MeetingIntelligenceAgent(kernel)
+    agent.transcript_chunk_tokens = 300
+    agent.max_concurrent_analyses = 3
+
+    result = await agent.process_transcript(STANDUP.read_text())
+
+    chunks = result["pipeline"]["chunks"]
+    assert result["success"] is True
+    assert chunks > 1
+    assert len(kernel.calls) == 3 * chunks
+    assert kernel.peak == 3
+    assert parse_transcript.cache_info().misses == 1
+    assert result["pipeline"]["speakers"][0] == "Jane Smith"
+    assert result["action_items"]["action_items"] == [
+        {"description": "Follow up on the Redis cluster timeline", "owner": "Jane"}
+    ]
+    assert len(result["impediments"]["impediments"]) == 1
+    assert result["analysis"]["team_sentiment"]["overall_mood"] == "Positive"
+    assert result["analysis"]["ceremony_effectiveness"]["score"] == 8.0
+
+
+@pytest.mark.asyncio
+async def test_short_text_is_sent_unchanged_in_one_call(fake_kernel):
+    kernel = fake_kernel(chunk_response, delay=0.01)
+    agent = MeetingIntelligenceAgent(kernel)
+
+    result = await agent.extract_action_items("Bob will update the README.")
+
+    assert kernel.calls == [("extract_action_items", {"text": "Bob will update the README."})]
+    assert result["action_items"]["action_items"][0]["owner"] == "Jane"
+
+
+@pytest.mark.asyncio
+async def test_participation_stats_are_local_and_llm_only_adds_suggestions(fake_kernel):
+    kernel = fake_kernel({"observations": "Jane leads", "recommendations": ["Rotate facilitation"]})
+    agent = MeetingIntelligenceAgent(kernel)
+
+    result = await agent.analyze_team_participation(STANDUP.read_text())
+    local_only = await agent.analyze_team_participation(STANDUP.read_text(), include_suggestions=False)
+
+    analysis = result["participation_analysis"]
+    assert len(kernel.calls) == 1
+    assert json.loads(kernel.arguments[0]["participation_stats"])["participation_summary"]["total_speakers"] == 5
+    assert analysis["recommendations"] == ["Rotate facilitation"]
+    assert analysis["attendees"]["Jane Smith"]["turns"] == 5
+    assert "recommendations" not in local_only["participation_analysis"]
@@ -0,0 +1,26 @@
+import json
+
+import pytest
+
+from src.backend.agents.team_wellness_agent import TeamWellnessAgent
+
+
+@pytest.mark.asyncio
+async def test_sentiment_prompt_gets_aggregates_instead_of_raw_messages(fake_kernel):
+    kernel = fake_kernel({"sentiment_analysis": {"overall_sentiment": "Neutral"}})
+    agent = TeamWellnessAgent(kernel)
+    agent.max_outlier_messages = 1
+    messages = [{"user": f"dev{i % 4}", "text": f"routine update {i}, all good"} for i in range(200)]
+    messages += [
+        {"user": "dev1", "text": "Honestly exhausted and overwhelmed"},
+        {"user": "dev2", "text": "deploy is broken"},
+    ]
+
+    result = await agent.analyze_team_sentiment(messages)
+
+    assert result["success"] is True
+    assert result["lexicon_analysis"]["overall"]["messages"] == 202
+    summary = json.loads(kernel.arguments[0]["sentiment_summary"])
+    assert summary["outliers"] == [result["lexicon_analysis"]["outliers"][0]]
+    assert summary["outliers"][0]["text"] == "Honestly exhausted and overwhelmed"
+    assert "routine update" not in kernel.arguments[0]["sentiment_summary"]
@@ -0,0 +1,57 @@
+import time
+
+from src.backend.common.analytics.estimation import StoryPointEstimator, benchmark
+
+HISTORY = [
+    {"title": "Login form validation", "description": "Validate email and password fields on the login form", "story_points": 2},
+    {"title": "Login error messages", "description": "Show inline errors on the login form", "story_points": 2},
+    {"title": "Password reset email", "description": "Send password reset email with expiring token", "story_points": 3},
+    {"title": "Payment gateway integration", "description": "Integrate external payment gateway API with retries and webhooks", "story_points": 8},
+    {"title": "Refund via payment gateway", "description": "Issue refunds through the external payment gateway API", "story_points": 8},
+    {"title": "Export report to CSV", "description": "Download the sprint report as a CSV file", "story_points": 3},
+    {"title": "Unsized spike", "description": "Investigate caching options"},
+]
+
+
+def make_estimator(**kwargs):
+    estimator = StoryPointEstimator(min_history=3, **kwargs)
+    estimator.add_stories(HISTORY)
+    return estimator
+
+
+def test_only_stories_with_points_are_indexed():
+    assert len(make_estimator()) == 6
+
+
+def test_estimates_from_nearest_neighbours():
+    estimates = make_estimator(k=3).estimate([
+        {"title": "Partial refund", "description": "Partial refunds through the external payment gateway API"},
+        {"title": "Login form remember me", "description": "Add remember me checkbox to the login form"},
+    ])
+
+    assert estimates[0]["estimated_points"] == 8
+    assert estimates[0]["neighbours"][0]["story"] == "Refund via payment gateway"
+    assert estimates[1]["estimated_points"] == 2
+    assert 0 < estimates[1]["confidence"] <= 1
+
+
+def test_unrelated_or_cold_start_stories_get_no_estimate():
+    assert make_estimator().estimate([{"title": "Kubernetes autoscaling"}]) == [None]
+    assert StoryPointEstimator().estimate([{"title": "Login form"}]) == [None]
+
+
+def test_index_grows_incrementally():
+    estimator = make_estimator(k=1)
+    estimator.estimate([{"title": "Login form"}])
+
+    estimator.add_stories([{"title": "Dark mode theme toggle", "story_points": 5}])
+
+    assert estimator.estimate([{"title": "Dark mode theme"}])[0]["estimated_points"] == 5
+
+
+def test_benchmark_runs_batch_in_one_pass():
+    started = time.perf_counter()
+    result = benchmark(history_size=5_000, batch_size=50)
+
+    assert result["history"] == 5_000
+    assert time.perf_counter() - started < 10
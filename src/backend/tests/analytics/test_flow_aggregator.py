@@ -0,0 +1,129 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.backend.common.analytics.flow_aggregator import FlowAggregator, QuantileSketch
+
+EVENTS = [
+    ("US-1", None, "To Do", "2024-01-01T00:00:00Z"),
+    ("US-1", "To Do", "In Progress", "2024-01-02T00:00:00Z"),
+    ("US-1", "In Progress", "Blocked", "2024-01-03T00:00:00Z"),
+    ("US-1", "Blocked", "In Progress", "2024-01-05T00:00:00Z"),
+    ("US-1", "In Progress", "Done", "2024-01-06T00:00:00Z"),
+    ("US-2", None, "To Do", "2024-01-06T00:00:00Z"),
+    ("US-2", "To Do", "In Progress", "2024-01-07T00:00:00Z"),
+]
+
+
+@pytest.fixture
+def aggregator():
+    aggregator = FlowAggregator()
+    for event in EVENTS:
+        aggregator.add_transition(*event)
+    return aggregator
+
+
+def test_quantile_sketch_stays_within_relative_error():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(1.5, 0.8) for _ in range(20_000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.5, 0.85, 0.95):
+        exact = float(np.quantile(values, q))
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert sketch.average == pytest.approx(sum(values) / len(values))
+
+
+def test_running_metrics(aggregator):
+    metrics = aggregator.metrics()
+
+    assert metrics["completed_items"] == 1
+    assert metrics["work_in_progress"] == 1
+    assert metrics["cycle_time"]["average_days"] == 4.0
+    assert metrics["lead_time"]["average_days"] == 5.0
+    # Two days in progress against two days blocked
+    assert metrics["flow_efficiency"] == 50.0
+    assert metrics["stage_dwell"]["Blocked"]["average_days"] == 2.0
+    assert metrics["status_counts"] == {"Done": 1, "In Progress": 1}
+
+
+def test_metrics_are_cached_until_next_event(aggregator):
+    first = aggregator.metrics()
+    assert aggregator.metrics() is first
+
+    aggregator.add_transition("US-2", "In Progress", "Done", "2024-01-09T00:00:00Z")
+
+    assert aggregator.metrics()["completed_items"] == 2
+
+
+def test_stale_and_repeated_events_are_ignored(aggregator):
+    assert aggregator.add_transition(*EVENTS[-1]) is False
+    assert aggregator.add_transition("US-1", "To Do", "In Progress", "2024-01-02T00:00:00Z") is False
+    assert aggregator.metrics()["events_processed"] == len(EVENTS)
+
+
+def test_cumulative_flow_records_end_of_day_counts(aggregator):
+    diagram = aggregator.cumulative_flow_diagram()
+
+    assert diagram["2024-01-03"] == {"Blocked": 1}
+    assert diagram["2024-01-06"] == {"Done": 1, "To Do": 1}
+    assert diagram["2024-01-07"] == {"Done": 1, "In Progress": 1}
+    assert aggregator.throughput_since("2024-01-06") == 1
+
+
+def test_snapshot_round_trip(aggregator, tmp_path):
+    path = str(tmp_path / "flow.json")
+    aggregator.save(path)
+
+    restored = FlowAggregator.load(path)
+
+    assert restored.metrics() == aggregator.metrics()
+    assert restored.cumulative_flow_diagram() == aggregator.cumulative_flow_diagram()
+    restored.add_transition("US-2", "In Progress", "Done", "2024-01-09T00:00:00Z")
+    assert restored.metrics()["cycle_time"]["count"] == 2
+
+
+def test_consume_accepts_event_dicts():
+    aggregator = FlowAggregator()
+
+    applied = aggregator.consume(
+        {"issue": issue, "from": from_status, "to": to_status, "timestamp": timestamp}
+        for issue, from_status, to_status, timestamp in EVENTS
+    )
+
+    assert applied == len(EVENTS)
+
+
+def test_window_metrics_cover_only_recent_days(aggregator):
+    aggregator.add_transition("US-2", "In Progress", "Done", "2024-01-09T00:00:00Z")
+
+    everything = aggregator.metrics_since("2024-01-01")
+    recent = aggregator.metrics_since("2024-01-07")
+
+    assert everything["cycle_time"] == aggregator.metrics()["cycle_time"]
+    assert everything["flow_efficiency"] == aggregator.metrics()["flow_efficiency"]
+    # Only US-2 finished in the window: two days in progress, three since created
+    assert recent["completed_items"] == 1
+    assert recent["cycle_time"]["average_days"] == 2.0
+    assert recent["lead_time"]["average_days"] == 3.0
+    assert "Blocked" not in recent["stage_dwell"]
+    assert recent["flow_efficiency"] == 100.0
+    assert list(aggregator.cumulative_flow_diagram(since="2024-01-07")) == ["2024-01-07", "2024-01-09"]
+
+
+def test_merged_sketches_match_one_sketch():
+    rng = random.Random(1)
+    values = [rng.lognormvariate(1.0, 0.5) for _ in range(2_000)]
+    whole, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for index, value in enumerate(values):
+        whole.add(value)
+        (first if index % 2 else second).add(value)
+
+    first.merge(second)
+
+    assert first.buckets == whole.buckets
+    assert first.quantile(0.85) == whole.quantile(0.85)
+    assert (first.count, first.min, first.max) == (whole.count, whole.min, whole.max)
@@ -0,0 +1,126 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.backend.common.analytics.flow_metrics import FlowMetricsEngine, parse_dates
+
+NOW = datetime(2024, 3, 1)
+
+
+def make_item(index, created, started=None, finished=None, status="Done"):
+    item = {"id": f"US-{index}", "status": status, "created_date": created}
+    if started:
+        item["start_date"] = started
+    if finished:
+        item["end_date"] = finished
+    return item
+
+
+@pytest.fixture
+def work_items():
+    return [
+        make_item(1, "2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z", "2024-01-04T00:00:00Z"),
+        make_item(2, "2024-01-01T00:00:00Z", "2024-01-03T00:00:00Z", "2024-01-07T00:00:00Z"),
+        make_item(3, "2024-01-05T00:00:00Z", "2024-01-06T00:00:00Z", "2024-01-12T00:00:00Z"),
+        make_item(4, "2024-01-10T00:00:00Z", "2024-01-11T00:00:00Z", "2024-01-19T00:00:00Z"),
+        make_item(5, "2024-02-01T00:00:00Z", "2024-02-20T00:00:00Z", status="In Progress"),
+        make_item(6, "2024-02-10T00:00:00Z", status="To Do"),
+    ]
+
+
+def test_parse_dates_handles_mixed_formats():
+    parsed = parse_dates(
+        ["2024-01-01T10:00:00Z", "2024-01-01T10:00:00+02:00", None, "garbage", datetime(2024, 1, 2)]
+    )
+
+    assert parsed.dtype == np.dtype("datetime64[ms]")
+    assert parsed[0] == np.datetime64("2024-01-01T10:00:00")
+    assert parsed[1] == np.datetime64("2024-01-01T08:00:00")
+    assert np.isnat(parsed[2]) and np.isnat(parsed[3])
+    assert parsed[4] == np.datetime64("2024-01-02")
+
+
+def test_cycle_and_lead_time_distribution(work_items):
+    engine = FlowMetricsEngine(work_items, now=NOW)
+
+    cycle = engine.cycle_time()
+    assert cycle["count"] == 4
+    assert cycle["average_days"] == pytest.approx((2 + 4 + 6 + 8) / 4)
+    assert cycle["median_days"] == pytest.approx(5.0)
+    assert cycle["max_days"] == pytest.approx(8.0)
+    assert cycle["trend"] == "Degrading"
+
+    lead = engine.lead_time()
+    assert lead["average_days"] == pytest.approx((3 + 6 + 7 + 9) / 4)
+
+
+def test_throughput_wip_and_aging(work_items):
+    engine = FlowMetricsEngine(work_items, now=NOW)
+
+    throughput = engine.throughput()
+    assert [p["items"] for p in throughput["periods"]] == [2, 1, 1]
+    assert throughput["periods"][0]["start"] == "2024-01-04"
+
+    wip = engine.work_in_progress()
+    assert wip["current_wip"] == 1
+    assert wip["max_wip"] == 2
+
+    aging = engine.aging()
+    assert aging["count"] == 1
+    assert aging["oldest_items"] == [{"id": "US-5", "age_days": 10.0}]
+    assert aging["older_than_cycle_time_p85"] == 1
+
+
+def test_summary_supports_jira_field_names():
+    stories = [
+        {
+            "key": "ECOM-1",
+            "status": "Done",
+            "created": "2025-09-15T09:30:00Z",
+            "in_development": "2025-09-20T10:15:00Z",
+            "deployed": "2025-09-27T09:30:00Z",
+        }
+    ]
+
+    summary = FlowMetricsEngine(stories, now=NOW).summary()
+
+    assert summary["completed_items"] == 1
+    assert summary["completion_rate"] == 100.0
+    assert summary["cycle_time"]["average_days"] == pytest.approx(6.97, abs=0.01)
+
+
+def test_empty_input_produces_zeroed_summary():
+    summary = FlowMetricsEngine([], now=NOW).summary()
+
+    assert summary["total_items"] == 0
+    assert summary["cycle_time"]["count"] == 0
+    assert summary["throughput"]["periods"] == []
+    assert summary["work_in_progress"]["current_wip"] == 0
+
+
+def test_large_collection_is_summarised_quickly():
+    base = datetime(2023, 1, 1)
+    items = []
+    for i in range(100_000):
+        created = base + timedelta(days=i % 365, hours=i % 24)
+        started = created + timedelta(days=i % 5)
+        done = i % 10 < 7
+        items.append(
+            make_item(
+                i,
+                created.isoformat() + "Z",
+                started.isoformat() + "Z",
+                (started + timedelta(days=i % 11)).isoformat() + "Z" if done else None,
+                "Done" if done else "In Progress",
+            )
+        )
+
+    start = time.perf_counter()
+    summary = FlowMetricsEngine(items, now=NOW).summary()
+    elapsed = time.perf_counter() - start
+
+    assert summary["completed_items"] == 70_000
+    assert summary["cycle_time"]["count"] == 70_000
+    assert elapsed < 5.0
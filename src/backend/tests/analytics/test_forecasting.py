@@ -0,0 +1,79 @@
+import time
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.backend.common.analytics.forecasting import MonteCarloForecaster, benchmark
+
+START = date(2024, 3, 1)
+
+
+def test_constant_history_gives_exact_forecast():
+    forecaster = MonteCarloForecaster([2, 2, 2], trials=500, seed=1)
+
+    completion = forecaster.forecast_completion(10, start=START)
+    assert {v["days"] for v in completion["percentiles"].values()} == {5}
+    assert completion["percentiles"]["p85"]["date"] == "2024-03-06"
+
+    throughput = forecaster.forecast_by_date(date(2024, 3, 15), start=START)
+    assert throughput["days"] == 14
+    assert set(throughput["percentiles"].values()) == {28}
+
+
+def test_seeded_forecasts_are_reproducible():
+    history = [0, 1, 3, 0, 2, 5, 1, 0, 0, 4]
+
+    first = MonteCarloForecaster(history, trials=2000, seed=42).forecast_completion(30, START)
+    second = MonteCarloForecaster(history, trials=2000, seed=42).forecast_completion(30, START)
+
+    assert first == second
+
+
+def test_confidence_levels_are_ordered():
+    forecaster = MonteCarloForecaster([0, 1, 3, 0, 2, 5, 1, 0, 0, 4], trials=5000, seed=7)
+
+    days = [v["days"] for v in forecaster.forecast_completion(40, START)["percentiles"].values()]
+    items = list(forecaster.forecast_throughput(14, START)["percentiles"].values())
+
+    # Higher confidence means a later date and fewer guaranteed items
+    assert days == sorted(days)
+    assert items == sorted(items, reverse=True)
+
+
+def test_simulate_days_extends_past_initial_horizon():
+    forecaster = MonteCarloForecaster([0] * 99 + [10], trials=200, seed=3, max_cells=1000)
+
+    days = forecaster.simulate_days(20)
+
+    assert days.shape == (200,)
+    assert (days >= 2).all()
+
+
+def test_empty_history_is_rejected():
+    with pytest.raises(ValueError):
+        MonteCarloForecaster([0, 0, 0])
+
+
+def test_from_work_items_uses_completion_dates():
+    items = [
+        {"status": "Done", "end_date": "2024-01-01T10:00:00Z"},
+        {"status": "Done", "end_date": "2024-01-01T15:00:00Z"},
+        {"status": "Done", "end_date": "2024-01-03T09:00:00Z"},
+        {"status": "In Progress", "start_date": "2024-01-02T09:00:00Z"},
+    ]
+
+    forecaster = MonteCarloForecaster.from_work_items(items, seed=0)
+
+    np.testing.assert_array_equal(forecaster.history, [2, 0, 1])
+
+
+def test_hundred_thousand_trials_run_quickly():
+    forecaster = MonteCarloForecaster(np.arange(10) % 4, trials=100_000, seed=0)
+
+    started = time.perf_counter()
+    forecaster.forecast_completion(50, START)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert [row["trials"] for row in benchmark(trial_counts=(100, 1000))] == [100, 1000]
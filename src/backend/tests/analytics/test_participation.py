@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from src.backend.common.analytics.participation import (
+    analyze_participation,
+    analyze_participation_batch,
+    benchmark,
+)
+
+STANDUP = Path(__file__).parents[4] / "test_data" / "meeting_transcripts" / "daily_standup_2024-01-18.md"
+
+HEATED = """**Attendees:** Ann (SM), Raj (Dev), Lee (QA)
+
+**Ann:**
+Can we talk about the release date? I think--
+
+**Raj:**
+Sorry, the pipeline is red again? I'm frustrated with it. We need to fix the flaky tests before anything else and I want everyone to stop merging until the suite is green.
+
+**Ann:**
+Agreed, thanks Raj.
+"""
+
+
+def test_counts_turns_share_questions_and_interruptions():
+    stats = analyze_participation(HEATED)
+
+    raj, ann = stats["attendees"]["Raj"], stats["attendees"]["Ann"]
+    assert (ann["turns"], raj["turns"]) == (2, 1)
+    assert raj["interruptions"] == 1 and ann["interrupted"] == 1
+    assert ann["questions"] == 1 and ann["question_ratio"] == 0.5
+    assert stats["participation_summary"]["dominant_speakers"] == ["Raj"]
+    assert stats["participation_summary"]["quiet_participants"] == ["Lee"]
+    assert stats["participation_summary"]["balanced_discussion"] is False
+    assert stats["engagement_indicators"]["tension_indicators"] == 2
+    assert stats["engagement_indicators"]["positive_interactions"] == 2
+
+
+def test_speaking_shares_sum_to_one_on_sample_standup():
+    stats = analyze_participation(STANDUP.read_text())
+
+    shares = [a["speaking_share"] for a in stats["attendees"].values()]
+    assert stats["participation_summary"]["total_speakers"] == 5
+    assert abs(sum(shares) - 1) < 0.01
+
+
+def test_batch_totals_per_attendee():
+    batch = analyze_participation_batch([HEATED, HEATED])
+
+    assert len(batch["meetings"]) == 2
+    assert batch["attendees"]["Ann"]["meetings"] == 2
+    assert batch["attendees"]["Ann"]["turns"] == 4
+
+
+def test_analysis_is_fast():
+    assert benchmark(iterations=50)["analysis_us"] < 5_000
@@ -0,0 +1,78 @@
+import json
+
+from src.backend.common.analytics.sentiment import (
+    SentimentLexicon,
+    analyze_messages,
+    benchmark,
+    parse_communications,
+    score_message,
+    score_messages,
+)
+
+
+def test_terms_match_on_word_boundaries_and_emoji_anywhere():
+    assert score_message("debugging the goodbye flow")["sentiment"] == "neutral"
+    assert score_message("great👍 :tada:")["positive_signals"] == 3
+    assert score_message("good good good")["positive_signals"] == 3
+
+
+def test_phrases_apostrophes_and_stress():
+    scored = score_message("Stuck again, I can’t handle this, too much pressure")
+
+    assert scored["sentiment"] == "negative"
+    assert scored["score"] == -1.0
+    assert scored["stress_indicators"] == 3
+
+
+def test_batch_scores_stay_with_their_messages():
+    texts = ["thanks", "", "this bug is awful", "İstanbul release shipped", "blocked"]
+
+    assert [s["sentiment"] for s in score_messages(texts)] == [
+        "positive", "neutral", "negative", "positive", "negative",
+    ]
+    assert score_messages(texts) == [score_message(text) for text in texts]
+
+
+def test_custom_lexicon_categories():
+    lexicon = SentimentLexicon({"positive": ["yay"], "risk": ["deadline"]})
+
+    assert lexicon.count(["yay, deadline"]) == [{"positive": 1, "negative": 0, "stress": 0, "risk": 1}]
+
+
+def test_aggregates_per_user_and_day_with_outliers():
+    messages = [
+        {"user": "ann", "text": "Great demo, thanks!", "ts": "1705570000.000100"},
+        {"user": "raj", "text": "Exhausted, pipeline broken again", "ts": "1705570100.000200"},
+        {"user": "raj", "text": "Looking at it now", "ts": "2024-01-19T09:00:00"},
+        {"user": "lee", "text": "   "},
+    ]
+
+    analysis = analyze_messages(messages)
+
+    assert analysis["overall"]["messages"] == 3
+    assert analysis["users"]["raj"] == {
+        "messages": 2,
+        "average_score": -0.5,
+        "positive_ratio": 0.0,
+        "negative_ratio": 0.5,
+        "stress_indicators": 1,
+    }
+    assert list(analysis["days"]) == ["2024-01-18", "2024-01-19"]
+    assert [o["user"] for o in analysis["outliers"]] == ["raj"]
+
+
+def test_parse_communications_accepts_lists_json_and_text():
+    listed = [{"user": "ann", "text": "hi"}, "plain"]
+
+    assert parse_communications(listed) == [{"user": "ann", "text": "hi"}, {"text": "plain"}]
+    assert parse_communications(json.dumps({"messages": listed})) == parse_communications(listed)
+    assert parse_communications("Ann: good news\nRaj: the build is broken") == [
+        {"user": "Ann", "text": "good news"},
+        {"user": "Raj", "text": "the build is broken"},
+    ]
+
+
+def test_benchmark_reports_throughput():
+    result = benchmark(count=2_000)
+
+    assert result["compiled_msgs_per_s"] > 0 and result["substring_msgs_per_s"] > 0
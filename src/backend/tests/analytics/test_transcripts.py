@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from src.backend.common.analytics.transcripts import (
+    NOTES_SPEAKER,
+    merge_items,
+    parse_transcript,
+)
+from src.backend.common.utils.tokens import count_tokens
+
+STANDUP = Path(__file__).parents[4] / "test_data" / "meeting_transcripts" / "daily_standup_2024-01-18.md"
+
+
+def test_parses_speaker_turns_metadata_and_notes():
+    transcript = parse_transcript(STANDUP.read_text())
+
+    assert transcript.metadata["Title"] == "Daily Standup - January 18, 2024"
+    assert transcript.metadata["Meeting End"] == "9:14 AM"
+    assert transcript.speakers == ["Jane Smith", "Bob Johnson", "Alice Chen", "Mike Davis", "Sarah Wilson"]
+    assert transcript.turns[0].role == "Scrum Master"
+    assert transcript.turns[-1].speaker == NOTES_SPEAKER
+    assert "Redis cluster timeline" in transcript.turns[-1].text
+
+
+def test_chunks_keep_whole_turns_within_budget():
+    transcript = parse_transcript(STANDUP.read_text())
+
+    chunks = transcript.chunks(300)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 300 for chunk in chunks)
+    assert all(chunk.startswith("Title: Daily Standup") for chunk in chunks)
+    body = "\n\n".join(chunk.split("\n\n", 1)[1] for chunk in chunks)
+    assert body.count("Jane Smith: ") == 5
+
+
+def test_plain_and_unmarked_text():
+    plain = parse_transcript("Bob: I'm blocked on Redis.\nAlice (QA): I can help.")
+    assert [(t.speaker, t.role) for t in plain.turns] == [("Bob", None), ("Alice", "QA")]
+
+    notes = parse_transcript("first note\n\nsecond note")
+    assert [t.text for t in notes.turns] == ["first note", "second note"]
+
+
+def test_merge_items_drops_near_duplicates_per_owner():
+    merged = merge_items([
+        {"description": "Follow up with infrastructure team on Redis cluster", "owner": "Jane"},
+        {"description": "Follow up with the infrastructure team on the Redis cluster", "owner": "Jane", "due_date": "Friday"},
+        {"description": "Follow up with infrastructure team on Redis cluster", "owner": "Mike"},
+        {"description": "Pair on mobile CSS issues", "owner": ""},
+    ])
+
+    assert [item["owner"] for item in merged] == ["Jane", "Mike", ""]
+    assert merged[0]["due_date"] == "Friday"
@@ -0,0 +1,169 @@
+import pytest
+
+from src.backend.common.database.cosmos_metrics import (
+    CosmosMetrics,
+    RequestChargeHook,
+    cosmos_metrics,
+    redact_parameters,
+    redact_query,
+)
+from src.backend.common.database.cosmosdb import CosmosDBClient, is_cross_partition
+from src.backend.common.models.messages_kernel import Plan, Step
+
+
+class FakePage:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeQueryIterable:
+    def __init__(self, pages, response_hook):
+        self._pages = pages
+        self._response_hook = response_hook
+
+    async def _iter_pages(self):
+        for page in self._pages:
+            self._response_hook({"x-ms-request-charge": "2.5"}, page)
+            yield FakePage(page)
+
+    def by_page(self):
+        return self._iter_pages()
+
+
+class FakeContainer:
+    def __init__(self, pages):
+        self.pages = pages
+        self.partition_keys = []
+
+    def query_items(self, query, parameters, response_hook, partition_key=None):
+        self.partition_keys.append(partition_key)
+        return FakeQueryIterable(self.pages, response_hook)
+
+    async def create_item(self, body, response_hook):
+        response_hook({"x-ms-request-charge": "6.1"}, body)
+        return body
+
+
+def make_client(pages):
+    client = CosmosDBClient("https://example", None, "db", "container", user_id="u")
+    client.container = FakeContainer(pages)
+    client._initialized = True
+    return client
+
+
+def plan_document(plan_id):
+    return {"id": plan_id, "plan_id": plan_id, "user_id": "u", "initial_goal": "g"}
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    cosmos_metrics.reset()
+    yield
+    cosmos_metrics.reset()
+
+
+def test_redaction_hides_literals_and_values():
+    assert redact_query("SELECT * FROM c WHERE c.id='abc' AND c.n=42") == (
+        "SELECT * FROM c WHERE c.id=? AND c.n=?"
+    )
+    assert redact_parameters([{"name": "@user_id", "value": "secret"}]) == [
+        "@user_id"
+    ]
+
+
+def test_request_charge_hook_sums_pages():
+    hook = RequestChargeHook()
+    hook({"x-ms-request-charge": "1.5"}, None)
+    hook({"x-ms-request-charge": "2"}, None)
+    hook({}, None)
+    assert hook.request_charge == 3.5
+    assert hook.responses == 3
+
+
+@pytest.mark.asyncio
+async def test_queries_are_recorded_under_calling_method():
+    client = make_client([[plan_document("p1"), plan_document("p2")], [plan_document("p3")]])
+
+    plans = await client.get_all_plans()
+
+    assert [plan.id for plan in plans] == ["p1", "p2", "p3"]
+    [stats] = cosmos_metrics.top_consumers()
+    assert stats["method"] == "get_all_plans"
+    assert stats["operation"] == "query"
+    assert stats["request_charge"] == 5.0
+    assert stats["items"] == 3
+    assert stats["cross_partition_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_point_writes_are_recorded():
+    client = make_client([])
+
+    await client.add_plan(Plan(**plan_document("p1")))
+
+    [stats] = cosmos_metrics.top_consumers()
+    assert stats["method"] == "add_plan"
+    assert stats["operation"] == "create"
+    assert stats["request_charge"] == pytest.approx(6.1)
+    assert stats["cross_partition_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queries_on_the_partition_key_are_single_partition():
+    step = {
+        "id": "s1",
+        "plan_id": "p1",
+        "session_id": "sess",
+        "user_id": "u",
+        "action": "a",
+        "agent": "Human_Agent",
+    }
+    client = make_client([[step]])
+
+    assert (await client.get_step("s1", "sess")).id == "s1"
+    steps = client.iter_items(
+        "SELECT * FROM c", [], Step, operation_name="steps", partition_key="sess"
+    )
+    assert [s.id async for s in steps] == ["s1"]
+
+    stats = {s["method"]: s for s in cosmos_metrics.top_consumers()}
+    assert stats["get_step"]["cross_partition_calls"] == 0
+    assert stats["steps"]["cross_partition_calls"] == 0
+    assert client.container.partition_keys == [None, "sess"]
+
+
+def test_cross_partition_detection():
+    assert is_cross_partition("SELECT * FROM c WHERE c.user_id=@user_id")
+    assert not is_cross_partition("SELECT * FROM c WHERE c.session_id = @sid")
+    assert not is_cross_partition("SELECT * FROM c", partition_key="sess")
+    assert is_cross_partition("SELECT * FROM c WHERE c.parent_session_id=@sid")
+
+
+def test_slow_queries_are_sampled_and_redacted(caplog):
+    metrics = CosmosMetrics(slow_query_ms=10, sample_rate=1.0)
+    with caplog.at_level("WARNING"):
+        metrics.record(
+            "get_all_plans",
+            "query",
+            12.0,
+            50.0,
+            item_count=4,
+            cross_partition=True,
+            query="SELECT * FROM c WHERE c.user_id=@user_id",
+            parameters=[{"name": "@user_id", "value": "alice@example.com"}],
+        )
+        metrics.record("get_plan", "query", 1.0, 1.0)
+
+    slow = [r for r in caplog.records if "Slow CosmosDB" in r.getMessage()]
+    assert len(slow) == 1
+    assert "alice@example.com" not in slow[0].getMessage()
+    assert metrics.summary()["total_request_charge"] == 13.0
@@ -0,0 +1,73 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+MOCK_ENV_VARS = {
+    "APPLICATIONINSIGHTS_CONNECTION_STRING": "InstrumentationKey=mock",
+    "AZURE_OPENAI_ENDPOINT": "https://mock-openai-endpoint.azure.com/",
+    "AZURE_AI_SUBSCRIPTION_ID": "00000000-0000-0000-0000-000000000000",
+    "AZURE_AI_RESOURCE_GROUP": "rg-test",
+    "AZURE_AI_PROJECT_NAME": "proj-test",
+    "AZURE_AI_AGENT_ENDPOINT": "https://agents.example.com/",
+}
+
+with patch.dict(os.environ, MOCK_ENV_VARS, clear=False):
+    from common.config.app_config import config
+    from common.database.database_factory import DatabaseFactory
+    from common.database.sqlite_db import SQLiteDBClient
+    from common.models.messages_kernel import Plan
+
+
+@pytest.fixture
+def sqlite_backend():
+    with patch.object(config, "DATABASE_BACKEND", "sqlite"), patch.object(
+        config, "SQLITE_DATABASE_PATH", ":memory:"
+    ):
+        yield
+    DatabaseFactory._instance = None
+    DatabaseFactory._lock = None
+
+
+@pytest.mark.asyncio
+async def test_get_database_returns_user_scoped_views(sqlite_backend):
+    alice = await DatabaseFactory.get_database(user_id="alice")
+    bob = await DatabaseFactory.get_database(user_id="bob")
+
+    assert isinstance(alice, SQLiteDBClient)
+    assert alice is not bob
+    assert alice.user_id == "alice" and bob.user_id == "bob"
+    assert alice.connection is bob.connection is DatabaseFactory._instance.connection
+
+    await alice.add_plan(
+        Plan(plan_id="p1", id="p1", user_id="alice", initial_goal="goal")
+    )
+    assert [p.id for p in await alice.get_all_plans()] == ["p1"]
+    assert await bob.get_all_plans() == []
+
+
+@pytest.mark.asyncio
+async def test_closing_a_scoped_view_keeps_shared_connection(sqlite_backend):
+    alice = await DatabaseFactory.get_database(user_id="alice")
+    await alice.close()
+
+    bob = await DatabaseFactory.get_database(user_id="bob")
+    assert await bob.get_all_plans() == []
+
+    await DatabaseFactory.close_all()
+    assert DatabaseFactory._instance is None
+
+
+@pytest.mark.asyncio
+async def test_force_new_builds_dedicated_client(sqlite_backend):
+    shared = await DatabaseFactory.get_database(user_id="alice")
+    dedicated = await DatabaseFactory.get_database(user_id="alice", force_new=True)
+
+    assert dedicated.connection is not shared.connection
+    await dedicated.close()
+
+
+def test_unknown_backend_is_rejected():
+    with patch.object(config, "DATABASE_BACKEND", "mongo"):
+        with pytest.raises(ValueError):
+            DatabaseFactory._create_client("alice")
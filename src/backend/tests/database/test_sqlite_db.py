@@ -0,0 +1,170 @@
+import pytest
+import pytest_asyncio
+
+from src.backend.common.database.database_base import validate_documents
+from src.backend.common.database.sqlite_db import SQLiteDBClient, translate_query
+from src.backend.common.models.messages_kernel import (
+    AgentMessageData,
+    DataType,
+    Plan,
+    PlanStatus,
+    UserCurrentTeam,
+)
+
+
+def make_plan(plan_id, user_id="user-1", team_id="team-1", **kwargs):
+    return Plan(
+        id=plan_id,
+        plan_id=plan_id,
+        session_id="session-1",
+        user_id=user_id,
+        team_id=team_id,
+        initial_goal="Ship the sprint",
+        **kwargs,
+    )
+
+
+@pytest_asyncio.fixture
+async def db():
+    client = SQLiteDBClient(database_path=":memory:", user_id="user-1")
+    await client.initialize()
+    yield client
+    await client.close()
+
+
+def test_translate_query_maps_columns_and_parameters():
+    sql = translate_query(
+        "SELECT * FROM c WHERE c.plan_id=@plan_id AND c.overall_status=@status ORDER BY c._ts DESC"
+    )
+    assert sql == (
+        "SELECT body FROM items WHERE plan_id=:plan_id AND "
+        "json_extract(body, '$.overall_status')=:status ORDER BY _ts DESC"
+    )
+
+
+def test_indexes_are_created():
+    import asyncio
+
+    client = SQLiteDBClient()
+    asyncio.run(client.initialize())
+    rows = client._execute_sync("SELECT name FROM sqlite_master WHERE type='index'")
+    names = {row[0] for row in rows}
+    assert {
+        "ix_items_data_type_user_id",
+        "ix_items_user_id",
+        "ix_items_team_id",
+        "ix_items_plan_id",
+        "ix_items_session_id",
+    } <= names
+    plan = client._execute_sync(
+        "EXPLAIN QUERY PLAN " + translate_query("SELECT * FROM c WHERE c.plan_id=@p"),
+        {"p": "x"},
+    )
+    assert "ix_items_plan_id" in plan[0][-1]
+    asyncio.run(client.close())
+
+
+@pytest.mark.asyncio
+async def test_plan_round_trip(db):
+    await db.add_plan(make_plan("plan-1"))
+
+    plan = await db.get_plan_by_plan_id("plan-1")
+    assert plan is not None
+    assert plan.initial_goal == "Ship the sprint"
+
+    plan.overall_status = PlanStatus.completed
+    await db.update_plan(plan)
+    plans = await db.get_all_plans_by_team_id_status(
+        "user-1", "team-1", PlanStatus.completed
+    )
+    assert [p.id for p in plans] == ["plan-1"]
+
+    item = await db.get_item_by_id("plan-1", "session-1", Plan)
+    assert item.overall_status == PlanStatus.completed
+
+
+@pytest.mark.asyncio
+async def test_add_item_rejects_duplicates(db):
+    await db.add_plan(make_plan("plan-1"))
+    with pytest.raises(Exception):
+        await db.add_plan(make_plan("plan-1"))
+
+
+@pytest.mark.asyncio
+async def test_queries_are_scoped_by_user_and_team(db):
+    await db.add_plan(make_plan("plan-1"))
+    await db.add_plan(make_plan("plan-2", team_id="team-2"))
+    await db.add_plan(make_plan("plan-3", user_id="user-2"))
+
+    assert {p.id for p in await db.get_all_plans()} == {"plan-1", "plan-2"}
+    assert [p.id for p in await db.get_all_plans_by_team_id("team-2")] == ["plan-2"]
+    assert len(await db.get_data_by_type(DataType.plan)) == 2
+    assert len(await db.get_all_items()) == 2
+
+
+@pytest.mark.asyncio
+async def test_agent_messages_are_ordered(db):
+    for index in range(3):
+        await db.add_agent_message(
+            AgentMessageData(
+                plan_id="plan-1",
+                user_id="user-1",
+                agent="agent",
+                content=f"message {index}",
+                raw_data="",
+            )
+        )
+
+    messages = await db.get_agent_messages("plan-1")
+    assert [m.content for m in messages] == ["message 0", "message 1", "message 2"]
+
+
+@pytest.mark.asyncio
+async def test_current_team_and_delete(db):
+    await db.set_current_team(UserCurrentTeam(user_id="user-1", team_id="team-1"))
+    current = await db.get_current_team("user-1")
+    assert current.team_id == "team-1"
+
+    await db.delete_current_team("user-1")
+    assert await db.get_current_team("user-1") is None
+
+    await db.add_plan(make_plan("plan-1"))
+    await db.delete_plan_by_plan_id("plan-1")
+    assert await db.get_plan("plan-1") is None
+
+
+@pytest.mark.asyncio
+async def test_raw_mode_and_streaming(db):
+    for index in range(5):
+        await db.add_agent_message(
+            AgentMessageData(
+                plan_id="plan-1",
+                user_id="user-1",
+                agent="agent",
+                content=f"message {index}",
+                raw_data="",
+            )
+        )
+
+    raw = await db.get_agent_messages("plan-1", raw=True)
+    assert all(isinstance(message, dict) for message in raw)
+    assert raw[0]["content"] == "message 0"
+
+    query = "SELECT * FROM c WHERE c.plan_id=@plan_id ORDER BY c._ts ASC"
+    parameters = [{"name": "@plan_id", "value": "plan-1"}]
+    streamed = [
+        item
+        async for item in db.iter_items(
+            query, parameters, AgentMessageData, batch_size=2
+        )
+    ]
+    assert [m.content for m in streamed] == [f"message {i}" for i in range(5)]
+
+
+def test_validate_documents_skips_invalid_documents():
+    documents = [
+        {"id": "p1", "plan_id": "p1", "user_id": "u", "initial_goal": "goal"},
+        {"id": "p2", "plan_id": "p2"},
+    ]
+    plans = validate_documents(documents, Plan)
+    assert [plan.id for plan in plans] == ["p1"]
@@ -0,0 +1,265 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+
+MOCK_ENV_VARS = {
+    "APPLICATIONINSIGHTS_CONNECTION_STRING": "InstrumentationKey=mock",
+    "AZURE_OPENAI_ENDPOINT": "https://mock-openai-endpoint.azure.com/",
+    "AZURE_AI_SUBSCRIPTION_ID": "00000000-0000-0000-0000-000000000000",
+    "AZURE_AI_RESOURCE_GROUP": "rg-test",
+    "AZURE_AI_PROJECT_NAME": "proj-test",
+    "AZURE_AI_AGENT_ENDPOINT": "https://agents.example.com/",
+}
+
+with patch.dict(os.environ, MOCK_ENV_VARS, clear=False):
+    from v3.common.services.change_feed_service import (
+        LEASE_DATA_TYPE,
+        ChangeFeedService,
+        compute_diff,
+        lease_slot_id,
+    )
+    from v3.config.settings import connection_config
+    from v3.models.messages import WebsocketMessageType
+
+
+class FakePage:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakePager:
+    def __init__(self, pages, token):
+        self._pages = iter(pages)
+        self.continuation_token = token
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return FakePage(next(self._pages))
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeFeed:
+    def __init__(self, pages, token):
+        self._pages = pages
+        self._token = token
+
+    def by_page(self):
+        return FakePager(self._pages, self._token)
+
+
+class FakeContainer:
+    def __init__(self):
+        self.documents = {}
+        self.feeds = []
+        self.feed_calls = []
+        self._writes = 0
+
+    def query_items_change_feed(self, **kwargs):
+        self.feed_calls.append(kwargs)
+        pages, token = self.feeds.pop(0)
+        return FakeFeed(pages, token)
+
+    async def read_item(self, item, partition_key):
+        if item not in self.documents:
+            raise CosmosResourceNotFoundError(message=item)
+        return dict(self.documents[item])
+
+    async def upsert_item(self, body):
+        self._writes += 1
+        self.documents[body["id"]] = {**body, "_etag": str(self._writes)}
+        return dict(self.documents[body["id"]])
+
+    async def create_item(self, body):
+        if body["id"] in self.documents:
+            raise CosmosResourceExistsError(message=body["id"])
+        return await self.upsert_item(body)
+
+    def _check_etag(self, item, etag):
+        if item not in self.documents:
+            raise CosmosResourceNotFoundError(message=item)
+        if self.documents[item]["_etag"] != etag:
+            raise CosmosAccessConditionFailedError(message=item)
+
+    async def replace_item(self, item, body, etag, match_condition):
+        self._check_etag(item, etag)
+        return await self.upsert_item(body)
+
+    async def delete_item(self, item, partition_key, etag, match_condition):
+        self._check_etag(item, etag)
+        del self.documents[item]
+
+    async def query_items(self, query, parameters):
+        for document in list(self.documents.values()):
+            if document.get("data_type") == parameters[0]["value"]:
+                yield dict(document)
+
+
+class Recorder:
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, message, user_id, message_type):
+        self.messages.append((message, user_id, message_type))
+
+
+def plan(plan_id, **fields):
+    document = {
+        "id": plan_id,
+        "plan_id": plan_id,
+        "user_id": "alice",
+        "data_type": "plan",
+        "overall_status": "in_progress",
+        "_etag": "1",
+    }
+    document.update(fields)
+    return document
+
+
+def test_compute_diff_ignores_system_fields():
+    previous = plan("p1")
+    current = plan("p1", overall_status="completed", _etag="2")
+    assert compute_diff(previous, current) == {"overall_status": "completed"}
+    assert "_etag" not in compute_diff(None, current)
+
+
+@pytest.mark.asyncio
+async def test_process_changes_filters_and_diffs():
+    notifier = Recorder()
+    service = ChangeFeedService(FakeContainer(), notifier=notifier)
+
+    sent = await service.process_changes(
+        [
+            plan("p1"),
+            {"id": "t1", "data_type": "team_config", "user_id": "alice"},
+            plan("p1", overall_status="completed"),
+            plan("p1", overall_status="completed"),
+        ]
+    )
+
+    assert sent == 2
+    created, updated = notifier.messages
+    assert created[0]["change"] == "created"
+    assert created[1] == "alice"
+    assert created[2] == WebsocketMessageType.DOCUMENT_CHANGE
+    assert updated[0]["change"] == "updated"
+    assert updated[0]["fields"] == {"overall_status": "completed"}
+
+
+@pytest.mark.asyncio
+async def test_poll_checkpoints_and_resumes_from_lease():
+    container = FakeContainer()
+    container.feeds.append(([[plan("p1")], [plan("p2")]], "token-1"))
+    notifier = Recorder()
+    service = ChangeFeedService(container, lease_id="lease-1", notifier=notifier)
+
+    await service.load_lease()
+    assert await service.poll_once() == 2
+    assert container.feed_calls[0] == {"start_time": "Now"}
+    assert container.documents["lease-1"]["continuation"] == "token-1"
+    assert container.documents["lease-1"]["data_type"] == LEASE_DATA_TYPE
+
+    restarted = ChangeFeedService(container, lease_id="lease-1", notifier=notifier)
+    await restarted.load_lease()
+    container.feeds.append(([[container.documents["lease-1"]]], "token-2"))
+    assert await restarted.poll_once() == 0
+    assert container.feed_calls[1] == {"continuation": "token-1"}
+    # Lease-only batches advance in memory without rewriting the lease
+    assert restarted.continuation == "token-2"
+    assert container.documents["lease-1"]["continuation"] == "token-1"
+
+
+@pytest.mark.asyncio
+async def test_workers_claim_separate_slots_and_restarts_resume():
+    container = FakeContainer()
+    first = ChangeFeedService(container, notifier=Recorder())
+    second = ChangeFeedService(container, notifier=Recorder())
+
+    assert await first.load_lease() is None
+    await second.load_lease()
+    assert (first.lease_id, second.lease_id) == (lease_slot_id(0), lease_slot_id(1))
+
+    first.continuation = "token-1"
+    await first.save_lease(release=True)
+    assert container.documents[lease_slot_id(0)]["owner"] is None
+
+    restarted = ChangeFeedService(container, notifier=Recorder())
+    assert await restarted.load_lease() == "token-1"
+    assert restarted.lease_id == lease_slot_id(0)
+    assert len(container.documents) == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_leases_are_reclaimed_and_stale_ones_removed():
+    container = FakeContainer()
+    leases = [(0, time.time(), "live"), (1, time.time() - 60, "crashed")]
+    for slot, renewed, continuation in leases:
+        await container.upsert_item(
+            {
+                "id": lease_slot_id(slot),
+                "data_type": LEASE_DATA_TYPE,
+                "owner": "another-worker",
+                "renewed": renewed,
+                "continuation": continuation,
+            }
+        )
+    await container.upsert_item(
+        {"id": lease_slot_id(0, "old-host"), "data_type": LEASE_DATA_TYPE, "renewed": 0}
+    )
+    service = ChangeFeedService(container, notifier=Recorder(), stale_lease_seconds=3600)
+
+    assert await service.load_lease() == "crashed"
+    assert service.lease_id == lease_slot_id(1)
+    assert await service.remove_stale_leases() == 1
+    assert lease_slot_id(0, "old-host") not in container.documents
+
+
+@pytest.mark.asyncio
+async def test_a_lost_lease_is_replaced_by_another_slot():
+    container = FakeContainer()
+    service = ChangeFeedService(container, notifier=Recorder())
+    await service.load_lease()
+
+    # Another worker took the slot after this one stopped renewing it
+    thief = ChangeFeedService(container, notifier=Recorder(), lease_expiry=0)
+    await thief.load_lease()
+    assert thief.lease_id == lease_slot_id(0)
+
+    service.continuation = "token-1"
+    await service.save_lease()
+    assert service.lease_id == lease_slot_id(1)
+    assert container.documents[lease_slot_id(0)]["owner"] == thief.owner
+
+
+@pytest.mark.asyncio
+async def test_only_users_connected_to_this_worker_are_notified(monkeypatch):
+    sent = []
+
+    async def send_status_update_async(message, user_id, message_type):
+        sent.append(user_id)
+
+    monkeypatch.setattr(connection_config, "send_status_update_async", send_status_update_async)
+    monkeypatch.setattr(connection_config, "user_to_process", {"alice": "process-1"})
+    service = ChangeFeedService(FakeContainer())
+
+    assert await service.process_changes([plan("p1"), plan("p2", user_id="bob")]) == 1
+    assert sent == ["alice"]
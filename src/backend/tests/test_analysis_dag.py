@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pytest
+
+from src.backend.common.utils.analysis_dag import AnalysisDAG
+
+
+def sleeper(delay, value):
+    async def run(inputs):
+        await asyncio.sleep(delay)
+        return value
+    return run
+
+
+@pytest.mark.asyncio
+async def test_independent_nodes_run_concurrently():
+    dag = AnalysisDAG()
+    for name in ("a", "b", "c"):
+        dag.add_node(name, sleeper(0.1, name))
+
+    async def join(inputs):
+        return "".join(sorted(inputs.values()))
+
+    dag.add_node("join", join, depends_on=("a", "b", "c"))
+
+    started = time.perf_counter()
+    execution = await dag.run()
+
+    assert execution["results"]["join"] == "abc"
+    assert time.perf_counter() - started < 0.25
+    assert all(node["status"] == "completed" for node in execution["nodes"].values())
+
+
+@pytest.mark.asyncio
+async def test_timeouts_and_failures_fall_back_and_dependents_still_run():
+    async def boom(inputs):
+        raise RuntimeError("boom")
+
+    async def collect(inputs):
+        return inputs
+
+    dag = AnalysisDAG(default_timeout=0.05)
+    dag.add_node("slow", sleeper(1, "late"), fallback="slow fallback")
+    dag.add_node("broken", boom, fallback="broken fallback")
+    dag.add_node("fast", sleeper(0, "ok"))
+    dag.add_node("collect", collect, depends_on=("slow", "broken", "fast"))
+
+    execution = await dag.run()
+
+    assert execution["results"]["collect"] == {
+        "slow": "slow fallback",
+        "broken": "broken fallback",
+        "fast": "ok",
+    }
+    assert execution["nodes"]["slow"]["status"] == "timeout"
+    assert execution["nodes"]["broken"] == {**execution["nodes"]["broken"], "status": "failed", "error": "boom"}
+
+
+def test_dependencies_must_be_declared_first():
+    with pytest.raises(ValueError):
+        AnalysisDAG().add_node("synthesis", sleeper(0, None), depends_on=("backlog",))
@@ -0,0 +1,97 @@
+from src.backend.common.utils.conversation_memory import ConversationMemory
+from src.backend.common.utils.token_budget import DROP, TRUNCATE, PromptBudget, PromptSection
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def rebuilt_context(history, budget=1500, cap=400):
+    # The per-turn PromptBudget assembly the incremental context replaces
+    recent = history[-5:]
+    sections = [
+        PromptSection(
+            f"exchange_{index}",
+            f"User: {user}\n{agent}: {assistant}",
+            priority=index,
+            max_tokens=cap,
+            strategy=DROP if index < len(recent) - 1 else TRUNCATE,
+        )
+        for index, (user, assistant, agent) in enumerate(recent)
+    ]
+    fitted = PromptBudget(budget).fit(sections)
+    parts = ["Previous conversation context:"] + [text for text in fitted.sections.values() if text]
+    return "\n".join(parts) + "\n\nCurrent request:"
+
+
+def test_incremental_context_matches_a_full_rebuild():
+    memory = ConversationMemory()
+    history = []
+    for turn in range(12):
+        assistant = f"Answer {turn}. " + "detail " * (50 if turn % 3 else 700)
+        history.append((f"question {turn}", assistant, "SM-Assistant-Coaching"))
+        memory.add_to_history("c1", *history[-1])
+        assert memory.get_context_string("c1") == rebuilt_context(history), turn
+
+    assert len(memory.get_history("c1")) == 10
+    assert memory.get_history("c1")[0]["user"] == "question 2"
+    assert memory.get_context_string("unknown") == ""
+
+
+def test_memory_is_accounted_as_exchanges_come_and_go():
+    memory = ConversationMemory(max_history_length=2)
+    for turn in range(5):
+        memory.add_to_history("c1", "q" * 10, "a" * 100)
+        memory.add_to_history("c2", "q" * 10, "a" * 50)
+    stats = memory.stats()
+    expected = sum(exchange.size for conversation in memory._conversations.values() for exchange in conversation.exchanges)
+
+    assert stats["active_conversations"] == 2
+    assert stats["memory_chars"] == expected
+
+    assert memory.clear("c1") is True
+    assert memory.clear("c1") is False
+    assert memory.stats()["memory_chars"] == sum(exchange.size for exchange in memory._conversations["c2"].exchanges)
+    assert memory.get_context_string("c1") == ""
+
+
+def test_least_recently_used_conversations_are_evicted_first():
+    memory = ConversationMemory(max_conversations=2)
+    memory.add_to_history("a", "hi", "hello")
+    memory.add_to_history("b", "hi", "hello")
+    memory.get_context_string("a")  # a is now the most recently used
+    memory.add_to_history("c", "hi", "hello")
+
+    assert memory.get_history("b") == []
+    assert memory.get_history("a") and memory.get_history("c")
+    assert memory.stats()["evictions"]["lru"] == 1
+
+
+def test_memory_cap_evicts_others_but_never_the_current_conversation():
+    memory = ConversationMemory(max_memory_chars=1000)
+    memory.add_to_history("a", "hi", "x" * 300)
+    memory.add_to_history("b", "hi", "x" * 300)
+    memory.add_to_history("c", "hi", "x" * 2000)
+
+    assert memory.stats()["active_conversations"] == 1
+    assert memory.get_history("c")
+    assert memory.stats()["evictions"]["memory"] == 2
+
+
+def test_idle_conversations_expire():
+    clock = Clock()
+    memory = ConversationMemory(idle_ttl=60, clock=clock)
+    memory.add_to_history("a", "hi", "hello")
+    clock.now = 30
+    memory.add_to_history("b", "hi", "hello")
+    clock.now = 70
+
+    assert memory.get_context_string("a") == ""
+    assert memory.get_context_string("b") != ""
+    stats = memory.stats()
+    assert stats["active_conversations"] == 1
+    assert stats["evictions"]["idle"] == 1
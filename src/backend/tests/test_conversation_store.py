@@ -0,0 +1,183 @@
+import asyncio
+import time
+
+import pytest
+
+from src.backend.common.utils.conversation_memory import ConversationMemory
+from src.backend.common.utils.conversation_store import (
+    APPEND,
+    SUMMARY,
+    CosmosConversationStore,
+    SQLiteConversationStore,
+)
+from src.backend.common.utils.conversation_summary import ExtractiveSummarizer
+
+DECISION = "Our team has 7 developers and we decided to release on March 3."
+
+
+class SlowStore(SQLiteConversationStore):
+    def __init__(self, path, delay=0.0, fail=False):
+        super().__init__(path)
+        self.delay = delay
+        self.fail = fail
+        self.loads = 0
+
+    async def load(self, conversation_id, limit):
+        self.loads += 1
+        if self.fail:
+            raise ConnectionError("store unavailable")
+        return await super().load(conversation_id, limit)
+
+    async def write(self, operations):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("store unavailable")
+        await super().write(operations)
+
+
+@pytest.mark.asyncio
+async def test_a_restarted_process_picks_up_the_conversation(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    before = ConversationMemory(max_history_length=3, store=SQLiteConversationStore(path))
+    for turn in range(5):
+        before.add_to_history("c1", f"question {turn}", f"answer {turn}", "SM-Assistant-Coaching")
+    context = before.get_context_string("c1")
+    await before.close()
+
+    after = ConversationMemory(max_history_length=3, store=SQLiteConversationStore(path))
+    assert after.get_context_string("c1") == ""
+    await after.load("c1")
+
+    assert after.get_context_string("c1") == context
+    assert [exchange["user"] for exchange in after.get_history("c1")] == ["question 2", "question 3", "question 4"]
+    assert after.stats()["memory_chars"] == sum(exchange.size for exchange in after._conversations["c1"].exchanges)
+    await after.close()
+
+
+@pytest.mark.asyncio
+async def test_the_running_summary_is_restored_too(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    before = ConversationMemory(summarizer=ExtractiveSummarizer(), store=SQLiteConversationStore(path))
+    before.add_to_history("c1", DECISION, "Plan two sprints.")
+    before.add_to_history("c1", "How should we split the stories?", "Split them by workflow step.")
+    await before.wait_for_summaries()
+    await before.close()
+
+    after = ConversationMemory(summarizer=ExtractiveSummarizer(), store=SQLiteConversationStore(path))
+    await after.load("c1")
+    context = after.get_context_string("c1")
+    assert DECISION in context.split("Last exchange:")[0]
+    assert "How should we split the stories?" in context.split("Last exchange:")[1]
+
+    # Later exchanges build on the restored summary
+    after.add_to_history("c1", "Who owns the release checklist?", "Priya owns the release checklist.")
+    await after.wait_for_summaries()
+    assert DECISION in after.get_context_string("c1")
+    await after.close()
+
+
+@pytest.mark.asyncio
+async def test_writes_never_wait_for_the_store(tmp_path):
+    store = SlowStore(str(tmp_path / "conversations.db"), delay=0.2)
+    memory = ConversationMemory(store=store)
+
+    started = time.perf_counter()
+    for turn in range(20):
+        memory.add_to_history("c1", f"question {turn}", f"answer {turn}")
+    assert time.perf_counter() - started < 0.1
+    assert memory.writes.pending("c1")
+
+    await memory.writes.flush()
+    stats = memory.stats()["store"]
+    assert not memory.writes.pending("c1")
+    assert stats["written"] == 20 and stats["queued"] == 0
+    # Queued before the background task ran, so written as one batch
+    assert stats["batches"] == 1
+    await memory.close()
+
+
+@pytest.mark.asyncio
+async def test_the_store_is_read_once_per_conversation(tmp_path):
+    store = SlowStore(str(tmp_path / "conversations.db"))
+    memory = ConversationMemory(store=store)
+
+    await asyncio.gather(*(memory.load("new") for _ in range(5)))
+    await memory.load("new")
+    memory.add_to_history("new", "hi", "hello")
+    await memory.load("new")
+
+    assert store.loads == 1
+    await memory.close()
+
+
+@pytest.mark.asyncio
+async def test_cleared_conversations_are_deleted_from_the_store(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    memory = ConversationMemory(summarizer=ExtractiveSummarizer(), store=SQLiteConversationStore(path))
+    memory.add_to_history("c1", DECISION, "Plan two sprints.")
+    memory.add_to_history("c1", "second question here", "second answer")
+    memory.clear("c1")
+    await memory.wait_for_summaries()
+    await memory.close()
+
+    assert await SQLiteConversationStore(path).load("c1", 10) is None
+
+
+@pytest.mark.asyncio
+async def test_an_unavailable_store_does_not_fail_requests(tmp_path):
+    store = SlowStore(str(tmp_path / "conversations.db"), fail=True)
+    memory = ConversationMemory(store=store)
+
+    await memory.load("c1")
+    memory.add_to_history("c1", "hi", "hello")
+    await memory.writes.flush()
+
+    assert "hi" in memory.get_context_string("c1")
+    assert memory.stats()["store"]["failed"] == 1
+    await memory.close()
+
+
+@pytest.mark.asyncio
+async def test_the_store_keeps_only_the_history_memory_keeps(tmp_path):
+    store = SQLiteConversationStore(str(tmp_path / "conversations.db"))
+    memory = ConversationMemory(max_history_length=3, idle_ttl=60, store=store)
+    for turn in range(10):
+        memory.add_to_history("c1", f"question {turn}", f"answer {turn}")
+    memory.add_to_history("c2", "hi", "hello")
+    await memory.writes.flush()
+
+    rows = store.connection.execute(
+        "SELECT conversation_id, COUNT(*) FROM conversation_exchanges GROUP BY conversation_id ORDER BY 1"
+    ).fetchall()
+    assert rows == [("c1", 3), ("c2", 1)]
+    assert [e["user"] for e in (await store.load("c1", 10)).exchanges] == ["question 7", "question 8", "question 9"]
+
+    # Conversations idle for longer than the memory's idle TTL are removed from the store
+    store.connection.execute("UPDATE conversation_exchanges SET _ts = _ts - 120 WHERE conversation_id='c2'")
+    store._expired_at = 0.0
+    memory.add_to_history("c1", "question 10", "answer 10")
+    await memory.writes.flush()
+    assert await store.load("c2", 10) is None
+    await memory.close()
+
+
+class RecordingContainer:
+    def __init__(self):
+        self.documents = []
+
+    async def create_item(self, body):
+        self.documents.append(body)
+
+    async def upsert_item(self, body):
+        self.documents.append(body)
+
+
+@pytest.mark.asyncio
+async def test_cosmos_documents_expire_with_the_idle_ttl():
+    store = CosmosConversationStore("https://example", None, "db", "container")
+    store.container = RecordingContainer()
+    store.set_retention(10, 3600.0)
+
+    await store.write([(APPEND, "c1", {"user": "hi"}), (SUMMARY, "c1", "greeting")])
+
+    assert [document["ttl"] for document in store.container.documents] == [3600, 3600]
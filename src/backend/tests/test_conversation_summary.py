@@ -0,0 +1,88 @@
+import pytest
+
+from src.backend.common.utils.conversation_memory import ConversationMemory
+from src.backend.common.utils.conversation_summary import ExtractiveSummarizer, score_sentence
+from src.backend.common.utils.tokens import count_tokens
+
+DECISION = "Our team has 7 developers and we decided to release on March 3."
+
+
+def chatter(memory, turns, start=0):
+    for turn in range(start, start + turns):
+        memory.add_to_history(
+            "c1",
+            f"What about retro format idea number {turn} for the team?",
+            f"Try the sailboat format for retro {turn}. It helps the team see risks and anchors. " * 3,
+        )
+
+
+def test_sentences_with_decisions_and_numbers_score_higher():
+    assert score_sentence(DECISION, from_user=True) > score_sentence("Can you help me with this?", from_user=True)
+    assert score_sentence("Thanks, that is a nice idea.", from_user=False) == 0
+
+
+def test_context_keeps_early_facts_and_stays_the_same_size():
+    memory = ConversationMemory(summarizer=ExtractiveSummarizer(max_tokens=200))
+    memory.add_to_history("c1", DECISION, "With 7 developers and a March 3 release, plan two sprints.")
+    chatter(memory, 5)
+    early = count_tokens(memory.get_context_string("c1"))
+    chatter(memory, 60, start=5)
+    context = memory.get_context_string("c1")
+
+    assert DECISION in context
+    assert "Summary of earlier exchanges:" in context
+    assert "retro format idea number 64" in context.split("Last exchange:")[1]
+    assert count_tokens(context) <= 200 + memory.exchange_token_cap + 40
+    assert abs(count_tokens(context) - early) < 60
+
+
+def test_restated_facts_are_refreshed_not_repeated():
+    summarizer = ExtractiveSummarizer()
+    summary = None
+    for day in ("March 3", "March 5"):
+
+        class Turn:
+            user = f"We decided to release on {day} with the whole team."
+            assistant = "Noted."
+
+        summary = summarizer.update(summary, Turn)
+
+    text = summarizer.render(summary)
+    assert "March 5" in text and "March 3" not in text
+    assert summary.turns == 2
+
+
+@pytest.mark.asyncio
+async def test_summaries_are_updated_in_the_background():
+    memory = ConversationMemory(summarizer=ExtractiveSummarizer())
+    memory.add_to_history("c1", DECISION, "Plan two sprints.")
+    memory.add_to_history("c1", "How should we split the stories?", "Split them by workflow step.")
+
+    # The first exchange is only folded in once the background task runs
+    assert "Summary of earlier exchanges:" not in memory.get_context_string("c1")
+    await memory.wait_for_summaries()
+    context = memory.get_context_string("c1")
+
+    assert DECISION in context.split("Last exchange:")[0]
+    assert "How should we split the stories?" in context.split("Last exchange:")[1]
+    expected = sum(c.size for c in memory._conversations.values())
+    assert memory.stats()["memory_chars"] == expected
+
+
+@pytest.mark.asyncio
+async def test_failing_summarizer_keeps_the_last_exchange():
+    class Broken:
+        def update(self, summary, exchange):
+            raise RuntimeError("model unavailable")
+
+        def render(self, summary):
+            return ""
+
+    memory = ConversationMemory(summarizer=Broken())
+    memory.add_to_history("c1", "first question here", "first answer")
+    memory.add_to_history("c1", "second question here", "second answer")
+    await memory.wait_for_summaries()
+
+    context = memory.get_context_string("c1")
+    assert "second question here" in context
+    assert "first question here" not in context
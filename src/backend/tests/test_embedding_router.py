@@ -0,0 +1,145 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.backend.common.config.agent_capabilities import (
+    AGENT_CAPABILITY_DEFINITIONS,
+    CAPABILITY_PATTERNS,
+    CHAT_AGENTS,
+)
+from src.backend.common.utils.embedding_router import CapabilityIndex, EmbeddingRouter, capability_texts
+from src.backend.common.utils.embeddings import HashingEmbedder, TfidfEmbedder, embedder_from_env
+from src.backend.common.utils.tiered_router import CapabilityClassifier, TieredRouter
+
+TEXTS = capability_texts(AGENT_CAPABILITY_DEFINITIONS)
+CORPUS = [text for rows in TEXTS.values() for text in rows]
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__(dimensions=256)
+        self.calls = 0
+
+    async def embed(self, texts):
+        self.calls += 1
+        return await super().embed(texts)
+
+
+def test_hashing_embeddings_are_normalized_and_deterministic():
+    embedder = HashingEmbedder()
+    vectors = embedder.transform(["User stories for login", "user stories for LOGIN", ""])
+
+    assert vectors.shape == (3, embedder.dimensions)
+    assert np.allclose(np.linalg.norm(vectors[:2], axis=1), 1.0)
+    assert np.allclose(vectors[0], vectors[1])
+    assert not vectors[2].any()
+    # Shared character n-grams keep word variants close
+    story, stories, velocity = embedder.transform(["story", "stories", "velocity"])
+    assert story @ stories > story @ velocity
+
+
+def test_tfidf_weights_words_rare_in_the_corpus_higher():
+    embedder = TfidfEmbedder(["team velocity", "team morale", "team backlog"])
+    team = embedder.idf[embedder._bucket("w:team")]
+    velocity = embedder.idf[embedder._bucket("w:velocity")]
+
+    assert velocity > team
+    assert embedder.fingerprint != TfidfEmbedder(["other corpus"]).fingerprint
+
+
+def test_similarities_take_the_best_row_of_each_capability():
+    vectors = np.eye(4, dtype=np.float32)
+    index = CapabilityIndex(["a", "b"], [3, 1], vectors, "fp")
+    queries = np.array([[0.0, 0.6, 0.8, 0.0], [0.0, 0.0, 0.0, 1.0]], dtype=np.float32)
+
+    assert np.allclose(index.similarities(queries), [[0.8, 0.0], [0.0, 1.0]])
+
+
+@pytest.mark.asyncio
+async def test_index_is_persisted_and_reused(tmp_path):
+    path = str(tmp_path / "vectors" / "capabilities.npz")
+    embedder = CountingEmbedder()
+
+    built = await CapabilityIndex.build(embedder, TEXTS, path)
+    loaded = await CapabilityIndex.build(embedder, TEXTS, path)
+
+    assert embedder.calls == 1
+    assert loaded.capabilities == list(TEXTS)
+    assert np.array_equal(loaded.vectors, built.vectors)
+
+    # Different capability texts invalidate the stored vectors
+    changed = dict(TEXTS, AgileCoaching=["Coaching only"])
+    rebuilt = await CapabilityIndex.build(embedder, changed, path)
+    assert embedder.calls == 2
+    assert rebuilt.row_counts[-1] == 1
+
+
+@pytest.mark.asyncio
+async def test_unreadable_index_is_rebuilt(tmp_path):
+    path = tmp_path / "capabilities.npz"
+    path.write_bytes(b"not a numpy archive")
+    embedder = CountingEmbedder()
+
+    await CapabilityIndex.build(embedder, TEXTS, str(path))
+
+    assert embedder.calls == 1
+    assert CapabilityIndex.load(str(path)) is not None
+
+
+@pytest.mark.asyncio
+async def test_embedding_router_classifies_messages_without_listed_keywords():
+    router = await EmbeddingRouter.create(TfidfEmbedder(CORPUS), TEXTS)
+
+    capability, confidence = await router.classify("Estimate the story points of this epic")
+    assert capability == "BacklogIntelligence"
+    assert confidence > 0.5
+    scores = await router.score_batch(["the standups drag on", "tell me more"])
+    assert max(scores[0], key=scores[0].get) == "MeetingIntelligence"
+    assert await router.score_batch([]) == []
+
+
+def test_embedder_from_env_falls_back_to_tfidf(monkeypatch):
+    monkeypatch.delenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", raising=False)
+    assert isinstance(embedder_from_env(CORPUS), TfidfEmbedder)
+
+
+@pytest.mark.asyncio
+async def test_tiered_router_uses_the_embedding_tier_before_the_llm():
+    class Embeddings:
+        async def classify(self, message):
+            return "TeamWellness", 0.8
+
+    async def llm(message):
+        raise AssertionError("the LLM router should not be called")
+
+    classifier = CapabilityClassifier(
+        {name: definition["keywords"] for name, definition in AGENT_CAPABILITY_DEFINITIONS.items()},
+        CAPABILITY_PATTERNS,
+    )
+    router = TieredRouter(classifier, CHAT_AGENTS, fallback=llm, embeddings=Embeddings())
+
+    decision = await router.route("our folks seem exhausted")
+    assert (decision.agent, decision.tier, decision.confidence) == ("wellness", "embedding", 0.8)
+    assert (await router.route("Our folks seem exhausted!")).tier == "cache"
+    assert router.stats()["tiers"]["embedding"]["share"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_slow_embeddings_are_skipped_for_the_llm_router():
+    class SlowEmbeddings:
+        async def classify(self, message):
+            await asyncio.sleep(10)
+
+    async def llm(message):
+        return "wellness"
+
+    classifier = CapabilityClassifier(
+        {name: definition["keywords"] for name, definition in AGENT_CAPABILITY_DEFINITIONS.items()},
+        CAPABILITY_PATTERNS,
+    )
+    router = TieredRouter(classifier, CHAT_AGENTS, fallback=llm, embeddings=SlowEmbeddings(), embedding_timeout=0.05)
+
+    decision = await router.route("our folks seem exhausted")
+    assert (decision.agent, decision.tier) == ("wellness", "llm")
+    assert decision.latency_ms < 1000
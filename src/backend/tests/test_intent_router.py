@@ -0,0 +1,63 @@
+import random
+
+from src.backend.common.utils.intent_router import IntentRouter, benchmark, leading_words, scan_scores
+
+KEYWORDS = {
+    "Backlog": ["user story", "story creation", "story points", "epic", "epic", "backlog"],
+    "Meeting": ["meeting", "standup", "review", "action items", "action"],
+    "Flow": ["metrics", "cycle time", "throughput"],
+}
+PATTERNS = {
+    "Backlog": [r"\b(create|write)\b.*\b(story|stories)\b", r"\bacceptance\s+criteria\b"],
+    "Meeting": [r"\baction\s+items?\b"],
+    "Coaching": [r"how\s+can\s+we", r"\bbest\s+practices?\b"],
+}
+
+
+def test_scores_match_a_per_keyword_scan():
+    router = IntentRouter(KEYWORDS, PATTERNS)
+    messages = [
+        "Write a user story creation guide with story points",
+        "epic",
+        "  Meeting  ",
+        "preview the metrics after the standup; action items?",
+        "How can we apply best practices to our cycle time",
+        "nothing relevant here",
+    ]
+
+    for message in messages:
+        assert router.score(message) == scan_scores(message, KEYWORDS, PATTERNS), message
+    assert router.score("epic")["Backlog"] == 20.0
+    assert router.keywords_in("User story creation") == {"user story", "story creation"}
+
+
+def test_batch_scores_equal_single_scores():
+    router = IntentRouter(KEYWORDS, PATTERNS)
+    rng = random.Random(3)
+    vocabulary = ["user", "story", "creation", "epic", "review", "action", "items", "write", "cycle", "time", "x"]
+    messages = [" ".join(rng.choices(vocabulary, k=8)) for _ in range(200)]
+
+    assert router.score_batch(messages) == [router.score(m) for m in messages]
+    assert router.score_batch(messages) == [scan_scores(m, KEYWORDS, PATTERNS) for m in messages]
+
+
+def test_repeated_messages_in_a_batch_get_their_own_scores():
+    router = IntentRouter(KEYWORDS, PATTERNS)
+
+    first, second = router.score_batch(["Write a user story", "write a USER story"])
+    assert first == second == router.score("write a user story")
+    first["Backlog"] = 0.0
+    assert second["Backlog"] > 0
+
+
+def test_leading_words_only_when_required():
+    assert leading_words(r"\b(create|write)\b.*\bstory\b") == ["create", "write"]
+    assert leading_words(r"\baction\s+items?\b") == ["action"]
+    assert leading_words(r"\b(a|b)?story") is None
+    assert leading_words(r"how\s+can") is None
+
+
+def test_benchmark_reports_per_message_cost():
+    result = benchmark(messages=200)
+
+    assert result["router_us"] > 0 and result["keyword_scan_us"] > 0
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from src.backend.common.utils.json_stream import (
+    JSONExtractionError,
+    JSONStreamExtractor,
+    extract_json,
+)
+
+
+def feed_in_chunks(extractor, text, size=4):
+    fields = []
+    for start in range(0, len(text), size):
+        fields.extend(extractor.feed(text[start:start + size]))
+    return fields
+
+
+def test_extracts_first_object_around_prose_and_fences():
+    text = 'Here you go [draft]:\n```json\n{"a": 1, "b": "x}"}\n```\nOr: {"c": 2}'
+
+    assert extract_json(text) == {"a": 1, "b": "x}"}
+
+
+def test_extracts_top_level_array():
+    assert extract_json('Stories: [{"title": "A"}, {"title": "B"}] done') == [
+        {"title": "A"},
+        {"title": "B"},
+    ]
+
+
+def test_reports_fields_as_they_complete():
+    text = json.dumps({"summary": "ok", "risks": ["a", "b"], "score": {"value": 7}})
+    extractor = JSONStreamExtractor()
+
+    fields = feed_in_chunks(extractor, text)
+
+    assert fields == [("summary", "ok"), ("risks", ["a", "b"]), ("score", {"value": 7})]
+    assert extractor.result() == json.loads(text)
+
+
+def test_reports_array_elements_by_index():
+    extractor = JSONStreamExtractor()
+
+    assert feed_in_chunks(extractor, '[{"id": 1}, {"id": 2}]') == [(0, {"id": 1}), (1, {"id": 2})]
+
+
+def test_escaped_quotes_do_not_end_strings():
+    assert extract_json(r'{"quote": "she said \"}\" twice"}') == {"quote": 'she said "}" twice'}
+
+
+def test_incomplete_response_raises_with_raw_text():
+    with pytest.raises(JSONExtractionError) as error:
+        extract_json('Sorry, {"partial": tru')
+
+    assert error.value.text == 'Sorry, {"partial": tru'
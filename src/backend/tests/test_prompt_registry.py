@@ -0,0 +1,59 @@
+import asyncio
+
+from semantic_kernel import Kernel
+from semantic_kernel.functions import KernelArguments
+
+from src.backend.agents.meeting_intelligence_agent import MeetingIntelligenceAgent
+from src.backend.agents.team_wellness_agent import TeamWellnessAgent
+from src.backend.common.utils.prompt_registry import (
+    PromptRegistry,
+    benchmark,
+    template_hash,
+)
+
+
+def test_template_is_compiled_once_per_name_and_hash():
+    registry = PromptRegistry()
+
+    first = registry.get("summarize", "Summarize {{$text}}")
+    second = registry.get("summarize", "Summarize {{$text}}")
+    changed = registry.get("summarize", "Summarize briefly {{$text}}")
+
+    assert first is second
+    assert changed is not first
+    assert registry.stats() == {"functions": 2, "compiled": 2, "hits": 1}
+
+
+def test_template_hash_is_stable():
+    assert template_hash("a {{$b}}") == template_hash("a {{$b}}")
+    assert template_hash("a {{$b}}") != template_hash("a {{$c}}")
+
+
+def test_compiled_function_renders_arguments():
+    function = PromptRegistry().get("greet", "Hello {{$name}}")
+
+    rendered = asyncio.run(
+        function.prompt_template.render(Kernel(), KernelArguments(name="team"))
+    )
+
+    assert rendered == "Hello team"
+
+
+def test_agents_share_compiled_functions():
+    first = TeamWellnessAgent(Kernel())
+    second = TeamWellnessAgent(Kernel())
+
+    assert first.functions["analyze_sentiment"] is second.functions["analyze_sentiment"]
+    assert set(MeetingIntelligenceAgent(Kernel()).functions) == {
+        "analyze_meeting",
+        "extract_action_items",
+        "detect_impediments",
+        "facilitate_ceremony",
+        "analyze_participation",
+    }
+
+
+def test_benchmark_reports_both_paths():
+    result = benchmark(iterations=5)
+
+    assert result["construction_us"] > result["registry_lookup_us"] > 0
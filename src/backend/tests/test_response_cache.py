@@ -0,0 +1,216 @@
+import asyncio
+import json
+
+import pytest
+
+from src.backend.agents.meeting_intelligence_agent import MeetingIntelligenceAgent
+from src.backend.common.utils.prompt_registry import PromptRegistry
+from src.backend.common.utils.response_cache import ResponseCache
+
+
+class CountingKernel:
+    def __init__(self, response="ok", delay=0.0, error=None):
+        self.response = response
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def invoke(self, function, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.response
+
+
+@pytest.fixture
+def function():
+    return PromptRegistry().get("summarize", "Summarize {{$text}}")
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_are_served_from_cache(function):
+    cache = ResponseCache()
+    kernel = CountingKernel("summary")
+
+    first = await cache.invoke(kernel, function, {"text": "sprint"}, agent="a", model="gpt")
+    second = await cache.invoke(kernel, function, {"text": "sprint"}, agent="a", model="gpt")
+    other = await cache.invoke(kernel, function, {"text": "sprint"}, agent="a", model="gpt-mini")
+
+    assert first == second == other == "summary"
+    assert kernel.calls == 2
+    assert cache.stats()["agents"]["a"] == {
+        "requests": 3,
+        "hits": 1,
+        "disk_hits": 0,
+        "coalesced": 0,
+        "misses": 2,
+        "hit_rate": 0.3333,
+    }
+
+
+@pytest.mark.asyncio
+async def test_key_depends_on_template_and_arguments(function):
+    cache = ResponseCache()
+    changed = PromptRegistry().get("summarize", "Summarize briefly {{$text}}")
+
+    key = cache.make_key(function, {"text": "a"}, "gpt")
+
+    assert key == cache.make_key(function, {"text": "a"}, "gpt")
+    assert key != cache.make_key(function, {"text": "b"}, "gpt")
+    assert key != cache.make_key(changed, {"text": "a"}, "gpt")
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_lru_is_bounded(function, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.backend.common.utils.response_cache.time.time", lambda: now[0])
+    cache = ResponseCache(max_entries=2, default_ttl=10)
+    kernel = CountingKernel()
+
+    for text in ("a", "b", "c"):
+        await cache.invoke(kernel, function, {"text": text})
+    assert cache.stats()["entries"] == 2
+
+    await cache.invoke(kernel, function, {"text": "a"})
+    assert kernel.calls == 4
+
+    now[0] += 11
+    await cache.invoke(kernel, function, {"text": "a"})
+    assert kernel.calls == 5
+
+
+@pytest.mark.asyncio
+async def test_zero_ttl_disables_caching(function):
+    cache = ResponseCache()
+    cache.set_ttl("summarize", 0)
+    kernel = CountingKernel()
+
+    await cache.invoke(kernel, function, {"text": "a"})
+    await cache.invoke(kernel, function, {"text": "a"})
+
+    assert kernel.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_request(function):
+    cache = ResponseCache()
+    kernel = CountingKernel("shared", delay=0.05)
+
+    results = await asyncio.gather(
+        *(cache.invoke(kernel, function, {"text": "a"}, agent="a") for _ in range(5))
+    )
+
+    assert results == ["shared"] * 5
+    assert kernel.calls == 1
+    assert cache.stats()["agents"]["a"]["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_first_caller_does_not_fail_the_others(function):
+    cache = ResponseCache()
+    kernel = CountingKernel("shared", delay=0.1)
+
+    owner = asyncio.create_task(asyncio.wait_for(cache.invoke(kernel, function, {"text": "a"}), 0.02))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.invoke(kernel, function, {"text": "a"}))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await owner
+    assert await waiter == "shared"
+    assert kernel.calls == 1
+    assert cache.stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_the_completion_is_cancelled_when_every_caller_leaves(function):
+    cache = ResponseCache()
+    kernel = CountingKernel("late", delay=0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(cache.invoke(kernel, function, {"text": "a"}), 0.02)
+    await asyncio.sleep(0)
+
+    assert cache.stats()["entries"] == 0
+    assert await cache.invoke(kernel, function, {"text": "a"}) == "late"
+    assert kernel.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached(function):
+    cache = ResponseCache()
+    kernel = CountingKernel(error=RuntimeError("boom"))
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await cache.invoke(kernel, function, {"text": "a"})
+
+    assert kernel.calls == 2
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_completions_the_caller_rejects_are_not_cached(function):
+    cache = ResponseCache()
+    kernel = CountingKernel('{"summary": "cut off')
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await cache.invoke(kernel, function, {"text": "a"}, validate=json.loads)
+
+    assert kernel.calls == 2
+    assert cache.stats()["entries"] == 0
+
+    kernel.response = '{"summary": "complete"}'
+    await cache.invoke(kernel, function, {"text": "a"}, validate=json.loads)
+    await cache.invoke(kernel, function, {"text": "a"}, validate=json.loads)
+    assert kernel.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_a_new_cache(function, tmp_path):
+    kernel = CountingKernel("persisted")
+    await ResponseCache(disk_path=str(tmp_path)).invoke(kernel, function, {"text": "a"})
+
+    restored = ResponseCache(disk_path=str(tmp_path))
+    result = await restored.invoke(kernel, function, {"text": "a"}, agent="a")
+
+    assert result == "persisted"
+    assert kernel.calls == 1
+    assert restored.stats()["agents"]["a"]["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_methods_use_the_shared_cache():
+    from common.utils.response_cache import response_cache
+
+    response_cache.clear()
+    kernel = CountingKernel(json.dumps({"ceremony_guide": {}}))
+    agent = MeetingIntelligenceAgent(kernel)
+    try:
+        await agent.facilitate_ceremony("Sprint Retrospective")
+        await agent.facilitate_ceremony("Sprint Retrospective")
+    finally:
+        stats = response_cache.stats()["agents"][agent.agent_name]
+        response_cache.clear()
+
+    assert kernel.calls == 1
+    assert stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_completions_record_token_usage(function):
+    from common.utils.token_usage import token_usage
+
+    token_usage.reset()
+    cache = ResponseCache()
+    kernel = CountingKernel("a short summary")
+
+    await cache.invoke(kernel, function, {"text": "sprint review notes"}, agent="a")
+    await cache.invoke(kernel, function, {"text": "sprint review notes"}, agent="a")
+
+    [usage] = token_usage.top_consumers()
+    assert (usage["agent"], usage["endpoint"]) == ("a", "summarize")
+    assert (usage["calls"], usage["cached_calls"]) == (1, 1)
+    assert usage["prompt_tokens"] >= 5 and usage["completion_tokens"] >= 3
+    token_usage.reset()
@@ -0,0 +1,137 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from src.backend.common.config.agent_capabilities import (
+    AGENT_CAPABILITY_DEFINITIONS,
+    CAPABILITY_PATTERNS,
+    CHAT_AGENTS,
+)
+from src.backend.common.utils.speculation import Speculation, SpeculationMetrics
+from src.backend.common.utils.tiered_router import CapabilityClassifier, TieredRouter
+
+
+async def agent_call(agent, delay, log):
+    try:
+        await asyncio.sleep(delay)
+        log.append(("finished", agent))
+        return {"response": f"{agent} answer with five tokens"}
+    except asyncio.CancelledError:
+        log.append(("cancelled", agent))
+        raise
+
+
+@pytest.mark.asyncio
+async def test_hit_keeps_the_result_and_reports_saved_latency():
+    metrics = SpeculationMetrics()
+    speculation = Speculation(metrics)
+    log = []
+
+    speculation.start("metrics", agent_call("metrics", 0.1, log), prompt_tokens=50)
+    await asyncio.sleep(0.05)  # the LLM router deciding
+    result = await speculation.resolve("metrics")
+
+    assert result["response"].startswith("metrics")
+    assert speculation.outcome == "hit"
+    summary = metrics.summary()
+    assert (summary["started"], summary["hits"], summary["misses"]) == (1, 1, 0)
+    assert 40 <= summary["saved_ms"] <= 100
+    assert summary["wasted_tokens"] == 0
+
+
+@pytest.mark.asyncio
+async def test_miss_cancels_the_call_and_reports_wasted_tokens():
+    metrics = SpeculationMetrics()
+    speculation = Speculation(metrics, completion_tokens=lambda result: 5)
+    log = []
+
+    speculation.start("metrics", agent_call("metrics", 1.0, log), prompt_tokens=50)
+    await asyncio.sleep(0.01)
+    assert await speculation.resolve("wellness") is None
+    await asyncio.sleep(0)
+
+    assert log == [("cancelled", "metrics")]
+    assert speculation.outcome == "miss"
+
+    # A call that already finished is charged its completion too
+    finished = Speculation(metrics, completion_tokens=lambda result: 5)
+    finished.start("backlog", agent_call("backlog", 0, log), prompt_tokens=30)
+    await asyncio.sleep(0.01)
+    assert await finished.resolve("coaching") is None
+
+    summary = metrics.summary()
+    assert (summary["hits"], summary["misses"], summary["hit_rate"]) == (0, 2, 0.0)
+    assert summary["wasted_tokens"] == 50 + 30 + 5
+    assert summary["agents"]["backlog"]["wasted_tokens"] == 35
+
+
+@pytest.mark.asyncio
+async def test_resolve_without_speculation_and_cancel():
+    metrics = SpeculationMetrics()
+    speculation = Speculation(metrics)
+    assert await speculation.resolve("coaching") is None
+    assert speculation.outcome is None
+
+    log = []
+    speculation.start("meeting", agent_call("meeting", 1.0, log), prompt_tokens=10)
+    await asyncio.sleep(0)
+    with pytest.raises(RuntimeError):
+        speculation.start("meeting", agent_call("meeting", 1.0, log))
+    speculation.cancel()
+    await asyncio.sleep(0)
+
+    assert ("cancelled", "meeting") in log
+    assert metrics.summary()["wasted_tokens"] == 10
+
+
+@pytest.mark.asyncio
+async def test_router_offers_its_best_guess_only_before_the_llm():
+    guesses = []
+
+    async def llm(message):
+        return "metrics"
+
+    classifier = CapabilityClassifier(
+        {name: definition["keywords"] for name, definition in AGENT_CAPABILITY_DEFINITIONS.items()},
+        CAPABILITY_PATTERNS,
+    )
+    router = TieredRouter(classifier, CHAT_AGENTS, fallback=llm)
+
+    await router.route("Calculate cycle time metrics", on_fallback=lambda *guess: guesses.append(guess))
+    assert guesses == []
+
+    decision = await router.route("is our delivery agile enough?", on_fallback=lambda *guess: guesses.append(guess))
+    assert decision.tier == "llm"
+    assert len(guesses) == 1 and guesses[0][0] in CHAT_AGENTS.values() and guesses[0][1] < 0.35
+
+
+@pytest.mark.asyncio
+async def test_smart_chat_cancels_the_speculation_when_the_request_is_cancelled(monkeypatch):
+    monkeypatch.syspath_prepend(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    server = pytest.importorskip("main_production_sk")
+    log = []
+    routing = asyncio.Event()
+
+    async def route(message, context, on_fallback=None):
+        on_fallback("metrics", 0.9)
+        routing.set()
+        await asyncio.sleep(10)  # the LLM router never answers
+
+    monkeypatch.setattr(server, "SPECULATIVE_ROUTING", True)
+    monkeypatch.setattr(server.agent_router, "route", route)
+    monkeypatch.setattr(server, "chat_with_agent", lambda request: agent_call(request.agent, 10, log))
+
+    request = SimpleNamespace(client=SimpleNamespace(host="speculation-test"))
+    chat = asyncio.ensure_future(
+        server.smart_chat_with_routing(server.ChatRequest(message="is our delivery agile?"), request)
+    )
+    await routing.wait()
+    await asyncio.sleep(0)
+    chat.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await chat
+    await asyncio.sleep(0)
+
+    assert log == [("cancelled", "metrics")]
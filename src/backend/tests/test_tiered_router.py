@@ -0,0 +1,119 @@
+import pytest
+
+from src.backend.common.config.agent_capabilities import (
+    AGENT_CAPABILITY_DEFINITIONS,
+    CAPABILITY_PATTERNS,
+    CHAT_AGENTS,
+)
+from src.backend.common.utils.tiered_router import (
+    CapabilityClassifier,
+    TieredRouter,
+    confidence,
+    example_terms,
+    normalize_message,
+)
+
+
+def classifier():
+    return CapabilityClassifier(
+        {name: definition["keywords"] for name, definition in AGENT_CAPABILITY_DEFINITIONS.items()},
+        CAPABILITY_PATTERNS,
+        {name: definition["examples"] for name, definition in AGENT_CAPABILITY_DEFINITIONS.items()},
+    )
+
+
+class FakeLLMRouter:
+    def __init__(self, answer="wellness"):
+        self.answer = answer
+        self.messages = []
+
+    async def __call__(self, message):
+        self.messages.append(message)
+        return self.answer
+
+
+def test_normalize_message_and_confidence():
+    assert normalize_message("  Show   Team VELOCITY!\n") == "show team velocity"
+    assert confidence({"a": 0.0, "b": 0.0}, 8.0) == 0.0
+    assert confidence({"a": 8.0, "b": 0.0}, 8.0) == 1.0
+    assert confidence({"a": 4.0, "b": 0.0}, 8.0) == 0.5
+    assert confidence({"a": 6.0, "b": 6.0}, 8.0) == 0.0
+
+
+def test_example_terms_keep_words_unique_to_one_capability():
+    terms = example_terms(
+        {"a": ["Analyze the login flow"], "b": ["Analyze velocity trends"]},
+        exclude=["velocity"],
+    )
+    assert terms == {"a": ["flow", "login"], "b": ["trends"]}
+
+
+def test_every_capability_example_is_classified_confidently():
+    local = classifier()
+    for name, definition in AGENT_CAPABILITY_DEFINITIONS.items():
+        for example in definition["examples"]:
+            capability, score = local.classify(example)
+            assert capability == name, example
+            assert score >= 0.35, example
+    assert local.classify("tell me more") == (None, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_confident_messages_skip_the_llm_and_are_cached():
+    llm = FakeLLMRouter()
+    router = TieredRouter(classifier(), CHAT_AGENTS, fallback=llm)
+
+    first = await router.route("Calculate cycle time metrics")
+    second = await router.route("  calculate CYCLE time metrics? ")
+
+    assert (first.agent, first.tier) == ("metrics", "local")
+    assert (second.agent, second.tier) == ("metrics", "cache")
+    assert llm.messages == []
+
+
+@pytest.mark.asyncio
+async def test_low_confidence_messages_go_to_the_llm_with_context():
+    llm = FakeLLMRouter("wellness")
+    router = TieredRouter(classifier(), CHAT_AGENTS, fallback=llm)
+
+    with_context = await router.route("tell me more", "User: our team seems exhausted")
+    assert (with_context.agent, with_context.tier) == ("wellness", "llm")
+    assert llm.messages == ["User: our team seems exhausted\ntell me more"]
+
+    # Decisions that depended on context are not cached; context-free ones are
+    assert (await router.route("tell me more")).tier == "llm"
+    assert (await router.route("Tell me more.")).tier == "cache"
+    assert len(llm.messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_without_an_llm_router_weak_matches_and_default_are_used():
+    async def unavailable(message):
+        return None
+
+    router = TieredRouter(classifier(), CHAT_AGENTS, fallback=unavailable)
+
+    weak = await router.route("what about the login stories and velocity?")
+    assert weak.tier == "local" and weak.confidence < 0.35
+    default = await router.route("tell me more")
+    assert (default.agent, default.tier, default.confidence) == ("coaching", "default", 0.0)
+
+    stats = router.stats()
+    assert stats["decisions"] == 2
+    assert stats["tiers"]["local"]["share"] == 0.5
+    assert stats["tiers"]["default"]["share"] == 0.5
+    assert stats["cached_messages"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded_and_reset_clears_stats():
+    router = TieredRouter(classifier(), CHAT_AGENTS, cache_size=2)
+    for message in ("Show team velocity trends", "Check for burnout indicators", "Prepare retrospective agenda"):
+        await router.route(message)
+
+    assert (await router.route("Show team velocity trends")).tier == "local"
+    assert router.stats()["cached_messages"] == 2
+
+    router.reset()
+    assert router.stats()["decisions"] == 0
+    assert router.stats()["cached_messages"] == 0
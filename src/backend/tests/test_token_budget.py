@@ -0,0 +1,73 @@
+import json
+
+from src.backend.common.utils.token_budget import (
+    DROP,
+    SUMMARIZE,
+    PromptBudget,
+    PromptSection,
+    compact_json,
+)
+from src.backend.common.utils.tokens import count_tokens
+
+ANALYSIS = {
+    "stories": [{"title": f"Story {i}", "notes": "detail " * 60, "risks": []} for i in range(40)],
+    "summary": "Backlog is healthy",
+}
+
+
+def test_sections_within_budget_are_untouched():
+    fitted = PromptBudget(1000).fit([PromptSection("context", "Sprint 14 planning"), PromptSection("data", {"a": 1})])
+
+    assert fitted.sections == {"context": "Sprint 14 planning", "data": '{"a": 1}'}
+    assert fitted.trimmed == []
+
+
+def test_section_caps_summarize_json_structurally():
+    fitted = PromptBudget(10_000).fit([PromptSection("backlog", ANALYSIS, max_tokens=400, strategy=SUMMARIZE)])
+
+    compacted = json.loads(fitted.sections["backlog"])
+    assert fitted.tokens["backlog"] <= 400
+    assert compacted["summary"] == "Backlog is healthy"
+    assert compacted["stories"][-1].endswith("more")
+    assert fitted.trimmed[0]["action"] == "summarized"
+
+
+def test_lowest_priority_sections_are_trimmed_first():
+    sections = [
+        PromptSection("request", "Plan the next sprint " * 10, priority=10),
+        PromptSection("old_chat", "We talked about velocity " * 50, priority=0, strategy=DROP),
+        PromptSection("metrics", "cycle time 4.2 days " * 50, priority=5),
+    ]
+
+    fitted = PromptBudget(200, reserved_tokens=50).fit(sections)
+
+    assert fitted.sections["old_chat"] == ""
+    assert fitted.sections["request"] == sections[0].content
+    assert fitted.sections["metrics"].endswith("[truncated]")
+    assert fitted.total_tokens <= 150
+    assert [t["section"] for t in fitted.trimmed] == ["old_chat", "metrics"]
+
+
+def test_text_summaries_keep_first_and_last_lines():
+    log = "\n".join(f"Day {i}: standup notes for day {i}" for i in range(100))
+
+    fitted = PromptBudget(120).fit([PromptSection("log", log, strategy=SUMMARIZE)])
+
+    summary = fitted.sections["log"].splitlines()
+    assert summary[0] == "Day 0: standup notes for day 0"
+    assert summary[-1] == "Day 99: standup notes for day 99"
+    assert "…" in summary
+    assert count_tokens(fitted.sections["log"]) <= 120
+
+
+def test_min_tokens_protects_a_section():
+    fitted = PromptBudget(10).fit([PromptSection("request", "word " * 100, min_tokens=40)])
+
+    assert 30 <= fitted.tokens["request"] <= 40
+
+
+def test_compact_json_drops_empty_fields():
+    assert compact_json({"a": [], "b": None, "c": "x" * 10, "d": [1, 2, 3]}, 2, 5) == {
+        "c": "xxxxx…",
+        "d": [1, 2, "... 1 more"],
+    }
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+from src.backend.common.utils import tokens
+from src.backend.common.utils.tokens import count_json_tokens, count_tokens, pack_by_budget, truncate_to_tokens
+
+
+def test_count_tokens_grows_with_text():
+    assert count_tokens("") == 0
+    short = count_tokens("Reset password")
+    assert 0 < short < count_tokens("Reset password via an emailed, expiring one-time link")
+
+
+def test_pack_by_budget_keeps_order_and_budget():
+    chunks = pack_by_budget([3, 4, 2, 6, 1], budget=7, cost=lambda n: n)
+
+    assert chunks == [[3, 4], [2], [6, 1]]
+
+
+def test_oversized_item_gets_its_own_chunk():
+    assert pack_by_budget([2, 20, 2], budget=5, cost=lambda n: n) == [[2], [20], [2]]
+
+
+def test_count_json_tokens_matches_serialized_form():
+    item = {"key": "PROJ-1", "title": "Login"}
+
+    assert count_json_tokens(item) == count_tokens('{"key": "PROJ-1", "title": "Login"}')
+
+
+def test_truncate_to_tokens_keeps_a_fitting_prefix():
+    text = "The team finished the login story and started on payments. " * 20
+
+    truncated = truncate_to_tokens(text, 25)
+
+    assert text.startswith(truncated)
+    assert 20 <= count_tokens(truncated) <= 25
+    assert truncate_to_tokens("short", 25) == "short"
+    assert truncate_to_tokens(text, 0) == ""
+
+
+def test_an_encoding_that_fails_to_load_is_not_retried(monkeypatch):
+    attempts = []
+
+    def get_encoding(name):
+        attempts.append(name)
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(tokens, "TIKTOKEN_AVAILABLE", True)
+    monkeypatch.setattr(tokens, "tiktoken", SimpleNamespace(get_encoding=get_encoding), raising=False)
+    monkeypatch.setattr(tokens, "_failed_encodings", set())
+    tokens._load_encoding.cache_clear()
+
+    estimate = count_tokens("Reset password", encoding="offline_base")
+    assert count_tokens("Reset password", encoding="offline_base") == estimate
+    assert truncate_to_tokens("Reset password", 1, encoding="offline_base") == "Reset"
+    assert attempts == ["offline_base"]
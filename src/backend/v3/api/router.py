@@ -1316,7 +1316,10 @@ async def get_plan_by_id(
             # Use get_steps_by_plan to match the original implementation
 
             team = await memory_store.get_team_by_id(team_id=plan.team_id)
-            agent_messages = await memory_store.get_agent_messages(plan_id=plan.plan_id)
+            # Messages are only re-serialized, so skip model validation
+            agent_messages = await memory_store.get_agent_messages(
+                plan_id=plan.plan_id, raw=True
+            )
             mplan = plan.m_plan if plan.m_plan else None
             streaming_message = plan.streaming_message if plan.streaming_message else ""
             plan.streaming_message = ""  # clear streaming message after retrieval
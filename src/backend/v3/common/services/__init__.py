@@ -4,10 +4,12 @@ Exports:
 - BaseAPIService: minimal async HTTP wrapper using endpoints from AppConfig
 - MCPService: service targeting a local/remote MCP server
 - FoundryService: helper around Azure AI Foundry (AIProjectClient)
+- ChangeFeedService: pushes persisted plan/step changes to WebSocket clients
 """
 
 from .agents_service import AgentsService
 from .base_api_service import BaseAPIService
+from .change_feed_service import ChangeFeedService
 from .foundry_service import FoundryService
 from .mcp_service import MCPService
 
@@ -16,4 +18,5 @@ __all__ = [
     "MCPService",
     "FoundryService",
     "AgentsService",
+    "ChangeFeedService",
 ]
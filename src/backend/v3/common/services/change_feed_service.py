@@ -0,0 +1,380 @@
+"""Cosmos change-feed listener that pushes persisted plan updates to WebSockets.
+
+Each worker tails the container's change feed and forwards plan, step and
+agent-message changes to the WebSocket clients connected to that worker, so
+a change persisted by one worker reaches sockets held by every other worker.
+Progress is checkpointed in a lease document per worker. Each host has a
+fixed set of lease slots; a starting worker claims a free one with an ETag
+check, renews it while running and releases it on shutdown, so a restarted
+worker picks up a released (or expired) slot and resumes from its position.
+Leases that have not been renewed for a long time are deleted.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+
+from common.models.messages_kernel import DataType
+from v3.config.settings import connection_config
+from v3.models.messages import WebsocketMessageType
+
+logger = logging.getLogger(__name__)
+
+# Document types forwarded to subscribed clients
+WATCHED_DATA_TYPES = {
+    DataType.plan.value,
+    DataType.step.value,
+    DataType.agent_message.value,
+    DataType.m_plan_message.value,
+}
+
+LEASE_DATA_TYPE = "change_feed_lease"
+
+# Lease slots per host; at least the number of workers on one host
+DEFAULT_LEASE_SLOTS = 16
+# A lease not renewed for this long is free to claim
+DEFAULT_LEASE_EXPIRY = 30.0
+# Leases not renewed for this long are deleted (and expire via Cosmos TTL
+# on containers with TTL enabled)
+DEFAULT_STALE_LEASE_SECONDS = 7 * 24 * 3600
+
+Notifier = Callable[[Dict[str, Any], str, WebsocketMessageType], Awaitable[None]]
+ConnectionCheck = Callable[[str], bool]
+
+
+def lease_slot_id(slot: int, host: Optional[str] = None) -> str:
+    """Id of one of a host's lease slots."""
+    return f"{LEASE_DATA_TYPE}-{host or socket.gethostname()}-{slot}"
+
+
+def compute_diff(
+    previous: Optional[Dict[str, Any]], current: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Return the user-visible fields of current that differ from previous."""
+    fields = {k: v for k, v in current.items() if not k.startswith("_")}
+    if previous is None:
+        return fields
+    return {k: v for k, v in fields.items() if previous.get(k) != v}
+
+
+class ChangeFeedService:
+    """Tails a Cosmos container's change feed and notifies WebSocket clients."""
+
+    def __init__(
+        self,
+        container: Any,
+        lease_container: Any = None,
+        lease_id: Optional[str] = None,
+        poll_interval: float = 1.0,
+        notifier: Optional[Notifier] = None,
+        max_tracked_documents: int = 5000,
+        is_connected: Optional[ConnectionCheck] = None,
+        lease_slots: int = DEFAULT_LEASE_SLOTS,
+        lease_expiry: float = DEFAULT_LEASE_EXPIRY,
+        stale_lease_seconds: float = DEFAULT_STALE_LEASE_SECONDS,
+    ):
+        self.container = container
+        self.lease_container = lease_container or container
+        # A fixed lease id is used as is; otherwise a lease slot is claimed
+        self.fixed_lease = lease_id is not None
+        self.lease_id = lease_id
+        self.lease_slots = lease_slots
+        self.lease_expiry = lease_expiry
+        self.stale_lease_seconds = stale_lease_seconds
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval
+        if notifier is None:
+            notifier = connection_config.send_status_update_async
+            # Most changes belong to users connected to another worker
+            is_connected = is_connected or (
+                lambda user_id: user_id in connection_config.user_to_process
+            )
+        self.notifier = notifier
+        self.is_connected = is_connected or (lambda user_id: True)
+        self.max_tracked_documents = max_tracked_documents
+
+        self.continuation: Optional[str] = None
+        self._last_seen: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._etag: Optional[str] = None
+        self._renewed = 0.0
+
+    # Lease handling
+    async def load_lease(self) -> Optional[str]:
+        """Claim a lease slot, or read the fixed lease, and load its continuation."""
+        if not self.fixed_lease:
+            return await self.claim_lease()
+        try:
+            lease = await self.lease_container.read_item(
+                item=self.lease_id, partition_key=self.lease_id
+            )
+            self.continuation = lease.get("continuation")
+        except Exception:
+            logger.info("No change-feed lease %s found; starting now", self.lease_id)
+            self.continuation = None
+        return self.continuation
+
+    def _lease_body(self, lease_id: str, owner: Optional[str]) -> Dict[str, Any]:
+        return {
+            "id": lease_id,
+            "session_id": lease_id,
+            "data_type": LEASE_DATA_TYPE,
+            "continuation": self.continuation,
+            "owner": owner,
+            "renewed": time.time(),
+            "updated": datetime.now(timezone.utc).isoformat(),
+            "ttl": int(self.stale_lease_seconds),
+        }
+
+    def _claimable(self, lease: Dict[str, Any]) -> bool:
+        if lease.get("owner") in (None, self.owner):
+            return True
+        return time.time() - lease.get("renewed", 0) > self.lease_expiry
+
+    async def claim_lease(self) -> Optional[str]:
+        """Claim this host's first free lease slot and resume from its position.
+
+        Released or expired slots are preferred over new ones so a restarted
+        worker continues where a previous worker stopped. The claim is an
+        ETag-conditional write, so two workers never hold the same slot.
+        """
+        for create in (False, True):
+            for slot in range(self.lease_slots):
+                lease_id = lease_slot_id(slot)
+                try:
+                    lease = await self.lease_container.read_item(
+                        item=lease_id, partition_key=lease_id
+                    )
+                except CosmosResourceNotFoundError:
+                    lease = None
+                if lease is None and create:
+                    self.continuation = None
+                    try:
+                        saved = await self.lease_container.create_item(
+                            body=self._lease_body(lease_id, self.owner)
+                        )
+                    except CosmosResourceExistsError:
+                        continue
+                elif lease is not None and not create and self._claimable(lease):
+                    self.continuation = lease.get("continuation")
+                    try:
+                        saved = await self.lease_container.replace_item(
+                            item=lease_id,
+                            body=self._lease_body(lease_id, self.owner),
+                            etag=lease.get("_etag"),
+                            match_condition=MatchConditions.IfNotModified,
+                        )
+                    except (
+                        CosmosAccessConditionFailedError,
+                        CosmosResourceNotFoundError,
+                    ):
+                        continue
+                else:
+                    continue
+                self.lease_id = lease_id
+                self._etag = saved.get("_etag")
+                self._renewed = time.monotonic()
+                logger.info("Claimed change-feed lease %s", lease_id)
+                return self.continuation
+
+        # More workers than slots: run without a lease, starting now
+        logger.warning(
+            "All %d change-feed lease slots are taken; not checkpointing",
+            self.lease_slots,
+        )
+        self.lease_id = None
+        self.continuation = None
+        return None
+
+    async def save_lease(self, release: bool = False) -> None:
+        """Persist the current continuation token to the lease document.
+
+        With ``release`` the slot is given up so the next worker can claim it.
+        """
+        if self.fixed_lease:
+            if not self.continuation:
+                return
+            await self.lease_container.upsert_item(
+                body=self._lease_body(self.lease_id, None)
+            )
+            return
+        if self.lease_id is None:
+            return
+        try:
+            saved = await self.lease_container.replace_item(
+                item=self.lease_id,
+                body=self._lease_body(self.lease_id, None if release else self.owner),
+                etag=self._etag,
+                match_condition=MatchConditions.IfNotModified,
+            )
+        except (CosmosAccessConditionFailedError, CosmosResourceNotFoundError):
+            # Another worker took the slot after this one missed its renewals
+            logger.warning("Lost change-feed lease %s", self.lease_id)
+            self.lease_id = None
+            if not release:
+                await self.claim_lease()
+            return
+        self._etag = saved.get("_etag")
+        self._renewed = time.monotonic()
+        if release:
+            self.lease_id = None
+
+    async def renew_lease(self) -> None:
+        """Keep the claimed slot from expiring while the feed is quiet."""
+        if self.lease_id is not None and not self.fixed_lease:
+            if time.monotonic() - self._renewed >= self.lease_expiry / 3:
+                await self.save_lease()
+
+    async def remove_stale_leases(self) -> int:
+        """Delete any host's leases not renewed for ``stale_lease_seconds``."""
+        cutoff = time.time() - self.stale_lease_seconds
+        leases = self.lease_container.query_items(
+            query="SELECT c.id, c.renewed, c._etag FROM c WHERE c.data_type=@data_type",
+            parameters=[{"name": "@data_type", "value": LEASE_DATA_TYPE}],
+        )
+        removed = 0
+        async for lease in leases:
+            if lease["id"] == self.lease_id or lease.get("renewed", 0) >= cutoff:
+                continue
+            try:
+                await self.lease_container.delete_item(
+                    item=lease["id"],
+                    partition_key=lease["id"],
+                    etag=lease.get("_etag"),
+                    match_condition=MatchConditions.IfNotModified,
+                )
+                removed += 1
+            except (CosmosAccessConditionFailedError, CosmosResourceNotFoundError):
+                continue
+        if removed:
+            logger.info("Removed %d stale change-feed leases", removed)
+        return removed
+
+    # Change processing
+    def _remember(self, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        document_id = document.get("id")
+        previous = self._last_seen.pop(document_id, None)
+        self._last_seen[document_id] = document
+        while len(self._last_seen) > self.max_tracked_documents:
+            self._last_seen.popitem(last=False)
+        return previous
+
+    async def process_changes(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Forward watched documents to their owners' WebSocket connections.
+
+        Returns the number of notifications sent.
+        """
+        sent = 0
+        for document in documents:
+            data_type = document.get("data_type")
+            if data_type not in WATCHED_DATA_TYPES:
+                continue
+
+            previous = self._remember(document)
+            fields = compute_diff(previous, document)
+            user_id = document.get("user_id")
+            if not fields or not user_id or not self.is_connected(user_id):
+                continue
+
+            message = {
+                "id": document.get("id"),
+                "data_type": data_type,
+                "plan_id": document.get("plan_id"),
+                "change": "created" if previous is None else "updated",
+                "fields": fields,
+            }
+            try:
+                await self.notifier(
+                    message, user_id, WebsocketMessageType.DOCUMENT_CHANGE
+                )
+                sent += 1
+            except Exception as e:
+                logger.error("Failed to push change for %s: %s", message["id"], e)
+        return sent
+
+    async def poll_once(self) -> int:
+        """Read all pending changes once, notify clients and checkpoint.
+
+        Returns the number of watched documents seen.
+        """
+        if self.continuation:
+            feed = self.container.query_items_change_feed(
+                continuation=self.continuation
+            )
+        else:
+            feed = self.container.query_items_change_feed(start_time="Now")
+
+        pages = feed.by_page()
+        watched = 0
+        async for page in pages:
+            documents: List[Dict[str, Any]] = [document async for document in page]
+            watched += sum(
+                1 for d in documents if d.get("data_type") in WATCHED_DATA_TYPES
+            )
+            await self.process_changes(documents)
+
+        token = getattr(pages, "continuation_token", None)
+        if token:
+            self.continuation = token
+            # Only checkpoint after real changes; the lease write itself shows up
+            # in the feed and must not trigger another write.
+            if watched:
+                await self.save_lease()
+        return watched
+
+    async def run(self) -> None:
+        """Poll the change feed until cancelled."""
+        try:
+            await self.load_lease()
+        except Exception as e:
+            logger.error("Failed to claim a change-feed lease: %s", e)
+            if not self.fixed_lease:
+                self.lease_id = None
+        if not self.fixed_lease:
+            try:
+                await self.remove_stale_leases()
+            except Exception as e:
+                logger.warning("Failed to remove stale change-feed leases: %s", e)
+        while True:
+            try:
+                await self.renew_lease()
+                if not await self.poll_once():
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Change-feed polling failed: %s", e)
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """Start the listener as a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+            logger.info("Started change-feed listener")
+
+    async def stop(self) -> None:
+        """Stop the listener, checkpoint the last position and release the lease."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.save_lease(release=True)
+        except Exception as e:
+            logger.warning("Failed to save change-feed lease on stop: %s", e)
@@ -0,0 +1,22 @@
+"""
+Access to the backend's shared analytics from the MCP servers.
+
+The Jira and Slack servers run as standalone scripts next to ``src/backend``
+and reuse its ``common.analytics`` modules. ``use_backend_modules`` puts the
+backend on ``sys.path`` once, after the installed packages, so it never
+shadows a package of the same name.
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(
+    os.environ.get("SM_ASSISTANT_BACKEND_DIR")
+    or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+)
+
+
+def use_backend_modules() -> None:
+    """Make ``common.*`` from the backend importable."""
+    if BACKEND_DIR not in sys.path:
+        sys.path.append(BACKEND_DIR)
@@ -6,8 +6,10 @@ Provides integration with Atlassian Jira for backlog and project management.
 import asyncio
 import json
 import logging
+import os
 from typing import Any, Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 import httpx
 from mcp.server import Server, NotificationOptions
@@ -15,18 +17,31 @@ from mcp.server.models import InitializationOptions
 import mcp.server.stdio
 import mcp.types as types
 
+from backend_modules import use_backend_modules
+
+# Share the flow analytics used by the backend agents
+use_backend_modules()
+from common.analytics.flow_aggregator import FlowAggregator
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("jira-mcp-server")
 
 class JiraMCPServer:
-    def __init__(self, jira_url: str, email: str, api_token: str):
+    def __init__(self, jira_url: str, email: str, api_token: str,
+                 flow_snapshot_dir: Optional[str] = None):
         self.jira_url = jira_url.rstrip('/')
         self.email = email
         self.api_token = api_token
         self.server = Server("jira-scrum-assistant")
         self.client = None
         
+        # Incremental flow metrics per project and issue type
+        self.flow_snapshot_dir = flow_snapshot_dir
+        self.flow_aggregators: Dict[str, FlowAggregator] = {}
+        # JQL dates are read in the Jira user's time zone
+        self.jira_timezone: Optional[tzinfo] = None
+        
         # Register tools
         self._register_tools()
     
@@ -303,79 +318,135 @@ class JiraMCPServer:
             ]
         }
 
-    async def _get_flow_metrics(self, project_key: str, days_back: int = 30, 
-                               issue_type: str = "Story") -> Dict[str, Any]:
-        """Calculate flow metrics for completed issues"""
+    def _get_flow_aggregator(self, key: str) -> FlowAggregator:
+        """Get the aggregator for a project/issue type, restoring its snapshot if present"""
+        if key not in self.flow_aggregators:
+            aggregator = FlowAggregator()
+            path = self._flow_snapshot_path(key)
+            if path and os.path.exists(path):
+                try:
+                    aggregator = FlowAggregator.load(path)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Ignoring unreadable flow snapshot {path}: {e}")
+            self.flow_aggregators[key] = aggregator
+        return self.flow_aggregators[key]
+
+    def _flow_snapshot_path(self, key: str) -> Optional[str]:
+        if not self.flow_snapshot_dir:
+            return None
+        return os.path.join(self.flow_snapshot_dir, f"flow_{key.replace(':', '_')}.json")
+
+    @staticmethod
+    def _status_transitions(issue: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Turn an issue and its changelog into ordered status-transition events"""
+        changes = []
+        for history in (issue.get("changelog") or {}).get("histories", []):
+            for item in history["items"]:
+                if item["field"] == "status":
+                    changes.append((history["created"], item.get("fromString"), item.get("toString")))
+        changes.sort(key=lambda change: datetime.fromisoformat(change[0].replace('Z', '+00:00')))
+        
+        initial_status = changes[0][1] if changes else issue["fields"]["status"]["name"]
+        events = [{"issue": issue["key"], "from": None, "to": initial_status, "timestamp": issue["fields"]["created"]}]
+        for created, from_status, to_status in changes:
+            events.append({"issue": issue["key"], "from": from_status, "to": to_status, "timestamp": created})
+        return events
+
+    async def _get_jira_timezone(self) -> tzinfo:
+        """Time zone of the authenticated Jira user, in which JQL dates are interpreted"""
+        if self.jira_timezone is None:
+            client = await self._get_client()
+            try:
+                response = await client.get("/myself")
+                response.raise_for_status()
+                self.jira_timezone = ZoneInfo(response.json()["timeZone"])
+            except (httpx.HTTPError, KeyError, ValueError, ZoneInfoNotFoundError) as e:
+                logger.warning(f"Could not read the Jira user's time zone, assuming UTC: {e}")
+                self.jira_timezone = timezone.utc
+        return self.jira_timezone
+
+    async def _sync_flow_events(self, aggregator: FlowAggregator, project_key: str,
+                                issue_type: str, since: datetime) -> int:
+        """Feed status transitions of issues updated since the given time into the aggregator"""
         client = await self._get_client()
         
-        # Calculate date range
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back)
-        
-        jql = f"project = {project_key} AND issuetype = {issue_type} AND status = Done AND resolved >= '{start_date.strftime('%Y-%m-%d')}'"
-        
-        params = {
-            "jql": jql,
-            "maxResults": 100,
-            "fields": "created,resolutiondate,status",
-            "expand": "changelog"
-        }
-        
-        response = await client.get("/search", params=params)
-        response.raise_for_status()
-        
-        issues = response.json()["issues"]
-        
-        # Calculate metrics
-        cycle_times = []
-        lead_times = []
-        
-        for issue in issues:
-            created = datetime.fromisoformat(issue["fields"]["created"].replace('Z', '+00:00'))
-            resolved = datetime.fromisoformat(issue["fields"]["resolutiondate"].replace('Z', '+00:00'))
-            
-            # Find when work started (In Progress transition)
-            work_started = created
-            if issue.get("changelog"):
-                for history in issue["changelog"]["histories"]:
-                    for item in history["items"]:
-                        if item["field"] == "status" and "In Progress" in item.get("toString", ""):
-                            work_started = datetime.fromisoformat(history["created"].replace('Z', '+00:00'))
-                            break
+        local_since = since.astimezone(await self._get_jira_timezone())
+        jql = f"project = {project_key} AND issuetype = {issue_type} AND updated >= '{local_since.strftime('%Y-%m-%d %H:%M')}' ORDER BY updated ASC"
+        applied = 0
+        start_at = 0
+        while True:
+            params = {
+                "jql": jql,
+                "startAt": start_at,
+                "maxResults": 100,
+                "fields": "created,status",
+                "expand": "changelog"
+            }
+            response = await client.get("/search", params=params)
+            response.raise_for_status()
+            data = response.json()
             
-            lead_time = (resolved - created).total_seconds() / 86400  # Convert to days
-            cycle_time = (resolved - work_started).total_seconds() / 86400
+            for issue in data["issues"]:
+                # Already-applied transitions are skipped, so the overlap is harmless
+                applied += aggregator.consume(self._status_transitions(issue))
             
-            lead_times.append(lead_time)
-            cycle_times.append(cycle_time)
-        
-        def percentile(data, p):
-            if not data:
-                return 0
-            sorted_data = sorted(data)
-            k = (len(sorted_data) - 1) * p / 100
-            f = int(k)
-            c = k - f
-            if f == len(sorted_data) - 1:
-                return sorted_data[f]
-            return sorted_data[f] * (1 - c) + sorted_data[f + 1] * c
+            start_at += len(data["issues"])
+            if not data["issues"] or start_at >= data.get("total", 0):
+                break
+        return applied
+
+    async def _get_flow_metrics(self, project_key: str, days_back: int = 30, 
+                               issue_type: str = "Story") -> Dict[str, Any]:
+        """Calculate flow metrics, fetching only issues changed since the last call"""
+        key = f"{project_key}:{issue_type}"
+        aggregator = self._get_flow_aggregator(key)
+        
+        end_date = datetime.now(timezone.utc)
+        start_date = end_date - timedelta(days=days_back)
+        start_day = start_date.date().isoformat()
+        
+        if aggregator.synced_since is None or aggregator.synced_since > start_date.timestamp():
+            # Older transitions cannot be folded into an issue's later state, so a
+            # window reaching further back than the synced history is rebuilt
+            aggregator = self.flow_aggregators[key] = FlowAggregator()
+            aggregator.synced_since = start_date.timestamp()
+            since = start_date
+        elif aggregator.last_event_at is None:
+            since = datetime.fromtimestamp(aggregator.synced_since, timezone.utc)
+        else:
+            # Jira filters by minute, so step back one minute to avoid gaps
+            since = datetime.fromtimestamp(aggregator.last_event_at, timezone.utc) - timedelta(minutes=1)
+        
+        applied = await self._sync_flow_events(aggregator, project_key, issue_type, since)
+        path = self._flow_snapshot_path(key)
+        if path and (applied or since == start_date):
+            aggregator.save(path)
+        
+        # Lead and cycle time, flow efficiency and stage dwell cover the period;
+        # work in progress is as of now
+        metrics = aggregator.metrics_since(start_day)
+        completed = aggregator.throughput_since(start_day)
+        
+        def summary(distribution):
+            return {
+                "average": distribution["average_days"],
+                "p50": distribution["p50_days"],
+                "p85": distribution["p85_days"],
+                "p95": distribution["p95_days"]
+            }
         
         return {
             "period": f"{days_back} days",
-            "total_completed_issues": len(issues),
-            "throughput": len(issues) / (days_back / 7),  # Issues per week
-            "lead_time": {
-                "average": sum(lead_times) / len(lead_times) if lead_times else 0,
-                "p50": percentile(lead_times, 50),
-                "p85": percentile(lead_times, 85),
-                "p95": percentile(lead_times, 95)
-            },
-            "cycle_time": {
-                "average": sum(cycle_times) / len(cycle_times) if cycle_times else 0,
-                "p50": percentile(cycle_times, 50),
-                "p85": percentile(cycle_times, 85),
-                "p95": percentile(cycle_times, 95)
-            }
+            "total_completed_issues": completed,
+            "throughput": completed / (days_back / 7),  # Issues per week
+            "lead_time": summary(metrics["lead_time"]),
+            "cycle_time": summary(metrics["cycle_time"]),
+            "work_in_progress": metrics["work_in_progress"],
+            "flow_efficiency": metrics["flow_efficiency"],
+            "stage_dwell": metrics["stage_dwell"],
+            "cumulative_flow": aggregator.cumulative_flow_diagram(since=start_day),
+            "events_applied": applied,
+            "last_event_at": metrics["last_event_at"]
         }
 
     async def _update_story_status(self, issue_key: str, transition: str) -> Dict[str, Any]:
@@ -461,18 +532,17 @@ class JiraMCPServer:
             )
 
 async def main():
-    import os
-    
     # Get configuration from environment variables
     jira_url = os.getenv("JIRA_URL", "https://your-company.atlassian.net")
     email = os.getenv("JIRA_EMAIL", "your-email@company.com")
     api_token = os.getenv("JIRA_API_TOKEN", "your-api-token")
+    flow_snapshot_dir = os.getenv("JIRA_FLOW_SNAPSHOT_DIR")
     
     if not all([jira_url, email, api_token]):
         logger.error("Missing required environment variables: JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN")
         return
     
-    server = JiraMCPServer(jira_url, email, api_token)
+    server = JiraMCPServer(jira_url, email, api_token, flow_snapshot_dir)
     await server.run()
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ Provides integration with Slack for team communication analysis and notification
 import asyncio
 import json
 import logging
+import os
 from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 import re
@@ -17,6 +18,12 @@ from mcp.server.models import InitializationOptions
 import mcp.server.stdio
 import mcp.types as types
 
+from backend_modules import use_backend_modules
+
+# Share the sentiment lexicon with the backend agents
+use_backend_modules()
+from common.analytics.sentiment import score_message, score_messages
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("slack-mcp-server")
@@ -216,51 +223,8 @@ class SlackMCPServer:
         return messages
 
     def _analyze_sentiment(self, text: str) -> Dict[str, Any]:
-        """Simple sentiment analysis based on keywords and patterns"""
-        positive_words = [
-            'good', 'great', 'excellent', 'awesome', 'fantastic', 'love', 'perfect', 
-            'amazing', 'wonderful', 'brilliant', 'outstanding', 'superb', 'thanks',
-            'thank you', '👍', '🎉', '✅', '💚', '😊', '😃', '🙌'
-        ]
-        
-        negative_words = [
-            'bad', 'terrible', 'awful', 'hate', 'horrible', 'frustrated', 'annoying',
-            'difficult', 'problem', 'issue', 'bug', 'broken', 'stuck', 'blocked',
-            'worried', 'concerned', '👎', '😞', '😢', '😤', '🚨', '❌'
-        ]
-        
-        stress_indicators = [
-            'overwhelmed', 'stressed', 'burnout', 'tired', 'exhausted', 'overwork',
-            'too much', 'cant handle', "can't handle", 'struggling', 'pressure'
-        ]
-        
-        text_lower = text.lower()
-        
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        stress_count = sum(1 for word in stress_indicators if word in text_lower)
-        
-        # Calculate sentiment score (-1 to +1)
-        if positive_count == 0 and negative_count == 0:
-            sentiment_score = 0
-        else:
-            sentiment_score = (positive_count - negative_count) / (positive_count + negative_count)
-        
-        # Determine sentiment category
-        if sentiment_score > 0.3:
-            sentiment = "positive"
-        elif sentiment_score < -0.3:
-            sentiment = "negative"
-        else:
-            sentiment = "neutral"
-        
-        return {
-            "sentiment": sentiment,
-            "score": sentiment_score,
-            "positive_signals": positive_count,
-            "negative_signals": negative_count,
-            "stress_indicators": stress_count
-        }
+        """Keyword and emoji sentiment analysis using the shared compiled lexicon"""
+        return score_message(text)
 
     async def _analyze_channel_sentiment(self, channel: str, days_back: int = 7, 
                                        include_threads: bool = True) -> Dict[str, Any]:
@@ -277,12 +241,13 @@ class SlackMCPServer:
             if msg.get("subtype") != "bot_message" and "text" in msg
         ]
         
-        # Analyze each message
+        # Score all messages in one batch, then aggregate per user
         sentiments = []
         user_activity = {}
         total_engagement = 0
+        batch_scores = score_messages([msg["text"] for msg in human_messages])
         
-        for msg in human_messages:
+        for msg, sentiment_analysis in zip(human_messages, batch_scores):
             text = msg["text"]
             user_id = msg.get("user", "unknown")
             
@@ -290,7 +255,6 @@ class SlackMCPServer:
             if not text.strip():
                 continue
             
-            sentiment_analysis = self._analyze_sentiment(text)
             sentiments.append(sentiment_analysis)
             
             # Track user activity
@@ -521,13 +485,14 @@ class SlackMCPServer:
                     channels_active_in += 1
                     total_messages += len(user_messages)
                     
-                    # Analyze sentiment of user's messages
+                    # Analyze sentiment of user's messages in one batch
+                    texts = [msg.get("text", "") for msg in user_messages]
+                    sentiment_scores.extend(
+                        sentiment["score"]
+                        for text, sentiment in zip(texts, score_messages(texts))
+                        if text.strip()
+                    )
                     for msg in user_messages:
-                        text = msg.get("text", "")
-                        if text.strip():
-                            sentiment = self._analyze_sentiment(text)
-                            sentiment_scores.append(sentiment["score"])
-                            
                         # Count reactions received
                         total_reactions_received += len(msg.get("reactions", []))
                 